@@ -8,22 +8,52 @@ Date: 2025-10-21
 Purpose: University Thesis - Monolith vs Microservices Comparison
 """
 
-import json
 import glob
 import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
 import os
 
+from perf import goodput
+from perf import summary
+from perf.summary import RunSummary
+
+DEFAULT_ACCESS_LOG = os.path.join('gateway-logs', 'access.log')
+DEFAULT_TRACES = 'traces.json'
+DEFAULT_MATRIX_DIR = 'matrix'
+
 class PerformanceAnalyzer:
     """Analyzes performance test results and generates visualizations"""
 
-    def __init__(self):
+    def __init__(self, access_log=None, traces=None, matrix_dir=None, exclude_warmup=False,
+                 discard_client_bound=False, slo_script=None):
         self.results = {
             'monolith': {},
             'microservices': {}
         }
         self.scenarios = ['light_load', 'medium_load', 'heavy_load']
+        self.access_log = access_log
+        self.gateway_log = None
+        self.taxonomies = {}
+        self.raw_requests = {}
+        self.predictions = {}
+        self.traces = traces
+        self.trace_summary = None
+        self.matrix_dir = matrix_dir
+        self.matrix_cells = []
+        self.matrix_images = []
+        self.capacities = {}
+        self.payloads = {}
+        self.exclude_warmup = exclude_warmup
+        self.warmups = {}
+        self.discard_client_bound = discard_client_bound
+        self.client_health = {}
+        self.normalized = {}
+        self.distributions = {}
+        self.exemplars = {}
+        self.variants = {}
+        self.slo_script = slo_script
+        self.slos = {}
 
     def load_results(self):
         """Load all test result JSON files"""
@@ -38,42 +68,404 @@ class PerformanceAnalyzer:
 
         for file in result_files:
             try:
-                with open(file, 'r') as f:
-                    data = json.load(f)
+                # Format: results-{architecture}-{scenario}.json; any TEST_NAME besides
+                # monolith / microservices is a deployment variant (perf.variants)
+                run = summary.load(file)
+                if run.architecture:
+                    self.results.setdefault(run.architecture, {})[run.scenario] = run
+                    print(f"  ✓ Loaded: {run.architecture} - {run.scenario}")
 
-                    # Extract architecture and scenario from filename
-                    # Format: results-{architecture}-{scenario}.json
-                    parts = file.replace('results-', '').replace('.json', '').split('-')
+            except Exception as e:
+                print(f"  ⚠️  Error loading {file}: {e}")
 
-                    if len(parts) >= 2:
-                        architecture = parts[0]
-                        scenario = '_'.join(parts[1:])
+        return True
 
-                        if architecture in self.results:
-                            self.results[architecture][scenario] = data
-                            print(f"  ✓ Loaded: {architecture} - {scenario}")
+    def load_gateway_log(self):
+        """Parse the nginx gateway access log, if one is available"""
+        path = self.access_log or DEFAULT_ACCESS_LOG
+        if not os.path.exists(path):
+            if self.access_log:
+                print(f"  ⚠️  Access log not found: {path}")
+            return False
 
-            except Exception as e:
-                print(f"  ⚠️  Error loading {file}: {e}")
+        from perf import gateway
+
+        print(f"\n🔀 Parsing gateway access log: {path}")
+        self.gateway_log = gateway.parse_access_log(path)
+        print(f"  ✓ Parsed {len(self.gateway_log):,} requests")
+        return len(self.gateway_log) > 0
+
+    def load_raw_streams(self):
+        """Build the goodput / error taxonomy from raw k6 streams, if present"""
+        from perf import k6stream
+
+        for (architecture, scenario), path in k6stream.find_raw_results().items():
+            print(f"\n🎯 Classifying requests: {path}")
+            requests = k6stream.read_requests(path)
+            if len(requests):
+                self.raw_requests[(architecture, scenario)] = requests
+                self.taxonomies[(architecture, scenario)] = goodput.taxonomy(requests)
+                print(f"  ✓ {len(requests):,} requests, goodput "
+                      f"{self.taxonomies[(architecture, scenario)]['goodput']:.2f} req/s")
+
+        return bool(self.taxonomies)
+
+    def analyze_warmup(self):
+        """Detect the warm-up phase of every raw stream; optionally drop it from the headline metrics"""
+        from perf import warmup
+
+        for (architecture, scenario), requests in self.raw_requests.items():
+            result = warmup.analyze(requests)
+            self.warmups[(architecture, scenario)] = result
+            print(f"  🔥 {architecture} - {scenario}: cold start {result['cold_start_ms']:.0f} ms, "
+                  f"steady after {result['warmup_seconds']:.0f}s")
+
+        return bool(self.warmups)
+
+    def analyze_client_health(self):
+        """Load-generator self-monitoring samples (perf.loadgen runs) from the raw streams"""
+        from perf import clientmonitor, k6stream
+
+        for (architecture, scenario), path in k6stream.find_raw_results().items():
+            samples, limit = clientmonitor.read_samples(path)
+            if samples:
+                assessment = clientmonitor.assess(samples, limit)
+                self.client_health[(architecture, scenario)] = (samples, assessment)
+                print(f"  {'⚠️ ' if assessment['bound_seconds'] else '🩺'} {architecture} - {scenario}: "
+                      f"{clientmonitor.recommendation(assessment)}")
+
+        return bool(self.client_health)
+
+    def analyze_exemplars(self):
+        """The slowest requests of every raw stream, overall, per endpoint and per phase"""
+        from perf import exemplars, k6stream
+
+        for (architecture, scenario), path in k6stream.find_raw_results().items():
+            result = exemplars.collect(path)
+            if result['overall']:
+                self.exemplars[(architecture, scenario)] = result
+                slowest = result['overall'][0]
+                print(f"  🔎 {architecture} - {scenario}: slowest {slowest['duration']:.0f} ms "
+                      f"{slowest['endpoint']} at {slowest['timestamp']}")
+
+        return bool(self.exemplars)
+
+    def analyze_slos(self):
+        """Per-window SLO compliance, Apdex and error-budget burn from the k6 script thresholds"""
+        from perf import k6stream, slo, thresholds
+
+        path = self.slo_script or thresholds.DEFAULT_SCRIPT
+        if not os.path.exists(path):
+            print(f"  ⚠️  SLO script not found: {path}")
+            return False
+        print(f"\n🚦 Checking SLOs from {path} per {slo.WINDOW_SECONDS}s window...")
+        self.slos = slo.analyze(k6stream.find_raw_results(), thresholds.load(path), self.raw_requests)
+        for (architecture, scenario), run in self.slos.items():
+            for result in run:
+                row = result['endpoints']['all']
+                if row['total']:
+                    print(f"  {'✓' if row['met'] else '✗'} {architecture} - {scenario}: "
+                          f"{result['objective']['key']} {result['objective']['expression']} budget used "
+                          f"{row['budget_used'] * 100:.0f}%, {row['burning']} of {len(row['windows'])} windows burning")
+        return bool(self.slos)
+
+    def generate_slo_graph(self):
+        from perf import slo
+
+        slo.plot_burn(self.slos, 'graph-slo-burn.png')
+        print("  ✓ Saved: graph-slo-burn.png")
+
+    def match_exemplars(self):
+        """Attach the gateway access-log line (upstream, upstream time) to every exemplar"""
+        from perf import exemplars
+
+        matched = sum(exemplars.attach_gateway(result, self.gateway_log) for result in self.exemplars.values())
+        print(f"  ✓ Matched {matched} exemplars to gateway log lines")
+
+    def apply_exclusions(self):
+        """Recompute the headline metrics without warm-up and/or client-bound requests"""
+        from perf import clientmonitor, k6stream, warmup
+
+        for key, requests in self.raw_requests.items():
+            architecture, scenario = key
+            if scenario not in self.results.get(architecture, {}):
+                continue
+            mask, config = None, {}
+            if self.exclude_warmup and key in self.warmups:
+                mask = warmup.steady_mask(requests, self.warmups[key])
+                config['warmupExcludedSeconds'] = self.warmups[key]['warmup_seconds']
+            if self.discard_client_bound and key in self.client_health:
+                assessment = self.client_health[key][1]
+                healthy = clientmonitor.healthy_mask(requests, assessment)
+                mask = healthy if mask is None else mask & healthy
+                config['clientBoundExcludedSeconds'] = assessment['bound_seconds']
+            if mask is not None:
+                self.results[architecture][scenario] = RunSummary(k6stream.subset_summary(
+                    self.results[architecture][scenario], requests, mask, config), architecture, scenario)
+
+    def generate_client_health_graph(self):
+        from perf import clientmonitor
+
+        clientmonitor.plot_health(self.client_health, 'graph-client-health.png')
+        print("  ✓ Saved: graph-client-health.png")
+
+    def generate_warmup_graph(self):
+        """Per-second median latency of each run with the detected warm-up shaded"""
+        runs = sorted(self.warmups.items())
+        cols = min(3, len(runs))
+        rows = (len(runs) + cols - 1) // cols
+        fig, axes = plt.subplots(rows, cols, figsize=(6 * cols, 4 * rows), squeeze=False)
+
+        for ax, ((architecture, scenario), w) in zip(axes.flat, runs):
+            ax.plot(w['series']['second'], w['series']['median_ms'], color='#3498db', linewidth=1)
+            if w['warmup_seconds']:
+                ax.axvspan(0, w['warmup_seconds'], color='#e74c3c', alpha=0.2, label='Warm-up')
+                ax.legend()
+            ax.set_title(f"{architecture.title()} - {scenario.replace('_', ' ').title()}", fontweight='bold')
+            ax.set_xlabel('Seconds since start')
+            ax.set_ylabel('Median Response Time (ms)')
+            ax.set_yscale('log')
+            ax.grid(True, alpha=0.3)
+        for ax in list(axes.flat)[len(runs):]:
+            ax.axis('off')
+
+        plt.tight_layout()
+        plt.savefig('graph-warmup.png', dpi=150, bbox_inches='tight')
+        plt.close()
+        print("  ✓ Saved: graph-warmup.png")
+
+    def load_traces(self):
+        """Critical-path breakdown from an OTLP JSON span dump, if available"""
+        path = self.traces or DEFAULT_TRACES
+        if not os.path.exists(path):
+            if self.traces:
+                print(f"  ⚠️  Trace file not found: {path}")
+            return False
+
+        from perf import traces
+
+        print(f"\n🧭 Loading spans: {path}")
+        spans = traces.load_spans(path)
+        print(f"  ✓ {len(spans):,} spans in {spans.trace_count:,} traces")
+        self.trace_summary = traces.analyze(spans)
+        return True
 
+    def load_matrix(self):
+        """Load load x data-size matrix runs (run-matrix-tests.ps1), if present"""
+        directory = self.matrix_dir or DEFAULT_MATRIX_DIR
+        if not os.path.isdir(directory):
+            if self.matrix_dir:
+                print(f"  ⚠️  Matrix directory not found: {directory}")
+            return False
+
+        from perf import matrix
+
+        print(f"\n🗺️  Loading load x data-size matrix: {directory}")
+        self.matrix_cells = matrix.load_cells(directory)
+        print(f"  ✓ {len(self.matrix_cells)} runs")
+        return bool(self.matrix_cells)
+
+    def generate_matrix_graphs(self):
+        """Heatmaps and contour plots of p95 / throughput per architecture"""
+        from perf import matrix
+
+        for architecture in sorted({c.architecture for c in self.matrix_cells}):
+            path = f'graph-matrix-{architecture}.png'
+            matrix.plot_matrix(self.matrix_cells, architecture, path)
+            self.matrix_images.append(path)
+            print(f"  ✓ Saved: {path}")
+
+    def load_capacities(self):
+        """Per-endpoint saturation results (capacity-*.json), if present"""
+        from perf import saturation
+
+        self.capacities = saturation.load_capacities()
+        for architecture, capacity in self.capacities.items():
+            print(f"\n🧱 Loaded capacity table: {architecture} ({len(capacity['endpoints'])} endpoints)")
+        return bool(self.capacities)
+
+    def analyze_normalized(self):
+        """Little's Law / think-time normalization of the closed-loop runs"""
+        from perf import littleslaw
+
+        print("\n⚖️  Normalizing throughput for think time...")
+        self.normalized = littleslaw.analyze(self.results)
+        for architecture, a in self.normalized.items():
+            fit = a['fit']
+            capacity = (f"~{fit['capacity']:.0f} req/s" if fit['capacity'] else
+                        f"not reached (> {fit['lower_bound']:.1f} req/s)")
+            print(f"  ✓ {architecture}: capacity {capacity}")
+            for scenario, run in a['runs'].items():
+                if not run['little_ok']:
+                    print(f"  ⚠️  {architecture} {scenario}: Little's Law gives {run['little_vus']:.1f} VUs, "
+                          f"configured {run['vus']:.0f}")
+        return bool(self.normalized)
+
+    def generate_normalized_graph(self):
+        from perf import littleslaw
+
+        littleslaw.plot_normalized(self.normalized, 'graph-normalized-throughput.png', self.scenarios)
+        print("  ✓ Saved: graph-normalized-throughput.png")
+
+    def analyze_distributions(self):
+        """Per-endpoint and merged percentiles from the summaries' exported histograms"""
+        from perf import distribution
+
+        self.distributions = distribution.analyze(self.results, self.scenarios, self.raw_requests)
+        if self.distributions:
+            print("\n📐 Reading latency histograms from the summaries and raw streams...")
+        for architecture, a in self.distributions.items():
+            merged = a['merged']['overall']
+            print(f"  ✓ {architecture}: {len(a['runs'])} runs merged, p99 {merged.quantile(0.99):.1f} ms, "
+                  f"p99.9 {merged.quantile(0.999):.1f} ms")
+        return bool(self.distributions)
+
+    def generate_distribution_graph(self):
+        from perf import distribution
+
+        distribution.plot_distribution(self.distributions, 'graph-latency-distribution.png', self.scenarios)
+        print("  ✓ Saved: graph-latency-distribution.png")
+
+    def analyze_variants(self):
+        """Pairwise deltas, ranking and Pareto front when more than two deployment variants were run"""
+        from perf import variants
+
+        analysis = variants.analyze(self.results, self.scenarios)
+        if variants.variant_count(analysis) <= 2:
+            return False
+        self.variants = analysis
+        print(f"\n🧪 Comparing {variants.variant_count(analysis)} deployment variants...")
+        for scenario, a in analysis.items():
+            best = a['ranking'][0]
+            print(f"  ✓ {scenario}: best {best[0]} (mean rank {best[1]:.2f}), Pareto front {', '.join(a['pareto'])}")
         return True
 
+    def generate_variant_graph(self):
+        from perf import variants
+
+        variants.plot_pareto(self.variants, 'graph-variants-pareto.png')
+        print("  ✓ Saved: graph-variants-pareto.png")
+
+    def load_payloads(self):
+        """Payload size and compression analysis of sampled bodies (bodies-*.ndjson), if present"""
+        from perf import payload
+
+        for (architecture, scenario), path in payload.find_bodies().items():
+            print(f"\n📦 Measuring response payloads: {path}")
+            summary = self.results.get(architecture, {}).get(scenario)
+            self.payloads[(architecture, scenario)] = payload.analyze(payload.read_bodies(path), summary)
+            print(f"  ✓ {len(self.payloads[(architecture, scenario)])} endpoints")
+        return bool(self.payloads)
+
+    def generate_payload_graph(self):
+        from perf import payload
+
+        payload.plot_payloads(self.payloads, 'graph-payload.png')
+        print("  ✓ Saved: graph-payload.png")
+
+    def simulate_what_if(self, vus_levels=(5, 10, 20, 50, 100, 150, 200)):
+        """Predict unmeasured load levels with the calibrated queueing simulator"""
+        from perf import simulator
+
+        print("\n🔮 Calibrating queueing simulator...")
+        gateway_ms = None
+        if self.gateway_log is not None:
+            overhead = self.gateway_log.upstream_stats()
+            medians = [s['overhead']['p50'] for s in overhead.values() if s['overhead']]
+            gateway_ms = float(np.median(medians)) if medians else None
+
+        models = simulator.build_models(self.results, self.raw_requests, gateway_ms)
+        for architecture, model in models.items():
+            self.predictions[architecture] = {
+                'servers': model.servers,
+                'measured': simulator.measured_points(self.results[architecture]),
+                'predicted': simulator.predict(model, vus_levels),
+            }
+            print(f"  ✓ {architecture}: {model.servers} servers/instance")
+
+        return bool(self.predictions)
+
+    def generate_prediction_graph(self):
+        """Plot predicted vs measured latency and throughput curves"""
+        colors = {'monolith': '#3498db', 'microservices': '#e74c3c'}
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+        for architecture, p in self.predictions.items():
+            color = colors.get(architecture)
+            vus = [x['vus'] for x in p['predicted']]
+            ax1.plot(vus, [x['p95_response_time'] for x in p['predicted']], '--', color=color,
+                     label=f'{architecture.title()} P95 (predicted)')
+            ax1.plot(vus, [x['avg_response_time'] for x in p['predicted']], ':', color=color,
+                     label=f'{architecture.title()} Avg (predicted)')
+            ax2.plot(vus, [x['throughput'] for x in p['predicted']], '--', color=color,
+                     label=f'{architecture.title()} (predicted)')
+
+            measured = sorted(p['measured'].values(), key=lambda m: m['vus'])
+            ax1.plot([m['vus'] for m in measured], [m['p95_response_time'] for m in measured], 'o',
+                     color=color, label=f'{architecture.title()} P95 (measured)')
+            ax1.plot([m['vus'] for m in measured], [m['avg_response_time'] for m in measured], 's',
+                     color=color, label=f'{architecture.title()} Avg (measured)')
+            ax2.plot([m['vus'] for m in measured], [m['throughput'] for m in measured], 'o',
+                     color=color, label=f'{architecture.title()} (measured)')
+
+        ax1.set_title('Response Time: Predicted vs Measured', fontweight='bold')
+        ax1.set_ylabel('Response Time (ms)')
+        ax2.set_title('Throughput: Predicted vs Measured', fontweight='bold')
+        ax2.set_ylabel('Throughput (requests/second)')
+        for ax in (ax1, ax2):
+            ax.set_xlabel('Number of Concurrent Users')
+            ax.legend(fontsize=8)
+            ax.grid(True, alpha=0.3)
+
+        plt.tight_layout()
+        plt.savefig('graph-predicted-vs-measured.png', dpi=300, bbox_inches='tight')
+        plt.close()
+        print("  ✓ Saved: graph-predicted-vs-measured.png")
+
+    def generate_gateway_graph(self):
+        """Plot per-upstream latency distributions from the gateway log"""
+        from perf import gateway
+
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+        centers = np.sqrt(gateway.HISTOGRAM_EDGES[:-1] * gateway.HISTOGRAM_EDGES[1:])
+
+        for upstream, stats in sorted(self.gateway_log.upstream_stats().items()):
+            for ax, key in ((ax1, 'upstream_time'), (ax2, 'overhead')):
+                if stats[key]:
+                    ax.step(centers, stats[key]['histogram'], where='mid', label=upstream)
+
+        ax1.set_title('Upstream Response Time Distribution', fontweight='bold')
+        ax2.set_title('Gateway Overhead Distribution', fontweight='bold')
+        for ax in (ax1, ax2):
+            ax.set_xscale('log')
+            ax.set_xlabel('Time (ms)')
+            ax.set_ylabel('Requests')
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+
+        plt.tight_layout()
+        plt.savefig('graph-gateway-upstreams.png', dpi=300, bbox_inches='tight')
+        plt.close()
+        print("  ✓ Saved: graph-gateway-upstreams.png")
+
     def extract_metrics(self, data):
         """Extract key metrics from test data"""
-        metrics = data.get('metrics', {})
+        run = RunSummary.of(data)
+        duration = run.trend('http_req_duration')
 
         return {
-            'avg_response_time': metrics.get('http_req_duration', {}).get('values', {}).get('avg', 0),
-            'median_response_time': metrics.get('http_req_duration', {}).get('values', {}).get('med', 0),
-            'p95_response_time': metrics.get('http_req_duration', {}).get('values', {}).get('p(95)', 0),
-            'p99_response_time': metrics.get('http_req_duration', {}).get('values', {}).get('p(99)', 0),
-            'max_response_time': metrics.get('http_req_duration', {}).get('values', {}).get('max', 0),
-            'min_response_time': metrics.get('http_req_duration', {}).get('values', {}).get('min', 0),
-            'throughput': metrics.get('http_reqs', {}).get('values', {}).get('rate', 0),
-            'total_requests': metrics.get('http_reqs', {}).get('values', {}).get('count', 0),
-            'error_rate': (metrics.get('errors', {}).get('values', {}).get('rate', 0)) * 100,
-            'success_rate': (1 - metrics.get('errors', {}).get('values', {}).get('rate', 0)) * 100,
-            'data_received_mb': metrics.get('data_received', {}).get('values', {}).get('count', 0) / 1024 / 1024,
+            'avg_response_time': duration.avg,
+            'median_response_time': duration.med,
+            'p95_response_time': duration.p95,
+            'p99_response_time': duration.p99,
+            'max_response_time': duration.max,
+            'min_response_time': duration.min,
+            'throughput': run.throughput,
+            'total_requests': run.total_requests,
+            'error_rate': run.error_rate * 100,
+            'success_rate': (1 - run.error_rate) * 100,
+            'data_received_mb': run.data_received_mb,
+            'goodput': run.goodput,
         }
 
     def generate_comparison_graphs(self):
@@ -353,6 +745,14 @@ class PerformanceAnalyzer:
                     {((micro['throughput'] - mono['throughput']) / mono['throughput'] * 100):+.1f}%
                 </td>
             </tr>
+            <tr>
+                <td>Goodput (useful req/s)</td>
+                <td>{mono['goodput']:.2f} req/s</td>
+                <td>{micro['goodput']:.2f} req/s</td>
+                <td class="{'better' if micro['goodput'] > mono['goodput'] else 'worse'}">
+                    {((micro['goodput'] - mono['goodput']) / mono['goodput'] * 100) if mono['goodput'] else 0:+.1f}%
+                </td>
+            </tr>
             <tr>
                 <td>Error Rate</td>
                 <td>{mono['error_rate']:.2f}%</td>
@@ -364,6 +764,88 @@ class PerformanceAnalyzer:
         </table>
 """
 
+        if self.taxonomies:
+            html += goodput.generate_html_section(self.taxonomies)
+
+        if self.normalized:
+            from perf import littleslaw
+
+            html += littleslaw.generate_html_section(self.normalized, self.scenarios)
+
+        if self.variants:
+            from perf import variants
+
+            html += variants.generate_html_section(self.variants)
+
+        if self.distributions:
+            from perf import distribution
+
+            html += distribution.generate_html_section(self.distributions, self.scenarios)
+
+        if self.slos:
+            from perf import slo
+
+            html += slo.generate_html_section(self.slos)
+
+        if self.exemplars:
+            from perf import exemplars
+
+            html += exemplars.generate_html_section(self.exemplars)
+
+        if self.client_health:
+            from perf import clientmonitor
+
+            html += clientmonitor.generate_html_section(self.client_health, self.discard_client_bound)
+
+        if self.warmups:
+            from perf import warmup
+
+            html += warmup.generate_html_section(self.warmups, self.exclude_warmup)
+
+        if self.payloads:
+            from perf import payload
+
+            html += payload.generate_html_section(self.payloads)
+
+        if self.trace_summary:
+            from perf import traces
+
+            html += traces.generate_html_section(self.trace_summary)
+
+        if self.capacities:
+            from perf import saturation
+
+            html += saturation.generate_html_section(self.capacities)
+
+        if self.matrix_cells:
+            from perf import matrix
+
+            html += matrix.generate_html_section(self.matrix_cells, self.matrix_images)
+
+        if self.predictions:
+            html += """
+        <h2>🔮 What-If Simulation</h2>
+        <p>Calibrated discrete-event queueing model (closed-loop VUs with the test-scenarios.js think times).
+        Dashed lines are predictions, markers are measured runs.</p>
+        <img src="graph-predicted-vs-measured.png" alt="Predicted vs Measured">
+        <table>
+            <tr><th>Architecture</th><th>VUs</th><th>Avg</th><th>P95</th><th>P99</th><th>Throughput</th></tr>
+"""
+            for architecture, p in self.predictions.items():
+                for x in p['predicted']:
+                    html += f"""            <tr><td>{architecture.title()}</td><td>{x['vus']}</td><td>{x['avg_response_time']:.1f} ms</td><td>{x['p95_response_time']:.1f} ms</td><td>{x['p99_response_time']:.1f} ms</td><td>{x['throughput']:.2f} req/s</td></tr>
+"""
+            html += """        </table>
+"""
+
+        if self.gateway_log is not None:
+            from perf import gateway
+
+            html += gateway.generate_html_section(self.gateway_log)
+            html += """
+        <img src="graph-gateway-upstreams.png" alt="Gateway Upstream Latency">
+"""
+
         html += """
         <h2>🎓 Thesis Graphs</h2>
         <p>Individual graphs for thesis inclusion:</p>
@@ -391,7 +873,35 @@ class PerformanceAnalyzer:
         if not self.load_results():
             return False
 
+        # Raw streams first: warm-up / client-bound exclusion changes the headline metrics
+        if self.load_raw_streams():
+            if self.analyze_warmup():
+                self.generate_warmup_graph()
+            if self.analyze_client_health():
+                self.generate_client_health_graph()
+            self.analyze_exemplars()
+            if self.analyze_slos():
+                self.generate_slo_graph()
+            self.apply_exclusions()
         self.generate_comparison_graphs()
+        if self.analyze_normalized():
+            self.generate_normalized_graph()
+        if self.analyze_distributions():
+            self.generate_distribution_graph()
+        if self.analyze_variants():
+            self.generate_variant_graph()
+        if self.load_gateway_log():
+            self.generate_gateway_graph()
+            if self.exemplars:
+                self.match_exemplars()
+        self.load_traces()
+        if self.load_matrix():
+            self.generate_matrix_graphs()
+        self.load_capacities()
+        if self.load_payloads():
+            self.generate_payload_graph()
+        if self.simulate_what_if():
+            self.generate_prediction_graph()
         self.generate_html_report()
 
         print("\n✅ Analysis complete!")
@@ -399,6 +909,22 @@ class PerformanceAnalyzer:
         print("  - performance-comparison-graphs.png (all graphs)")
         print("  - graph-response-time-vs-users.png (thesis)")
         print("  - graph-throughput-vs-users.png (thesis)")
+        if self.normalized:
+            print("  - graph-normalized-throughput.png (think-time normalization)")
+        if self.distributions:
+            print("  - graph-latency-distribution.png (latency histograms)")
+        if self.variants:
+            print("  - graph-variants-pareto.png (deployment variants)")
+        if self.gateway_log is not None:
+            print("  - graph-gateway-upstreams.png (gateway attribution)")
+        for path in self.matrix_images:
+            print(f"  - {path} (load x data size)")
+        if self.payloads:
+            print("  - graph-payload.png (response payloads)")
+        if self.client_health:
+            print("  - graph-client-health.png (load generator health)")
+        if self.slos:
+            print("  - graph-slo-burn.png (error-budget burn)")
         print("  - comparison-report.html (full report)")
 
         print("\n📖 Open comparison-report.html in your browser to view results!")
@@ -407,10 +933,31 @@ class PerformanceAnalyzer:
 
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Analyze K6 performance test results')
+    parser.add_argument('--access-log', help=f'nginx gateway access log (default: {DEFAULT_ACCESS_LOG} if present)')
+    parser.add_argument('--traces', help=f'OTLP JSON span dump (default: {DEFAULT_TRACES} if present)')
+    parser.add_argument('--exclude-warmup', action='store_true',
+                        help='drop the detected warm-up phase from the headline comparison (needs raw streams)')
+    parser.add_argument('--discard-client-bound', action='store_true',
+                        help='drop requests from windows where the load generator was the bottleneck')
+    parser.add_argument('--slo-script', help='k6 script or JSON config whose thresholds are the SLOs '
+                        '(default: test-scenarios.js)')
+    parser.add_argument('--matrix-dir', help=f'load x data-size runs (default: {DEFAULT_MATRIX_DIR}/ if present)')
+    parser.add_argument('--profile', nargs='?', const='profile-analyze', metavar='PREFIX',
+                        help='per-stage time / memory profile: PREFIX.prof and PREFIX-timeline.json')
+    args = parser.parse_args()
+
     try:
         import matplotlib
-        analyzer = PerformanceAnalyzer()
-        analyzer.run_analysis()
+        from perf import profiling
+        analyzer = PerformanceAnalyzer(access_log=args.access_log, traces=args.traces,
+                                       matrix_dir=args.matrix_dir, exclude_warmup=args.exclude_warmup,
+                                       discard_client_bound=args.discard_client_bound, slo_script=args.slo_script)
+        with profiling.session(args.profile, 'analyze-results') as profiler:
+            profiler.instrument(analyzer)
+            analyzer.run_analysis()
     except ImportError:
         print("❌ Error: matplotlib is required")
         print("   Install with: pip install matplotlib")
@@ -5,12 +5,13 @@ Performance Test Graph Generator
 Generates comparison graphs for Monolith vs Microservices
 """
 
-import json
 import glob
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 
+from perf import summary
+
 # Configure matplotlib for Serbian Cyrillic
 plt.rcParams['font.family'] = 'DejaVu Sans'
 plt.rcParams['axes.unicode_minus'] = False
@@ -38,12 +39,12 @@ class GraphGenerator:
 
         for file in result_files:
             try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                arch = data['testConfig']['testName']
-                scenario = data['testConfig']['scenario']
-                self.results[arch][scenario] = data
+                run = summary.load(file)
+                arch = run.config['testName']
+                scenario = run.config['scenario']
+                if arch not in self.results:
+                    continue  # other deployment variants: python -m perf.variants
+                self.results[arch][scenario] = run
                 print(f"  Loaded: {file}")
 
             except Exception as e:
@@ -54,16 +55,16 @@ class GraphGenerator:
 
     def extract_metrics(self, data):
         """Extract key metrics from test data"""
-        metrics = data.get('metrics', {})
+        duration = data.trend('http_req_duration')
 
         return {
-            'requests_total': metrics.get('http_reqs', {}).get('values', {}).get('count', 0),
-            'requests_per_sec': metrics.get('http_reqs', {}).get('values', {}).get('rate', 0),
-            'response_avg': metrics.get('http_req_duration', {}).get('values', {}).get('avg', 0),
-            'response_p95': metrics.get('http_req_duration', {}).get('values', {}).get('p(95)', 0),
-            'response_p99': metrics.get('http_req_duration', {}).get('values', {}).get('p(99)', 0),
-            'success_count': metrics.get('successful_requests', {}).get('values', {}).get('count', 0),
-            'failed_count': metrics.get('failed_requests', {}).get('values', {}).get('count', 0),
+            'requests_total': data.total_requests,
+            'requests_per_sec': data.throughput,
+            'response_avg': duration.avg,
+            'response_p95': duration.p95,
+            'response_p99': duration.p99,
+            'success_count': data.counter('successful_requests').count,
+            'failed_count': data.counter('failed_requests').count,
         }
 
     def generate_response_time_graph(self):
@@ -290,5 +291,16 @@ class GraphGenerator:
         return True
 
 if __name__ == "__main__":
+    import argparse
+
+    from perf import profiling
+
+    parser = argparse.ArgumentParser(description='Generate thesis graphs from the results files')
+    parser.add_argument('--profile', nargs='?', const='profile-graphs', metavar='PREFIX',
+                        help='per-stage time / memory profile: PREFIX.prof and PREFIX-timeline.json')
+    args = parser.parse_args()
+
     generator = GraphGenerator()
-    generator.run()
+    with profiling.session(args.profile, 'generate-graphs') as profiler:
+        profiler.instrument(generator)
+        generator.run()
@@ -0,0 +1,7 @@
+"""
+QuizHub performance tooling library
+Reusable parsers and analyses shared by the scripts in performance-tests/
+
+Run the scripts from the performance-tests directory so this package is
+importable (e.g. `from perf import gateway`).
+"""
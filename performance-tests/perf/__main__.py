@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+perf Command Line
+One entry point for the analysis scripts and perf modules
+
+    python -m perf summary [results-*.json ...]   text summary (quick-summary.py / perf.summary)
+    python -m perf graphs                         thesis graphs (generate-graphs.py)
+    python -m perf report [--lang sr] [...]       HTML report (analyze-results.py / -serbian.py)
+    python -m perf compare A.json B.json          side-by-side comparison (perf.compare)
+    python -m perf watch raw-....ndjson [-- k6 run ...]   live monitor (perf.watch)
+    python -m perf gate [results-*.json ...]      CI threshold check, exit 99 on failure (perf.thresholds)
+    python -m perf ingest raw-....ndjson          rebuild a summary from a raw stream (perf.ingest)
+    python -m perf archive pack raw-....ndjson    compact columnar archive of a raw stream (perf.archive)
+    python -m perf distribution [--merge]         percentiles from latency histograms (perf.distribution)
+    python -m perf exemplars raw-....ndjson       slowest requests with their context (perf.exemplars)
+    python -m perf variants [--scenario S]        rank any number of deployment variants (perf.variants)
+    python -m perf slo [raw-....ndjson]           SLO compliance, Apdex and error-budget burn (perf.slo)
+    python -m perf startup                        startup-time benchmark of the commands above
+    python -m perf bench [--sizes 1e3,1e6]        benchmark of the analysis stages (perf.bench)
+
+Arguments after the command go to the underlying script unchanged. This
+module imports nothing beyond the standard library at load time: numpy and
+matplotlib load only inside graphs / report / ingest, so summary and gate
+start in well under STARTUP_BUDGET_MS in CI. `startup` measures that, and
+fails when a command exceeds its budget or imports a heavy package.
+
+Usage (from performance-tests/):
+    python -m perf gate && python -m perf summary
+"""
+
+import os
+import sys
+
+# Startup budget for the text-only commands, over a bare interpreter (ms)
+STARTUP_BUDGET_MS = 100
+# Must not be imported by the text-only commands
+HEAVY_MODULES = ('numpy', 'matplotlib', 'asyncio')
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_script(filename, argv):
+    """Run one of the performance-tests/ scripts as __main__ with `argv`"""
+    import runpy
+
+    path = os.path.join(SCRIPTS_DIR, filename)
+    sys.argv = [path] + list(argv)
+    runpy.run_path(path, run_name='__main__')
+
+
+def _run_module(name, argv):
+    """Call perf.<name>.main() with `argv` as its command line"""
+    import importlib
+
+    sys.argv = [f'perf {name}'] + list(argv)
+    importlib.import_module(f'perf.{name}').main()
+
+
+def summary(argv):
+    if argv and not argv[0].startswith('-'):
+        _run_module('summary', argv)
+    else:
+        _run_script('quick-summary.py', argv)
+
+
+def graphs(argv):
+    _run_script('generate-graphs.py', argv)
+
+
+def report(argv):
+    script = 'analyze-results.py'
+    if argv[:1] == ['--lang=sr']:
+        script, argv = 'analyze-results-serbian.py', argv[1:]
+    elif argv[:2] == ['--lang', 'sr']:
+        script, argv = 'analyze-results-serbian.py', argv[2:]
+    _run_script(script, argv)
+
+
+def compare(argv):
+    from perf import compare as module
+
+    module.main(argv)
+
+
+def watch(argv):
+    _run_module('watch', argv)
+
+
+def gate(argv):
+    from perf import thresholds
+
+    thresholds.main(argv)
+
+
+def ingest(argv):
+    _run_module('ingest', argv)
+
+
+def bench(argv):
+    _run_module('bench', argv)
+
+
+def distribution(argv):
+    _run_module('distribution', argv)
+
+
+def exemplars(argv):
+    _run_module('exemplars', argv)
+
+
+def variants(argv):
+    _run_module('variants', argv)
+
+
+def slo(argv):
+    _run_module('slo', argv)
+
+
+def archive(argv):
+    _run_module('archive', argv)
+
+
+def startup(argv):
+    """Time `python -m perf summary` / `gate` in fresh interpreters against STARTUP_BUDGET_MS"""
+    import argparse
+    import statistics
+    import subprocess
+    import time
+
+    parser = argparse.ArgumentParser(prog='perf startup', description=startup.__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help='allowed time over a bare interpreter')
+    args = parser.parse_args(argv)
+
+    def timed(command):
+        samples = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            subprocess.run(command, cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+    def heavy_imports(command):
+        run = subprocess.run(command[:1] + ['-X', 'importtime'] + command[1:], cwd=SCRIPTS_DIR,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        imported = {line.rsplit('|', 1)[-1].strip() for line in run.stderr.splitlines() if '|' in line}
+        return sorted(m for m in HEAVY_MODULES if m in imported)
+
+    python = [sys.executable]
+    baseline = timed(python + ['-c', 'pass'])
+    print(f"⏱  Startup benchmark ({args.runs} runs, median; bare interpreter {baseline:.0f} ms)\n")
+    print(f"  {'Command':<34} {'total':>8} {'over bare':>10}  heavy imports")
+    failed = False
+    for name in ('summary', 'gate', '--help'):
+        command = python + ['-m', 'perf'] + ([name] if name != '--help' else ['--help'])
+        total = timed(command)
+        heavy = heavy_imports(command)
+        over = total - baseline
+        ok = over <= args.budget_ms and not heavy
+        failed |= not ok
+        print(f"  {'python -m perf ' + name:<34} {total:>6.0f} ms {over:>7.0f} ms  "
+              f"{', '.join(heavy) or '-'}  {'✓' if ok else '✗'}")
+    if failed:
+        print(f"\n❌ Over the {args.budget_ms:g} ms budget or importing heavy packages")
+        sys.exit(1)
+    print(f"\n✅ Within the {args.budget_ms:g} ms budget")
+
+
+COMMANDS = {
+    'summary': (summary, 'text summary of the results files'),
+    'graphs': (graphs, 'thesis graphs'),
+    'report': (report, 'full HTML report with graphs (--lang sr for Serbian)'),
+    'compare': (compare, 'compare two results files'),
+    'watch': (watch, 'live monitor for a raw stream being written'),
+    'gate': (gate, 'check results against the k6 script thresholds (exit 99 on failure)'),
+    'ingest': (ingest, 'rebuild results-*.json from raw streams'),
+    'archive': (archive, 'pack / unpack / inspect .k6a raw-stream archives'),
+    'distribution': (distribution, 'per-endpoint and merged percentiles from results-file or raw-stream histograms'),
+    'exemplars': (exemplars, 'K slowest requests of a raw stream with VU / iteration and phases'),
+    'variants': (variants, 'delta matrix, ranking and Pareto front of deployment variants'),
+    'slo': (slo, 'per-window SLO compliance, Apdex and error-budget burn of raw streams'),
+    'startup': (startup, 'startup-time benchmark of this command line'),
+    'bench': (bench, 'benchmark of the analysis stages on synthetic data'),
+}
+
+
+def usage():
+    lines = ['usage: python -m perf <command> [arguments]', '', 'commands:']
+    lines += [f'  {name:<10} {help_text}' for name, (_, help_text) in COMMANDS.items()]
+    lines += ['', "Arguments go to the command: python -m perf <command> --help"]
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return
+    command = COMMANDS.get(argv[0])
+    if command is None:
+        print(f"perf: unknown command '{argv[0]}'\n\n{usage()}", file=sys.stderr)
+        sys.exit(2)
+    command[0](argv[1:])
+
+
+if __name__ == '__main__':
+    main()
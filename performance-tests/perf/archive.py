@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Raw Stream Archive
+Compact columnar storage for k6 `--out json` streams
+
+A raw stream repeats the metric name, every tag key and every tag value on
+each of its three or more lines per request, so it is 20-50x larger than
+the data it carries. An archive (.k6a) keeps the same points as columns in
+chunks of CHUNK_POINTS:
+
+    time        microseconds, delta-encoded against the previous point
+    metric      index into the metric names
+    value       float32
+    <tag key>   per-key dictionary index of the tag value (0 = tag absent)
+
+Each chunk is compressed on its own (zstd when the zstandard package is
+installed, zlib otherwise). A footer holds the dictionaries, the k6 Metric
+definitions and a chunk index with each chunk's time range, metrics and -
+for tags with at most INDEX_CARDINALITY values - the tag values it holds. A
+time-range, metric or tag filtered read only decompresses the chunks that
+can match.
+
+Point values are stored as float32 (~7 significant digits) and timestamps
+to the microsecond; `unpack` writes them back as NDJSON with UTC times.
+perf.k6stream reads archives wherever it reads raw streams, so
+raw-{arch}-{scenario}.k6a works in the report in place of the .ndjson.
+
+Usage (from performance-tests/):
+    python -m perf.archive pack raw-monolith-heavy_load.ndjson      # -> raw-monolith-heavy_load.k6a
+    python -m perf.archive info raw-monolith-heavy_load.k6a
+    python -m perf.archive unpack raw-monolith-heavy_load.k6a --metric http_req_duration \
+        --tag name=view_quiz_details --start 2025-11-06T12:01:00Z --end 2025-11-06T12:02:00Z
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+from perf.k6stream import RequestTable, endpoint_of, open_stream, parse_time
+
+try:
+    # Optional: archives are zlib-compressed when zstandard is not installed
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SUFFIX = '.k6a'
+MAGIC = b'K6ARCH1\n'
+# footer offset, footer length, magic
+TRAILER = struct.Struct('<QQ8s')
+CHUNK_POINTS = 65536
+# Tags with at most this many distinct values get per-chunk value sets in the index
+INDEX_CARDINALITY = 256
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+# Pseudo tag holding a point's k6 `metadata` object as JSON (tag keys are identifiers)
+METADATA_KEY = '@metadata'
+
+
+def default_codec():
+    return 'zstd' if zstandard is not None else 'zlib'
+
+
+def _compress(payload, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return zlib.compress(payload, ZLIB_LEVEL)
+
+
+def _decompress(blob, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('archive is zstd-compressed; install with: pip install zstandard')
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+def _smallest_uint(maximum):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if maximum <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def is_archive(path):
+    return path.endswith(SUFFIX)
+
+
+class ArchiveWriter:
+    """Appends k6 points to a .k6a file, one compressed chunk per CHUNK_POINTS points"""
+
+    def __init__(self, path, chunk_points=CHUNK_POINTS, codec=None):
+        self.path = path
+        self.chunk_points = chunk_points
+        self.codec = codec or default_codec()
+        self.metrics = {}
+        self.definitions = {}
+        self.dictionaries = {}
+        self.chunks = []
+        self.count = 0
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._reset()
+
+    def _reset(self):
+        self._time, self._metric, self._value = [], [], []
+        # tag key -> (rows, value ids), scattered into a dense column at flush
+        self._tags = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _metric_id(self, name):
+        index = self.metrics.get(name)
+        if index is None:
+            index = self.metrics[name] = len(self.metrics)
+        return index
+
+    def add_metric(self, line):
+        """Keep a k6 Metric line (the parsed object) for unpacking"""
+        self._metric_id(line['metric'])
+        self.definitions[line['metric']] = line
+
+    def add(self, metric, epoch, value, tags, metadata=None):
+        row = len(self._time)
+        self._time.append(epoch)
+        self._metric.append(self._metric_id(metric))
+        self._value.append(value)
+        if metadata:
+            tags = dict(tags, **{METADATA_KEY: json.dumps(metadata, separators=(',', ':'), sort_keys=True)})
+        for key, tag in tags.items():
+            values = self.dictionaries.get(key)
+            if values is None:
+                values = self.dictionaries[key] = {}
+            tag = tag if isinstance(tag, str) else json.dumps(tag)
+            index = values.get(tag)
+            if index is None:
+                index = values[tag] = len(values) + 1
+            column = self._tags.get(key)
+            if column is None:
+                column = self._tags[key] = ([], [])
+            column[0].append(row)
+            column[1].append(index)
+        if len(self._time) >= self.chunk_points:
+            self.flush()
+
+    def flush(self):
+        """Compress and write the buffered points as one chunk"""
+        count = len(self._time)
+        if not count:
+            return
+        micros = np.round(np.array(self._time, dtype=np.float64) * 1e6).astype(np.int64)
+        base = int(micros[0])
+        deltas = np.diff(micros, prepend=base)
+        small = deltas.min() >= np.iinfo(np.int32).min and deltas.max() <= np.iinfo(np.int32).max
+        metric = np.array(self._metric, dtype=np.uint16)
+        columns = [('time', deltas.astype(np.int32 if small else np.int64)), ('metric', metric),
+                   ('value', np.array(self._value, dtype=np.float32))]
+        present = {}
+        for key, (rows, ids) in self._tags.items():
+            ids = np.array(ids, dtype=np.uint64)
+            column = np.zeros(count, dtype=_smallest_uint(int(ids.max())))
+            column[rows] = ids
+            columns.append((key, column))
+            distinct = np.unique(ids)
+            if len(distinct) <= INDEX_CARDINALITY:
+                present[key] = distinct.tolist()
+
+        blob = _compress(b''.join(c.tobytes() for _, c in columns), self.codec)
+        self.chunks.append({
+            'offset': self._file.tell(), 'length': len(blob), 'points': count,
+            'start': int(micros.min()) / 1e6, 'end': int(micros.max()) / 1e6, 'base': base,
+            'columns': [[name, column.dtype.str] for name, column in columns],
+            'metrics': np.unique(metric).tolist(), 'values': present,
+        })
+        self._file.write(blob)
+        self.count += count
+        self._reset()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        footer = zlib.compress(json.dumps({
+            'version': 1, 'codec': self.codec, 'points': self.count,
+            'metrics': list(self.metrics), 'definitions': list(self.definitions.values()),
+            'dictionaries': {key: list(values) for key, values in self.dictionaries.items()},
+            'chunks': self.chunks,
+        }, separators=(',', ':')).encode('utf-8'))
+        offset = self._file.tell()
+        self._file.write(footer)
+        self._file.write(TRAILER.pack(offset, len(footer), MAGIC))
+        self._file.close()
+
+
+class ArchiveReader:
+    """Chunk-selective reads of a .k6a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._file.seek(-TRAILER.size, os.SEEK_END)
+            offset, length, magic = TRAILER.unpack(self._file.read(TRAILER.size))
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not a complete {SUFFIX} archive')
+            self._file.seek(offset)
+            footer = json.loads(zlib.decompress(self._file.read(length)))
+        except (OSError, ValueError, zlib.error) as e:
+            self._file.close()
+            raise ValueError(f'{path}: unreadable archive ({e})') from e
+        self.codec = footer['codec']
+        self.count = footer['points']
+        self.metrics = footer['metrics']
+        self.definitions = footer['definitions']
+        self.dictionaries = footer['dictionaries']
+        self.chunks = footer['chunks']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def start(self):
+        return min((c['start'] for c in self.chunks), default=0.0)
+
+    @property
+    def end(self):
+        return max((c['end'] for c in self.chunks), default=0.0)
+
+    def _filters(self, metrics, tags):
+        """(metric ids, {key: value id}) or None when nothing can match"""
+        metric_ids = None
+        if metrics is not None:
+            metric_ids = {self.metrics.index(m) for m in metrics if m in self.metrics}
+            if not metric_ids:
+                return None
+        tag_ids = {}
+        for key, value in (tags or {}).items():
+            values = self.dictionaries.get(key, [])
+            if value not in values:
+                return None
+            tag_ids[key] = values.index(value) + 1
+        return metric_ids, tag_ids
+
+    def select(self, start=None, end=None, metrics=None, tags=None):
+        """Index entries of the chunks that can hold matching points"""
+        filters = self._filters(metrics, tags)
+        if filters is None:
+            return []
+        metric_ids, tag_ids = filters
+        selected = []
+        for chunk in self.chunks:
+            if (start is not None and chunk['end'] < start) or (end is not None and chunk['start'] > end):
+                continue
+            if metric_ids is not None and metric_ids.isdisjoint(chunk['metrics']):
+                continue
+            names = {name for name, _ in chunk['columns']}
+            if any(key not in names or (key in chunk['values'] and tag_id not in chunk['values'][key])
+                   for key, tag_id in tag_ids.items()):
+                continue
+            selected.append(chunk)
+        return selected
+
+    def columns(self, chunk):
+        """{column: numpy array} for one chunk; 'time' as epoch seconds"""
+        self._file.seek(chunk['offset'])
+        payload = _decompress(self._file.read(chunk['length']), self.codec)
+        columns, position = {}, 0
+        for name, dtype in chunk['columns']:
+            dtype = np.dtype(dtype)
+            columns[name] = np.frombuffer(payload, dtype=dtype, count=chunk['points'], offset=position)
+            position += dtype.itemsize * chunk['points']
+        micros = chunk['base'] + np.cumsum(columns['time'], dtype=np.int64)
+        columns['time'] = micros / 1e6
+        return columns
+
+    def frames(self, start=None, end=None, metrics=None, tags=None):
+        """Yield {column: array} per selected chunk, with the rows filtered"""
+        filters = self._filters(metrics, tags)
+        if filters is None:
+            return
+        metric_ids, tag_ids = filters
+        for chunk in self.select(start, end, metrics, tags):
+            columns = self.columns(chunk)
+            mask = np.ones(chunk['points'], dtype=bool)
+            if start is not None:
+                mask &= columns['time'] >= start
+            if end is not None:
+                mask &= columns['time'] <= end
+            if metric_ids is not None:
+                mask &= np.isin(columns['metric'], list(metric_ids))
+            for key, tag_id in tag_ids.items():
+                mask &= columns[key] == tag_id
+            if mask.any():
+                yield {name: column[mask] for name, column in columns.items()}
+
+    def points(self, start=None, end=None, metrics=None, tags=None):
+        """Yield (metric, epoch, value, tags) like perf.k6stream.iter_points"""
+        for frame in self.frames(start, end, metrics, tags):
+            keys = [k for k in frame if k not in ('time', 'metric', 'value')]
+            tag_columns = [(k, self.dictionaries[k], frame[k].tolist()) for k in keys]
+            for row, (metric, epoch, value) in enumerate(zip(frame['metric'].tolist(), frame['time'].tolist(),
+                                                             frame['value'].tolist())):
+                point_tags = {k: values[ids[row] - 1] for k, values, ids in tag_columns if ids[row]}
+                yield self.metrics[metric], epoch, value, point_tags
+
+    def ndjson_lines(self, start=None, end=None, metrics=None, tags=None):
+        """k6 `--out json` lines: the Metric definitions, then the selected Points"""
+        for definition in self.definitions:
+            if metrics is None or definition['metric'] in metrics:
+                yield json.dumps(definition, separators=(',', ':')) + '\n'
+        seconds = {}
+        for frame in self.frames(start, end, metrics, tags):
+            # float32 -> shortest decimal that reads back as the same float32
+            values = frame['value'].astype(str).tolist()
+            keys = [k for k in frame if k not in ('time', 'metric', 'value')]
+            tag_columns = [(k, self.dictionaries[k], frame[k].tolist()) for k in keys]
+            for row, (metric, epoch) in enumerate(zip(frame['metric'].tolist(), frame['time'].tolist())):
+                whole = int(epoch // 1)
+                prefix = seconds.get(whole)
+                if prefix is None:
+                    seconds.clear()
+                    prefix = seconds[whole] = datetime.fromtimestamp(whole, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+                stamp = f'{prefix}.{round((epoch - whole) * 1e6):06d}Z'
+                point_tags = {k: values[ids[row] - 1] for k, values, ids in tag_columns if ids[row]}
+                metadata = point_tags.pop(METADATA_KEY, None)
+                data = f'"time":"{stamp}","value":{values[row]},"tags":{json.dumps(point_tags, separators=(",", ":"))}'
+                if metadata is not None:
+                    data += f',"metadata":{metadata}'
+                yield f'{{"metric":{json.dumps(self.metrics[metric])},"type":"Point","data":{{{data}}}}}\n'
+
+
+def pack(source, destination, chunk_points=CHUNK_POINTS, codec=None):
+    """Archive a raw k6 stream (.ndjson / .ndjson.gz); returns the number of points"""
+    with ArchiveWriter(destination, chunk_points, codec) as writer, open_stream(source) as f:
+        for line in f:
+            if '"type":"Point"' in line:
+                try:
+                    point = json.loads(line)
+                except ValueError:
+                    continue  # truncated last line of a live file
+                data = point['data']
+                writer.add(point['metric'], parse_time(data['time']), data['value'],
+                           data.get('tags') or {}, data.get('metadata'))
+            elif '"type":"Metric"' in line:
+                try:
+                    writer.add_metric(json.loads(line))
+                except ValueError:
+                    continue
+    return writer.count
+
+
+def unpack(source, destination, start=None, end=None, metrics=None, tags=None):
+    """Write (the selected points of) an archive back as NDJSON; returns the number of lines"""
+    lines = 0
+    with ArchiveReader(source) as reader, open(destination, 'w', encoding='utf-8') as f:
+        for line in reader.ndjson_lines(start, end, metrics, tags):
+            f.write(line)
+            lines += 1
+    return lines
+
+
+def ndjson_lines(path):
+    """All lines of an archive as NDJSON, for readers that parse raw lines (perf.ingest)"""
+    with ArchiveReader(path) as reader:
+        yield from reader.ndjson_lines()
+
+
+def read_requests(path, start=None, end=None, tags=None):
+    """perf.k6stream.RequestTable of the http_req_duration points in an archive, without per-point parsing"""
+    parts = {k: [] for k in ('time', 'value', 'name', 'url', 'status', 'error_code', 'method')}
+    with ArchiveReader(path) as reader:
+        dictionaries = reader.dictionaries
+        for frame in reader.frames(start, end, ('http_req_duration',), tags):
+            empty = np.zeros(len(frame['time']), dtype=np.uint32)
+            for key, column in parts.items():
+                column.append(frame.get(key, empty))
+    if not parts['time']:
+        return RequestTable([], np.array([], dtype=np.int32), np.array([]), np.array([]),
+                            np.array([], dtype=np.int16), np.array([], dtype=np.int32))
+    columns = {k: np.concatenate(v) for k, v in parts.items()}
+
+    def numeric(key):
+        lookup = [0] + [int(v) if v.isdigit() else 0 for v in dictionaries.get(key, [])]
+        return np.array(lookup, dtype=np.int64)[columns[key].astype(np.int64)]
+
+    def labels(ids, label_of):
+        # Distinct ids in first-seen order -> label indexes, like RequestTableBuilder
+        distinct, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+        codes = {}
+        for index in np.argsort(first):
+            codes.setdefault(label_of(int(distinct[index])), len(codes))
+        names = list(codes)
+        lookup = np.array([codes[label_of(int(i))] for i in distinct], dtype=np.int32)
+        return names, lookup[inverse]
+
+    def tag(key, index):
+        return dictionaries[key][index - 1] if index else ''
+
+    urls = len(dictionaries.get('url', [])) + 1
+    endpoint_labels, endpoint = labels(
+        columns['name'].astype(np.int64) * urls + columns['url'].astype(np.int64),
+        lambda pair: endpoint_of({k: v for k, v in (('name', tag('name', pair // urls)),
+                                                     ('url', tag('url', pair % urls))) if v}))
+    method_labels, method = labels(columns['method'].astype(np.int64), lambda i: tag('method', i))
+    return RequestTable(endpoint_labels, endpoint, columns['time'], columns['value'].astype(np.float64),
+                        numeric('status').astype(np.int16), numeric('error_code').astype(np.int32),
+                        method_labels, method)
+
+
+def archive_path(raw_path):
+    """raw-{arch}-{scenario}.ndjson[.gz] -> raw-{arch}-{scenario}.k6a"""
+    name = os.path.basename(raw_path).split('.ndjson')[0]
+    return os.path.join(os.path.dirname(raw_path), name + SUFFIX)
+
+
+def _parse_when(value):
+    """Epoch seconds or an RFC3339 timestamp -> epoch seconds"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return parse_time(value)
+
+
+def _parse_tags(items, parser):
+    tags = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f'expected KEY=VALUE, got {item!r}')
+        tags[key] = value
+    return tags
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack raw k6 streams into compact .k6a archives and back')
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack_parser = commands.add_parser('pack', help='raw-*.ndjson[.gz] -> .k6a')
+    pack_parser.add_argument('paths', nargs='+', help='raw k6 streams')
+    pack_parser.add_argument('--output', help='archive path (single input only; default raw-....k6a)')
+    pack_parser.add_argument('--codec', choices=('zstd', 'zlib'), default=default_codec())
+    pack_parser.add_argument('--chunk-points', type=int, default=CHUNK_POINTS)
+    pack_parser.add_argument('--remove', action='store_true', help='delete each stream once it is archived')
+    info_parser = commands.add_parser('info', help='chunks, sizes and dictionaries of an archive')
+    info_parser.add_argument('paths', nargs='+')
+    unpack_parser = commands.add_parser('unpack', help='.k6a -> NDJSON, optionally filtered')
+    unpack_parser.add_argument('path')
+    unpack_parser.add_argument('--output', help='NDJSON path (default: the archive name with .ndjson)')
+    unpack_parser.add_argument('--start', help='RFC3339 time or epoch seconds')
+    unpack_parser.add_argument('--end', help='RFC3339 time or epoch seconds')
+    unpack_parser.add_argument('--metric', action='append', help='keep only this metric (repeatable)')
+    unpack_parser.add_argument('--tag', action='append', default=[], metavar='KEY=VALUE',
+                               help='keep only points with this tag value (repeatable)')
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        if args.output and len(args.paths) > 1:
+            parser.error('--output needs a single input')
+        if args.codec == 'zstd' and zstandard is None:
+            parser.error('zstd needs the zstandard package (pip install zstandard)')
+        for path in args.paths:
+            destination = args.output or archive_path(path)
+            points = pack(path, destination, args.chunk_points, args.codec)
+            before, after = os.path.getsize(path), os.path.getsize(destination)
+            print(f"  ✓ {path} -> {destination}: {points:,} points, {before / 1e6:,.1f} MB -> "
+                  f"{after / 1e6:,.2f} MB ({before / max(after, 1):.0f}x, {after / max(points, 1):.1f} B/point)")
+            if args.remove:
+                os.remove(path)
+
+    elif args.command == 'info':
+        for path in args.paths:
+            with ArchiveReader(path) as reader:
+                size = os.path.getsize(path)
+                print(f"\n📦 {path}: {reader.count:,} points in {len(reader.chunks)} chunks, "
+                      f"{size / 1e6:,.2f} MB ({size / max(reader.count, 1):.1f} B/point, {reader.codec})")
+                print(f"   {datetime.fromtimestamp(reader.start, timezone.utc):%Y-%m-%d %H:%M:%S} - "
+                      f"{datetime.fromtimestamp(reader.end, timezone.utc):%Y-%m-%d %H:%M:%S} UTC")
+                print(f"   metrics: {', '.join(reader.metrics)}")
+                print("   tags:    " + ', '.join(f'{key} ({len(values):,})'
+                                               for key, values in reader.dictionaries.items()))
+
+    else:
+        if not is_archive(args.path):
+            parser.error(f'{args.path} is not a {SUFFIX} archive')
+        destination = args.output or args.path[:-len(SUFFIX)] + '.ndjson'
+        if os.path.exists(destination) and not args.output:
+            print(f"❌ {destination} exists; pass --output to choose another path")
+            sys.exit(1)
+        with ArchiveReader(args.path) as reader:
+            start, end = _parse_when(args.start), _parse_when(args.end)
+            tags = _parse_tags(args.tag, parser)
+            chunks = len(reader.select(start, end, args.metric, tags))
+            total = len(reader.chunks)
+        lines = unpack(args.path, destination, start, end, args.metric, tags)
+        print(f"  ✓ {destination}: {lines:,} lines (decompressed {chunks} of {total} chunks)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analysis Tooling Benchmark
+Times the analysis pipeline on synthetic k6 data and keeps a history
+
+With raw streams, journeys and long runs the analysis scripts become a slow
+part of the pipeline. This suite generates synthetic k6 data at
+10^3 .. 10^8 requests and times every analysis stage:
+
+    parse       k6stream.read_requests: NDJSON -> RequestTable
+    aggregate   goodput.taxonomy: per-endpoint / per-window classification
+    sketch      LogHistogram per endpoint in SHARDS shards, then merged
+                (perf.coordinator's path); reports the overall p95 error vs numpy
+    statistics  warmup.analyze (changepoints) + per-endpoint percentiles
+    summary     JSON round-trip and perf.summary over a summary with
+                endpoint x status submetrics
+    render      a warm-up / per-endpoint figure saved as PNG (matplotlib Agg)
+
+The generators mimic k6 output: one http_reqs, http_req_duration and
+http_req_failed Point per request with the full k6 tag set, ENDPOINTS names,
+URLs carrying one of QUIZ_IDS quiz IDs, a status mix with 404 / 429 / 503 /
+timeouts, up to VUS virtual users and a 3x slower warm-up. Each size runs in
+its own interpreter so peak RSS (recorded after every stage) belongs to that
+size. Results are appended to bench-history.jsonl; a stage slower than
+REGRESSION_RATIO x the median of the last HISTORY_WINDOW comparable runs
+is flagged (--fail-on-regression turns that into exit 1, for CI).
+
+Raw streams take ~1 KB per request on disk (--gzip: ~10x less, slower to
+write); 10^8 also needs ~4 GB of RAM for the RequestTable.
+
+Usage (from performance-tests/):
+    python -m perf.bench                         # 10^3, 10^4, 10^5
+    python -m perf.bench --sizes 1e3,1e6 --fail-on-regression
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+try:
+    # Optional: peak RSS is not reported where `resource` is unavailable (Windows)
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5)
+HISTORY_PATH = 'bench-history.jsonl'
+HISTORY_WINDOW = 5
+REGRESSION_RATIO = 1.25
+# Slowdowns smaller than this are timer noise, whatever the ratio
+REGRESSION_MIN_SECONDS = 0.05
+STAGES = ('generate', 'parse', 'aggregate', 'sketch', 'statistics', 'summary', 'render')
+
+SHARDS = 8
+VUS = 200
+QUIZ_IDS = 5000
+BASE_URL = 'http://localhost:5000'
+# (name, path template, median ms, weight) - test-scenarios.js plus the journey endpoints
+ENDPOINTS = [
+    ('browse_quizzes', '/api/quiz', 12.0, 20),
+    ('get_categories', '/api/category', 4.0, 20),
+    ('view_quiz_details', '/api/quiz/{id}', 9.0, 20),
+    ('health_check', '/health', 1.5, 20),
+    ('login', '/api/auth/login', 60.0, 2),
+    ('browse', '/api/quiz?pageNumber=1&pageSize=10', 14.0, 5),
+    ('take', '/api/quiz/{id}/take', 11.0, 5),
+    ('submit', '/api/quiz/{id}/submit', 35.0, 4),
+    ('attempts', '/api/quiz/attempts?pageNumber=1&pageSize=10', 18.0, 2),
+    ('leaderboard', '/api/quiz/leaderboard?timeframe=week', 40.0, 2),
+]
+# (status, error_code, share); the rest is 200
+STATUS_MIX = [(404, 0, 0.03), (429, 0, 0.01), (503, 0, 0.005), (0, 1050, 0.002)]
+WARMUP_SHARE = 0.05
+
+
+def _rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_seconds(requests):
+    """Synthetic run length: ~200 req/s, between 1 minute and 1 hour"""
+    return min(max(requests / 200, 60), 3600)
+
+
+def write_raw_stream(path, requests, seed=1):
+    """k6 `--out json` stream with `requests` requests (3 Points each); .gz paths are gzipped"""
+    import gzip
+
+    rng = random.Random(seed)
+    names = [e[0] for e in ENDPOINTS]
+    weights = [e[3] for e in ENDPOINTS]
+    medians = {e[0]: math.log(e[2]) for e in ENDPOINTS}
+    paths = {e[0]: e[1] for e in ENDPOINTS}
+    seconds = run_seconds(requests)
+    start = datetime(2025, 11, 6, 12, 0, 0, tzinfo=timezone.utc).timestamp()
+    warmup_until = requests * WARMUP_SHARE
+    prefixes = {}
+
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt', encoding='utf-8') as f:
+        f.write('{"type":"Metric","data":{"name":"http_reqs","type":"counter"},"metric":"http_reqs"}\n'
+                '{"type":"Metric","data":{"name":"http_req_duration","type":"trend","contains":"time"},'
+                '"metric":"http_req_duration"}\n'
+                '{"type":"Metric","data":{"name":"http_req_failed","type":"rate"},"metric":"http_req_failed"}\n')
+        lines = []
+        iterations = [0] * VUS
+        for i in range(requests):
+            epoch = start + seconds * i / requests
+            second = int(epoch)
+            prefix = prefixes.get(second)
+            if prefix is None:
+                prefixes.clear()
+                prefix = prefixes[second] = datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+            stamp = f'{prefix}.{int((epoch - second) * 1e9):09d}Z'
+
+            name = rng.choices(names, weights)[0]
+            url = BASE_URL + paths[name].replace('{id}', str(rng.randint(1, QUIZ_IDS)))
+            status, error_code = 200, 0
+            roll = rng.random()
+            for candidate, code, share in STATUS_MIX:
+                if roll < share:
+                    status, error_code = candidate, code
+                    break
+                roll -= share
+            duration = rng.lognormvariate(medians[name], 0.6) * (3.0 if i < warmup_until else 1.0)
+            if error_code:
+                duration = 60000.0
+            vu = rng.randrange(VUS)
+            iterations[vu] += 1
+            ok = 'true' if 200 <= status < 400 else 'false'
+            tags = (f'"tags":{{"expected_response":"{ok}","group":"","method":"GET","name":"{name}",'
+                    f'"proto":"HTTP/1.1","scenario":"default","status":"{status}","url":"{url}",'
+                    f'"vu":"{vu + 1}","iter":"{iterations[vu]}"'
+                    + (f',"error_code":"{error_code}"' if error_code else '') + '}}}')
+            lines.append(f'{{"metric":"http_reqs","type":"Point","data":{{"time":"{stamp}","value":1,{tags}')
+            lines.append(f'{{"metric":"http_req_duration","type":"Point","data":{{"time":"{stamp}",'
+                         f'"value":{duration:.4f},{tags}')
+            lines.append(f'{{"metric":"http_req_failed","type":"Point","data":{{"time":"{stamp}",'
+                         f'"value":{0 if ok == "true" else 1},{tags}')
+            if len(lines) >= 30000:
+                f.write('\n'.join(lines) + '\n')
+                lines = []
+        if lines:
+            f.write('\n'.join(lines) + '\n')
+
+
+def synthetic_summary(requests, seed=1):
+    """handleSummary-style dict with endpoint and endpoint x status submetrics"""
+    rng = random.Random(seed)
+    seconds = run_seconds(requests)
+
+    def trend(median):
+        values = sorted(rng.lognormvariate(math.log(median), 0.6) for _ in range(200))
+        return {'avg': sum(values) / len(values), 'min': values[0], 'med': values[100], 'max': values[-1],
+                'p(90)': values[180], 'p(95)': values[190], 'p(99)': values[198]}
+
+    metrics = {
+        'http_req_duration': {'type': 'trend', 'contains': 'time', 'values': trend(10.0)},
+        'http_req_duration{expected_response:true}': {'type': 'trend', 'contains': 'time', 'values': trend(9.0)},
+        'http_reqs': {'type': 'counter', 'values': {'count': requests, 'rate': requests / seconds}},
+        'http_req_failed': {'type': 'rate', 'values': {'rate': 0.047, 'passes': int(requests * 0.047),
+                                                      'fails': requests - int(requests * 0.047)}},
+        'iterations': {'type': 'counter', 'values': {'count': requests // 4, 'rate': requests / 4 / seconds}},
+        'vus': {'type': 'gauge', 'values': {'value': 0, 'min': 0, 'max': VUS}},
+        'vus_max': {'type': 'gauge', 'values': {'value': VUS, 'min': VUS, 'max': VUS}},
+    }
+    for name, _, median, _ in ENDPOINTS:
+        for metric in ('http_req_duration', 'http_req_waiting', 'http_req_blocked'):
+            metrics[f'{metric}{{name:{name}}}'] = {'type': 'trend', 'contains': 'time', 'values': trend(median)}
+        for status in ['200'] + [str(s) for s, _, _ in STATUS_MIX]:
+            metrics[f'http_req_duration{{name:{name},status:{status}}}'] = {
+                'type': 'trend', 'contains': 'time', 'values': trend(median)}
+    return {'metrics': metrics, 'state': {'testRunDurationMs': seconds * 1000},
+            'testConfig': {'testName': 'bench', 'scenario': f'n{requests}', 'vus': VUS}}
+
+
+def run_size(requests, directory, use_gzip=False):
+    """Time every stage for one size in this process; {stage: {'seconds', 'rss_mb'}, 'notes': {...}}"""
+    import numpy as np
+
+    from perf import goodput, k6stream, summary, warmup
+    from perf.histogram import LogHistogram
+
+    results = {}
+    notes = {}
+
+    def stage(name, function):
+        started = time.perf_counter()
+        value = function()
+        results[name] = {'seconds': time.perf_counter() - started, 'rss_mb': _rss_mb()}
+        return value
+
+    path = os.path.join(directory, f'raw-bench-n{requests}.ndjson' + ('.gz' if use_gzip else ''))
+    stage('generate', lambda: write_raw_stream(path, requests))
+    notes['stream_mb'] = os.path.getsize(path) / (1024 * 1024)
+
+    table = stage('parse', lambda: k6stream.read_requests(path))
+    notes['requests'] = len(table)
+    stage('aggregate', lambda: goodput.taxonomy(table))
+
+    def sketch():
+        merged = {}
+        for code, label in enumerate(table.endpoint_labels):
+            durations = table.duration[table.endpoint == code]
+            shards = [LogHistogram() for _ in range(SHARDS)]
+            for i, value in enumerate(durations.tolist()):
+                shards[i % SHARDS].add(value)
+            total = LogHistogram()
+            for shard in shards:
+                total.merge(shard)
+            merged[label] = total
+        return merged
+
+    sketches = stage('sketch', sketch)
+    overall = LogHistogram()
+    for histogram in sketches.values():
+        overall.merge(histogram)
+    exact = float(np.percentile(table.duration, 95))
+    notes['sketch_p95_error'] = abs(overall.quantile(0.95) - exact) / exact if exact else 0.0
+
+    def statistics():
+        analysis = warmup.analyze(table)
+        percentiles = {}
+        for code, label in enumerate(table.endpoint_labels):
+            durations = table.duration[table.endpoint == code]
+            percentiles[label] = np.percentile(durations, [50, 90, 95, 99]).tolist()
+        return analysis, percentiles
+
+    analysis, percentiles = stage('statistics', statistics)
+    notes['warmup_seconds'] = analysis['warmup_seconds']
+
+    text = json.dumps(synthetic_summary(requests))
+
+    def summary_stage():
+        run = summary.RunSummary(json.loads(text))
+        rows = [(m.key, m.values.get('p(95)')) for m in run.metrics.values()]
+        return rows, run.throughput, run.error_rate, run.endpoints
+
+    rows = stage('summary', summary_stage)[0]
+    notes['summary_metrics'] = len(rows)
+
+    def render():
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        fig, (left, right) = plt.subplots(1, 2, figsize=(14, 5))
+        left.plot(analysis['series']['second'], analysis['series']['median_ms'], linewidth=1)
+        left.axvspan(0, analysis['warmup_seconds'], alpha=0.2)
+        left.set_yscale('log')
+        labels = sorted(percentiles)
+        right.boxplot([table.duration[table.endpoint == table.endpoint_labels.index(label)] for label in labels],
+                      showfliers=False)
+        right.set_xticks(range(1, len(labels) + 1), labels, rotation=30, ha='right')
+        plt.tight_layout()
+        plt.savefig(os.path.join(directory, 'bench-render.png'), dpi=150, bbox_inches='tight')
+        plt.close(fig)
+
+    stage('render', render)
+    return {'stages': results, 'notes': notes}
+
+
+def _environment():
+    commit = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return {'commit': commit, 'python': platform.python_version(), 'machine': platform.node(),
+            'platform': platform.platform(), 'cpus': os.cpu_count()}
+
+
+def read_history(path):
+    entries = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+
+def regressions(entry, history, ratio=REGRESSION_RATIO, window=HISTORY_WINDOW):
+    """[(size, stage, seconds, baseline)] slower than `ratio` x the median of comparable earlier runs"""
+    comparable = [h for h in history if h.get('machine') == entry['machine'] and h.get('python') == entry['python']]
+    found = []
+    for size, result in entry['sizes'].items():
+        for name, timing in result['stages'].items():
+            past = sorted(h['sizes'][size]['stages'][name]['seconds'] for h in comparable[-window:]
+                          if name in h.get('sizes', {}).get(size, {}).get('stages', {}))
+            if not past:
+                continue
+            baseline = past[len(past) // 2]
+            if timing['seconds'] > baseline * ratio and timing['seconds'] - baseline > REGRESSION_MIN_SECONDS:
+                found.append((size, name, timing['seconds'], baseline))
+    return found
+
+
+def parse_size(value):
+    number = float(value)
+    if number < 1 or number != int(number):
+        raise argparse.ArgumentTypeError(f'invalid size: {value}')
+    return int(number)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analysis tooling on synthetic k6 data')
+    parser.add_argument('--sizes', type=lambda v: [parse_size(s) for s in v.split(',')], default=list(DEFAULT_SIZES),
+                        help='comma-separated request counts, e.g. 1e3,1e5,1e8')
+    parser.add_argument('--history', default=HISTORY_PATH, help='JSON-lines history file')
+    parser.add_argument('--no-history', action='store_true', help='do not append to the history file')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit 1 when a stage regressed')
+    parser.add_argument('--gzip', action='store_true', help='write the synthetic streams gzipped')
+    parser.add_argument('--workdir', help='keep generated streams here instead of a temporary directory')
+    parser.add_argument('--run-one', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        # Child process: one size, result as JSON on stdout
+        print(json.dumps(run_size(args.run_one, args.workdir, args.gzip)))
+        return
+
+    directory = args.workdir or tempfile.mkdtemp(prefix='perf-bench-')
+    os.makedirs(directory, exist_ok=True)
+    entry = {'timestamp': datetime.now(timezone.utc).isoformat(), **_environment(), 'sizes': {}}
+    print(f"🏁 Benchmarking the analysis on {', '.join(f'{n:,}' for n in args.sizes)} requests "
+          f"(commit {entry['commit'] or '?'}, Python {entry['python']})")
+    try:
+        for size in args.sizes:
+            command = [sys.executable, '-m', 'perf.bench', '--run-one', str(size), '--workdir', directory]
+            if args.gzip:
+                command.append('--gzip')
+            run = subprocess.run(command, capture_output=True, text=True)
+            if run.returncode:
+                print(f"  ✗ {size:,}: {run.stderr.strip().splitlines()[-1] if run.stderr.strip() else 'failed'}")
+                continue
+            result = json.loads(run.stdout.strip().splitlines()[-1])
+            entry['sizes'][str(size)] = result
+            notes = result['notes']
+            print(f"\n  {size:,} requests ({notes['stream_mb']:.1f} MB stream, {notes['summary_metrics']} summary "
+                  f"metrics, sketch p95 error {notes['sketch_p95_error'] * 100:.2f}%)")
+            print(f"    {'Stage':<12} {'seconds':>9} {'req/s':>12} {'peak RSS':>10}")
+            for name in STAGES:
+                timing = result['stages'][name]
+                # The summary stage does not scale with the request count
+                rate = f"{size / timing['seconds']:,.0f}" if timing['seconds'] and name != 'summary' else '-'
+                rss = f"{timing['rss_mb']:.0f} MB" if timing['rss_mb'] is not None else '-'
+                print(f"    {name:<12} {timing['seconds']:>9.3f} {rate:>12} {rss:>10}")
+            # Only this size's stream is needed; large ones would fill the disk
+            for filename in os.listdir(directory):
+                if filename.startswith(f'raw-bench-n{size}.') and not args.workdir:
+                    os.remove(os.path.join(directory, filename))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    history = read_history(args.history)
+    found = regressions(entry, history)
+    if found:
+        print(f"\n⚠️  Regressions vs the median of the last {HISTORY_WINDOW} comparable runs:")
+        for size, name, seconds, baseline in found:
+            print(f"    {int(size):,} {name}: {seconds:.3f}s vs {baseline:.3f}s ({seconds / baseline:.2f}x)")
+    elif history:
+        print(f"\n✅ No regressions vs {args.history}")
+    if not args.no_history and entry['sizes']:
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        print(f"  ✓ Appended to {args.history}")
+    if found and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load-Generator Self-Monitoring
+Detects windows where the client, not the server, was the bottleneck
+
+perf.loadgen runs every VU on one asyncio thread. When that thread runs
+out of CPU, callbacks queue up: think times overshoot, requests start late
+and response timestamps include time spent waiting for the loop, all of
+which reads as server latency. ClientMonitor samples once per second:
+
+    loadgen_cpu             process CPU time / wall time (1.0 = one core)
+    loadgen_loop_lag        mean / max event-loop lag of a LAG_TICK timer (ms)
+    loadgen_sockets         open HTTP connections, and the fd soft limit
+    loadgen_schedule_skew   p95 / max lateness of VU sleeps vs their schedule (ms)
+
+The samples go into the raw stream as k6-style Points and into the
+summary as trends. A second is client-bound when any of CPU_LIMIT,
+LOOP_LAG_LIMIT_MS, SKEW_LIMIT_MS or SOCKET_LIMIT_RATIO is exceeded; the
+analyzer reports those windows, can drop the requests inside them
+(--discard-client-bound), and estimates how many generator processes keep
+CPU under TARGET_CPU.
+
+Collection uses the standard library only; analysis needs numpy.
+"""
+
+import asyncio
+import math
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Sampling period of the loop-lag timer
+LAG_TICK = 0.05
+# Per-second thresholds for a client-bound window
+CPU_LIMIT = 0.9
+LOOP_LAG_LIMIT_MS = 20.0
+SKEW_LIMIT_MS = 50.0
+SOCKET_LIMIT_RATIO = 0.9
+# CPU share per generator process to size a scale-out
+TARGET_CPU = 0.6
+
+METRICS = ('loadgen_cpu', 'loadgen_loop_lag', 'loadgen_sockets', 'loadgen_schedule_skew')
+
+
+def fd_limit():
+    """Soft limit on open file descriptors, or None where unknown"""
+    if resource is None:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return soft if soft != resource.RLIM_INFINITY else None
+
+
+def _p95(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] if ordered else 0.0
+
+
+class ClientMonitor:
+    """Per-second health samples of the running load generator"""
+
+    def __init__(self, sockets=lambda: 0, interval=1.0):
+        self.sockets = sockets
+        self.interval = interval
+        self.samples = []
+        self.fd_limit = fd_limit()
+        self._skews = []
+        self._task = None
+
+    def skew(self, ms):
+        """Record how late a scheduled wake-up (think time, ramp-up, arrival) happened"""
+        self._skews.append(ms)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            wall, cpu = time.perf_counter(), time.process_time()
+            lags = []
+            while time.perf_counter() - wall < self.interval:
+                expected = loop.time() + LAG_TICK
+                await asyncio.sleep(LAG_TICK)
+                lags.append(max(0.0, (loop.time() - expected) * 1000))
+            elapsed = time.perf_counter() - wall
+            skews, self._skews = self._skews, []
+            self.samples.append({
+                'time': time.time(),
+                'cpu': (time.process_time() - cpu) / elapsed,
+                'loop_lag_ms': sum(lags) / len(lags),
+                'loop_lag_max_ms': max(lags),
+                'sockets': self.sockets(),
+                'skew_p95_ms': _p95(skews),
+                'skew_max_ms': max(skews, default=0.0),
+            })
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def points(self):
+        """(metric, epoch, value, tags) for the raw stream"""
+        for s in self.samples:
+            yield 'loadgen_cpu', s['time'], s['cpu'], {}
+            yield 'loadgen_loop_lag', s['time'], s['loop_lag_ms'], {'stat': 'mean'}
+            yield 'loadgen_loop_lag', s['time'], s['loop_lag_max_ms'], {'stat': 'max'}
+            tags = {'fd_limit': str(self.fd_limit)} if self.fd_limit else {}
+            yield 'loadgen_sockets', s['time'], s['sockets'], tags
+            yield 'loadgen_schedule_skew', s['time'], s['skew_p95_ms'], {'stat': 'p95'}
+            yield 'loadgen_schedule_skew', s['time'], s['skew_max_ms'], {'stat': 'max'}
+
+    def trends(self):
+        """{metric: samples} for the summary"""
+        return {
+            'loadgen_cpu': [s['cpu'] for s in self.samples],
+            'loadgen_loop_lag': [s['loop_lag_ms'] for s in self.samples],
+            'loadgen_sockets': [s['sockets'] for s in self.samples],
+            'loadgen_schedule_skew': [s['skew_p95_ms'] for s in self.samples],
+        }
+
+    def report(self):
+        """assess() of the samples so far, for end-of-run warnings"""
+        return assess(self.samples, self.fd_limit)
+
+
+def reasons(sample, limit=None):
+    """{limit: description} of why one second was client-bound; empty if it was not"""
+    found = {}
+    if sample['cpu'] >= CPU_LIMIT:
+        found['cpu'] = f"CPU {sample['cpu'] * 100:.0f}%"
+    if sample['loop_lag_ms'] > LOOP_LAG_LIMIT_MS:
+        found['loop lag'] = f"loop lag {sample['loop_lag_ms']:.0f} ms"
+    if sample['skew_p95_ms'] > SKEW_LIMIT_MS:
+        found['schedule skew'] = f"schedule skew {sample['skew_p95_ms']:.0f} ms"
+    if limit and sample['sockets'] >= SOCKET_LIMIT_RATIO * limit:
+        found['sockets'] = f"{sample['sockets']:.0f}/{limit} sockets"
+    return found
+
+
+def assess(samples, limit=None):
+    """Client-bound windows and a scale-out recommendation for a run's samples"""
+    if not samples:
+        return None
+    windows = []
+    for s in samples:
+        why = reasons(s, limit)
+        if not why:
+            continue
+        # Samples are stamped at the end of their second
+        if windows and s['time'] - windows[-1]['end'] <= 1.5:
+            windows[-1]['end'] = s['time']
+            windows[-1]['reasons'].update(why)
+        else:
+            windows.append({'start': s['time'] - 1.0, 'end': s['time'], 'reasons': set(why)})
+    for w in windows:
+        w['reasons'] = sorted(w['reasons'])
+
+    cpu = [s['cpu'] for s in samples]
+    bound = sum(1 for s in samples if reasons(s, limit))
+    return {
+        'seconds': len(samples),
+        'bound_seconds': bound,
+        'bound_share': bound / len(samples),
+        'windows': windows,
+        'peak_cpu': max(cpu),
+        'p95_cpu': _p95(cpu),
+        'p95_loop_lag_ms': _p95([s['loop_lag_ms'] for s in samples]),
+        'p95_skew_ms': _p95([s['skew_p95_ms'] for s in samples]),
+        'peak_sockets': max(s['sockets'] for s in samples),
+        'fd_limit': limit,
+        # CPU-bound seconds understate demand (capped at one core), hence the peak
+        'generators': max(1, math.ceil(max(cpu) / TARGET_CPU)) if bound else 1,
+    }
+
+
+def recommendation(assessment):
+    if assessment is None:
+        return ''
+    if not assessment['bound_seconds']:
+        return f"Load generator healthy (peak CPU {assessment['peak_cpu'] * 100:.0f}%)."
+    return (f"Load generator was the bottleneck for {assessment['bound_seconds']}s "
+            f"({assessment['bound_share'] * 100:.0f}% of the run): split the load over at least "
+            f"{assessment['generators']} processes or machines.")
+
+
+def read_samples(path):
+    """Per-second samples (as ClientMonitor.samples) and the fd limit from a raw stream"""
+    from perf import k6stream
+
+    fields = {('loadgen_cpu', None): 'cpu', ('loadgen_loop_lag', 'mean'): 'loop_lag_ms',
+              ('loadgen_loop_lag', 'max'): 'loop_lag_max_ms', ('loadgen_sockets', None): 'sockets',
+              ('loadgen_schedule_skew', 'p95'): 'skew_p95_ms', ('loadgen_schedule_skew', 'max'): 'skew_max_ms'}
+    by_time, limit = {}, None
+    for metric, epoch, value, tags in k6stream.read_points(path, metrics=METRICS):
+        field = fields.get((metric, tags.get('stat')))
+        if field:
+            sample = by_time.setdefault(round(epoch, 3), {'time': epoch, 'cpu': 0.0, 'loop_lag_ms': 0.0,
+                                                          'loop_lag_max_ms': 0.0, 'sockets': 0,
+                                                          'skew_p95_ms': 0.0, 'skew_max_ms': 0.0})
+            sample[field] = value
+        if tags.get('fd_limit'):
+            limit = int(tags['fd_limit'])
+    return [by_time[t] for t in sorted(by_time)], limit
+
+
+def healthy_mask(requests, assessment):
+    """Boolean mask of the requests outside client-bound windows"""
+    import numpy as np
+
+    keep = np.ones(len(requests), dtype=bool)
+    for w in assessment['windows']:
+        keep &= (requests.time < w['start']) | (requests.time > w['end'])
+    return keep
+
+
+def plot_health(runs, path):
+    """CPU, loop lag and schedule skew over time per run, client-bound windows shaded"""
+    import matplotlib.pyplot as plt
+
+    runs = sorted(runs.items())
+    fig, axes = plt.subplots(len(runs), 1, figsize=(14, 3.5 * len(runs)), squeeze=False)
+    for ax, ((architecture, scenario), (samples, assessment)) in zip(axes[:, 0], runs):
+        start = samples[0]['time']
+        x = [s['time'] - start for s in samples]
+        ax.plot(x, [s['cpu'] * 100 for s in samples], color='#3498db', label='CPU %')
+        ax.axhline(CPU_LIMIT * 100, color='#3498db', linestyle=':', linewidth=1)
+        ax.set_ylabel('CPU (% of one core)')
+        ax.set_ylim(0, max(110, max(s['cpu'] for s in samples) * 110))
+        lag = ax.twinx()
+        lag.plot(x, [s['loop_lag_ms'] for s in samples], color='#e67e22', label='Loop lag (ms)')
+        lag.plot(x, [s['skew_p95_ms'] for s in samples], color='#9b59b6', label='Schedule skew p95 (ms)')
+        lag.set_ylabel('ms')
+        lag.set_ylim(bottom=0)
+        for w in assessment['windows']:
+            ax.axvspan(w['start'] - start, w['end'] - start, color='#e74c3c', alpha=0.2)
+        lines = ax.get_legend_handles_labels()
+        more = lag.get_legend_handles_labels()
+        ax.legend(lines[0] + more[0], lines[1] + more[1], loc='upper left', fontsize=8)
+        ax.set_title(f"{architecture.title()} - {scenario.replace('_', ' ').title()}: Load Generator Health",
+                     fontweight='bold')
+        ax.set_xlabel('Seconds since start')
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def generate_html_section(runs, discarded=False):
+    """HTML section for {(architecture, scenario): (samples, assess(...))}"""
+    note = ('Requests inside client-bound windows are excluded from the headline metrics.' if discarded else
+            'Use --discard-client-bound to exclude requests inside client-bound windows.')
+    html = f"""
+        <h2>🩺 Load Generator Health</h2>
+        <p>perf.loadgen samples its own CPU, event-loop lag, open sockets and schedule skew every second.
+        A second is client-bound at CPU &ge; {CPU_LIMIT * 100:.0f}%, loop lag &gt; {LOOP_LAG_LIMIT_MS:g} ms,
+        schedule skew p95 &gt; {SKEW_LIMIT_MS:g} ms or sockets near the fd limit; latency measured then
+        partly belongs to the client. {note}</p>
+        <img src="graph-client-health.png" alt="Load Generator Health">
+        <table>
+            <tr><th>Run</th><th>Peak / P95 CPU</th><th>P95 loop lag</th><th>P95 schedule skew</th><th>Peak sockets</th><th>Client-bound</th><th>Recommendation</th></tr>
+"""
+    for (architecture, scenario), (_, a) in sorted(runs.items()):
+        css = 'worse' if a['bound_seconds'] else 'better'
+        sockets = f"{a['peak_sockets']:.0f}" + (f" / {a['fd_limit']}" if a['fd_limit'] else '')
+        html += f"""            <tr><td>{architecture.title()} - {scenario.replace('_', ' ').title()}</td><td>{a['peak_cpu'] * 100:.0f}% / {a['p95_cpu'] * 100:.0f}%</td><td>{a['p95_loop_lag_ms']:.1f} ms</td><td>{a['p95_skew_ms']:.1f} ms</td><td>{sockets}</td><td class="{css}">{a['bound_seconds']}s in {len(a['windows'])} windows</td><td>{recommendation(a)}</td></tr>
+"""
+    html += """        </table>
+"""
+    return html
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Result Comparison
+Side-by-side headline metrics of two result files, as text or Markdown
+
+The Python counterpart of compare-results.ps1, for any two results files
+(monolith vs microservices, before vs after a change, two hosts): the same
+rows as the analysis report, with the difference of B against A and
+whether it is an improvement. Standard library only.
+
+Usage (from performance-tests/):
+    python -m perf.compare results-monolith-heavy_load.json results-microservices-heavy_load.json
+    python -m perf.compare A.json B.json --markdown comparison.md
+"""
+
+import argparse
+import os
+
+from perf import summary
+
+# (label, value(run), unit, higher is better)
+ROWS = [
+    ('Total Requests', lambda r: r.total_requests, '', None),
+    ('Requests/sec', lambda r: r.throughput, 'req/s', True),
+    ('Goodput', lambda r: r.goodput, 'req/s', True),
+    ('Avg Response Time', lambda r: r.trend('http_req_duration').avg, 'ms', False),
+    ('Median Response Time', lambda r: r.trend('http_req_duration').med, 'ms', False),
+    ('95th Percentile', lambda r: r.trend('http_req_duration').p95, 'ms', False),
+    ('99th Percentile', lambda r: r.trend('http_req_duration').p99, 'ms', False),
+    ('Max Response Time', lambda r: r.trend('http_req_duration').max, 'ms', False),
+    ('Error Rate', lambda r: r.error_rate * 100, '%', False),
+    ('Data Received', lambda r: r.data_received_mb, 'MB', None),
+]
+
+
+def label(run):
+    if run.architecture and run.scenario:
+        return f'{run.architecture} {run.scenario}'
+    return os.path.basename(run.path or '?')
+
+
+def compare(a, b):
+    """[{'metric', 'unit', 'a', 'b', 'delta', 'percent', 'better'}] for two RunSummary objects"""
+    rows = []
+    for name, value, unit, higher_is_better in ROWS:
+        x, y = value(a), value(b)
+        delta = y - x
+        better = None
+        if higher_is_better is not None and delta:
+            better = (delta > 0) == higher_is_better
+        rows.append({'metric': name, 'unit': unit, 'a': x, 'b': y, 'delta': delta,
+                     'percent': delta / x * 100 if x else None, 'better': better})
+    return rows
+
+
+def _format(value, unit):
+    if not unit:
+        return f'{value:,.0f}'
+    return f'{value:,.2f} {unit}'.rstrip()
+
+
+def _change(row):
+    if not row['delta']:
+        return '-'
+    percent = f" ({row['percent']:+.1f}%)" if row['percent'] is not None else ''
+    return f"{row['delta']:+,.2f}{percent}"
+
+
+def to_text(a, b, rows):
+    lines = [f"  {'Metric':<22} {label(a):>26} {label(b):>26}  Difference"]
+    for row in rows:
+        mark = {True: '  ✓', False: '  ✗', None: ''}[row['better']]
+        lines.append(f"  {row['metric']:<22} {_format(row['a'], row['unit']):>26} "
+                     f"{_format(row['b'], row['unit']):>26}  {_change(row)}{mark}")
+    return '\n'.join(lines)
+
+
+def to_markdown(a, b, rows):
+    lines = [f'| Metric | {label(a)} | {label(b)} | Difference |', '|--------|------|------|------------|']
+    for row in rows:
+        mark = {True: ' (better)', False: ' (worse)', None: ''}[row['better']]
+        lines.append(f"| **{row['metric']}** | {_format(row['a'], row['unit'])} | "
+                     f"{_format(row['b'], row['unit'])} | {_change(row)}{mark} |")
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two k6 / perf.loadgen result files')
+    parser.add_argument('a', help='baseline results-*.json')
+    parser.add_argument('b', help='results-*.json compared against the baseline')
+    parser.add_argument('--markdown', help='also write a Markdown table to this path')
+    args = parser.parse_args(argv)
+
+    a, b = summary.load(args.a), summary.load(args.b)
+    rows = compare(a, b)
+    print(f"\n📊 {label(b)} vs {label(a)}\n")
+    print(to_text(a, b, rows))
+    if args.markdown:
+        with open(args.markdown, 'w', encoding='utf-8') as f:
+            f.write(to_markdown(a, b, rows))
+        print(f"\n  ✓ Saved: {args.markdown}")
+
+
+if __name__ == '__main__':
+    main()
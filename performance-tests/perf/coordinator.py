@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Distributed Load Generation
+Coordinator and worker processes for perf.loadgen runs beyond one core
+
+perf.loadgen runs on a single asyncio thread, which saturates long before
+the 200+ VUs of aws-deployment/testing/load-test.js at high request rates.
+The coordinator splits the VUs over N worker processes - spawned locally,
+started by hand on other hosts, or both - and starts them together. Each
+worker runs the usual scenario and streams, once per second, per-endpoint
+LogHistograms (perf.histogram) and counters for that second only. The
+coordinator merges them into one results-{arch}-{scenario}.json with the
+same shape as a single perf.loadgen run, plus a per-second `timeline` and
+per-worker health (perf.clientmonitor) under testConfig.workers. Merged
+percentiles are exact to perf.histogram.RELATIVE_ERROR; no raw stream is
+written.
+
+Protocol: newline-delimited JSON over TCP.
+    worker -> coordinator   hello {host, pid, time}
+    coordinator -> worker   welcome {time, worker, vus, first_user, config}
+    worker -> coordinator   ready {}                 (token pool warm)
+    coordinator -> worker   start {at}               (coordinator clock)
+    worker -> coordinator   tick {second, ...}       (every second)
+    worker -> coordinator   done {duration, health}
+Workers estimate their clock offset from the hello / welcome round trip, so
+hosts need not have synchronized clocks.
+
+Usage (from performance-tests/):
+    python -m perf.coordinator --base-url http://localhost:5000 --arch monolith \\
+        --scenario journey --vus 400 --duration 5m --local-workers 4
+
+    # several hosts: the coordinator waits for 8 workers ...
+    python -m perf.coordinator --listen 0.0.0.0:7070 --local-workers 0 --remote-workers 8 ...
+    # ... started on the load hosts, one per core
+    python -m perf.coordinator worker --connect coordinator-host:7070
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from datetime import datetime, timezone
+
+from perf import journeys
+from perf.clientmonitor import ClientMonitor
+from perf.histogram import LogHistogram
+from perf.loadgen import HttpClient, Recorder, parse_duration, print_summary, run_closed, write_summary
+
+DEFAULT_PORT = 7070
+# Delay between the start message and the synchronized start
+START_DELAY = 1.0
+# How long the coordinator waits for all workers to connect and warm up
+JOIN_TIMEOUT = 300.0
+
+
+async def _send(writer, message):
+    writer.write(json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n')
+    await writer.drain()
+
+
+async def _receive(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError('peer closed the connection')
+    return json.loads(line)
+
+
+def _histograms(data):
+    return {name: LogHistogram.from_dict(h) for name, h in data.items()}
+
+
+class StreamingRecorder(Recorder):
+    """Recorder that keeps only the current second, as histograms, for streaming"""
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self.tick = {'requests': 0, 'failed': 0, 'bytes': 0, 'durations': {}, 'sizes': {}, 'trends': {},
+                     'counters': {}}
+
+    def request(self, name, method, url, response, vu=0, iteration=0):
+        tick = self.tick
+        tick['requests'] += 1
+        tick['bytes'] += len(response.body)
+        if not response.ok:
+            tick['failed'] += 1
+        tick['durations'].setdefault(name, LogHistogram()).add(response.duration)
+        if response.ok:
+            tick['sizes'].setdefault(name, LogHistogram()).add(len(response.body))
+
+    def trend(self, name, value):
+        self.tick['trends'].setdefault(name, LogHistogram()).add(value)
+
+    def count(self, name, n=1):
+        self.tick['counters'][name] = self.tick['counters'].get(name, 0) + n
+
+    def drain(self):
+        """The current second as a tick message; starts a new second"""
+        tick = self.tick
+        self._reset()
+        message = {k: tick[k] for k in ('requests', 'failed', 'bytes', 'counters')}
+        for key in ('durations', 'sizes', 'trends'):
+            message[key] = {name: h.to_dict() for name, h in tick[key].items()}
+        return message
+
+
+class MergedRun:
+    """Totals and per-second timeline merged from all workers' ticks"""
+
+    def __init__(self):
+        self.requests = self.failed = self.bytes = 0
+        self.durations, self.sizes, self.trends, self.counters = {}, {}, {}, {}
+        self.timeline = {}
+
+    def add(self, tick):
+        self.requests += tick['requests']
+        self.failed += tick['failed']
+        self.bytes += tick['bytes']
+        for key, target in (('durations', self.durations), ('sizes', self.sizes), ('trends', self.trends)):
+            for name, h in _histograms(tick[key]).items():
+                target.setdefault(name, LogHistogram()).merge(h)
+        for name, n in tick['counters'].items():
+            self.counters[name] = self.counters.get(name, 0) + n
+
+        second = self.timeline.setdefault(tick['second'], {'requests': 0, 'failed': 0, 'duration': LogHistogram()})
+        second['requests'] += tick['requests']
+        second['failed'] += tick['failed']
+        for h in _histograms(tick['durations']).values():
+            second['duration'].merge(h)
+
+    def summary(self, duration_seconds, config):
+        """handleSummary-shaped result, as perf.loadgen.Recorder.summary"""
+        seconds = max(duration_seconds, 1e-9)
+        overall = LogHistogram()
+        for h in self.durations.values():
+            overall.merge(h)
+        ok = self.requests - self.failed
+        error_rate = self.failed / self.requests if self.requests else 0
+        metrics = {
+            'http_req_duration': {'type': 'trend', 'contains': 'time', 'values': overall.values()},
+            'http_reqs': {'type': 'counter', 'values': {'count': self.requests, 'rate': self.requests / seconds}},
+            'http_req_failed': {'type': 'rate', 'values': {'rate': error_rate, 'passes': self.failed, 'fails': ok}},
+            'errors': {'type': 'rate', 'values': {'rate': error_rate}},
+            'successful_requests': {'type': 'counter', 'values': {'count': ok, 'rate': ok / seconds}},
+            'failed_requests': {'type': 'counter', 'values': {'count': self.failed, 'rate': self.failed / seconds}},
+            'data_received': {'type': 'counter', 'contains': 'data', 'values': {
+                'count': self.bytes, 'rate': self.bytes / seconds}},
+        }
+        for name, h in self.durations.items():
+            metrics[f'http_req_duration{{name:{name}}}'] = {
+                'type': 'trend', 'contains': 'time', 'values': {**h.values(), 'count': h.count}}
+        if self.sizes:
+            sizes = LogHistogram()
+            for h in self.sizes.values():
+                sizes.merge(h)
+            metrics['response_size'] = {'type': 'trend', 'contains': 'data', 'values': sizes.values()}
+            for name, h in self.sizes.items():
+                metrics[f'response_size{{name:{name}}}'] = {
+                    'type': 'trend', 'contains': 'data', 'values': {**h.values(), 'count': h.count}}
+        for name, h in self.trends.items():
+            metrics[name] = {'type': 'trend', 'contains': 'time', 'values': h.values()}
+        for name, count in self.counters.items():
+            metrics[name] = {'type': 'counter', 'values': {'count': count, 'rate': count / seconds}}
+        histograms = {'http_req_duration': overall.to_dict()}
+        for name, h in self.durations.items():
+            histograms[f'http_req_duration{{name:{name}}}'] = h.to_dict()
+        return {
+            'metrics': metrics,
+            'state': {'testRunDurationMs': duration_seconds * 1000},
+            'testConfig': config,
+            'histograms': histograms,
+            'timeline': [{'second': s, 'requests': t['requests'], 'failed': t['failed'],
+                          'p95': t['duration'].quantile(0.95)} for s, t in sorted(self.timeline.items())],
+        }
+
+
+async def run_worker(host, port):
+    """Connect to a coordinator, run the assigned share of VUs and stream ticks"""
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = time.time()
+    await _send(writer, {'type': 'hello', 'host': socket.gethostname(), 'pid': os.getpid(), 'time': sent})
+    welcome = await _receive(reader)
+    # Coordinator clock = local clock + offset, assuming a symmetric round trip
+    offset = welcome['time'] - (sent + time.time()) / 2
+    config, vus = welcome['config'], welcome['vus']
+
+    context = await journeys.prepare(config['scenario'], config['base_url'], vus, config.get('manifest'),
+                                     think_scale=config['think_scale'], timeout=config['timeout'],
+                                     login_ratio=config['login_ratio'], first_user=welcome['first_user'])
+    await _send(writer, {'type': 'ready'})
+    start = await _receive(reader)
+    await asyncio.sleep(max(0.0, start['at'] - offset - time.time()))
+
+    recorder = StreamingRecorder()
+    recorder.monitor = ClientMonitor(lambda: HttpClient.open_connections)
+    recorder.monitor.start()
+    started = time.monotonic()
+
+    async def ticker():
+        second = 0
+        while True:
+            await asyncio.sleep(max(0.0, started + second + 1 - time.monotonic()))
+            await _send(writer, {'type': 'tick', 'second': second, **recorder.drain()})
+            second += 1
+
+    ticks = asyncio.get_running_loop().create_task(ticker())
+    await run_closed(journeys.SCENARIOS[config['scenario']], config['base_url'], vus, config['duration'],
+                     recorder, context, config['ramp_up'], config['timeout'])
+    duration = time.monotonic() - started
+    ticks.cancel()
+    await recorder.monitor.stop()
+    await _send(writer, {'type': 'tick', 'second': int(duration), **recorder.drain()})
+    await _send(writer, {'type': 'done', 'duration': duration, 'health': recorder.monitor.report(),
+                         'dataset': context.dataset})
+    writer.close()
+
+
+async def coordinate(config, vus, expected, listen_host, port, local_workers):
+    """Run the coordinator; returns (MergedRun, duration, per-worker info, dataset)
+
+    A worker that disconnects before `done`, sends a bad message or (when
+    local) exits with an error fails the run, as does a join timeout: the
+    local workers are terminated and SystemExit carries the reason.
+    """
+    merged = MergedRun()
+    workers = []
+    ready_count = [0]
+    ready = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    start = loop.create_future()
+    failure = loop.create_future()
+    finished = []
+    datasets = []
+    handlers = []
+
+    async def handle(reader, writer):
+        hello = await _receive(reader)
+        index = len(workers)
+        if index >= expected:
+            writer.close()
+            return
+        share = vus // expected + (1 if index < vus % expected else 0)
+        worker = {'worker': index, 'host': hello['host'], 'pid': hello['pid'], 'vus': share, 'requests': 0}
+        workers.append(worker)
+        first_user = sum(w['vus'] for w in workers[:-1])
+        await _send(writer, {'type': 'welcome', 'time': time.time(), 'worker': index, 'vus': share,
+                             'first_user': first_user, 'config': config})
+
+        await _receive(reader)
+        ready_count[0] += 1
+        print(f"  ✓ Worker {index} ready: {hello['host']} pid {hello['pid']}, {share} VUs")
+        if ready_count[0] == expected:
+            ready.set()
+        await _send(writer, {'type': 'start', 'at': await start})
+
+        while True:
+            message = await _receive(reader)
+            if message['type'] == 'tick':
+                worker['requests'] += message['requests']
+                merged.add(message)
+            elif message['type'] == 'done':
+                health = message.get('health') or {}
+                worker.update({'duration': message['duration'], 'peak_cpu': health.get('peak_cpu'),
+                               'client_bound_seconds': health.get('bound_seconds')})
+                finished.append(message['duration'])
+                datasets.append(message.get('dataset'))
+                break
+        writer.close()
+
+    async def guarded(reader, writer):
+        try:
+            await handle(reader, writer)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            peer = writer.get_extra_info('peername')
+            if not failure.done():
+                failure.set_result(f'worker at {peer[0]}:{peer[1]} failed: {e!r}')
+            writer.close()
+
+    def accept(reader, writer):
+        handlers.append(loop.create_task(guarded(reader, writer)))
+
+    def check(deadline=None):
+        """Reason to abort the run, or None"""
+        if failure.done():
+            return failure.result()
+        for index, process in enumerate(processes):
+            if process.returncode not in (None, 0):
+                return f'local worker process {index} exited with code {process.returncode}'
+        if deadline is not None and time.monotonic() > deadline:
+            return f'only {ready_count[0]} of {expected} workers ready after {JOIN_TIMEOUT:.0f}s'
+        return None
+
+    async def until(condition, deadline=None):
+        while not condition():
+            error = check(deadline)
+            if error:
+                raise SystemExit(f'❌ {error} - stopping the run')
+            await asyncio.sleep(0.2)
+
+    server = await asyncio.start_server(accept, listen_host, port)
+    port = server.sockets[0].getsockname()[1]
+    print(f"🛰️  Coordinator on {listen_host}:{port}, waiting for {expected} workers")
+    processes = []
+    try:
+        for _ in range(local_workers):
+            processes.append(await asyncio.create_subprocess_exec(
+                sys.executable, '-m', 'perf.coordinator', 'worker', '--connect', f'127.0.0.1:{port}'))
+
+        await until(ready.is_set, time.monotonic() + JOIN_TIMEOUT)
+        start.set_result(time.time() + START_DELAY)
+        print(f"  🚦 Start: {expected} workers, {vus} VUs")
+
+        await until(lambda: len(finished) >= expected)
+        for process in processes:
+            await process.wait()
+    except BaseException:
+        for process in processes:
+            if process.returncode is None:
+                process.terminate()
+        for process in processes:
+            await process.wait()
+        raise
+    finally:
+        server.close()
+        for task in handlers:
+            task.cancel()
+    return merged, max(finished), workers, datasets[0]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'worker':
+        parser = argparse.ArgumentParser(description='Distributed load generation worker')
+        parser.add_argument('worker')
+        parser.add_argument('--connect', required=True, help='coordinator host:port')
+        args = parser.parse_args()
+        host, _, port = args.connect.rpartition(':')
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+        asyncio.run(run_worker(host or '127.0.0.1', int(port)))
+        return
+
+    parser = argparse.ArgumentParser(description='Distributed load generation coordinator')
+    parser.add_argument('--base-url', default=os.environ.get('BASE_URL', 'http://localhost:5000'))
+    parser.add_argument('--arch', default=os.environ.get('TEST_NAME', 'monolith'))
+    parser.add_argument('--scenario', choices=sorted(journeys.SCENARIOS), default='journey')
+    parser.add_argument('--vus', type=int, default=200, help='total VUs over all workers')
+    parser.add_argument('--duration', type=parse_duration, default=parse_duration('2m'))
+    parser.add_argument('--ramp-up', type=parse_duration, default=0.0)
+    parser.add_argument('--timeout', type=parse_duration, default=60.0)
+    parser.add_argument('--manifest', default=os.environ.get('DATASET_MANIFEST'))
+    parser.add_argument('--login-ratio', type=float, default=0.0)
+    parser.add_argument('--think-scale', type=float, default=1.0)
+    parser.add_argument('--local-workers', type=int, default=os.cpu_count() or 1,
+                        help='worker processes to spawn on this host')
+    parser.add_argument('--remote-workers', type=int, default=0, help='workers expected from other hosts')
+    parser.add_argument('--listen', default=f'127.0.0.1:{DEFAULT_PORT}', help='host:port for workers')
+    args = parser.parse_args()
+
+    expected = args.local_workers + args.remote_workers
+    if expected < 1:
+        parser.error('need at least one worker')
+    host, _, port = args.listen.rpartition(':')
+    config = {
+        'base_url': args.base_url, 'scenario': args.scenario, 'duration': args.duration,
+        'ramp_up': args.ramp_up, 'timeout': args.timeout, 'manifest': args.manifest,
+        'login_ratio': args.login_ratio, 'think_scale': args.think_scale,
+    }
+    merged, elapsed, workers, dataset = asyncio.run(coordinate(config, args.vus, expected, host or '127.0.0.1',
+                                                      int(port), args.local_workers))
+
+    summary = merged.summary(elapsed, {
+        'baseUrl': args.base_url,
+        'testName': args.arch,
+        'scenario': args.scenario,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'vus': args.vus,
+        'generator': 'perf.coordinator',
+        'workers': workers,
+        'dataset': dataset,
+    })
+    path = write_summary(summary, args.arch, args.scenario)
+    print_summary(summary)
+    print(f"\n  {'Worker':<8} {'host':<20} {'VUs':>5} {'requests':>10} {'peak CPU':>9}")
+    for w in workers:
+        cpu = f"{w['peak_cpu'] * 100:.0f}%" if w.get('peak_cpu') is not None else '-'
+        print(f"  {w['worker']:<8} {w['host']:<20} {w['vus']:>5} {w['requests']:>10,} {cpu:>9}")
+    bound = [w['worker'] for w in workers if w.get('client_bound_seconds')]
+    if bound:
+        print(f"  ⚠️  Workers {bound} were client-bound - add workers")
+    print(f"\n  ✓ Saved: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bulk Synthetic Dataset Generator
+Generates QuizHub catalogues from 10^3 to 10^7 users for data-volume experiments
+
+DbInitializer only seeds five quizzes, so none of the measured numbers
+exercise GetQuizzesAsync (Include Category/CreatedBy/Questions, ordering
+by Questions.Count) or the leaderboard at realistic table sizes. This
+writes rows matching the EF Core schema (AspNetUsers, Categories, Quizzes,
+Questions, Answers, QuizAttempts, UserAnswers) as PostgreSQL COPY CSV
+files, streamed in batches so memory stays flat at any scale, plus:
+
+    load.sql       psql script: \\copy every table in FK order, grant roles
+    unload.sql     psql script: delete the generated rows again
+    manifest.json  row counts and sampled IDs for the load generators
+
+IDs are derived from (table, index), so child rows can reference parents
+without keeping them in memory, and a given --users/--seed always yields
+the same dataset. Every generated user has the password `Test123!`.
+
+Usage (from performance-tests/):
+    python -m perf.datagen --users 100000 --out dataset-100k
+    psql "$DSN" -f dataset-100k/load.sql          # or: --dsn to load directly
+"""
+
+import argparse
+import base64
+import csv
+import glob
+import hashlib
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+
+PASSWORD = 'Test123!'
+BATCH_ROWS = 10000
+# Rows per worker task (users); quizzes and attempts use smaller chunks
+CHUNK_ROWS = 200000
+MANIFEST_SAMPLE = 500
+YEAR = 365 * 24 * 3600
+
+# Table prefixes for deterministic UUIDs: xxxxxxxx-0000-4000-8000-<index>
+PREFIX = {
+    'user': 0x75736572,
+    'category': 0x63617467,
+    'quiz': 0x7175697a,
+    'question': 0x71756573,
+    'answer': 0x616e7377,
+    'attempt': 0x61747470,
+    'user_answer': 0x75616e73,
+}
+
+# Question types (KvizHub.Domain.Enums.QuestionType)
+MULTIPLE_CHOICE, TRUE_FALSE, MULTIPLE_SELECT = 1, 2, 3
+# AttemptStatus
+IN_PROGRESS, COMPLETED, ABANDONED = 1, 2, 3
+
+MAX_QUESTIONS = 20
+MAX_ANSWERS = 4
+
+COLUMNS = {
+    'AspNetUsers': ['Id', 'FirstName', 'LastName', 'Avatar', 'CreatedAt', 'UpdatedAt', 'UserName',
+                    'NormalizedUserName', 'Email', 'NormalizedEmail', 'EmailConfirmed', 'PasswordHash',
+                    'SecurityStamp', 'ConcurrencyStamp', 'PhoneNumber', 'PhoneNumberConfirmed',
+                    'TwoFactorEnabled', 'LockoutEnd', 'LockoutEnabled', 'AccessFailedCount'],
+    'Categories': ['Id', 'Name', 'Description', 'Icon', 'CreatedAt', 'UpdatedAt'],
+    'Quizzes': ['Id', 'Title', 'Description', 'CategoryId', 'Difficulty', 'TimeLimit', 'IsPublic',
+                'CreatedById', 'CreatedAt', 'UpdatedAt'],
+    'Questions': ['Id', 'QuizId', 'Type', 'QuestionText', 'Points', 'TimeLimit', 'Order',
+                  'CreatedAt', 'UpdatedAt'],
+    'Answers': ['Id', 'QuestionId', 'AnswerText', 'IsCorrect', 'Order', 'CreatedAt', 'UpdatedAt'],
+    'QuizAttempts': ['Id', 'QuizId', 'UserId', 'StartedAt', 'FinishedAt', 'Score', 'TotalPoints',
+                     'Status', 'CreatedAt', 'UpdatedAt'],
+    'UserAnswers': ['Id', 'AttemptId', 'QuestionId', 'SelectedAnswerIds', 'IsCorrect', 'PointsEarned',
+                    'TimeSpent', 'AnsweredAt', 'CreatedAt', 'UpdatedAt'],
+}
+
+# FK-safe load order
+TABLE_ORDER = ['AspNetUsers', 'Categories', 'Quizzes', 'Questions', 'Answers', 'QuizAttempts', 'UserAnswers']
+
+FIRST_NAMES = ['Ana', 'Marko', 'Jelena', 'Nikola', 'Milica', 'Stefan', 'Ivana', 'Luka', 'Sara', 'Dusan']
+LAST_NAMES = ['Petrovic', 'Jovanovic', 'Nikolic', 'Markovic', 'Djordjevic', 'Stojanovic', 'Ilic']
+TOPICS = ['History', 'Science', 'Sports', 'Geography', 'Music', 'Movies', 'Literature', 'Technology',
+          'Art', 'Nature', 'Food', 'Languages', 'Mathematics', 'Programming', 'Space', 'Politics']
+
+
+_ID_PREFIX = {table: f'{prefix:08x}-0000-4000-8000-' for table, prefix in PREFIX.items()}
+
+
+def make_id(table, index):
+    """Deterministic UUID for row `index` of a table"""
+    return f'{_ID_PREFIX[table]}{index:012x}'
+
+
+def questions_in_quiz(quiz):
+    """Question count of a quiz (5..MAX_QUESTIONS), stable for a given index"""
+    return 5 + (quiz * 2654435761 >> 7) % (MAX_QUESTIONS - 4)
+
+
+def question_type(question):
+    return (MULTIPLE_CHOICE, MULTIPLE_CHOICE, TRUE_FALSE, MULTIPLE_SELECT)[question % 4]
+
+
+def answers_in_question(question):
+    return 2 if question_type(question) == TRUE_FALSE else MAX_ANSWERS
+
+
+def identity_password_hash(password, salt=b'kvizhub-synthetic', iterations=10000):
+    """ASP.NET Core Identity V3 hash (PBKDF2-HMAC-SHA256), shared by all generated users"""
+    subkey = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt[:16].ljust(16, b'\0'), iterations, 32)
+    header = bytes([0x01]) + (1).to_bytes(4, 'big') + iterations.to_bytes(4, 'big') + (16).to_bytes(4, 'big')
+    return base64.b64encode(header + salt[:16].ljust(16, b'\0') + subkey).decode('ascii')
+
+
+class DatasetSize:
+    """Row-count plan derived from the number of users"""
+
+    def __init__(self, users, quizzes=None, attempts=None, categories=None):
+        self.users = users
+        self.quizzes = quizzes if quizzes is not None else max(5, users // 10)
+        self.attempts = attempts if attempts is not None else users * 5
+        self.categories = categories if categories is not None else min(200, max(len(TOPICS), self.quizzes // 1000))
+
+    def as_dict(self):
+        return {'users': self.users, 'categories': self.categories,
+                'quizzes': self.quizzes, 'attempts': self.attempts}
+
+
+class BatchedCsv:
+    """CSV writer that buffers rows and flushes them with writerows"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.rows = []
+        self.count = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        self.writer.writerows(self.rows)
+        self.count += len(self.rows)
+        self.rows = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class Clock:
+    """Formats epoch seconds as timestamptz literals without strftime per row"""
+
+    def __init__(self, now):
+        self.now = int(now)
+        self.day0 = self.now // 86400 - 400
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        self.days = [(epoch + timedelta(days=self.day0 + d)).strftime('%Y-%m-%d') for d in range(402)]
+
+    def format(self, seconds):
+        day, rest = divmod(int(seconds), 86400)
+        hour, rest = divmod(rest, 3600)
+        return f'{self.days[day - self.day0]} {hour:02d}:{rest // 60:02d}:{rest % 60:02d}+00'
+
+
+def _chunks(total, size):
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def _user_part(task):
+    out_dir, part, start, stop, seed, now = task
+    rng = random.Random(f'{seed}:users:{part}')
+    clock = Clock(now)
+    password_hash = identity_password_hash(PASSWORD)
+    w = BatchedCsv(os.path.join(out_dir, f'AspNetUsers.{part:04d}.csv'))
+    for u in range(start, stop):
+        created = clock.format(now - rng.randrange(YEAR))
+        user_id = make_id('user', u)
+        email = f'loaduser{u}@kvizhub.test'
+        w.add([user_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), '', created, created,
+               email, email.upper(), email, email.upper(), 't', password_hash,
+               user_id.replace('-', '').upper(), user_id, '', 'f', 'f', '', 't', 0])
+    w.close()
+    return {'AspNetUsers': w.count}
+
+
+def _quiz_part(task):
+    """Quizzes with their questions and answers; the first answer is always correct"""
+    out_dir, part, start, stop, seed, now, size = task
+    rng = random.Random(f'{seed}:quizzes:{part}')
+    clock = Clock(now)
+    quiz_w = BatchedCsv(os.path.join(out_dir, f'Quizzes.{part:04d}.csv'))
+    question_w = BatchedCsv(os.path.join(out_dir, f'Questions.{part:04d}.csv'))
+    answer_w = BatchedCsv(os.path.join(out_dir, f'Answers.{part:04d}.csv'))
+    for q in range(start, stop):
+        created = clock.format(now - rng.randrange(YEAR))
+        quiz_id = make_id('quiz', q)
+        quiz_w.add([quiz_id, f'{TOPICS[q % len(TOPICS)]} Quiz #{q}', f'Synthetic quiz number {q}',
+                    make_id('category', q % size.categories), 1 + q % 3, rng.choice(['', 5, 10, 15]),
+                    't' if q % 20 else 'f', make_id('user', rng.randrange(size.users)), created, created])
+        for k in range(questions_in_quiz(q)):
+            question = q * MAX_QUESTIONS + k
+            question_id = make_id('question', question)
+            question_w.add([question_id, quiz_id, question_type(question), f'Question {k + 1} of quiz {q}?',
+                            1 + question % 3, '', k, created, created])
+            for a in range(answers_in_question(question)):
+                answer_w.add([make_id('answer', question * MAX_ANSWERS + a), question_id, f'Answer {a + 1}',
+                              't' if a == 0 else 'f', a, created, created])
+    for w in (quiz_w, question_w, answer_w):
+        w.close()
+    return {'Quizzes': quiz_w.count, 'Questions': question_w.count, 'Answers': answer_w.count}
+
+
+def _attempt_part(task):
+    """Attempts and their answers; quiz popularity is Zipf-like so the
+    leaderboard and per-quiz attempt lists have realistic hot spots"""
+    out_dir, part, start, stop, seed, now, size = task
+    rng = random.Random(f'{seed}:attempts:{part}')
+    clock = Clock(now)
+    attempt_w = BatchedCsv(os.path.join(out_dir, f'QuizAttempts.{part:04d}.csv'))
+    user_answer_w = BatchedCsv(os.path.join(out_dir, f'UserAnswers.{part:04d}.csv'))
+    # UserAnswer IDs only need to be unique: attempt index * MAX_QUESTIONS + question position
+    for t in range(start, stop):
+        q = (min(int(rng.paretovariate(1.2)) - 1, size.quizzes - 1) * 7919) % size.quizzes
+        started_at = now - rng.randrange(YEAR)
+        roll = rng.random()
+        status = COMPLETED if roll < 0.9 else IN_PROGRESS if roll < 0.95 else ABANDONED
+        attempt_id = make_id('attempt', t)
+        n_questions = questions_in_quiz(q)
+        answered = n_questions if status == COMPLETED else rng.randrange(n_questions)
+        score = total = 0
+        moment = started_at
+        for k in range(n_questions):
+            question = q * MAX_QUESTIONS + k
+            points = 1 + question % 3
+            total += points
+            if k >= answered:
+                continue
+            correct = rng.random() < 0.6
+            choice = 0 if correct else rng.randrange(1, answers_in_question(question))
+            spent = rng.randint(3, 40)
+            moment += spent
+            earned = points if correct else 0
+            score += earned
+            answered_at = clock.format(moment)
+            user_answer_w.add([make_id('user_answer', t * MAX_QUESTIONS + k), attempt_id, make_id('question', question),
+                               f'["{make_id("answer", question * MAX_ANSWERS + choice)}"]',
+                               't' if correct else 'f', earned, spent, answered_at, answered_at, answered_at])
+        started = clock.format(started_at)
+        finished = clock.format(moment)
+        attempt_w.add([attempt_id, make_id('quiz', q), make_id('user', rng.randrange(size.users)),
+                       started, finished if status == COMPLETED else '', score, total, status, started, finished])
+    attempt_w.close()
+    user_answer_w.close()
+    return {'QuizAttempts': attempt_w.count, 'UserAnswers': user_answer_w.count}
+
+
+def build_manifest(size, seed):
+    """Sampled IDs for the load generators, derived without reading the CSV files"""
+    rng = random.Random(f'{seed}:manifest')
+    quizzes = []
+    for q in sorted(rng.sample(range(size.quizzes), min(MANIFEST_SAMPLE, size.quizzes))):
+        questions = []
+        for k in range(questions_in_quiz(q)):
+            question = q * MAX_QUESTIONS + k
+            questions.append({
+                'id': make_id('question', question),
+                'type': question_type(question),
+                'answers': [make_id('answer', question * MAX_ANSWERS + a) for a in range(answers_in_question(question))],
+                'correct': make_id('answer', question * MAX_ANSWERS),
+            })
+        quizzes.append({'id': make_id('quiz', q), 'public': bool(q % 20), 'questions': questions})
+    return {
+        'size': size.as_dict(),
+        'seed': seed,
+        'password': PASSWORD,
+        'users': [f'loaduser{u}@kvizhub.test' for u in rng.sample(range(size.users), min(MANIFEST_SAMPLE, size.users))],
+        'categories': [make_id('category', c) for c in range(size.categories)],
+        'quizzes': quizzes,
+    }
+
+
+def generate(size, out_dir, seed=1, workers=None, now=None):
+    """Write the COPY CSV parts, load.sql and manifest.json into out_dir
+
+    Users, quizzes and attempts are generated in independent chunks on a
+    process pool; each chunk has its own seeded generator and part file, so
+    output does not depend on the number of workers.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    for table in TABLE_ORDER:
+        for path in part_files(out_dir, table):
+            os.remove(path)
+    now = int(now or time.time())
+    started = time.time()
+    clock = Clock(now)
+
+    with open(os.path.join(out_dir, 'Categories.0000.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        created = clock.format(now - 400 * 86400 + 1)
+        for c in range(size.categories):
+            # Name has a unique index, and DbInitializer already seeds the plain topic names
+            name = f'Synthetic {TOPICS[c % len(TOPICS)]} {c // len(TOPICS) + 1}'
+            writer.writerow([make_id('category', c), name, f'Synthetic category {name}', '📚', created, created])
+
+    tasks = [(_user_part, (out_dir, i, a, b, seed, now)) for i, (a, b) in enumerate(_chunks(size.users, CHUNK_ROWS))]
+    tasks += [(_quiz_part, (out_dir, i, a, b, seed, now, size))
+              for i, (a, b) in enumerate(_chunks(size.quizzes, CHUNK_ROWS // 20))]
+    tasks += [(_attempt_part, (out_dir, i, a, b, seed, now, size))
+              for i, (a, b) in enumerate(_chunks(size.attempts, CHUNK_ROWS // 10))]
+
+    counts = {table: 0 for table in TABLE_ORDER}
+    counts['Categories'] = size.categories
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with Pool(min(workers, len(tasks))) as pool:
+            results = pool.starmap(_run_task, tasks)
+    else:
+        results = [_run_task(fn, task) for fn, task in tasks]
+    for result in results:
+        for table, count in result.items():
+            counts[table] += count
+
+    manifest = build_manifest(size, seed)
+    manifest['counts'] = counts
+    manifest['generated_at'] = datetime.fromtimestamp(now, timezone.utc).isoformat()
+    with open(os.path.join(out_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    with open(os.path.join(out_dir, 'load.sql'), 'w', encoding='utf-8') as f:
+        f.write(load_script(out_dir))
+    with open(os.path.join(out_dir, 'unload.sql'), 'w', encoding='utf-8') as f:
+        f.write(unload_script())
+
+    return manifest, time.time() - started
+
+
+def _run_task(fn, task):
+    return fn(task)
+
+
+def part_files(out_dir, table):
+    return sorted(glob.glob(os.path.join(out_dir, f'{table}.*.csv')))
+
+
+def load_script(out_dir):
+    """psql script that bulk-loads the CSV parts in FK order"""
+    lines = ['-- Generated by perf/datagen.py - run from the dataset directory after migrations',
+             '\\set ON_ERROR_STOP on', 'BEGIN;']
+    for table in TABLE_ORDER:
+        columns = ', '.join(f'"{c}"' for c in COLUMNS[table])
+        for path in part_files(out_dir, table):
+            lines.append(f"\\copy \"{table}\" ({columns}) FROM '{os.path.basename(path)}' WITH (FORMAT csv, NULL '')")
+    lines += [
+        '-- Generated users get the standard "User" role',
+        'INSERT INTO "AspNetUserRoles" ("UserId", "RoleId")',
+        '    SELECT u."Id", r."Id" FROM "AspNetUsers" u CROSS JOIN "AspNetRoles" r',
+        "    WHERE r.\"Name\" = 'User' AND u.\"Email\" LIKE '%@kvizhub.test'",
+        '    ON CONFLICT DO NOTHING;',
+        'COMMIT;',
+        'ANALYZE;',
+        '',
+    ]
+    return '\n'.join(lines)
+
+
+def unload_script():
+    """psql script that removes every generated row (identified by its ID prefix)"""
+    tables = {'AspNetUsers': 'user', 'Categories': 'category', 'Quizzes': 'quiz', 'Questions': 'question',
+              'Answers': 'answer', 'QuizAttempts': 'attempt', 'UserAnswers': 'user_answer'}
+    lines = ['-- Generated by perf/datagen.py - removes a previously loaded synthetic dataset',
+             '\\set ON_ERROR_STOP on', 'BEGIN;',
+             f"DELETE FROM \"AspNetUserRoles\" WHERE \"UserId\" LIKE '{_ID_PREFIX['user']}%';"]
+    for table in reversed(TABLE_ORDER):
+        lines.append(f"DELETE FROM \"{table}\" WHERE \"Id\"::text LIKE '{_ID_PREFIX[tables[table]]}%';")
+    lines += ['COMMIT;', 'VACUUM ANALYZE;', '']
+    return '\n'.join(lines)
+
+
+def load_into_database(dsn, out_dir):
+    """COPY the CSV files straight into PostgreSQL (needs psycopg 3)"""
+    import psycopg
+
+    with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+        for table in TABLE_ORDER:
+            columns = ', '.join(f'"{c}"' for c in COLUMNS[table])
+            for path in part_files(out_dir, table):
+                with open(path, 'rb') as f, \
+                        cur.copy(f'COPY "{table}" ({columns}) FROM STDIN WITH (FORMAT csv, NULL \'\')') as copy:
+                    while chunk := f.read(1 << 20):
+                        copy.write(chunk)
+            print(f"  ✓ Loaded {table}")
+        cur.execute(
+            'INSERT INTO "AspNetUserRoles" ("UserId", "RoleId") '
+            'SELECT u."Id", r."Id" FROM "AspNetUsers" u CROSS JOIN "AspNetRoles" r '
+            "WHERE r.\"Name\" = 'User' AND u.\"Email\" LIKE '%@kvizhub.test' ON CONFLICT DO NOTHING")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic QuizHub dataset')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--quizzes', type=int, help='default: users / 10')
+    parser.add_argument('--attempts', type=int, help='default: users * 5')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workers', type=int, help='generator processes (default: CPU count)')
+    parser.add_argument('--out', help='output directory (default: dataset-<users>)')
+    parser.add_argument('--dsn', help='load directly into PostgreSQL with COPY (requires psycopg)')
+    args = parser.parse_args()
+
+    size = DatasetSize(args.users, args.quizzes, args.attempts)
+    out_dir = args.out or f'dataset-{args.users}'
+    print(f"🏗️  Generating dataset into {out_dir}/ ({size.as_dict()})")
+    manifest, elapsed = generate(size, out_dir, args.seed, args.workers)
+    rows = sum(manifest['counts'].values())
+    for table, count in manifest['counts'].items():
+        print(f"  {table:<14} {count:>12,}")
+    print(f"  ✓ {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    if args.dsn:
+        try:
+            load_into_database(args.dsn, out_dir)
+        except ImportError:
+            print("❌ Error: psycopg is required for --dsn")
+            print("   Install with: pip install psycopg")
+            print(f"   Or: cd {out_dir} && psql \"$DSN\" -f load.sql")
+    else:
+        print(f"\n  Load with: cd {out_dir} && psql \"$DSN\" -f load.sql")
+    print(f"  Use with k6: DATASET_MANIFEST={os.path.join(out_dir, 'manifest.json')}")
+
+
+if __name__ == '__main__':
+    main()
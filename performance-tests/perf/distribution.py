@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latency Distributions from Mergeable Histograms
+Any percentile, per endpoint and merged across runs
+
+k6 writes only the summaryTrendStats of http_req_duration (avg, min, med,
+max, p95, p99), overall and with no per-endpoint percentiles. Percentiles of
+several runs cannot be combined from those numbers. Results files therefore
+carry `histograms`: perf.histogram.LogHistogram buckets for
+http_req_duration, overall and per `name` tag, and a `timeline` of requests
+and failures per window. perf.loadgen, perf.coordinator and perf.ingest
+write them with 1% relative error; test-scenarios.js counts requests into
+coarser buckets in handleSummary (~10%). Results files without the blocks
+(runs from before the export) get them from the raw stream's
+http_req_duration points (from_requests). From those this module gives:
+
+    QUANTILES     p50 .. p99.9 per run and per endpoint
+    merged        the same over several runs (bucket counts added): all
+                  scenarios of an architecture, repeated runs, or the
+                  files given on the command line
+    check         histogram p95 against k6's exact p95
+    timeline      requests/s and failures/s over the run
+
+Usage (from performance-tests/):
+    python -m perf.distribution                                  # every results-*.json
+    python -m perf.distribution run1.json run2.json --merge      # one merged distribution
+"""
+
+import argparse
+import glob
+import math
+import os
+
+from perf.histogram import GAMMA, MIN_VALUE, LogHistogram
+from perf.summary import RunSummary, load, parse_key
+
+RESULTS_PATTERN = 'results-*.json'
+QUANTILES = (0.5, 0.9, 0.95, 0.99, 0.999)
+METRIC = 'http_req_duration'
+
+
+def quantile_label(q):
+    return f'p{q * 100:g}'
+
+
+def merge(histograms):
+    """One LogHistogram with the samples of all `histograms`"""
+    merged = LogHistogram()
+    for h in histograms:
+        merged.merge(h)
+    return merged
+
+
+def _histogram(durations):
+    """LogHistogram of a numpy array of durations (buckets counted in one pass)"""
+    import numpy as np
+
+    h = LogHistogram()
+    positive = durations[durations > MIN_VALUE]
+    if len(positive):
+        indexes, counts = np.unique(np.ceil(np.log(positive) / math.log(GAMMA)).astype(np.int64),
+                                    return_counts=True)
+        h.buckets = dict(zip(indexes.tolist(), counts.tolist()))
+    h.zero = len(durations) - len(positive)
+    h.count = len(durations)
+    if h.count:
+        h.total, h.min, h.max = float(durations.sum()), float(durations.min()), float(durations.max())
+    return h
+
+
+def from_requests(requests):
+    """`histograms` and per-second `timeline` blocks for a perf.k6stream.RequestTable"""
+    import numpy as np
+
+    if not len(requests):
+        return {'histograms': {}, 'timeline': []}
+    histograms = {METRIC: _histogram(requests.duration).to_dict()}
+    for code, name in enumerate(requests.endpoint_labels):
+        durations = requests.duration[requests.endpoint == code]
+        if len(durations):
+            histograms[f'{METRIC}{{name:{name}}}'] = _histogram(durations).to_dict()
+    seconds = (requests.time - requests.start).astype(np.int64)
+    failed = (requests.status < 200) | (requests.status >= 400)
+    counts = np.bincount(seconds)
+    failures = np.bincount(seconds, weights=failed, minlength=len(counts)).astype(np.int64)
+    timeline = [{'second': second, 'requests': int(n), 'failed': int(failures[second])}
+                for second, n in enumerate(counts.tolist()) if n]
+    return {'histograms': histograms, 'timeline': timeline}
+
+
+def with_raw_blocks(run, requests):
+    """RunSummary with `histograms` / `timeline` from `requests` when the summary has none"""
+    run = RunSummary.of(run)
+    if run.data.get('histograms') or requests is None:
+        return run
+    return RunSummary({**run.data, **from_requests(requests)}, run.architecture, run.scenario)
+
+
+def run_histograms(run):
+    """(overall LogHistogram or None, {endpoint: LogHistogram}) from a summary's `histograms`"""
+    run = RunSummary.of(run)
+    endpoints = {}
+    for key in run.data.get('histograms', {}):
+        name, tags = parse_key(key)
+        if name == METRIC and list(tags) == ['name']:
+            endpoints[tags['name']] = run.histogram(METRIC, name=tags['name'])
+    return run.histogram(METRIC), endpoints
+
+
+def describe(h):
+    """{'count', 'avg', 'p50', ..., 'max'} of a histogram"""
+    row = {'count': h.count, 'avg': h.mean, 'max': h.max if h.count else 0.0}
+    for q in QUANTILES:
+        row[quantile_label(q)] = h.quantile(q)
+    return row
+
+
+def analyze(results, scenarios=None, raw_requests=None):
+    """{architecture: {'runs': {scenario: {...}}, 'merged': {...}}} for runs with histograms
+
+    Runs whose summary has no `histograms` (k6 runs) use their raw stream
+    from `raw_requests` ({(architecture, scenario): RequestTable}) instead.
+    """
+    analysis = {}
+    for architecture, runs in results.items():
+        entry = {'runs': {}}
+        for scenario in scenarios or sorted(runs):
+            if scenario not in runs:
+                continue
+            run = with_raw_blocks(runs[scenario], (raw_requests or {}).get((architecture, scenario)))
+            overall, endpoints = run_histograms(run)
+            if overall is None:
+                continue
+            k6_p95 = run.trend(METRIC).p95
+            entry['runs'][scenario] = {
+                'overall': overall, 'endpoints': endpoints, 'k6_p95': k6_p95,
+                'p95_error': abs(overall.quantile(0.95) - k6_p95) / k6_p95 if k6_p95 else None,
+                'timeline': run.timeline, 'window': run.config.get('timelineWindowSeconds', 1),
+            }
+        if not entry['runs']:
+            continue
+        measured = entry['runs'].values()
+        names = sorted({name for r in measured for name in r['endpoints']})
+        entry['merged'] = {
+            'overall': merge(r['overall'] for r in measured),
+            'endpoints': {name: merge(r['endpoints'][name] for r in measured if name in r['endpoints'])
+                          for name in names},
+        }
+        analysis[architecture] = entry
+    return analysis
+
+
+def plot_distribution(analysis, path, scenarios):
+    """Percentile curves per run (log latency over a 'nines' axis) and requests/s over time"""
+    import matplotlib.pyplot as plt
+
+    colors = {'monolith': '#3498db', 'microservices': '#e74c3c'}
+    styles = ['-', '--', ':', '-.']
+    qs = [1 - 10 ** -(x / 20) for x in range(6, 61)]  # p50 .. p99.9
+    fig, (left, right) = plt.subplots(1, 2, figsize=(16, 5.5))
+    for architecture, a in analysis.items():
+        color = colors.get(architecture)
+        for i, scenario in enumerate(s for s in scenarios if s in a['runs']):
+            r = a['runs'][scenario]
+            label = f"{architecture.title()} {scenario.replace('_', ' ')}"
+            left.plot([-math.log10(1 - q) for q in qs], [max(r['overall'].quantile(q), 1e-3) for q in qs],
+                      styles[i % len(styles)], color=color, label=label)
+            if r['timeline']:
+                window = r['window'] or 1
+                right.plot([t['second'] for t in r['timeline']], [t['requests'] / window for t in r['timeline']],
+                           styles[i % len(styles)], color=color, label=label)
+                failed = [(t['second'], t['failed'] / window) for t in r['timeline'] if t['failed']]
+                if failed:
+                    right.plot(*zip(*failed), 'x', color=color, markersize=4, alpha=0.7)
+
+    ticks = [0.5, 0.9, 0.99, 0.999]
+    left.set_xticks([-math.log10(1 - q) for q in ticks])
+    left.set_xticklabels([quantile_label(q) for q in ticks])
+    left.set_yscale('log')
+    left.set_xlabel('Percentile')
+    left.set_ylabel('Response time (ms, log)')
+    left.set_title('Latency Percentiles (log-bucket histograms)', fontweight='bold')
+    left.legend(fontsize=7)
+    left.grid(True, which='both', alpha=0.3)
+
+    right.set_xlabel('Seconds since start')
+    right.set_ylabel('Requests/second (x: failed/second)')
+    right.set_title('Throughput over the Run (timeline)', fontweight='bold')
+    right.legend(fontsize=7)
+    right.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def _cells(h):
+    row = describe(h)
+    return f"<td>{row['count']:,}</td>" + ''.join(f"<td>{row[quantile_label(q)]:.1f} ms</td>" for q in QUANTILES)
+
+
+def generate_html_section(analysis, scenarios):
+    """HTML report section for analyze(...)"""
+    header = ''.join(f'<th>{quantile_label(q)}</th>' for q in QUANTILES)
+    html = f"""
+        <h2>📐 Latency Distribution</h2>
+        <p>k6 exports only a few fixed percentiles per run. Results files carry mergeable latency histograms per endpoint
+        (1% relative error, ~10% for test-scenarios.js runs; from the raw stream when a file has none) and a request
+        timeline, so any percentile is available per endpoint and across runs. The merged rows add the bucket counts of all scenarios; they are not averaged
+        percentiles. "vs k6 p95" compares the histogram to k6's exact p95.</p>
+        <img src="graph-latency-distribution.png" alt="Latency Distribution">
+        <table>
+            <tr><th>Run</th><th>Endpoint</th><th>Requests</th>{header}<th>vs k6 p95</th></tr>
+"""
+    for architecture, a in analysis.items():
+        for scenario in scenarios:
+            r = a['runs'].get(scenario)
+            if r is None:
+                continue
+            run_label = f"{architecture.title()} - {scenario.replace('_', ' ').title()}"
+            check = f"{r['p95_error'] * 100:.1f}%" if r['p95_error'] is not None else '-'
+            html += f"""            <tr><td>{run_label}</td><td><strong>all</strong></td>{_cells(r['overall'])}<td>{check}</td></tr>
+"""
+            for name, h in sorted(r['endpoints'].items()):
+                html += f"""            <tr><td>{run_label}</td><td>{name}</td>{_cells(h)}<td>-</td></tr>
+"""
+        merged = a['merged']
+        html += f"""            <tr><td><strong>{architecture.title()} - all scenarios (merged)</strong></td><td><strong>all</strong></td>{_cells(merged['overall'])}<td>-</td></tr>
+"""
+        for name, h in sorted(merged['endpoints'].items()):
+            html += f"""            <tr><td><strong>{architecture.title()} - all scenarios (merged)</strong></td><td>{name}</td>{_cells(h)}<td>-</td></tr>
+"""
+    html += """        </table>
+"""
+    return html
+
+
+def _print_row(label, h):
+    row = describe(h)
+    print(f"  {label:<34} {row['count']:>9,} " + ' '.join(f"{row[quantile_label(q)]:>9.1f}" for q in QUANTILES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Percentiles from the histograms of results files, or of their raw streams')
+    parser.add_argument('paths', nargs='*', help=f'results files (default: {RESULTS_PATTERN})')
+    parser.add_argument('--merge', action='store_true', help='also print one distribution merged over all files')
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(RESULTS_PATTERN))
+    if not paths:
+        print(f"❌ No {RESULTS_PATTERN} files")
+        return
+
+    merged, merged_endpoints = [], {}
+    print(f"\n📐 {METRIC} percentiles (ms) from the results-file histograms (raw stream where a file has none)\n")
+    print(f"  {'Run / endpoint':<34} {'requests':>9} " + ' '.join(f"{quantile_label(q):>9}" for q in QUANTILES))
+    for path in paths:
+        run = load(path)
+        if not run.data.get('histograms'):
+            from perf import k6stream
+
+            raw = k6stream.raw_path(os.path.basename(path)[len('results-'):-len('.json')], os.path.dirname(path))
+            run = with_raw_blocks(run, k6stream.read_requests(raw) if raw else None)
+        overall, endpoints = run_histograms(run)
+        if overall is None:
+            print(f"  {path}: no histograms (written before the export) and no raw stream")
+            continue
+        _print_row(f'{run.architecture} {run.scenario}' if run.architecture else path, overall)
+        for name, h in sorted(endpoints.items()):
+            _print_row(f'  {name}', h)
+            merged_endpoints.setdefault(name, []).append(h)
+        merged.append(overall)
+    if args.merge and merged:
+        _print_row(f'merged ({len(merged)} runs)', merge(merged))
+        for name, hs in sorted(merged_endpoints.items()):
+            _print_row(f'  {name}', merge(hs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tail-Latency Exemplars
+The K slowest requests of a raw k6 stream, with everything needed to find them again
+
+A p99 says how slow the tail is, not which requests were in it. This module
+streams a raw k6 stream (or perf.archive file) once and keeps, in a min-heap
+of K entries each, the slowest requests:
+
+    overall       by http_req_duration
+    per endpoint  by http_req_duration, per `name` tag / normalized path
+    per phase     by http_req_blocked, _connecting, _tls_handshaking,
+                  _sending, _waiting and _receiving
+
+k6 writes one Point per http_req_* metric of a request, all with the same
+timestamp and tags; consecutive points are folded back into one request.
+Every exemplar carries its timestamp (UTC), tags, VU and iteration (the
+`vu` / `iter` system tags that test-scenarios.js enables), status, URL and
+phase breakdown. With a gateway access log, each is also matched to its
+nginx line (upstream, request_time, upstream_response_time), so an outlier
+can be followed into the backend logs. perf.loadgen streams only carry
+http_req_duration, so their exemplars have no phase breakdown.
+
+Usage (from performance-tests/):
+    python -m perf.exemplars raw-monolith-heavy_load.ndjson
+    python -m perf.exemplars raw-monolith-heavy_load.k6a -k 25 --endpoint browse_quizzes
+    python -m perf.exemplars raw-microservices-heavy_load.ndjson --access-log gateway-logs/access.log
+"""
+
+import argparse
+import heapq
+import json
+import re
+from datetime import datetime, timezone
+
+from perf.k6stream import endpoint_of, read_points
+
+DEFAULT_K = 10
+METRIC = 'http_req_duration'
+# k6 phase metric -> column label
+PHASES = {
+    'http_req_blocked': 'blocked',
+    'http_req_connecting': 'connecting',
+    'http_req_tls_handshaking': 'tls',
+    'http_req_sending': 'sending',
+    'http_req_waiting': 'waiting',
+    'http_req_receiving': 'receiving',
+}
+METRICS = (METRIC, *PHASES)
+# A gateway line matches an exemplar when it was logged within this many seconds of it
+GATEWAY_TOLERANCE_S = 1.0
+
+
+class TopK:
+    """The k largest values seen, with their items, in O(k) memory"""
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+        self.seen = 0
+
+    def admits(self, value):
+        return len(self.heap) < self.k or value > self.heap[0][0]
+
+    def push(self, value, item):
+        # seen breaks ties, so items themselves are never compared
+        self.seen += 1
+        entry = (value, self.seen, item)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif value > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def items(self):
+        """Items, largest value first"""
+        return [item for _, _, item in sorted(self.heap, reverse=True)]
+
+
+def exemplar(epoch, tags, values):
+    """One request as a plain dict: time, endpoint, context tags and phase breakdown (ms)"""
+    phases = {label: values[metric] for metric, label in PHASES.items() if metric in values}
+    return {
+        'time': epoch,
+        'timestamp': datetime.fromtimestamp(epoch, timezone.utc).isoformat(timespec='milliseconds'),
+        'endpoint': endpoint_of(tags),
+        'duration': values[METRIC],
+        'phases': phases,
+        'dominant': max(phases, key=phases.get) if phases else None,
+        'vu': tags.get('vu'),
+        'iter': tags.get('iter'),
+        'status': int(tags.get('status') or 0),
+        'method': tags.get('method', ''),
+        'url': tags.get('url', ''),
+        'error_code': int(tags.get('error_code') or 0),
+        'tags': dict(tags),
+    }
+
+
+class ExemplarCollector:
+    """Folds a stream of (metric, epoch, value, tags) points into the top-K requests"""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.requests = 0
+        self.overall = TopK(k)
+        self.endpoints = {}
+        self.phases = {metric: TopK(k) for metric in PHASES}
+        self._current = None
+
+    def add(self, metric, epoch, value, tags):
+        current = self._current
+        if current is None or current[0] != epoch or current[1] != tags:
+            self._finish_request()
+            current = self._current = (epoch, tags, {})
+        current[2][metric] = value
+
+    def _finish_request(self):
+        if self._current is None:
+            return
+        epoch, tags, values = self._current
+        self._current = None
+        duration = values.get(METRIC)
+        if duration is None:
+            return
+        self.requests += 1
+        endpoint = endpoint_of(tags)
+        by_endpoint = self.endpoints.get(endpoint)
+        if by_endpoint is None:
+            by_endpoint = self.endpoints[endpoint] = TopK(self.k)
+        candidates = [(self.overall, duration), (by_endpoint, duration)]
+        candidates += [(self.phases[m], values[m]) for m in PHASES if values.get(m, 0) > 0]
+        admitted = [(top, value) for top, value in candidates if top.admits(value)]
+        if not admitted:
+            return  # the common case: the request is faster than every current top K
+        item = exemplar(epoch, tags, values)
+        for top, value in admitted:
+            top.push(value, item)
+
+    def result(self):
+        """{'k', 'requests', 'overall': [...], 'endpoints': {name: [...]}, 'phases': {label: [...]}}"""
+        self._finish_request()
+        return {
+            'k': self.k,
+            'requests': self.requests,
+            'overall': self.overall.items(),
+            'endpoints': {name: top.items() for name, top in sorted(self.endpoints.items())},
+            'phases': {PHASES[m]: top.items() for m, top in self.phases.items() if top.heap},
+        }
+
+
+def collect(path, k=DEFAULT_K):
+    """Top-K exemplars of a raw stream or perf.archive file, in one pass"""
+    collector = ExemplarCollector(k)
+    for metric, epoch, value, tags in read_points(path, metrics=METRICS):
+        collector.add(metric, epoch, value, tags)
+    return collector.result()
+
+
+def unique(result):
+    """Every exemplar of a result once (the same request can be in several top-K lists)"""
+    seen = {}
+    for items in [result['overall'], *result['endpoints'].values(), *result['phases'].values()]:
+        for item in items:
+            seen.setdefault(id(item), item)
+    return list(seen.values())
+
+
+def attach_gateway(result, log, tolerance_s=GATEWAY_TOLERANCE_S):
+    """Match exemplars to gateway access-log lines (perf.gateway.GatewayLog); returns the match count
+
+    k6 and nginx both time-stamp a request when it completes. Among the
+    lines for the same endpoint within `tolerance_s`, the one whose
+    request_time is closest to the exemplar's duration wins.
+    """
+    import numpy as np
+
+    from perf.gateway import normalize_endpoint
+
+    codes = {label: code for code, label in enumerate(log.endpoint_labels)}
+    matched = 0
+    for item in unique(result):
+        path = re.sub(r'^[a-z]+://[^/]+', '', item['url']).split('?')[0]
+        code = codes.get(normalize_endpoint(path))
+        if code is None:
+            continue
+        rows = np.flatnonzero((log.endpoint == code) & (np.abs(log.timestamp - item['time']) <= tolerance_s))
+        if not len(rows):
+            continue
+        row = rows[np.argmin(np.abs(log.request_time[rows] - item['duration']))]
+        item['gateway'] = {
+            'upstream': log.upstream_labels[log.upstream[row]],
+            'status': int(log.status[row]),
+            'timestamp': float(log.timestamp[row]),
+            'request_time': float(log.request_time[row]),
+            'upstream_time': float(log.upstream_time[row]),
+        }
+        matched += 1
+    return matched
+
+
+def _context(item):
+    vu = item['vu'] if item['vu'] is not None else '-'
+    iteration = item['iter'] if item['iter'] is not None else '-'
+    return f"VU {vu} / iter {iteration}"
+
+
+def _phase_cells(item):
+    return ''.join(f"<td>{item['phases'][label]:.1f}</td>" if label in item['phases'] else '<td>-</td>'
+                   for label in ('blocked', 'connecting', 'waiting', 'receiving'))
+
+
+def _gateway_cell(item):
+    g = item.get('gateway')
+    if not g:
+        return '<td>-</td>'
+    return f"<td>{g['upstream']} ({g['upstream_time']:.1f} of {g['request_time']:.1f} ms)</td>"
+
+
+def generate_html_section(exemplars, per_endpoint=3):
+    """HTML section for {(architecture, scenario): collect(...)}"""
+    has_gateway = any('gateway' in item for result in exemplars.values() for item in unique(result))
+    gateway_header = '<th>Gateway upstream</th>' if has_gateway else ''
+    html = f"""
+        <h2>🔎 Tail-Latency Exemplars</h2>
+        <p>The slowest requests of every raw stream, kept in a bounded top-K heap while streaming. Timestamps are
+        UTC completion times, as in k6 and the nginx access log, so each request can be looked up in the backend
+        logs by time, URL and VU / iteration. Phase times are in ms; "-" means the stream has no phase points
+        (perf.loadgen).</p>
+"""
+    header = (f"<tr><th>Time (UTC)</th><th>Endpoint</th><th>Status</th><th>VU / iteration</th><th>Duration</th>"
+              f"<th>Blocked</th><th>Connecting</th><th>Waiting</th><th>Receiving</th><th>URL</th>{gateway_header}</tr>")
+
+    def rows(items, label=None):
+        out = ''
+        for item in items:
+            first = f"<td>{label}</td>" if label is not None else ''
+            status = item['status'] or f"error {item['error_code']}"
+            out += (f"            <tr>{first}<td>{item['timestamp']}</td><td>{item['endpoint']}</td><td>{status}</td>"
+                    f"<td>{_context(item)}</td><td><strong>{item['duration']:.1f} ms</strong></td>{_phase_cells(item)}"
+                    f"<td>{item['method']} {item['url']}</td>{_gateway_cell(item) if has_gateway else ''}</tr>\n")
+        return out
+
+    for (architecture, scenario), result in sorted(exemplars.items()):
+        run_label = f"{architecture.title()} - {scenario.replace('_', ' ').title()}"
+        html += f"""        <h3>{run_label}: {len(result['overall'])} slowest of {result['requests']:,} requests</h3>
+        <table>
+            {header}
+{rows(result['overall'])}        </table>
+"""
+        html += f"""        <table>
+            <tr><th>Slowest per endpoint</th>{header[4:]}
+"""
+        for name, items in result['endpoints'].items():
+            html += rows(items[:per_endpoint], name)
+        html += """        </table>
+"""
+        if result['phases']:
+            html += f"""        <table>
+            <tr><th>Slowest by phase</th>{header[4:]}
+"""
+            for label, items in result['phases'].items():
+                html += rows(items[:1], f"{label} ({items[0]['phases'][label]:.1f} ms)")
+            html += """        </table>
+"""
+    return html
+
+
+def print_exemplars(result, endpoint=None):
+    items = result['endpoints'].get(endpoint, []) if endpoint else result['overall']
+    title = f"endpoint {endpoint}" if endpoint else 'overall'
+    print(f"\n🔎 {len(items)} slowest requests ({title}) of {result['requests']:,}\n")
+    print(f"  {'time (UTC)':<29} {'ms':>9} {'status':>6} {'vu/iter':>11}  {'endpoint':<20} {'phase':<10} url")
+    for item in items:
+        dominant = item['dominant'] or '-'
+        context = f"{item['vu'] or '-'}/{item['iter'] or '-'}"
+        print(f"  {item['timestamp']:<29} {item['duration']:>9.1f} {item['status']:>6} {context:>11}  "
+              f"{item['endpoint']:<20} {dominant:<10} {item['method']} {item['url']}")
+        if 'gateway' in item:
+            g = item['gateway']
+            print(f"  {'':<29} {'':>9} gateway: {g['upstream']} status {g['status']}, "
+                  f"request_time {g['request_time']:.1f} ms, upstream {g['upstream_time']:.1f} ms")
+    if not endpoint and result['phases']:
+        print("\n  Slowest by phase:")
+        for label, items in result['phases'].items():
+            top = items[0]
+            print(f"  {label:<11} {top['phases'][label]:>9.1f} ms  {top['timestamp']}  {top['endpoint']}  "
+                  f"VU {top['vu'] or '-'} / iter {top['iter'] or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='K slowest requests of a raw k6 stream, with context')
+    parser.add_argument('path', help='raw-*.ndjson[.gz] stream or raw-*.k6a archive')
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help=f'requests to keep per list (default {DEFAULT_K})')
+    parser.add_argument('--endpoint', help='print the slowest requests of one endpoint')
+    parser.add_argument('--access-log', help='nginx gateway access log to match the exemplars against')
+    parser.add_argument('--json', metavar='FILE', help='also write every list as JSON')
+    args = parser.parse_args()
+
+    result = collect(args.path, args.k)
+    if args.access_log:
+        from perf import gateway
+
+        matched = attach_gateway(result, gateway.parse_access_log(args.access_log))
+        print(f"  ✓ Matched {matched} of {len(unique(result))} exemplars to gateway log lines")
+    print_exemplars(result, args.endpoint)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n  ✓ Saved: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
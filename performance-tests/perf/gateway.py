@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nginx Gateway Access-Log Analyzer
+Parses the microservices gateway access.log and attributes latency per upstream
+
+The gateway must log in the "perf" format declared in
+aws-deployment/microservices/nginx-simulation.conf, which appends
+`ts=$msec rt=$request_time urt=$upstream_response_time ups=$proxy_host`
+to the combined format. Multi-GB logs are split into line-aligned byte
+ranges that are parsed in parallel worker processes; every range comes back
+as numpy columns so aggregation is vectorized.
+
+Usage (from performance-tests/):
+    python -m perf.gateway gateway-logs/access.log
+"""
+
+import os
+import re
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+# One match per request line; the trailing fields come from `log_format perf`
+LINE_RE = re.compile(
+    rb'"[A-Z]+ ([^ "?]+)[^"]*" (\d{3}) [^\n]*?'
+    rb' ts=([\d.]+) rt=([\d.]+) urt=([^\n]*?) ups=([^ \n]+)'
+)
+
+# Fallback attribution when $proxy_host is empty (limit_req rejections,
+# OPTIONS short-circuits), mirroring the location blocks of
+# nginx-simulation.conf and nginx's selection: the regex locations are
+# tried in file order and the first match wins; only when none matches does
+# the longest matching prefix location apply. The quiz_service regex is
+# first, so /api/quiz/leaderboard and /api/quiz/attempts go to quiz_service
+# although execution_service has locations for them.
+REGEX_LOCATIONS = [
+    (re.compile(r'^/api/quiz/(?!.*/(submit|take|attempts))'), 'quiz_service'),
+    (re.compile(r'^/api/quiz/.*/take'), 'execution_service'),
+    (re.compile(r'^/api/quiz/.*/submit'), 'execution_service'),
+    (re.compile(r'^/api/quiz/attempts'), 'execution_service'),
+]
+PREFIX_LOCATIONS = [
+    ('/health', 'gateway'),
+    ('/api/auth', 'auth_service'),
+    ('/api/quiz/leaderboard', 'execution_service'),
+    ('/api/', 'quiz_service'),
+]
+
+ID_SEGMENT_RE = re.compile(r'/([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+)(?=/|$)')
+
+CHUNK_BYTES = 64 * 1024 * 1024
+PERCENTILES = [50, 90, 95, 99]
+# Log-spaced histogram edges in ms (0.1 ms .. 60 s)
+HISTOGRAM_EDGES = np.logspace(-1, np.log10(60000), 48)
+
+
+def normalize_endpoint(path):
+    """Collapse IDs in a request path so requests group by endpoint"""
+    return ID_SEGMENT_RE.sub('/{id}', path)
+
+
+def route_upstream(path):
+    """Return the upstream nginx would pick for a path ('gateway' when nginx answers itself)"""
+    for pattern, upstream in REGEX_LOCATIONS:
+        if pattern.search(path):
+            return upstream
+    prefixes = [(len(prefix), upstream) for prefix, upstream in PREFIX_LOCATIONS if path.startswith(prefix)]
+    return max(prefixes)[1] if prefixes else 'gateway'
+
+
+def _to_seconds(values):
+    """Convert raw time fields to floats, summing retried upstream attempts"""
+    try:
+        return np.array(values, dtype='S16').astype(np.float64)
+    except ValueError:
+        out = np.full(len(values), np.nan)
+        for i, raw in enumerate(values):
+            parts = [p for p in re.split(rb'[ ,:]+', raw) if p and p != b'-']
+            if parts:
+                out[i] = sum(float(p) for p in parts)
+        return out
+
+
+def _line_aligned_ranges(path, chunk_bytes):
+    """Split a file into byte ranges that start and end on line boundaries"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        offset = chunk_bytes
+        while offset < size:
+            f.seek(offset)
+            f.readline()
+            if f.tell() >= size:
+                break
+            if f.tell() > bounds[-1]:
+                bounds.append(f.tell())
+            offset = bounds[-1] + chunk_bytes
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_range(args):
+    """Parse one byte range into columns with range-local label tables"""
+    path, start, end = args
+    with open(path, 'rb') as f:
+        f.seek(start)
+        block = f.read(end - start)
+
+    rows = LINE_RE.findall(block)
+    lines = block.count(b'\n')
+    if not rows:
+        return {'lines': lines, 'rows': 0}
+
+    paths, statuses, ts, rt, urt, ups = zip(*rows)
+
+    endpoint_labels = {}
+    upstream_labels = {}
+    path_cache = {}
+    endpoint_codes = np.empty(len(rows), dtype=np.int32)
+    upstream_codes = np.empty(len(rows), dtype=np.int32)
+    for i, (raw_path, raw_ups) in enumerate(zip(paths, ups)):
+        cached = path_cache.get(raw_path)
+        if cached is None:
+            text = raw_path.decode('utf-8', 'replace')
+            cached = (normalize_endpoint(text), route_upstream(text))
+            path_cache[raw_path] = cached
+        endpoint, routed = cached
+        upstream = routed if raw_ups == b'-' else raw_ups.decode('ascii', 'replace')
+        endpoint_codes[i] = endpoint_labels.setdefault(endpoint, len(endpoint_labels))
+        upstream_codes[i] = upstream_labels.setdefault(upstream, len(upstream_labels))
+
+    return {
+        'lines': lines,
+        'rows': len(rows),
+        'endpoint_labels': list(endpoint_labels),
+        'upstream_labels': list(upstream_labels),
+        'endpoint': endpoint_codes,
+        'upstream': upstream_codes,
+        'status': np.array(statuses, dtype='S3').astype(np.int16),
+        'timestamp': np.array(ts, dtype='S20').astype(np.float64),
+        'request_time': _to_seconds(rt) * 1000,
+        'upstream_time': _to_seconds(urt) * 1000,
+    }
+
+
+class GatewayLog:
+    """Columnar view of a parsed gateway access log (times in ms)"""
+
+    def __init__(self, endpoint_labels, upstream_labels, endpoint, upstream,
+                 status, timestamp, request_time, upstream_time, skipped=0):
+        self.endpoint_labels = endpoint_labels
+        self.upstream_labels = upstream_labels
+        self.endpoint = endpoint
+        self.upstream = upstream
+        self.status = status
+        self.timestamp = timestamp
+        self.request_time = request_time
+        self.upstream_time = upstream_time
+        self.skipped = skipped
+
+    def __len__(self):
+        return len(self.status)
+
+    @property
+    def overhead(self):
+        """Time nginx itself added: request_time minus upstream_response_time"""
+        return np.clip(self.request_time - self.upstream_time, 0, None)
+
+    @staticmethod
+    def _distribution(values):
+        """Percentiles and histogram of the finite values"""
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return None
+        stats = dict(zip((f'p{p}' for p in PERCENTILES), np.percentile(values, PERCENTILES)))
+        stats['avg'] = float(values.mean())
+        stats['max'] = float(values.max())
+        stats['histogram'] = np.histogram(values, bins=HISTOGRAM_EDGES)[0].tolist()
+        return stats
+
+    def _group_stats(self, mask):
+        """Latency and status breakdown for the rows selected by mask"""
+        status = self.status[mask]
+        return {
+            'requests': int(mask.sum()),
+            'errors_5xx': int((status >= 500).sum()),
+            'errors_4xx': int(((status >= 400) & (status < 500)).sum()),
+            'request_time': self._distribution(self.request_time[mask]),
+            'upstream_time': self._distribution(self.upstream_time[mask]),
+            'overhead': self._distribution(self.overhead[mask]),
+        }
+
+    def upstream_stats(self):
+        """Per-upstream latency distributions and gateway overhead"""
+        return {
+            label: self._group_stats(self.upstream == code)
+            for code, label in enumerate(self.upstream_labels)
+            if (self.upstream == code).any()
+        }
+
+    def endpoint_stats(self):
+        """Per-endpoint stats, keyed by (upstream, endpoint)"""
+        stats = {}
+        keys = self.upstream.astype(np.int64) * len(self.endpoint_labels) + self.endpoint
+        for key in np.unique(keys):
+            upstream, endpoint = divmod(int(key), len(self.endpoint_labels))
+            stats[(self.upstream_labels[upstream], self.endpoint_labels[endpoint])] = \
+                self._group_stats(keys == key)
+        return stats
+
+
+def parse_access_log(path, workers=None, chunk_bytes=CHUNK_BYTES):
+    """Parse an access log in parallel line-aligned chunks into a GatewayLog"""
+    ranges = [(path, start, end) for start, end in _line_aligned_ranges(path, chunk_bytes)]
+    workers = workers or os.cpu_count() or 1
+
+    if len(ranges) > 1 and workers > 1:
+        with Pool(min(workers, len(ranges))) as pool:
+            parts = pool.map(_parse_range, ranges)
+    else:
+        parts = [_parse_range(r) for r in ranges]
+
+    endpoint_labels, upstream_labels = {}, {}
+    columns = {k: [] for k in ('endpoint', 'upstream', 'status', 'timestamp',
+                               'request_time', 'upstream_time')}
+    skipped = 0
+    for part in parts:
+        skipped += part['lines'] - part['rows']
+        if not part['rows']:
+            continue
+        # Remap range-local label codes onto the global tables
+        endpoint_map = np.array([endpoint_labels.setdefault(l, len(endpoint_labels))
+                                 for l in part['endpoint_labels']], dtype=np.int32)
+        upstream_map = np.array([upstream_labels.setdefault(l, len(upstream_labels))
+                                 for l in part['upstream_labels']], dtype=np.int32)
+        columns['endpoint'].append(endpoint_map[part['endpoint']])
+        columns['upstream'].append(upstream_map[part['upstream']])
+        for key in ('status', 'timestamp', 'request_time', 'upstream_time'):
+            columns[key].append(part[key])
+
+    empty = {'status': np.int16}
+    merged = {k: np.concatenate(v) if v else np.array([], dtype=empty.get(k, np.float64))
+              for k, v in columns.items()}
+    return GatewayLog(list(endpoint_labels), list(upstream_labels), skipped=skipped, **merged)
+
+
+def _fmt(dist, key):
+    return f"{dist[key]:.1f}" if dist else '-'
+
+
+def generate_html_section(log):
+    """HTML report section with per-upstream latency and gateway overhead"""
+    html = """
+        <h2>🔀 Gateway Upstream Attribution</h2>
+        <p>Parsed """ + f"{len(log):,}" + """ requests from the nginx access log
+        (""" + f"{log.skipped:,}" + """ lines without perf timing fields skipped).
+        Overhead is request_time minus upstream_response_time, i.e. the time spent in the gateway itself.</p>
+        <table>
+            <tr>
+                <th>Upstream</th>
+                <th>Requests</th>
+                <th>5xx</th>
+                <th>Upstream p50</th>
+                <th>Upstream p95</th>
+                <th>Upstream p99</th>
+                <th>Total p95</th>
+                <th>Overhead p50</th>
+                <th>Overhead p95</th>
+            </tr>
+"""
+    for upstream, s in sorted(log.upstream_stats().items()):
+        html += f"""
+            <tr>
+                <td>{upstream}</td>
+                <td>{s['requests']}</td>
+                <td>{s['errors_5xx']}</td>
+                <td>{_fmt(s['upstream_time'], 'p50')} ms</td>
+                <td>{_fmt(s['upstream_time'], 'p95')} ms</td>
+                <td>{_fmt(s['upstream_time'], 'p99')} ms</td>
+                <td>{_fmt(s['request_time'], 'p95')} ms</td>
+                <td>{_fmt(s['overhead'], 'p50')} ms</td>
+                <td>{_fmt(s['overhead'], 'p95')} ms</td>
+            </tr>
+"""
+    html += """
+        </table>
+        <h3>Per Endpoint</h3>
+        <table>
+            <tr>
+                <th>Upstream</th>
+                <th>Endpoint</th>
+                <th>Requests</th>
+                <th>Upstream p95</th>
+                <th>Overhead p95</th>
+            </tr>
+"""
+    for (upstream, endpoint), s in sorted(log.endpoint_stats().items()):
+        html += f"""
+            <tr>
+                <td>{upstream}</td>
+                <td>{endpoint}</td>
+                <td>{s['requests']}</td>
+                <td>{_fmt(s['upstream_time'], 'p95')} ms</td>
+                <td>{_fmt(s['overhead'], 'p95')} ms</td>
+            </tr>
+"""
+    html += """
+        </table>
+"""
+    return html
+
+
+def print_summary(log):
+    """Print per-upstream stats to the terminal"""
+    print("\n" + "=" * 80)
+    print(" GATEWAY UPSTREAM ATTRIBUTION")
+    print("=" * 80)
+    print(f"\n  Requests parsed: {len(log):,}   Skipped lines: {log.skipped:,}\n")
+    print(f"  {'Upstream':<20} {'Requests':>9} {'5xx':>6} {'Up p50':>9} {'Up p95':>9} "
+          f"{'Up p99':>9} {'OH p50':>8} {'OH p95':>8}")
+    for upstream, s in sorted(log.upstream_stats().items()):
+        print(f"  {upstream:<20} {s['requests']:>9} {s['errors_5xx']:>6} "
+              f"{_fmt(s['upstream_time'], 'p50'):>9} {_fmt(s['upstream_time'], 'p95'):>9} "
+              f"{_fmt(s['upstream_time'], 'p99'):>9} {_fmt(s['overhead'], 'p50'):>8} "
+              f"{_fmt(s['overhead'], 'p95'):>8}")
+    print("\n  (all times in ms)")
+    print("=" * 80 + "\n")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python -m perf.gateway <access.log> [workers]")
+        sys.exit(1)
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    print_summary(parse_access_log(sys.argv[1], workers=workers))
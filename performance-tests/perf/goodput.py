@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Goodput and Error Taxonomy
+Separates useful work from rejected, failed and health-check requests
+
+`http_reqs.rate` counts every request, including /health probes (404 on
+the microservices gateway) and requests nginx rejected with limit_req
+(503 by default, 429 when `limit_req_status 429` is set). Goodput only
+counts successful, non-health requests per second.
+
+Summary-level functions work on the handleSummary JSON and need no
+third-party packages; the per-endpoint / per-window taxonomy needs the raw
+k6 stream (see perf.k6stream) and numpy.
+"""
+
+# Taxonomy classes, in display order
+CATEGORIES = [
+    'ok',
+    'health',
+    'rate_limited_429',
+    'unavailable_503',
+    'not_found_404',
+    'server_error_5xx',
+    'client_error_4xx',
+    'timeout',
+    'network_error',
+]
+
+CATEGORY_LABELS = {
+    'ok': 'OK',
+    'health': 'Health',
+    'rate_limited_429': '429',
+    'unavailable_503': '503',
+    'not_found_404': '404',
+    'server_error_5xx': 'Other 5xx',
+    'client_error_4xx': 'Other 4xx',
+    'timeout': 'Timeout',
+    'network_error': 'Network',
+}
+
+HEALTH_ENDPOINTS = {'health_check', '/health'}
+
+# k6 error_code for "request timeout"
+K6_TIMEOUT_ERROR = 1050
+
+DEFAULT_WINDOW_SECONDS = 10
+
+
+def summary_goodput(data):
+    """Goodput (useful requests/second) from a handleSummary result file
+
+    Uses the `useful_requests` counter when the scenario script records it.
+    Older results fall back to successful_requests minus the successful health
+    checks: test-scenarios.js does one per iteration, and failed_requests are
+    attributed to the health check first (the gateway answers /health 404).
+    """
+    metrics = data.get('metrics', {})
+    duration_ms = data.get('state', {}).get('testRunDurationMs')
+
+    useful = metrics.get('useful_requests', {}).get('values')
+    if useful is not None:
+        if duration_ms:
+            return useful.get('count', 0) / (duration_ms / 1000)
+        return useful.get('rate', 0)
+
+    successful = metrics.get('successful_requests', {}).get('values', {})
+    failed = metrics.get('failed_requests', {}).get('values', {}).get('count', 0)
+    health_checks = metrics.get('iterations', {}).get('values', {}).get('count', 0)
+    count = max(successful.get('count', 0) - max(health_checks - failed, 0), 0)
+    if duration_ms:
+        return count / (duration_ms / 1000)
+    rate = metrics.get('http_reqs', {}).get('values', {})
+    return count / rate['count'] * rate['rate'] if rate.get('count') else 0
+
+
+def classify(requests):
+    """Taxonomy category index (into CATEGORIES) for every request in a RequestTable"""
+    import numpy as np
+
+    status = requests.status
+    health_codes = [i for i, label in enumerate(requests.endpoint_labels) if label in HEALTH_ENDPOINTS]
+    is_health = np.isin(requests.endpoint, health_codes)
+
+    conditions = [
+        is_health,
+        status == 429,
+        status == 503,
+        status == 404,
+        status >= 500,
+        status >= 400,
+        (status == 0) & (requests.error_code == K6_TIMEOUT_ERROR),
+        status == 0,
+    ]
+    choices = [CATEGORIES.index(c) for c in CATEGORIES[1:]]
+    return np.select(conditions, choices, default=CATEGORIES.index('ok'))
+
+
+def _counts(categories):
+    import numpy as np
+
+    counts = np.bincount(categories, minlength=len(CATEGORIES))
+    return dict(zip(CATEGORIES, counts.tolist()))
+
+
+def taxonomy(requests, window=DEFAULT_WINDOW_SECONDS):
+    """Error taxonomy and goodput per endpoint and per time window"""
+    import numpy as np
+
+    categories = classify(requests)
+    seconds = requests.duration_seconds
+
+    overall = _counts(categories)
+    result = {
+        'duration_seconds': seconds,
+        'throughput': len(requests) / seconds,
+        'goodput': overall['ok'] / seconds,
+        'overall': overall,
+        'endpoints': {},
+        'windows': [],
+    }
+
+    for code, label in enumerate(requests.endpoint_labels):
+        mask = requests.endpoint == code
+        if mask.any():
+            counts = _counts(categories[mask])
+            counts['total'] = int(mask.sum())
+            counts['goodput'] = counts['ok'] / seconds
+            result['endpoints'][label] = counts
+
+    offsets = requests.time - requests.start
+    window_index = (offsets // window).astype(np.int64)
+    n_windows = int(window_index.max()) + 1 if len(requests) else 0
+    # One 2D bincount instead of a Python loop over windows
+    grid = np.bincount(window_index * len(CATEGORIES) + categories,
+                       minlength=n_windows * len(CATEGORIES)).reshape(n_windows, len(CATEGORIES))
+    for w in range(n_windows):
+        span = min(window, seconds - w * window) if w == n_windows - 1 else window
+        counts = dict(zip(CATEGORIES, grid[w].tolist()))
+        counts['start'] = w * window
+        counts['total'] = int(grid[w].sum())
+        counts['throughput'] = counts['total'] / max(span, 1e-9)
+        counts['goodput'] = counts['ok'] / max(span, 1e-9)
+        result['windows'].append(counts)
+
+    return result
+
+
+def generate_html_section(taxonomies):
+    """HTML report section for {(architecture, scenario): taxonomy(...)}"""
+    headers = ''.join(f'<th>{CATEGORY_LABELS[c]}</th>' for c in CATEGORIES)
+    html = """
+        <h2>🎯 Goodput and Error Taxonomy</h2>
+        <p>Goodput counts only successful, non-rate-limited, non-health requests per second.</p>
+"""
+    for (architecture, scenario), tax in sorted(taxonomies.items()):
+        html += f"""
+        <h3>{architecture.title()} - {scenario.replace('_', ' ').title()}</h3>
+        <p><strong>Throughput:</strong> {tax['throughput']:.2f} req/s &nbsp;
+           <strong>Goodput:</strong> {tax['goodput']:.2f} req/s</p>
+        <table>
+            <tr><th>Endpoint</th><th>Total</th><th>Goodput</th>{headers}</tr>
+"""
+        for endpoint, counts in sorted(tax['endpoints'].items()):
+            cells = ''.join(f'<td>{counts[c]}</td>' for c in CATEGORIES)
+            html += f"""            <tr><td>{endpoint}</td><td>{counts['total']}</td><td>{counts['goodput']:.2f}/s</td>{cells}</tr>
+"""
+        html += f"""        </table>
+        <table>
+            <tr><th>Window (s)</th><th>Throughput</th><th>Goodput</th>{headers}</tr>
+"""
+        for counts in tax['windows']:
+            cells = ''.join(f'<td>{counts[c]}</td>' for c in CATEGORIES)
+            html += f"""            <tr><td>{counts['start']:.0f}</td><td>{counts['throughput']:.2f}/s</td><td>{counts['goodput']:.2f}/s</td>{cells}</tr>
+"""
+        html += """        </table>
+"""
+    return html
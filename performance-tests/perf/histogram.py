@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mergeable Latency Histogram
+Log-bucketed histogram with bounded relative error
+
+Percentiles cannot be averaged: the p95 of two load generators is not the
+mean of their p95s. LogHistogram keeps counts in logarithmic buckets
+(bucket i covers (GAMMA**(i-1), GAMMA**i]), so any quantile is within
+RELATIVE_ERROR of the true value, histograms from different processes
+merge by adding counts, and memory grows with the value range (~700
+buckets for 0.01 ms to 1 hour), not the sample count. Count, sum, min and
+max are exact.
+
+Values at or below MIN_VALUE (zero included) are counted apart from the
+buckets, since bucket 0 is the ordinary bucket (1/GAMMA, 1] ms. The compact
+form for the wire and for files is
+    {"n": count, "s": sum, "min": ..., "max": ..., "z": zero count, "b": [[index, count], ...]}
+("z" is omitted when there are none).
+"""
+
+import math
+
+RELATIVE_ERROR = 0.01
+GAMMA = (1 + RELATIVE_ERROR) / (1 - RELATIVE_ERROR)
+_LOG_GAMMA = math.log(GAMMA)
+# Values at or below this are counted as zero, outside the log buckets
+MIN_VALUE = 1e-3
+
+TREND_STATS = ('avg', 'min', 'med', 'max', 'p(90)', 'p(95)', 'p(99)')
+
+
+class LogHistogram:
+    """Bucketed samples of a non-negative metric"""
+
+    __slots__ = ('buckets', 'zero', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.buckets = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value, n=1):
+        if value > MIN_VALUE:
+            index = math.ceil(math.log(value) / _LOG_GAMMA)
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        else:
+            self.zero += n
+        self.count += n
+        self.total += value * n
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add another histogram's samples into this one; returns self"""
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """Value at quantile q (0-1), clamped to the exact min / max"""
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if seen > rank:
+            return min(max(0.0, self.min), self.max)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms
+                value = 2 * GAMMA ** index / (GAMMA + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def values(self):
+        """k6 trend `values` block"""
+        if not self.count:
+            return {stat: 0.0 for stat in TREND_STATS}
+        values = {'avg': self.mean, 'min': self.min, 'med': self.quantile(0.5), 'max': self.max}
+        for stat in TREND_STATS[4:]:
+            values[stat] = self.quantile(float(stat[2:-1]) / 100)
+        return values
+
+    def to_dict(self):
+        data = {'n': self.count, 's': self.total, 'min': self.min if self.count else 0.0,
+                'max': self.max if self.count else 0.0, 'b': sorted(self.buckets.items())}
+        if self.zero:
+            data['z'] = self.zero
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        h = cls()
+        h.buckets = {int(i): n for i, n in data['b']}
+        h.zero = data.get('z', 0)
+        h.count = data['n']
+        h.total = data['s']
+        if h.count:
+            h.min, h.max = data['min'], data['max']
+        return h
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Raw Stream Ingest
+Rebuilds a handleSummary-style results file from a raw k6 / perf.loadgen stream
+
+handleSummary only runs when k6 exits cleanly. When a run is killed (CI
+timeout, OOM, Ctrl+C twice) the raw `--out json` stream is all that is
+left. This module folds every Point of the stream into the summary shape
+the analysis expects:
+
+    trend     perf.histogram LogHistogram -> avg / min / med / max / p(90/95/99)
+    counter   sum and sum / run duration
+    rate      share of non-zero samples, passes / fails
+    gauge     last value, min, max
+
+Metric types come from the stream's "Metric" lines, else the k6 built-in
+types; other undeclared metrics are trends. Like perf.loadgen, every
+http_req_* trend gets `{name:...}` submetrics and http_req_duration an
+`{expected_response:true}` one. http_reqs and
+http_req_failed are derived from the request points when the stream has no
+points of its own. The summary also carries the mergeable `histograms` and
+the per-second `timeline` (perf.summary), built from the http_req_duration
+points. Memory is bounded by the histogram buckets and seconds, not the
+request count.
+
+Usage (from performance-tests/):
+    python -m perf.ingest raw-monolith-heavy_load.ndjson [--output results-monolith-heavy_load.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from perf.histogram import LogHistogram
+from perf.k6stream import open_stream, parse_time, run_name
+from perf.summary import split_name
+from perf.watch import request_failed
+
+REQUEST_METRIC = 'http_req_duration'
+# Histogram / timeline metrics of test-scenarios.js streams: rebuilt from the request points instead
+EXPORT_PREFIXES = ('hist_', 'timeline_')
+# k6 built-ins, for streams whose "Metric" lines are missing
+BUILTIN_TYPES = {
+    'http_reqs': ('counter', None),
+    'iterations': ('counter', None),
+    'data_received': ('counter', 'data'),
+    'data_sent': ('counter', 'data'),
+    'dropped_iterations': ('counter', None),
+    'http_req_failed': ('rate', None),
+    'checks': ('rate', None),
+    'vus': ('gauge', None),
+    'vus_max': ('gauge', None),
+}
+
+
+class _Aggregate:
+    __slots__ = ('type', 'contains', 'histogram', 'total', 'nonzero', 'count', 'last', 'min', 'max')
+
+    def __init__(self, metric_type='trend', contains=None):
+        self.type = metric_type
+        self.contains = contains
+        self.histogram = LogHistogram() if metric_type == 'trend' else None
+        self.total = 0.0
+        self.nonzero = 0
+        self.count = 0
+        self.last = None
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        if self.histogram is not None:
+            self.histogram.add(max(value, 0.0))
+            return
+        self.total += value
+        self.nonzero += value != 0
+        self.last = value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def values(self, seconds):
+        if self.type == 'trend':
+            return self.histogram.values()
+        if self.type == 'counter':
+            total = int(self.total) if float(self.total).is_integer() else self.total
+            return {'count': total, 'rate': self.total / seconds}
+        if self.type == 'rate':
+            return {'rate': self.nonzero / self.count if self.count else 0.0,
+                    'passes': self.nonzero, 'fails': self.count - self.nonzero}
+        return {'value': self.last or 0, 'min': self.min or 0, 'max': self.max or 0}
+
+
+class StreamSummary:
+    """Folds raw stream lines into per-metric aggregates"""
+
+    def __init__(self):
+        self.types = {}
+        self.metrics = {}
+        self.first = None
+        self.last = None
+        self.vus = set()
+        self.requests = _Aggregate('counter')
+        self.failed = _Aggregate('rate')
+        # epoch second -> [requests, failed]
+        self.seconds = {}
+
+    def _aggregate(self, key, name):
+        aggregate = self.metrics.get(key)
+        if aggregate is None:
+            metric_type, contains = self.types.get(name) or BUILTIN_TYPES.get(name, ('trend', None))
+            aggregate = self.metrics[key] = _Aggregate(metric_type, contains)
+        return aggregate
+
+    def add_line(self, line):
+        if '"type":"Metric"' in line:
+            data = json.loads(line).get('data', {})
+            self.types[data.get('name')] = (data.get('type', 'trend'), data.get('contains'))
+            return
+        if '"type":"Point"' not in line:
+            return
+        try:
+            point = json.loads(line)
+        except ValueError:
+            return  # truncated last line
+        name, data = point['metric'], point['data']
+        if name.startswith(EXPORT_PREFIXES):
+            return
+        epoch = parse_time(data['time'])
+        self.first = epoch if self.first is None else min(self.first, epoch)
+        self.last = epoch if self.last is None else max(self.last, epoch)
+        value, tags = data['value'], data.get('tags') or {}
+        self._aggregate(name, name).add(value)
+        if name.startswith('http_req_') and self.metrics[name].type == 'trend':
+            if tags.get('name'):
+                self._aggregate(f"{name}{{name:{tags['name']}}}", name).add(value)
+            if name == REQUEST_METRIC:
+                if tags.get('expected_response') == 'true':
+                    self._aggregate(f'{name}{{expected_response:true}}', name).add(value)
+                if tags.get('vu'):
+                    self.vus.add(tags['vu'])
+                # http_reqs / http_req_failed, used when the stream carries no points of its own
+                failed = request_failed(tags)
+                self.requests.add(1)
+                self.failed.add(1 if failed else 0)
+                second = self.seconds.setdefault(int(epoch), [0, 0])
+                second[0] += 1
+                second[1] += failed
+
+    def summary(self, config=None):
+        seconds = max((self.last - self.first) if self.first is not None else 0.0, 1e-9)
+        metrics = {}
+        for key, aggregate in self.metrics.items():
+            metrics[key] = {'type': aggregate.type, 'values': aggregate.values(seconds)}
+            if aggregate.contains:
+                metrics[key]['contains'] = aggregate.contains
+            if aggregate.type == 'trend' and '{name:' in key:
+                metrics[key]['values']['count'] = aggregate.count
+        if self.requests.count and 'http_reqs' not in metrics:
+            metrics['http_reqs'] = {'type': 'counter', 'values': self.requests.values(seconds)}
+        if self.failed.count and 'http_req_failed' not in metrics:
+            metrics['http_req_failed'] = {'type': 'rate', 'values': self.failed.values(seconds)}
+        if 'http_req_failed' in metrics and 'errors' not in metrics:
+            metrics['errors'] = {'type': 'rate', 'values': {'rate': metrics['http_req_failed']['values']['rate']}}
+        if 'vus' not in metrics and self.vus:
+            metrics['vus'] = {'type': 'gauge', 'values': {'value': 0, 'min': 0, 'max': len(self.vus)}}
+        histograms = {key: aggregate.histogram.to_dict() for key, aggregate in self.metrics.items()
+                      if aggregate.histogram is not None and
+                      (key == REQUEST_METRIC or key.startswith(f'{REQUEST_METRIC}{{name:'))}
+        start = int(self.first) if self.first is not None else 0
+        timeline = [{'second': second - start, 'requests': n, 'failed': failed}
+                    for second, (n, failed) in sorted(self.seconds.items())]
+        config = dict(config or {})
+        if self.vus:
+            config.setdefault('vus', len(self.vus))
+        return {
+            'metrics': metrics,
+            'state': {'testRunDurationMs': seconds * 1000},
+            'testConfig': config,
+            'histograms': histograms,
+            'timeline': timeline,
+        }
+
+
+def summarize(path, config=None):
+    """handleSummary-style dict for a raw stream (.ndjson, .ndjson.gz or a perf.archive .k6a)"""
+    from perf import archive
+
+    stream = StreamSummary()
+    if archive.is_archive(path):
+        for line in archive.ndjson_lines(path):
+            stream.add_line(line)
+        return stream.summary(config)
+    with open_stream(path) as f:
+        for line in f:
+            stream.add_line(line)
+    return stream.summary(config)
+
+
+def results_path(raw_path):
+    """raw-{arch}-{scenario}.ndjson[.gz] / .k6a -> results-{arch}-{scenario}.json"""
+    name = run_name(raw_path)
+    return os.path.join(os.path.dirname(raw_path), name.replace('raw-', 'results-', 1) + '.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild a results-*.json summary from a raw stream')
+    parser.add_argument('paths', nargs='+', help='raw-*.ndjson[.gz] streams or .k6a archives')
+    parser.add_argument('--output', help='summary path (single input only; default results-{arch}-{scenario}.json)')
+    parser.add_argument('--force', action='store_true', help='overwrite an existing summary')
+    args = parser.parse_args()
+    if args.output and len(args.paths) > 1:
+        parser.error('--output needs exactly one input stream')
+
+    status = 0
+    for path in args.paths:
+        output = args.output or results_path(path)
+        if os.path.exists(output) and not args.force:
+            print(f"  ⚠️  {output} exists - use --force to overwrite")
+            status = 1
+            continue
+        architecture, scenario = split_name(path)
+        print(f"📥 Ingesting {path}")
+        data = summarize(path, {'testName': architecture, 'scenario': scenario,
+                                'ingestedFrom': os.path.basename(path)})
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        requests = data['metrics'].get('http_reqs', {}).get('values', {}).get('count', 0)
+        print(f"  ✓ Saved: {output} ({requests:,.0f} requests, "
+              f"{data['state']['testRunDurationMs'] / 1000:.0f}s)")
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+User Journeys
+Stateful scenarios for perf.loadgen with a pre-warmed token pool
+
+`journey` follows aws-deployment/testing/load-test.js with real IDs:
+login -> browse -> take -> submit -> attempts -> leaderboard. Logging in
+at the start of every iteration turns the benchmark into a login storm
+(PBKDF2 hashing dominates), so VUs take JWTs from a TokenPool filled
+before the clock starts. Tokens are renewed shortly before their `exp`:
+POST /api/auth/refresh first, falling back to a fresh login while the
+backend's refresh endpoint is a stub. `--login-ratio` keeps a share of
+journeys doing an explicit login step.
+
+Recorded per journey:
+    journey_step_{step}    latency of each step (trend, ms)
+    journey_duration       sum of step latencies, without think time
+    journey_elapsed        wall-clock time of the whole journey
+    journeys_completed / journeys_failed   counters
+
+`browse` mirrors test-scenarios.js for like-for-like runs against k6.
+"""
+
+import asyncio
+import base64
+import json
+import random
+import time
+
+from perf.loadgen import HttpClient
+
+# DbInitializer test users (password Test123!)
+SEED_USERS = [
+    'john.doe@example.com', 'jane.smith@example.com', 'mike.johnson@example.com',
+    'sarah.williams@example.com', 'david.brown@example.com', 'emma.davis@example.com',
+    'james.miller@example.com', 'lisa.wilson@example.com',
+]
+SEED_PASSWORD = 'Test123!'
+SEED_QUIZ_IDS = ['1f645276-d6bc-4901-8774-5d8af1e13396']
+
+# Renew tokens this long before they expire
+REFRESH_MARGIN_SECONDS = 300
+WARM_CONCURRENCY = 16
+
+LEADERBOARD_TIMEFRAMES = ['AllTime', 'Today', 'ThisWeek', 'ThisMonth', 'ThisYear']
+
+
+def jwt_expiry(token):
+    """`exp` claim of a JWT (epoch seconds), or None"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+    except (IndexError, ValueError, AttributeError):
+        return None
+
+
+class Credential:
+    __slots__ = ('email', 'password', 'token', 'refresh_token', 'expires')
+
+    def __init__(self, email, password):
+        self.email = email
+        self.password = password
+        self.token = None
+        self.refresh_token = None
+        self.expires = 0.0
+
+
+class TokenPool:
+    """JWTs obtained before the measured run, handed out round-robin"""
+
+    def __init__(self, base_url, users, password, timeout=60.0):
+        self.base_url = base_url
+        self.credentials = [Credential(email, password) for email in users]
+        self.timeout = timeout
+        self.next = 0
+        self.logins = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    async def _login(self, client, credential):
+        response = await client.request('POST', '/api/auth/login',
+                                        {'email': credential.email, 'password': credential.password})
+        return self.store(credential, response)
+
+    def store(self, credential, response):
+        """Keep the token from a login / refresh response on the credential; False when it has none"""
+        body = response.json() if response.ok else None
+        token = (body or {}).get('token') or ((body or {}).get('data') or {}).get('token')
+        if not token:
+            return False
+        credential.token = token
+        credential.refresh_token = body.get('refreshToken')
+        credential.expires = jwt_expiry(token) or time.time() + 3600
+        return True
+
+    async def warm(self, concurrency=WARM_CONCURRENCY):
+        """Log every credential in; returns the number of usable tokens"""
+        queue = list(self.credentials)
+
+        async def worker():
+            client = HttpClient(self.base_url, self.timeout)
+            try:
+                while queue:
+                    credential = queue.pop()
+                    if await self._login(client, credential):
+                        self.logins += 1
+                    else:
+                        self.failures += 1
+            finally:
+                await client.close()
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(queue)) or 1)))
+        self.credentials = [c for c in self.credentials if c.token]
+        return len(self.credentials)
+
+    async def acquire(self, vu):
+        """Token for a VU, renewed through the VU's own connection if close to expiry"""
+        if not self.credentials:
+            return None
+        credential = self.credentials[self.next % len(self.credentials)]
+        self.next += 1
+        if credential.expires - time.time() < REFRESH_MARGIN_SECONDS:
+            await self.renew(vu, credential)
+        return credential
+
+    async def renew(self, vu, credential):
+        if credential.refresh_token:
+            response = await vu.call('refresh', 'POST', '/api/auth/refresh',
+                                     {'refreshToken': credential.refresh_token})
+            if self.store(credential, response):
+                self.refreshes += 1
+                return True
+        response = await vu.call('login', 'POST', '/api/auth/login',
+                                 {'email': credential.email, 'password': credential.password})
+        return self.store(credential, response)
+
+
+class JourneyContext:
+    """Shared, read-only run configuration for all VUs"""
+
+    def __init__(self, pool=None, quizzes=None, dataset=None, think_scale=1.0, login_ratio=0.0):
+        self.pool = pool
+        self.quizzes = quizzes or [{'id': q} for q in SEED_QUIZ_IDS]
+        self.dataset = dataset
+        self.think_scale = think_scale
+        self.login_ratio = login_ratio
+
+
+async def prepare(scenario, base_url, vus, manifest=None, think_scale=1.0, timeout=60.0, login_ratio=0.0,
+                  first_user=0):
+    """Load the dataset manifest and, for authenticated scenarios, warm the token pool
+
+    `first_user` offsets the pool into the user list, so parallel generator
+    processes log in as different users.
+    """
+    users, password, quizzes, dataset = SEED_USERS, SEED_PASSWORD, None, None
+    if manifest:
+        with open(manifest, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        users, password = data['users'], data['password']
+        quizzes = [q for q in data['quizzes'] if q.get('public', True)]
+        dataset = {**data['size'], 'counts': data.get('counts'), 'seed': data.get('seed')}
+
+    pool = None
+    if scenario in AUTHENTICATED:
+        # One identity per VU where possible, so attempts spread over users
+        start = first_user % len(users)
+        pool = TokenPool(base_url, (users[start:] + users[:start])[:max(vus, 1)], password, timeout)
+        started = time.monotonic()
+        ready = await pool.warm()
+        print(f"  ✓ Token pool: {ready} tokens in {time.monotonic() - started:.1f}s"
+              + (f" ({pool.failures} logins failed)" if pool.failures else ''))
+        if not ready:
+            raise SystemExit('❌ No user could log in - check the credentials and BASE_URL')
+    return JourneyContext(pool, quizzes, dataset, think_scale, login_ratio)
+
+
+async def think(vu, seconds):
+    if vu.context.think_scale:
+        await vu.sleep(seconds * vu.context.think_scale)
+
+
+def _data(response):
+    body = response.json()
+    return body.get('data', body) if isinstance(body, dict) else body
+
+
+async def journey(vu):
+    """login -> browse -> take -> submit -> attempts -> leaderboard"""
+    context, recorder = vu.context, vu.recorder
+    journey_started = time.perf_counter()
+    steps = {}
+
+    async def step(name, method, path, body=None, auth=None):
+        headers = {'Authorization': f'Bearer {auth}'} if auth else None
+        response = await vu.call(name, method, path, body, headers)
+        steps[name] = response.duration
+        recorder.trend(f'journey_step_{name}', response.duration)
+        if response.ok:
+            recorder.count('useful_requests')
+        return response
+
+    def finish(ok):
+        recorder.count('journeys_completed' if ok else 'journeys_failed')
+        if ok:
+            recorder.trend('journey_duration', sum(steps.values()))
+            recorder.trend('journey_elapsed', (time.perf_counter() - journey_started) * 1000)
+        return ok
+
+    credential = await context.pool.acquire(vu)
+    if credential is None:
+        return finish(False)
+    if random.random() < context.login_ratio:
+        response = await step('login', 'POST', '/api/auth/login',
+                              {'email': credential.email, 'password': credential.password})
+        if not context.pool.store(credential, response):
+            return finish(False)
+    token = credential.token
+    await think(vu, 1)
+
+    response = await step('browse', 'GET', '/api/quiz', auth=token)
+    if not response.ok:
+        return finish(False)
+    await think(vu, 2)
+
+    quiz = random.choice(context.quizzes)
+    response = await step('take', 'GET', f"/api/quiz/{quiz['id']}/take", auth=token)
+    if not response.ok:
+        return finish(False)
+    questions = (_data(response) or {}).get('questions') or quiz.get('questions', [])
+
+    # Answer every question; time spent is compressed into one think period
+    started_at = time.time()
+    answers = []
+    for question in questions:
+        options = [a['id'] if isinstance(a, dict) else a for a in question.get('answers', [])]
+        if options:
+            answers.append({'questionId': question['id'], 'selectedAnswerIds': [random.choice(options)],
+                            'timeSpent': random.randint(3000, 20000)})
+    await think(vu, 3)
+    finished_at = time.time()
+
+    response = await step('submit', 'POST', f"/api/quiz/{quiz['id']}/submit", {
+        'answers': answers,
+        'startedAt': _iso(started_at),
+        'finishedAt': _iso(finished_at),
+    }, auth=token)
+    if not response.ok:
+        return finish(False)
+    await think(vu, 2)
+
+    response = await step('attempts', 'GET', '/api/quiz/attempts?pageNumber=1&pageSize=10', auth=token)
+    if not response.ok:
+        return finish(False)
+    await think(vu, 1)
+
+    timeframe = random.choice(LEADERBOARD_TIMEFRAMES)
+    response = await step('leaderboard', 'GET', f'/api/quiz/leaderboard?timeframe={timeframe}', auth=token)
+    await think(vu, 1)
+    return finish(response.ok)
+
+
+async def browse(vu):
+    """Anonymous browse flow of test-scenarios.js"""
+    response = await vu.call('browse_quizzes', 'GET', '/api/quiz')
+    if response.ok:
+        vu.recorder.count('useful_requests')
+    await think(vu, 1)
+    response = await vu.call('get_categories', 'GET', '/api/category')
+    if response.ok:
+        vu.recorder.count('useful_requests')
+    await think(vu, 1)
+    quiz = random.choice(vu.context.quizzes)
+    response = await vu.call('view_quiz_details', 'GET', f"/api/quiz/{quiz['id']}")
+    if response.ok:
+        vu.recorder.count('useful_requests')
+    await think(vu, 2)
+    await vu.call('health_check', 'GET', '/health')
+    await think(vu, 1)
+
+
+def _iso(epoch):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(epoch)) + f'.{int(epoch % 1 * 1000):03d}Z'
+
+
+SCENARIOS = {
+    'journey': journey,
+    'browse': browse,
+}
+
+AUTHENTICATED = {'journey'}
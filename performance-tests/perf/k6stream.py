@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+K6 Raw Output Reader
+Streams the NDJSON written by `k6 run --out json=raw-{arch}-{scenario}.ndjson`
+
+Every HTTP request produces one Point per http_req_* metric, all sharing
+the same timestamp and tags. The reader keeps one http_req_duration point
+per request and returns the run as numpy columns with dictionary-encoded
+endpoint labels. perf.archive files (raw-{arch}-{scenario}.k6a) are read
+the same way; a .ndjson stream wins when both exist for a run.
+"""
+
+import copy
+import glob
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+
+from perf import summary
+from perf.gateway import normalize_endpoint
+
+RAW_PATTERN = 'raw-*.ndjson*'
+ARCHIVE_PATTERN = 'raw-*.k6a'
+# Counters that grow with the requests: subset_summary scales them to the requests kept
+SCALED_COUNTERS = ('data_received', 'data_sent', 'successful_requests', 'failed_requests')
+
+_epoch_cache = {}
+
+
+def parse_time(value):
+    """Parse a k6 RFC3339 timestamp (nanosecond precision) to epoch seconds"""
+    # Whole seconds and the UTC offset repeat for thousands of points, so only
+    # the fraction is parsed per call
+    head, rest = value[:19], value[19:]
+    fraction = 0.0
+    if rest.startswith('.'):
+        end = 1
+        while end < len(rest) and rest[end].isdigit():
+            end += 1
+        fraction = float('0' + rest[:end])
+        rest = rest[end:]
+    key = (head, rest)
+    base = _epoch_cache.get(key)
+    if base is None:
+        tz = '+00:00' if rest in ('', 'Z') else rest
+        base = datetime.fromisoformat(head + tz).timestamp()
+        if len(_epoch_cache) > 100000:
+            _epoch_cache.clear()
+        _epoch_cache[key] = base
+    return base + fraction
+
+
+def endpoint_of(tags):
+    """Endpoint label for a request: the `name` tag, else the path with IDs collapsed"""
+    name = tags.get('name')
+    url = tags.get('url', '')
+    if name and name != url:
+        return name
+    path = re.sub(r'^[a-z]+://[^/]+', '', url).split('?')[0]
+    return normalize_endpoint(path) or name or 'unknown'
+
+
+def open_stream(path):
+    """Open a raw output file, transparently handling .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_points(lines, metrics=None):
+    """Yield (metric, epoch, value, tags) for the Point lines of a k6 stream"""
+    for line in lines:
+        # Cheap substring checks before paying for json.loads
+        if '"type":"Point"' not in line:
+            continue
+        if metrics is not None and not any(f'"metric":"{m}"' in line for m in metrics):
+            continue
+        try:
+            point = json.loads(line)
+        except ValueError:
+            continue  # truncated last line of a live file
+        data = point['data']
+        yield point['metric'], parse_time(data['time']), data['value'], data.get('tags') or {}
+
+
+def read_points(path, metrics=None):
+    """Yield (metric, epoch, value, tags) from a raw stream or a perf.archive file"""
+    from perf import archive
+
+    if archive.is_archive(path):
+        with archive.ArchiveReader(path) as reader:
+            yield from reader.points(metrics=metrics)
+        return
+    with open_stream(path) as f:
+        yield from iter_points(f, metrics)
+
+
+def run_name(path):
+    """raw-{arch}-{scenario}.ndjson[.gz] / .k6a -> raw-{arch}-{scenario}"""
+    return re.sub(r'\.(ndjson(\.gz)?|k6a)$', '', os.path.basename(path))
+
+
+class RequestTable:
+    """Columnar per-request samples from a raw k6 stream"""
+
+    def __init__(self, endpoint_labels, endpoint, time, duration, status,
+                 error_code, method_labels=None, method=None):
+        self.endpoint_labels = endpoint_labels
+        self.endpoint = endpoint
+        self.time = time
+        self.duration = duration
+        self.status = status
+        self.error_code = error_code
+        self.method_labels = method_labels or []
+        self.method = method if method is not None else np.zeros(len(time), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.time)
+
+    @property
+    def start(self):
+        return float(self.time.min()) if len(self) else 0.0
+
+    @property
+    def end(self):
+        return float(self.time.max()) if len(self) else 0.0
+
+    @property
+    def duration_seconds(self):
+        return max(self.end - self.start, 1e-9)
+
+
+class RequestTableBuilder:
+    """Accumulates request points and freezes them into a RequestTable"""
+
+    def __init__(self):
+        self.endpoint_labels = {}
+        self.method_labels = {}
+        self.columns = {k: [] for k in ('endpoint', 'time', 'duration', 'status',
+                                        'error_code', 'method')}
+
+    def add(self, epoch, duration, tags):
+        """Add one http_req_duration point"""
+        c = self.columns
+        endpoint = endpoint_of(tags)
+        c['endpoint'].append(self.endpoint_labels.setdefault(endpoint, len(self.endpoint_labels)))
+        c['method'].append(self.method_labels.setdefault(tags.get('method', ''), len(self.method_labels)))
+        c['time'].append(epoch)
+        c['duration'].append(duration)
+        c['status'].append(int(tags.get('status') or 0))
+        c['error_code'].append(int(tags.get('error_code') or 0))
+
+    def build(self):
+        c = self.columns
+        return RequestTable(
+            list(self.endpoint_labels),
+            np.array(c['endpoint'], dtype=np.int32),
+            np.array(c['time'], dtype=np.float64),
+            np.array(c['duration'], dtype=np.float64),
+            np.array(c['status'], dtype=np.int16),
+            np.array(c['error_code'], dtype=np.int32),
+            list(self.method_labels),
+            np.array(c['method'], dtype=np.int32),
+        )
+
+
+def read_requests(path):
+    """Read a raw k6 stream (or perf.archive file) into a RequestTable"""
+    from perf import archive
+
+    if archive.is_archive(path):
+        return archive.read_requests(path)
+    builder = RequestTableBuilder()
+    with open_stream(path) as f:
+        for _, epoch, value, tags in iter_points(f, metrics=('http_req_duration',)):
+            builder.add(epoch, value, tags)
+    return builder.build()
+
+
+def raw_path(stem, directory='.'):
+    """raw-{stem}.ndjson[.gz] stream, else raw-{stem}.k6a archive, in `directory`; None when neither exists"""
+    for suffix in ('.ndjson', '.ndjson.gz', '.k6a'):
+        path = os.path.join(directory, f'raw-{stem}{suffix}')
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def find_raw_results():
+    """Map (architecture, scenario) -> raw stream path for raw-*.ndjson and raw-*.k6a files"""
+    found = {}
+    for path in sorted(glob.glob(ARCHIVE_PATTERN)) + sorted(glob.glob(RAW_PATTERN)):
+        architecture, scenario = summary.split_name(path)
+        if architecture:
+            found[(architecture, scenario)] = path
+    return found
+
+
+def _trend_values(durations, keys):
+    """k6 trend `values` for `keys` (avg, min, med, max, p(N)); keys it cannot compute are left out"""
+    values = {}
+    for key in keys:
+        if key == 'avg':
+            values[key] = float(durations.mean())
+        elif key == 'min':
+            values[key] = float(durations.min())
+        elif key == 'max':
+            values[key] = float(durations.max())
+        elif key == 'med':
+            values[key] = float(np.percentile(durations, 50))
+        elif re.fullmatch(r'p\([\d.]+\)', key):
+            values[key] = float(np.percentile(durations, float(key[2:-1])))
+    return values
+
+
+def subset_summary(data, requests, mask, config=None):
+    """Copy of a handleSummary result with its request metrics recomputed over requests[mask]
+
+    http_req_duration (overall, per `name` and expected_response), http_reqs,
+    http_req_failed, useful_requests and the run duration are recomputed;
+    the vus gauges are kept. The per-request counters in SCALED_COUNTERS
+    are scaled by the share of requests kept. Every other request metric
+    (`errors`, checks, the phase trends, exported histograms / timeline)
+    only exists for the whole run, so it is dropped rather than left stale.
+    `data` may be a dict or a perf.summary.RunSummary; the copy is a plain
+    dict. `config` entries are merged into the copy's testConfig.
+    """
+    from perf import goodput
+
+    subset = copy.deepcopy(dict(data))
+    if not mask.any():
+        return subset
+    times = requests.time[mask]
+    seconds = max(float(times.max() - times.min()), 1e-9)
+    ok = (requests.status >= 200) & (requests.status < 400)
+    failed = int((mask & ~ok).sum())
+    count = int(mask.sum())
+
+    metrics = {}
+    for key, metric in subset.get('metrics', {}).items():
+        name, tags = summary.parse_key(key)
+        if name == 'http_req_duration':
+            if not tags:
+                selected = mask
+            elif tags == {'expected_response': 'true'}:
+                selected = mask & ok
+            elif list(tags) == ['name'] and tags['name'] in requests.endpoint_labels:
+                selected = mask & (requests.endpoint == requests.endpoint_labels.index(tags['name']))
+            else:
+                continue
+            if selected.any():
+                metrics[key] = {**metric, 'values': _trend_values(requests.duration[selected], metric['values'])}
+        elif key == 'http_reqs':
+            metrics[key] = {**metric, 'values': {'count': count, 'rate': count / seconds}}
+        elif key == 'http_req_failed':
+            metrics[key] = {**metric, 'values': {'rate': failed / count, 'passes': failed, 'fails': count - failed}}
+        elif key == 'useful_requests':
+            useful = int((goodput.classify(requests)[mask] == goodput.CATEGORIES.index('ok')).sum())
+            metrics[key] = {**metric, 'values': {'count': useful, 'rate': useful / seconds}}
+        elif key in SCALED_COUNTERS:
+            scaled = metric['values'].get('count', 0) * count / len(requests)
+            metrics[key] = {**metric, 'values': {'count': scaled, 'rate': scaled / seconds}}
+        elif key in ('vus', 'vus_max'):
+            metrics[key] = metric
+    subset['metrics'] = metrics
+    subset.pop('histograms', None)
+    subset.pop('timeline', None)
+    subset.setdefault('state', {})['testRunDurationMs'] = seconds * 1000
+    subset.setdefault('testConfig', {}).update(config or {})
+    return subset
+    values = subset.setdefault('metrics', {}).setdefault('http_req_duration', {}).setdefault('values', {})
+    p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+    values.update({'avg': float(durations.mean()), 'med': float(p50), 'p(95)': float(p95), 'p(99)': float(p99),
+                   'min': float(durations.min()), 'max': float(durations.max())})
+    times = requests.time[mask]
+    seconds = max(float(times.max() - times.min()), 1e-9)
+    subset['metrics'].setdefault('http_reqs', {}).setdefault('values', {}).update(
+        {'count': int(len(durations)), 'rate': len(durations) / seconds})
+    subset.setdefault('testConfig', {}).update(config or {})
+    return subset
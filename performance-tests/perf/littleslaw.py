@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Think-Time-Aware Throughput Normalization
+Little's Law, in-flight concurrency and server capacity from closed-loop runs
+
+Every test-scenarios.js iteration sleeps ~5 s, so `http_reqs.rate` is
+mostly VUs / think time: a slower architecture still shows almost the same
+throughput. This module uses the operational laws of a closed system to
+separate the client's pacing from the server:
+
+    Little's Law (whole loop)   VUs = iterations/s x iteration_duration
+                                - a consistency check on the run itself
+    active time per iteration   iteration_duration - think time, compared
+                                with requests/iteration x avg latency (the
+                                rest is unexplained client-side time)
+    in-flight concurrency       http_reqs/s x avg latency - requests the
+                                server actually held at once
+    think-time ceiling          VUs x requests/iteration / think time - what
+                                an infinitely fast server would get
+    server capacity             fitted across the runs of one architecture:
+                                1/latency = 1/S - X/(S x capacity), i.e.
+                                latency grows as S / (1 - X / capacity)
+
+Capacity is only reported when latency grows with throughput and the
+busiest run reached MIN_UTILIZATION of it; otherwise the runs never loaded
+the server and the largest measured throughput is a lower bound. Think time comes from an `iteration_think_time`
+trend (perf.loadgen records one) or the test-scenarios.js script.
+
+Usage (from performance-tests/):
+    python -m perf.littleslaw [results-monolith-heavy_load.json ...]
+"""
+
+import glob
+import sys
+
+from perf import summary
+
+RESULTS_PATTERN = 'results-*.json'
+# |X_iter x iteration_duration / VUs - 1| above this fails the Little's Law check
+LITTLE_TOLERANCE = 0.1
+# Unexplained time per request (ms) above which latency does not account for the loop
+OVERHEAD_LIMIT_MS = 5.0
+# A capacity fit whose busiest run is below this utilization is extrapolated noise
+MIN_UTILIZATION = 0.1
+
+
+def _values(metrics, name):
+    return metrics.get(name, {}).get('values', {})
+
+
+def script_think_seconds():
+    """Think time per test-scenarios.js iteration, and requests per iteration"""
+    from perf.simulator import SCENARIO_SCRIPT
+
+    return sum(think for _, _, think in SCENARIO_SCRIPT), len(SCENARIO_SCRIPT)
+
+
+def analyze_run(data, scenario=None):
+    """Little's Law quantities for one handleSummary result; None without iteration metrics"""
+    metrics = data.get('metrics', {})
+    config = data.get('testConfig', {})
+    iterations = _values(metrics, 'iterations')
+    iteration = _values(metrics, 'iteration_duration')
+    requests = _values(metrics, 'http_reqs')
+    if not iterations.get('count') or not iteration.get('avg') or not requests.get('count'):
+        return None
+
+    vus = _values(metrics, 'vus_max').get('max') or _values(metrics, 'vus').get('max') or config.get('vus')
+    if not vus:
+        from perf.simulator import SCENARIO_VUS
+
+        vus = SCENARIO_VUS.get(scenario or config.get('scenario'))
+    if not vus:
+        return None
+
+    per_iteration = requests['count'] / iterations['count']
+    if 'iteration_think_time' in metrics:
+        think = _values(metrics, 'iteration_think_time').get('avg', 0) / 1000
+    else:
+        think = script_think_seconds()[0]
+
+    iteration_s = iteration['avg'] / 1000
+    latency_s = _values(metrics, 'http_req_duration').get('avg', 0) / 1000
+    throughput = requests['rate']
+    little_vus = iterations['rate'] * iteration_s
+    active = max(iteration_s - think, 0.0)
+    overhead_ms = (active - per_iteration * latency_s) / per_iteration * 1000
+    ceiling = vus * per_iteration / think if think else None
+
+    return {
+        'vus': vus,
+        'think_s': think,
+        'requests_per_iteration': per_iteration,
+        'iteration_s': iteration_s,
+        'iterations_rate': iterations['rate'],
+        'throughput': throughput,
+        'latency_ms': latency_s * 1000,
+        # Little's Law over the whole loop: should reproduce the VU count
+        'little_vus': little_vus,
+        'little_error': little_vus / vus - 1,
+        'little_ok': abs(little_vus / vus - 1) <= LITTLE_TOLERANCE,
+        # Time per iteration that is not think time, vs what latency accounts for
+        'active_ms': active * 1000,
+        'overhead_ms': overhead_ms,
+        'latency_ok': abs(overhead_ms) <= OVERHEAD_LIMIT_MS,
+        # Little's Law at the server
+        'in_flight': throughput * latency_s,
+        'busy_share': throughput * latency_s / vus,
+        'think_ceiling': ceiling,
+        'think_bound_share': throughput / ceiling if ceiling else None,
+    }
+
+
+def fit_capacity(runs):
+    """Least-squares fit of 1/latency = a - b x throughput over one architecture's runs
+
+    Returns {'service_ms', 'capacity', 'lower_bound'}: capacity = a / b when
+    latency grows with throughput and the busiest run reached MIN_UTILIZATION,
+    else None with lower_bound = max throughput.
+    """
+    points = [(r['throughput'], 1000 / r['latency_ms']) for r in runs if r['latency_ms'] > 0]
+    lower_bound = max((x for x, _ in points), default=0.0)
+    if len(points) < 2:
+        service = 1000 / points[0][1] if points else None
+        return {'service_ms': service, 'capacity': None, 'lower_bound': lower_bound}
+
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx if sxx else 0.0
+    intercept = mean_y - slope * mean_x
+    if slope >= 0 or intercept <= 0 or lower_bound * -slope / intercept < MIN_UTILIZATION:
+        # Latency did not grow (measurably) with load: the server never got busy
+        fastest = max(y for _, y in points)
+        return {'service_ms': 1000 / fastest, 'capacity': None, 'lower_bound': lower_bound}
+    return {'service_ms': 1000 / intercept, 'capacity': intercept / -slope, 'lower_bound': lower_bound}
+
+
+def analyze(results):
+    """{architecture: {'runs': {scenario: analyze_run(...)}, 'fit': ..., 'saturation_vus': ...}}
+
+    `results` is PerformanceAnalyzer.results ({architecture: {scenario: summary}}).
+    """
+    analysis = {}
+    for architecture, scenarios in results.items():
+        runs = {}
+        for scenario, data in scenarios.items():
+            run = analyze_run(data, scenario)
+            if run is not None:
+                runs[scenario] = run
+        if not runs:
+            continue
+        fit = fit_capacity(runs.values())
+        saturation_vus = None
+        if fit['capacity']:
+            for run in runs.values():
+                run['utilization'] = run['throughput'] / fit['capacity']
+            # Closed-loop knee: VUs whose think-paced demand equals capacity
+            sample = next(iter(runs.values()))
+            per_iteration = sample['requests_per_iteration']
+            saturation_vus = fit['capacity'] * (sample['think_s'] / per_iteration + fit['service_ms'] / 1000)
+        analysis[architecture] = {'runs': runs, 'fit': fit, 'saturation_vus': saturation_vus}
+    return analysis
+
+
+def plot_normalized(analysis, path, scenarios):
+    """Measured throughput vs think-time ceiling and capacity, in-flight concurrency, Little's Law check"""
+    import matplotlib.pyplot as plt
+
+    colors = {'monolith': '#3498db', 'microservices': '#e74c3c'}
+    fig, (left, middle, right) = plt.subplots(1, 3, figsize=(18, 5))
+    for architecture, a in analysis.items():
+        color = colors.get(architecture)
+        runs = [a['runs'][s] for s in scenarios if s in a['runs']]
+        vus = [r['vus'] for r in runs]
+        left.plot(vus, [r['throughput'] for r in runs], 'o-', color=color, label=f'{architecture.title()} measured')
+        left.plot(vus, [r['think_ceiling'] or 0 for r in runs], ':', color=color, alpha=0.6,
+                  label=f'{architecture.title()} think-time ceiling')
+        if a['fit']['capacity']:
+            left.axhline(a['fit']['capacity'], linestyle='--', color=color, alpha=0.8,
+                         label=f"{architecture.title()} capacity ~{a['fit']['capacity']:.0f} req/s")
+        middle.plot(vus, [r['in_flight'] for r in runs], 'o-', color=color, label=architecture.title())
+        right.plot(vus, [r['little_vus'] for r in runs], 'o', color=color, markersize=9, label=architecture.title())
+
+    left.set_xlabel('Virtual Users')
+    left.set_ylabel('Requests/second')
+    left.set_title('Throughput vs Think-Time Ceiling and Capacity', fontweight='bold')
+    left.legend(fontsize=7)
+    left.grid(True, alpha=0.3)
+
+    middle.set_xlabel('Virtual Users')
+    middle.set_ylabel('Requests in flight (X x R)')
+    middle.set_title("In-Flight Concurrency (Little's Law)", fontweight='bold')
+    middle.legend(fontsize=8)
+    middle.grid(True, alpha=0.3)
+
+    top = max((r['vus'] for a in analysis.values() for r in a['runs'].values()), default=1)
+    right.plot([0, top], [0, top], 'k--', alpha=0.5, label='VUs = X_iter x iteration_duration')
+    right.set_xlabel('Virtual Users (configured)')
+    right.set_ylabel('iterations/s x iteration_duration')
+    right.set_title("Little's Law Consistency", fontweight='bold')
+    right.legend(fontsize=8)
+    right.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def generate_html_section(analysis, scenarios):
+    """HTML report section for analyze(...)"""
+    html = f"""
+        <h2>⚖️ Think-Time-Normalized Throughput</h2>
+        <p>Each iteration spends most of its time in <code>sleep()</code>, so raw throughput tracks VUs / think
+        time. The think-time ceiling is what an infinitely fast server would reach; in-flight concurrency
+        (throughput x latency) is what the server actually held. Capacity is fitted per architecture from
+        latency growing as S / (1 - X / capacity); the knee is the VU count whose demand reaches it.
+        Little's Law must reproduce the VU count within {LITTLE_TOLERANCE * 100:.0f}%, and latency must account
+        for the non-think time of an iteration within {OVERHEAD_LIMIT_MS:g} ms per request.</p>
+        <img src="graph-normalized-throughput.png" alt="Think-Time-Normalized Throughput">
+        <table>
+            <tr><th>Architecture</th><th>No-load latency</th><th>Estimated capacity</th><th>Knee</th></tr>
+"""
+    for architecture, a in analysis.items():
+        fit = a['fit']
+        capacity = (f"{fit['capacity']:.0f} req/s" if fit['capacity'] else
+                    f"&gt; {fit['lower_bound']:.1f} req/s (not reached)")
+        knee = f"~{a['saturation_vus']:.0f} VUs" if a['saturation_vus'] else '-'
+        service = f"{fit['service_ms']:.1f} ms" if fit['service_ms'] else '-'
+        html += f"""            <tr><td>{architecture.title()}</td><td>{service}</td><td>{capacity}</td><td>{knee}</td></tr>
+"""
+    html += """        </table>
+        <table>
+            <tr><th>Run</th><th>Throughput</th><th>Of think-time ceiling</th><th>In flight</th><th>Utilization</th><th>Little's Law</th><th>Unexplained per request</th></tr>
+"""
+    for architecture, a in analysis.items():
+        for scenario in scenarios:
+            r = a['runs'].get(scenario)
+            if r is None:
+                continue
+            share = f"{r['think_bound_share'] * 100:.0f}%" if r['think_bound_share'] is not None else '-'
+            utilization = f"{r['utilization'] * 100:.0f}%" if 'utilization' in r else '-'
+            html += f"""            <tr><td>{architecture.title()} - {scenario.replace('_', ' ').title()}</td><td>{r['throughput']:.2f} req/s</td><td>{share}</td><td>{r['in_flight']:.2f} of {r['vus']:.0f}</td><td>{utilization}</td><td class="{'better' if r['little_ok'] else 'worse'}">{r['little_vus']:.1f} VUs ({r['little_error'] * 100:+.1f}%)</td><td class="{'better' if r['latency_ok'] else 'worse'}">{r['overhead_ms']:+.1f} ms</td></tr>
+"""
+    html += """        </table>
+"""
+    return html
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(RESULTS_PATTERN))
+    if not paths:
+        print(f"❌ No {RESULTS_PATTERN} files")
+        return
+    results = {}
+    for path in paths:
+        run = summary.load(path)
+        if run.architecture is None:
+            print(f"  ⚠️  {path}: not a results-{{architecture}}-{{scenario}}.json file")
+            continue
+        results.setdefault(run.architecture, {})[run.scenario] = run.data
+
+    for architecture, a in analyze(results).items():
+        fit = a['fit']
+        print(f"\n⚖️  {architecture}")
+        print(f"  {'Scenario':<14} {'VUs':>5} {'req/s':>8} {'ceiling':>8} {'in flight':>9} "
+              f"{'Little VUs':>10} {'unexpl. ms':>10}")
+        for scenario, r in sorted(a['runs'].items(), key=lambda item: item[1]['vus']):
+            print(f"  {scenario:<14} {r['vus']:>5.0f} {r['throughput']:>8.2f} {r['think_ceiling'] or 0:>8.2f} "
+                  f"{r['in_flight']:>9.2f} {r['little_vus']:>10.1f} {r['overhead_ms']:>+10.1f}"
+                  + ('' if r['little_ok'] and r['latency_ok'] else '  ⚠️'))
+        if fit['capacity']:
+            print(f"  Capacity ~{fit['capacity']:.0f} req/s (no-load latency {fit['service_ms']:.1f} ms), "
+                  f"knee ~{a['saturation_vus']:.0f} VUs")
+        else:
+            print(f"  Capacity not reached: > {fit['lower_bound']:.1f} req/s")
+
+
+if __name__ == '__main__':
+    main()
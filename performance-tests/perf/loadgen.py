@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Python Load Generator
+asyncio HTTP/1.1 load generator that writes k6-compatible results
+
+k6 scripts cannot carry state between requests beyond what one VU holds,
+so authenticated multi-step journeys (perf.journeys) run here instead.
+Results use the same shapes as k6 so the existing analysis reads them
+unchanged:
+
+    results-{arch}-{scenario}.json   handleSummary-style summary (trends,
+                                     counters, tagged submetrics, testConfig)
+    raw-{arch}-{scenario}.ndjson     one http_req_duration Point per request,
+                                     plus perf.clientmonitor samples
+    bodies-{arch}-{scenario}.ndjson  sampled 2xx response bodies per endpoint
+                                     (reservoir, for perf.payload)
+
+The HTTP client is stdlib only: one keep-alive connection per VU, like a
+k6 VU, with Content-Length and chunked bodies. http_req_duration excludes
+connection setup, as in k6. The generator monitors itself
+(perf.clientmonitor) and warns when it, not the server, was the bottleneck.
+
+Usage (from performance-tests/):
+    python -m perf.loadgen --base-url http://localhost:5000 --arch monolith \\
+        --scenario journey --vus 50 --duration 5m
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import ssl
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from perf.clientmonitor import ClientMonitor, recommendation
+from perf.histogram import LogHistogram
+
+# k6 error_code conventions (perf.goodput classifies on these)
+K6_TIMEOUT_ERROR = 1050
+K6_CONNECTION_ERROR = 1210
+
+TREND_STATS = ('avg', 'min', 'med', 'max', 'p(90)', 'p(95)', 'p(99)')
+# Methods safe to resend after a failure on a reused connection (RFC 9110 9.2.2)
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'}
+RAW_FLUSH_LINES = 5000
+# Response bodies kept per endpoint for payload analysis
+BODY_SAMPLES = 20
+
+
+class Response:
+    """Outcome of one HTTP request; status 0 means no response"""
+
+    __slots__ = ('status', 'headers', 'body', 'duration', 'error', 'error_code')
+
+    def __init__(self, status=0, headers=None, body=b'', duration=0.0, error=None, error_code=0):
+        self.status = status
+        self.headers = headers or {}
+        self.body = body
+        self.duration = duration
+        self.error = error
+        self.error_code = error_code
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 400
+
+    def json(self):
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return None
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client for one virtual user"""
+
+    # Connections currently open across all clients (sampled by ClientMonitor)
+    open_connections = 0
+
+    def __init__(self, base_url, timeout=60.0):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname or 'localhost'
+        self.port = parts.port or (443 if self.scheme == 'https' else 80)
+        self.prefix = parts.path.rstrip('/')
+        self.host_header = parts.netloc or self.host
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def _connect(self):
+        context = ssl.create_default_context() if self.scheme == 'https' else None
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+        HttpClient.open_connections += 1
+
+    async def request(self, method, path, body=None, headers=None):
+        if body is not None and not isinstance(body, (bytes, bytearray)):
+            body = json.dumps(body).encode('utf-8')
+            headers = {'Content-Type': 'application/json', **(headers or {})}
+        lines = [f'{method} {self.prefix}{path} HTTP/1.1', f'Host: {self.host_header}',
+                 'Accept: application/json', 'Accept-Encoding: identity', 'Connection: keep-alive']
+        lines += [f'{k}: {v}' for k, v in (headers or {}).items()]
+        if body is not None:
+            lines.append(f'Content-Length: {len(body)}')
+        payload = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b'')
+
+        # A kept-alive connection may have been closed by the server: reconnect when it is
+        # already closed, and retry once on a fresh one only when a resend cannot duplicate
+        # work (an idempotent method on a reused connection)
+        for attempt in (0, 1):
+            reused = False
+            try:
+                if self._writer is not None and self._reader.at_eof():
+                    await self.close()
+                if self._writer is None:
+                    await self._connect()
+                else:
+                    reused = True
+                started = time.perf_counter()
+                self._writer.write(payload)
+                response = await asyncio.wait_for(self._read_response(method), self.timeout)
+                response.duration = (time.perf_counter() - started) * 1000
+                if response.headers.get('connection', '').lower() == 'close':
+                    await self.close()
+                return response
+            except asyncio.TimeoutError:
+                await self.close()
+                return Response(duration=self.timeout * 1000, error='request timeout', error_code=K6_TIMEOUT_ERROR)
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                await self.close()
+                if attempt or not reused or method not in IDEMPOTENT_METHODS:
+                    return Response(error=str(e) or type(e).__name__, error_code=K6_CONNECTION_ERROR)
+
+    async def _read_response(self, method):
+        reader = self._reader
+        status_line = await reader.readuntil(b'\r\n')
+        status = int(status_line.split(b' ', 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    await reader.readuntil(b'\r\n')
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            headers['connection'] = 'close'
+        return Response(status, headers, body)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+            HttpClient.open_connections -= 1
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def trend_values(samples):
+    """k6 trend `values` block for a list of samples"""
+    if not samples:
+        return {stat: 0.0 for stat in TREND_STATS}
+    ordered = sorted(samples)
+    values = {'avg': sum(ordered) / len(ordered), 'min': ordered[0], 'med': _percentile(ordered, 50),
+              'max': ordered[-1]}
+    for stat in TREND_STATS[4:]:
+        values[stat] = _percentile(ordered, float(stat[2:-1]))
+    return values
+
+
+class Recorder:
+    """Collects request samples, custom trends and counters for one run
+
+    Durations, response sizes and trends go into LogHistograms, so memory
+    stays bounded however long the run is.
+    """
+
+    def __init__(self, raw_path=None, bodies_path=None, body_samples=BODY_SAMPLES):
+        self.durations = {}
+        self.sizes = {}
+        self.bodies = {}
+        self.bodies_path = bodies_path
+        self.body_samples = body_samples if bodies_path else 0
+        self.trends = {}
+        self.counters = {}
+        self.requests = 0
+        self.failed = 0
+        self.bytes_received = 0
+        self.raw_path = raw_path
+        self.monitor = None
+        self._raw = open(raw_path, 'w', encoding='utf-8') if raw_path else None
+        self._raw_lines = []
+        if self._raw:
+            self._raw.write('{"type":"Metric","data":{"name":"http_req_duration","type":"trend"},'
+                            '"metric":"http_req_duration"}\n')
+
+    def request(self, name, method, url, response, vu=0, iteration=0):
+        """Record one HTTP request under an endpoint name (k6 `name` tag)"""
+        self.requests += 1
+        self.bytes_received += len(response.body)
+        if not response.ok:
+            self.failed += 1
+        self.durations.setdefault(name, LogHistogram()).add(response.duration)
+        if response.ok:
+            sizes = self.sizes.setdefault(name, LogHistogram())
+            sizes.add(len(response.body))
+            if self.body_samples:
+                self._sample_body(name, response, sizes.count)
+        if self._raw:
+            tags = {'name': name, 'method': method, 'url': url, 'status': str(response.status),
+                    'vu': str(vu), 'iter': str(iteration), 'expected_response': 'true' if response.ok else 'false'}
+            if response.error_code:
+                tags['error_code'] = str(response.error_code)
+            now = time.time()
+            stamp = datetime.fromtimestamp(now, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + f'.{int(now % 1 * 1e6):06d}Z'
+            self._raw_lines.append(json.dumps(
+                {'metric': 'http_req_duration', 'type': 'Point',
+                 'data': {'time': stamp, 'value': response.duration, 'tags': tags}},
+                separators=(',', ':')))
+            if len(self._raw_lines) >= RAW_FLUSH_LINES:
+                self.flush()
+
+    def _sample_body(self, name, response, seen):
+        # Reservoir sampling: every successful response has the same chance of being kept
+        samples = self.bodies.setdefault(name, [])
+        if len(samples) < self.body_samples:
+            samples.append(response)
+        else:
+            slot = random.randrange(seen)
+            if slot < self.body_samples:
+                samples[slot] = response
+
+    def write_bodies(self):
+        """Write the sampled bodies (one JSON line each) for perf.payload"""
+        if not self.bodies_path:
+            return
+        with open(self.bodies_path, 'w', encoding='utf-8') as f:
+            for name, samples in sorted(self.bodies.items()):
+                for response in samples:
+                    f.write(json.dumps({'name': name, 'status': response.status,
+                                        'contentType': response.headers.get('content-type', ''),
+                                        'body': response.body.decode('utf-8', 'replace')},
+                                       separators=(',', ':')) + '\n')
+
+    def point(self, metric, epoch, value, tags):
+        """Write a non-request Point (e.g. a monitor sample) to the raw stream"""
+        if self._raw:
+            stamp = datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + f'.{int(epoch % 1 * 1e6):06d}Z'
+            self._raw_lines.append(json.dumps(
+                {'metric': metric, 'type': 'Point', 'data': {'time': stamp, 'value': value, 'tags': tags}},
+                separators=(',', ':')))
+
+    def trend(self, name, value):
+        self.trends.setdefault(name, LogHistogram()).add(value)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def flush(self):
+        if self._raw and self._raw_lines:
+            self._raw.write('\n'.join(self._raw_lines) + '\n')
+            self._raw_lines = []
+
+    def close(self):
+        if self.monitor is not None:
+            for metric, epoch, value, tags in self.monitor.points():
+                self.point(metric, epoch, value, tags)
+        self.flush()
+        if self._raw:
+            self._raw.close()
+            self._raw = None
+
+    def summary(self, duration_seconds, config):
+        """handleSummary-shaped result dict"""
+        seconds = max(duration_seconds, 1e-9)
+        overall = LogHistogram()
+        for h in self.durations.values():
+            overall.merge(h)
+        metrics = {
+            'http_req_duration': {'type': 'trend', 'contains': 'time', 'values': overall.values()},
+            'http_reqs': {'type': 'counter', 'values': {'count': self.requests, 'rate': self.requests / seconds}},
+            'http_req_failed': {'type': 'rate', 'values': {
+                'rate': self.failed / self.requests if self.requests else 0,
+                'passes': self.failed, 'fails': self.requests - self.failed}},
+            'errors': {'type': 'rate', 'values': {'rate': self.failed / self.requests if self.requests else 0}},
+            'successful_requests': {'type': 'counter', 'values': {
+                'count': self.requests - self.failed, 'rate': (self.requests - self.failed) / seconds}},
+            'failed_requests': {'type': 'counter', 'values': {'count': self.failed, 'rate': self.failed / seconds}},
+            'data_received': {'type': 'counter', 'contains': 'data', 'values': {
+                'count': self.bytes_received, 'rate': self.bytes_received / seconds}},
+        }
+        for name, h in self.durations.items():
+            metrics[f'http_req_duration{{name:{name}}}'] = {
+                'type': 'trend', 'contains': 'time', 'values': {**h.values(), 'count': h.count}}
+        if self.sizes:
+            sizes = LogHistogram()
+            for h in self.sizes.values():
+                sizes.merge(h)
+            metrics['response_size'] = {'type': 'trend', 'contains': 'data', 'values': sizes.values()}
+            for name, h in self.sizes.items():
+                metrics[f'response_size{{name:{name}}}'] = {
+                    'type': 'trend', 'contains': 'data', 'values': {**h.values(), 'count': h.count}}
+        if self.monitor is not None:
+            for name, samples in self.monitor.trends().items():
+                metrics[name] = {'type': 'trend', 'values': trend_values(samples)}
+        for name, h in self.trends.items():
+            metrics[name] = {'type': 'trend', 'contains': 'time', 'values': h.values()}
+        for name, count in self.counters.items():
+            metrics[name] = {'type': 'counter', 'values': {'count': count, 'rate': count / seconds}}
+        return {
+            'metrics': metrics,
+            'state': {'testRunDurationMs': duration_seconds * 1000},
+            'testConfig': config,
+            'histograms': {'http_req_duration': overall.to_dict(),
+                           **{f'http_req_duration{{name:{name}}}': h.to_dict() for name, h in self.durations.items()}},
+        }
+
+
+class VirtualUser:
+    """Per-VU state handed to scenario functions"""
+
+    def __init__(self, number, client, recorder, context):
+        self.number = number
+        self.client = client
+        self.recorder = recorder
+        self.context = context
+        self.iteration = 0
+        self.slept = 0.0
+        self.state = {}
+
+    async def sleep(self, seconds):
+        """Think time; lateness of the wake-up is recorded as schedule skew"""
+        wake = time.perf_counter() + seconds
+        await asyncio.sleep(seconds)
+        self.slept += seconds
+        if self.recorder.monitor is not None:
+            self.recorder.monitor.skew(max(0.0, (time.perf_counter() - wake) * 1000))
+
+    async def call(self, name, method, path, body=None, headers=None):
+        """Issue and record a request"""
+        response = await self.client.request(method, path, body, headers)
+        self.recorder.request(name, method, f'{self.client.scheme}://{self.client.host_header}{path}',
+                              response, self.number, self.iteration)
+        return response
+
+
+async def run_closed(scenario, base_url, vus, duration, recorder, context, ramp_up=0.0, timeout=60.0):
+    """Closed-loop run: `vus` users repeat `scenario(vu)` until `duration` elapses
+
+    VUs start evenly over `ramp_up` seconds. An iteration in progress at the
+    deadline is allowed to finish, as with k6's gracefulStop. Iterations are
+    timed like k6's iteration_duration, with their think time recorded
+    alongside (iteration_think_time, for perf.littleslaw).
+    """
+    deadline = time.monotonic() + ramp_up + duration
+
+    async def user(number):
+        vu = VirtualUser(number + 1, HttpClient(base_url, timeout), recorder, context)
+        if ramp_up:
+            await vu.sleep(ramp_up * number / vus)
+        try:
+            while time.monotonic() < deadline:
+                started, vu.slept = time.perf_counter(), 0.0
+                await scenario(vu)
+                recorder.trend('iteration_duration', (time.perf_counter() - started) * 1000)
+                recorder.trend('iteration_think_time', vu.slept * 1000)
+                vu.iteration += 1
+                recorder.count('iterations')
+        finally:
+            await vu.client.close()
+
+    await asyncio.gather(*(user(i) for i in range(vus)))
+
+
+def parse_duration(value):
+    """Parse k6-style durations: 90, 90s, 5m, 1h30m"""
+    if re.fullmatch(r'[\d.]+', value):
+        return float(value)
+    parts = re.findall(r'([\d.]+)(ms|s|m|h)', value)
+    if not parts or ''.join(n + u for n, u in parts) != value:
+        raise argparse.ArgumentTypeError(f'invalid duration: {value}')
+    scale = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    return sum(float(n) * scale[u] for n, u in parts)
+
+
+def write_summary(summary, architecture, scenario, path=None):
+    path = path or f'results-{architecture}-{scenario}.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return path
+
+
+def print_summary(summary):
+    metrics = summary['metrics']
+    seconds = summary['state']['testRunDurationMs'] / 1000
+    d = metrics['http_req_duration']['values']
+    print(f"\n  Duration: {seconds:.1f}s   Requests: {metrics['http_reqs']['values']['count']:,} "
+          f"({metrics['http_reqs']['values']['rate']:.2f}/s)   Failed: {metrics['http_req_failed']['values']['rate'] * 100:.2f}%")
+    print(f"  http_req_duration  avg {d['avg']:.1f}  med {d['med']:.1f}  p95 {d['p(95)']:.1f}  p99 {d['p(99)']:.1f} ms")
+    print(f"\n  {'Trend':<34} {'count':>7} {'avg':>9} {'p95':>9} {'p99':>9}")
+    for name, metric in sorted(metrics.items()):
+        if metric['type'] == 'trend' and name != 'http_req_duration':
+            v = metric['values']
+            count = v.get('count', '')
+            print(f"  {name:<34} {count:>7} {v['avg']:>9.1f} {v['p(95)']:>9.1f} {v['p(99)']:>9.1f}")
+
+
+def main():
+    from perf import journeys
+
+    parser = argparse.ArgumentParser(description='QuizHub Python load generator')
+    parser.add_argument('--base-url', default=os.environ.get('BASE_URL', 'http://localhost:5000'))
+    parser.add_argument('--arch', default=os.environ.get('TEST_NAME', 'monolith'),
+                        help='architecture name used in result file names')
+    parser.add_argument('--scenario', choices=sorted(journeys.SCENARIOS), default='journey')
+    parser.add_argument('--vus', type=int, default=20)
+    parser.add_argument('--duration', type=parse_duration, default=parse_duration('2m'))
+    parser.add_argument('--ramp-up', type=parse_duration, default=0.0)
+    parser.add_argument('--timeout', type=parse_duration, default=60.0, help='per-request timeout')
+    parser.add_argument('--manifest', default=os.environ.get('DATASET_MANIFEST'),
+                        help='perf.datagen manifest.json (users and quiz IDs)')
+    parser.add_argument('--login-ratio', type=float, default=0.0,
+                        help='share of journeys that log in explicitly instead of using the token pool')
+    parser.add_argument('--think-scale', type=float, default=1.0, help='multiplier for think times (0 = none)')
+    parser.add_argument('--no-raw', action='store_true', help='do not write raw-*.ndjson')
+    parser.add_argument('--body-samples', type=int, default=BODY_SAMPLES,
+                        help='response bodies sampled per endpoint into bodies-*.ndjson (0 = none)')
+    args = parser.parse_args()
+
+    try:
+        # Optional: uvloop lowers per-request client overhead when installed
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    name = f'{args.arch}-{args.scenario}'
+    recorder = Recorder(None if args.no_raw else f'raw-{name}.ndjson',
+                        f'bodies-{name}.ndjson' if args.body_samples > 0 else None, args.body_samples)
+    recorder.monitor = ClientMonitor(lambda: HttpClient.open_connections)
+    print(f"🚀 {args.scenario}: {args.vus} VUs for {args.duration:.0f}s against {args.base_url}")
+
+    async def run():
+        context = await journeys.prepare(args.scenario, args.base_url, args.vus, args.manifest,
+                                         think_scale=args.think_scale, timeout=args.timeout,
+                                         login_ratio=args.login_ratio)
+        started = time.monotonic()
+        recorder.monitor.start()
+        await run_closed(journeys.SCENARIOS[args.scenario], args.base_url, args.vus, args.duration,
+                         recorder, context, args.ramp_up, args.timeout)
+        await recorder.monitor.stop()
+        return time.monotonic() - started, context
+
+    elapsed, context = asyncio.run(run())
+    recorder.close()
+    recorder.write_bodies()
+    summary = recorder.summary(elapsed, {
+        'baseUrl': args.base_url,
+        'testName': args.arch,
+        'scenario': args.scenario,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'vus': args.vus,
+        'generator': 'perf.loadgen',
+        'dataset': context.dataset,
+    })
+    path = write_summary(summary, args.arch, args.scenario)
+    print_summary(summary)
+    print(f"\n  ✓ Saved: {path}" + ('' if args.no_raw else f" and raw-{name}.ndjson"))
+    health = recorder.monitor.report()
+    if health:
+        print(f"  {'⚠️ ' if health['bound_seconds'] else '✓'} {recommendation(health)}")
+    if recorder.bodies:
+        print(f"  ✓ Saved: {recorder.bodies_path} ({sum(map(len, recorder.bodies.values()))} sampled bodies)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load x Data-Size Matrix
+p95 latency and throughput surfaces over concurrent users x catalogue size
+
+run-matrix-tests.ps1 runs test-scenarios.js at several VU levels against
+several synthetic datasets (perf.datagen) and writes
+matrix/results-{arch}-{dataset}-{vus}vu.json plus the matching raw stream.
+The VU level and dataset size are read from testConfig (`vus`, `dataset`),
+not from the file name. Per-endpoint cells come from the raw stream when it
+exists, otherwise from tagged submetrics in the summary; the `all` endpoint
+is always the summary's http_req_duration / http_reqs.
+"""
+
+import glob
+import json
+import os
+import re
+
+import numpy as np
+
+from perf import k6stream, summary
+
+MATRIX_DIR = 'matrix'
+ALL_ENDPOINTS = 'all'
+
+# VU counts of the fixed scenarios, for results recorded before testConfig.vus
+SCENARIO_VUS = {'light_load': 5, 'medium_load': 20, 'heavy_load': 50}
+
+_SUBMETRIC = re.compile(r'^http_req_duration\{name:([^}]+)\}$')
+
+
+class MatrixCell:
+    """One measured (architecture, VUs, dataset) point"""
+
+    def __init__(self, architecture, vus, dataset, endpoints):
+        self.architecture = architecture
+        self.vus = vus
+        self.dataset = dataset
+        self.endpoints = endpoints
+
+    @property
+    def rows(self):
+        """Dataset size used for the data axis: number of quiz attempts"""
+        return self.dataset.get('attempts', 0)
+
+    @property
+    def label(self):
+        d = self.dataset
+        if not d:
+            return 'seed'
+        return f"{_short(d.get('quizzes', 0))} quizzes / {_short(d.get('attempts', 0))} attempts"
+
+
+def _short(n):
+    for unit, scale in (('M', 1e6), ('k', 1e3)):
+        if n >= scale:
+            return f'{n / scale:g}{unit}'
+    return str(n)
+
+
+def _summary_endpoints(data):
+    metrics = data.get('metrics', {})
+    duration = data.get('state', {}).get('testRunDurationMs', 0) / 1000
+    values = metrics.get('http_req_duration', {}).get('values', {})
+    endpoints = {ALL_ENDPOINTS: {
+        'p95': values.get('p(95)', 0),
+        'throughput': metrics.get('http_reqs', {}).get('values', {}).get('rate', 0),
+    }}
+    for name, metric in metrics.items():
+        match = _SUBMETRIC.match(name)
+        if match and duration:
+            endpoints[match.group(1)] = {
+                'p95': metric.get('values', {}).get('p(95)', 0),
+                'throughput': metric.get('values', {}).get('count', 0) / duration,
+            }
+    return endpoints
+
+
+def _raw_endpoints(path):
+    requests = k6stream.read_requests(path)
+    if not len(requests):
+        return {}
+    seconds = requests.duration_seconds
+    endpoints = {}
+    for code, label in enumerate(requests.endpoint_labels):
+        durations = requests.duration[requests.endpoint == code]
+        if len(durations):
+            endpoints[label] = {
+                'p95': float(np.percentile(durations, 95)),
+                'throughput': len(durations) / seconds,
+            }
+    return endpoints
+
+
+def load_cells(directory=MATRIX_DIR):
+    """Load every matrix result in a directory"""
+    cells = []
+    for path in sorted(glob.glob(os.path.join(directory, 'results-*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        config = data.get('testConfig', {})
+        vus = config.get('vus') or SCENARIO_VUS.get(config.get('scenario'))
+        if not vus:
+            vus = data.get('metrics', {}).get('vus_max', {}).get('values', {}).get('max')
+        architecture = config.get('testName') or summary.split_name(path)[0]
+        endpoints = _summary_endpoints(data)
+
+        raw = k6stream.raw_path(os.path.basename(path)[len('results-'):-len('.json')], directory)
+        if raw:
+            endpoints.update(_raw_endpoints(raw))
+
+        cells.append(MatrixCell(architecture, int(vus or 0), config.get('dataset') or {}, endpoints))
+    return cells
+
+
+def surface(cells, architecture, endpoint, metric):
+    """(vus_levels, dataset_cells, grid) with grid[dataset][vus]; NaN where not measured"""
+    cells = [c for c in cells if c.architecture == architecture and endpoint in c.endpoints]
+    vus_levels = sorted({c.vus for c in cells})
+    datasets = {}
+    for c in cells:
+        datasets.setdefault(c.rows, c)
+    sizes = sorted(datasets)
+    grid = np.full((len(sizes), len(vus_levels)), np.nan)
+    for c in cells:
+        grid[sizes.index(c.rows), vus_levels.index(c.vus)] = c.endpoints[endpoint][metric]
+    return vus_levels, [datasets[s] for s in sizes], grid
+
+
+def endpoints_of(cells, architecture):
+    names = {e for c in cells if c.architecture == architecture for e in c.endpoints}
+    return [ALL_ENDPOINTS] + sorted(names - {ALL_ENDPOINTS})
+
+
+def sensitivity(cells):
+    """p95 at the largest dataset / p95 at the smallest, per architecture, endpoint and VU level"""
+    result = {}
+    for architecture in sorted({c.architecture for c in cells}):
+        for endpoint in endpoints_of(cells, architecture):
+            vus_levels, datasets, grid = surface(cells, architecture, endpoint, 'p95')
+            if len(datasets) < 2:
+                continue
+            for i, vus in enumerate(vus_levels):
+                column = grid[:, i]
+                measured = np.flatnonzero(~np.isnan(column))
+                if len(measured) >= 2 and column[measured[0]] > 0:
+                    result[(architecture, endpoint, vus)] = {
+                        'smallest': datasets[measured[0]].label,
+                        'largest': datasets[measured[-1]].label,
+                        'p95_small': float(column[measured[0]]),
+                        'p95_large': float(column[measured[-1]]),
+                        'ratio': float(column[measured[-1]] / column[measured[0]]),
+                    }
+    return result
+
+
+def plot_matrix(cells, architecture, path):
+    """Heatmaps (p95, throughput) and a p95 contour plot per endpoint for one architecture"""
+    import matplotlib.pyplot as plt
+
+    endpoints = endpoints_of(cells, architecture)
+    fig, axes = plt.subplots(len(endpoints), 3, figsize=(18, 4.5 * len(endpoints)), squeeze=False)
+
+    for row, endpoint in zip(axes, endpoints):
+        vus_levels, datasets, p95 = surface(cells, architecture, endpoint, 'p95')
+        _, _, throughput = surface(cells, architecture, endpoint, 'throughput')
+        labels = [d.label for d in datasets]
+
+        for ax, grid, title, cmap, unit in ((row[0], p95, 'P95 Latency', 'YlOrRd', 'ms'),
+                                            (row[2], throughput, 'Throughput', 'YlGn', 'req/s')):
+            image = ax.imshow(grid, origin='lower', aspect='auto', cmap=cmap)
+            fig.colorbar(image, ax=ax, label=unit)
+            ax.set_xticks(range(len(vus_levels)), [str(v) for v in vus_levels])
+            ax.set_yticks(range(len(labels)), labels, fontsize=8)
+            for (i, j), value in np.ndenumerate(grid):
+                if not np.isnan(value):
+                    ax.text(j, i, f'{value:.0f}', ha='center', va='center', fontsize=8)
+            ax.set_title(f'{endpoint} - {title}', fontweight='bold')
+            ax.set_xlabel('Concurrent Users')
+
+        ax = row[1]
+        if p95.shape[0] >= 2 and p95.shape[1] >= 2 and not np.isnan(p95).any():
+            rows = [d.rows or 1 for d in datasets]
+            contour = ax.contourf(vus_levels, rows, p95, levels=12, cmap='YlOrRd')
+            lines = ax.contour(vus_levels, rows, p95, levels=contour.levels[::3], colors='k', linewidths=0.5)
+            ax.clabel(lines, fmt='%.0f ms', fontsize=7)
+            fig.colorbar(contour, ax=ax, label='ms')
+            ax.set_yscale('log')
+            ax.set_ylabel('Quiz Attempts')
+        else:
+            ax.text(0.5, 0.5, 'Contour needs a complete grid\n(>= 2 VU levels x 2 datasets)',
+                    ha='center', va='center', transform=ax.transAxes)
+        ax.set_title(f'{endpoint} - P95 Contours', fontweight='bold')
+        ax.set_xlabel('Concurrent Users')
+
+    fig.suptitle(f'{architecture.title()}: Load x Data Size', fontsize=16, fontweight='bold', y=1.01)
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def generate_html_section(cells, images):
+    """HTML report section: heatmap images and the data-size sensitivity table"""
+    html = """
+        <h2>🗺️ Load x Data Size</h2>
+        <p>P95 latency and throughput over concurrent users x synthetic dataset size
+        (perf/datagen.py). The ratio column compares p95 on the largest dataset with the smallest at the same load.</p>
+"""
+    for image in images:
+        html += f"""        <img src="{image}" alt="Load x Data Size Heatmaps">
+"""
+    rows = sensitivity(cells)
+    if rows:
+        html += """        <table>
+            <tr><th>Architecture</th><th>Endpoint</th><th>VUs</th><th>Smallest dataset</th><th>Largest dataset</th><th>P95 ratio</th></tr>
+"""
+        for (architecture, endpoint, vus), s in sorted(rows.items()):
+            css = 'worse' if s['ratio'] > 1.5 else ''
+            html += f"""            <tr><td>{architecture.title()}</td><td>{endpoint}</td><td>{vus}</td><td>{s['smallest']} ({s['p95_small']:.0f} ms)</td><td>{s['largest']} ({s['p95_large']:.0f} ms)</td><td class="{css}">{s['ratio']:.2f}x</td></tr>
+"""
+        html += """        </table>
+"""
+    return html
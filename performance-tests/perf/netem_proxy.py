@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Network-Conditions Emulating Proxy
+asyncio TCP reverse proxy that injects latency, jitter, bandwidth caps and loss
+
+Put it between k6 and a local backend so the monolith and the microservices
+simulation can be measured on one box under identical network conditions
+(the original comparison ran microservices on AWS and the monolith locally).
+It proxies at the TCP level, so HTTP keep-alive, chunked bodies and
+websockets pass through untouched and the proxy never parses requests.
+
+Each direction of a connection is an ordered pipe: a chunk read at time t is
+written at max(t + latency +/- jitter, link free + size / bandwidth,
+previous chunk). At most MAX_QUEUED_CHUNKS wait per direction; beyond that
+the proxy stops reading, so a slow emulated link pushes back on the sender
+through TCP flow control instead of buffering without bound. TCP never
+drops application data, so loss is emulated as a retransmission timeout
+added to the affected chunk. All randomness comes from a seeded generator
+per connection, so runs are reproducible. Each route can have its own link.
+
+Usage (from performance-tests/):
+    # monolith on :5000 seen through a 40 ms RTT link at :5050
+    python -m perf.netem_proxy --route 5050=localhost:5000 --latency 20 --jitter 2
+
+    # two hops: client -> gateway and gateway -> service
+    python -m perf.netem_proxy --route 8081=localhost:8080 --route 5101=localhost:5001 --latency 1
+
+    # a WAN hop to the gateway and a LAN hop behind it
+    python -m perf.netem_proxy --route 8081=localhost:8080,latency=20,jitter=2 --route 5101=localhost:5001,latency=0.2
+
+    # pass-through overhead: loopback request/response rounds with and without the proxy
+    python -m perf.netem_proxy --bench
+
+Set BASE_URL for k6 to the proxy port.
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import socket
+import statistics
+import sys
+import time
+
+READ_SIZE = 64 * 1024
+# Chunks held per direction before reading stops (backpressure to the sender);
+# 4 MB covers a 160 Mbit/s link at 200 ms
+MAX_QUEUED_CHUNKS = 64
+# Linux minimum TCP retransmission timeout
+DEFAULT_RTO_MS = 200.0
+# --bench: request / response sizes of one round (a small API call)
+BENCH_REQUEST_SIZE = 256
+BENCH_RESPONSE_SIZE = 2048
+
+
+class LinkProfile:
+    """One-way link characteristics applied to each direction of a connection"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, bandwidth_bps=0.0, loss=0.0,
+                 rto_ms=DEFAULT_RTO_MS):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.bytes_per_second = bandwidth_bps / 8
+        self.loss = loss
+        self.rto = rto_ms / 1000
+
+    @property
+    def passthrough(self):
+        return not (self.latency or self.jitter or self.bytes_per_second or self.loss)
+
+
+class Pipe:
+    """Ordered, shaped delivery of one direction of a connection"""
+
+    def __init__(self, profile, rng):
+        self.profile = profile
+        self.rng = rng
+        self.link_free = 0.0
+        self.last_delivery = 0.0
+
+    def delivery_time(self, now, size):
+        """Monotonic wall-clock time at which a chunk read at `now` may be written"""
+        p = self.profile
+        start = max(now, self.link_free)
+        if p.bytes_per_second:
+            self.link_free = start + size / p.bytes_per_second
+        else:
+            self.link_free = start
+        delay = p.latency
+        if p.jitter:
+            delay = max(0.0, self.rng.gauss(p.latency, p.jitter))
+        if p.loss and self.rng.random() < p.loss:
+            delay += p.rto
+        self.last_delivery = max(self.link_free + delay, self.last_delivery)
+        return self.last_delivery
+
+
+class ProxyStats:
+    def __init__(self):
+        self.connections = 0
+        self.active = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+
+
+async def _pump_direct(reader, writer, stats, attr):
+    """Unshaped copy loop - the fast path when no impairment is configured"""
+    while True:
+        data = await reader.read(READ_SIZE)
+        if not data:
+            break
+        setattr(stats, attr, getattr(stats, attr) + len(data))
+        writer.write(data)
+        await writer.drain()
+    _write_eof(writer)
+
+
+async def _pump_shaped(reader, writer, pipe, stats, attr):
+    """Copy loop that holds each chunk until its delivery time"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(MAX_QUEUED_CHUNKS)
+
+    async def deliver():
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    _write_eof(writer)
+                    break
+                due, data = item
+                wait = due - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                writer.write(data)
+                await writer.drain()
+        finally:
+            # Unblock a reader waiting on a full queue after a write failure
+            while not queue.empty():
+                queue.get_nowait()
+
+    sender = asyncio.create_task(deliver())
+    try:
+        while not sender.done():
+            data = await reader.read(READ_SIZE)
+            if not data:
+                break
+            setattr(stats, attr, getattr(stats, attr) + len(data))
+            # Waits while the queue is full, so a slow link stops reads from the sender
+            await queue.put((pipe.delivery_time(loop.time(), len(data)), data))
+        if not sender.done():
+            await queue.put(None)
+        await sender
+    finally:
+        sender.cancel()
+
+
+def _write_eof(writer):
+    """Half-close one direction; the other keeps flowing until its own EOF"""
+    try:
+        if writer.can_write_eof():
+            writer.write_eof()
+    except (OSError, RuntimeError):
+        pass
+
+
+class NetemProxy:
+    """Listens on one port and forwards every connection to a target"""
+
+    def __init__(self, listen_host, listen_port, target_host, target_port, profile, seed=1):
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.target_host = target_host
+        self.target_port = target_port
+        self.profile = profile
+        self.seed = seed
+        self.stats = ProxyStats()
+        self.server = None
+
+    async def _handle(self, client_reader, client_writer):
+        self.stats.connections += 1
+        self.stats.active += 1
+        connection = self.stats.connections
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(
+                self.target_host, self.target_port)
+        except OSError:
+            self.stats.active -= 1
+            client_writer.close()
+            return
+
+        if self.profile.passthrough:
+            pumps = [_pump_direct(client_reader, upstream_writer, self.stats, 'bytes_up'),
+                     _pump_direct(upstream_reader, client_writer, self.stats, 'bytes_down')]
+        else:
+            # Seed per connection and direction: same seed, same impairments
+            up = Pipe(self.profile, random.Random(f'{self.seed}:{connection}:up'))
+            down = Pipe(self.profile, random.Random(f'{self.seed}:{connection}:down'))
+            pumps = [_pump_shaped(client_reader, upstream_writer, up, self.stats, 'bytes_up'),
+                     _pump_shaped(upstream_reader, client_writer, down, self.stats, 'bytes_down')]
+        pumps = [asyncio.create_task(pump) for pump in pumps]
+        try:
+            # Both directions end with EOF (half-closes pass through); an error
+            # in one of them ends the connection
+            await asyncio.wait(pumps, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for pump in pumps:
+                pump.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+            client_writer.close()
+            upstream_writer.close()
+            self.stats.active -= 1
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self._handle, self.listen_host, self.listen_port, backlog=4096)
+        return self.server
+
+
+def parse_bandwidth(value):
+    """Parse '10mbit', '512kbit', '1gbit' or plain bits/second"""
+    if not value:
+        return 0.0
+    match = re.fullmatch(r'([\d.]+)\s*([kmg]?)(bit|bps)?', value.strip().lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f'invalid bandwidth: {value}')
+    scale = {'': 1, 'k': 1e3, 'm': 1e6, 'g': 1e9}[match.group(2)]
+    return float(match.group(1)) * scale
+
+
+ROUTE_OPTIONS = {
+    'latency': float,
+    'jitter': float,
+    'bandwidth': parse_bandwidth,
+    'loss': float,
+    'rto': float,
+}
+
+
+def parse_route(value):
+    """Parse 'LISTEN_PORT=TARGET_HOST:TARGET_PORT[,option=value...]'
+
+    Options (latency, jitter, bandwidth, loss, rto) override the global
+    flags for this route only. Returns (listen port, host, port, {option: value}).
+    """
+    try:
+        route, *options = value.split(',')
+        listen, target = route.split('=', 1)
+        host, port = target.rsplit(':', 1)
+        overrides = {}
+        for option in options:
+            key, raw = option.split('=', 1)
+            overrides[key.strip()] = ROUTE_OPTIONS[key.strip()](raw)
+        return int(listen), host, int(port), overrides
+    except (ValueError, KeyError):
+        raise argparse.ArgumentTypeError(
+            f'invalid route: {value} (expected 5050=localhost:5000[,latency=20,jitter=2,bandwidth=100mbit,'
+            f'loss=0.001,rto=200])')
+
+
+def describe(profile):
+    bandwidth = f"{profile.bytes_per_second * 8 / 1e6:g} Mbit/s" if profile.bytes_per_second else 'unlimited'
+    return (f"latency {profile.latency * 1000:g} ms ± {profile.jitter * 1000:g} ms, bandwidth {bandwidth}, "
+            f"loss {profile.loss * 100:.2f}%")
+
+
+async def serve(routes, listen_host='0.0.0.0', seed=1, report_every=10.0):
+    """Run one proxy per (listen port, target host, target port, LinkProfile) route"""
+    proxies = [NetemProxy(listen_host, listen, host, port, profile, seed)
+               for listen, host, port, profile in routes]
+    for proxy in proxies:
+        await proxy.start()
+        print(f"  ✓ :{proxy.listen_port} -> {proxy.target_host}:{proxy.target_port}  ({describe(proxy.profile)})")
+
+    started = time.monotonic()
+    while True:
+        await asyncio.sleep(report_every)
+        elapsed = time.monotonic() - started
+        for proxy in proxies:
+            s = proxy.stats
+            print(f"  [{elapsed:7.0f}s] :{proxy.listen_port}  conns {s.connections} (active {s.active})  "
+                  f"up {s.bytes_up / 1024 / 1024:.1f} MB  down {s.bytes_down / 1024 / 1024:.1f} MB")
+
+
+async def _bench_server(reader, writer):
+    """Answers every BENCH_REQUEST_SIZE bytes with BENCH_RESPONSE_SIZE bytes"""
+    response = b'x' * BENCH_RESPONSE_SIZE
+    try:
+        while True:
+            await reader.readexactly(BENCH_REQUEST_SIZE)
+            writer.write(response)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    writer.close()
+
+
+async def _bench_load(port, connections, rounds):
+    """(rounds/second, [round-trip seconds]) for `connections` keep-alive clients"""
+    request = b'r' * BENCH_REQUEST_SIZE
+    latencies = []
+
+    async def client():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for _ in range(rounds // connections):
+            sent = time.perf_counter()
+            writer.write(request)
+            await reader.readexactly(BENCH_RESPONSE_SIZE)
+            latencies.append(time.perf_counter() - sent)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return len(latencies) / (time.perf_counter() - started), latencies
+
+
+async def bench(connections=50, rounds=20000):
+    """Loopback request/response rounds, direct and through a pass-through proxy process
+
+    One sequential connection gives the latency of the extra hop; `connections`
+    concurrent ones give the throughput. The proxy runs in its own
+    interpreter, as in real use, so on a single core it competes with this
+    process's client and backend and the concurrent numbers are a lower bound.
+    """
+    backend = await asyncio.start_server(_bench_server, '127.0.0.1', 0)
+    backend_port = backend.sockets[0].getsockname()[1]
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        proxy_port = s.getsockname()[1]
+    proxy = await asyncio.create_subprocess_exec(
+        sys.executable, '-m', 'perf.netem_proxy', '--route', f'{proxy_port}=127.0.0.1:{backend_port}',
+        '--listen-host', '127.0.0.1', stdout=asyncio.subprocess.DEVNULL)
+    results = {}
+    try:
+        for _ in range(100):
+            try:
+                _, writer = await asyncio.open_connection('127.0.0.1', proxy_port)
+                writer.close()
+                break
+            except OSError:
+                await asyncio.sleep(0.05)
+        await _bench_load(proxy_port, connections, rounds // 10)  # warm-up
+        for clients, n in ((1, rounds // 10), (connections, rounds)):
+            for name, port in (('direct', backend_port), ('proxied', proxy_port)):
+                rate, latencies = await _bench_load(port, clients, n)
+                cuts = statistics.quantiles(latencies, n=100)
+                results[clients, name] = (rate, cuts[49] * 1000, cuts[98] * 1000)
+    finally:
+        proxy.terminate()
+        await proxy.wait()
+        backend.close()
+
+    print(f"\n  Rounds of {BENCH_REQUEST_SIZE} B -> {BENCH_RESPONSE_SIZE} B over loopback")
+    print(f"  {'connections':<12} {'':<8} {'rounds/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for (clients, name), (rate, p50, p99) in results.items():
+        print(f"  {clients:<12} {name:<8} {rate:>10,.0f} {p50:>8.3f} {p99:>8.3f}")
+    hop = (results[1, 'proxied'][1] - results[1, 'direct'][1]) * 1000
+    share = results[connections, 'proxied'][0] / results[connections, 'direct'][0]
+    print(f"  Proxy hop: +{hop:.0f} µs median unloaded; {share * 100:.0f}% of direct throughput "
+          f"at {connections} connections")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TCP reverse proxy with emulated network conditions')
+    parser.add_argument('--route', action='append', type=parse_route, default=[],
+                        help='LISTEN_PORT=TARGET_HOST:TARGET_PORT[,latency=MS,jitter=MS,bandwidth=RATE,loss=P,rto=MS] '
+                             '(repeatable, one per hop; options override the flags below for that route)')
+    parser.add_argument('--listen-host', default='0.0.0.0')
+    parser.add_argument('--latency', type=float, default=0.0, help='one-way latency per direction (ms)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='latency standard deviation (ms)')
+    parser.add_argument('--bandwidth', type=parse_bandwidth, default=0.0, help='e.g. 100mbit (default: unlimited)')
+    parser.add_argument('--loss', type=float, default=0.0, help='chunk loss probability (0-1)')
+    parser.add_argument('--rto', type=float, default=DEFAULT_RTO_MS, help='retransmission penalty per loss (ms)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--bench', action='store_true', help='measure the pass-through overhead on loopback and exit')
+    args = parser.parse_args()
+    if not args.route and not args.bench:
+        parser.error('at least one --route is required')
+
+    defaults = {'latency': args.latency, 'jitter': args.jitter, 'bandwidth': args.bandwidth,
+                'loss': args.loss, 'rto': args.rto}
+    routes = []
+    for listen, host, port, overrides in args.route:
+        link = {**defaults, **overrides}
+        routes.append((listen, host, port, LinkProfile(link['latency'], link['jitter'], link['bandwidth'],
+                                                       link['loss'], link['rto'])))
+
+    try:
+        # Optional: uvloop roughly halves per-chunk overhead when installed
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    if args.bench:
+        print("🌐 Network emulation proxy: pass-through benchmark")
+        asyncio.run(bench())
+        return
+
+    print("🌐 Network emulation proxy")
+    try:
+        asyncio.run(serve(routes, args.listen_host, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
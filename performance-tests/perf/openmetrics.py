@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OpenMetrics Exporter
+Serves live and stored load-test metrics for Prometheus / Grafana
+
+A small asyncio HTTP server exposes GET /metrics in the Prometheus text
+format, or OpenMetrics when the scraper asks for
+application/openmetrics-text. Two sources:
+
+    live     raw-*.ndjson streams in the working directory, followed as
+             k6 / perf.loadgen write them (perf.watch's tailer): request
+             and failure counters and a latency histogram per endpoint,
+             plus rolling throughput, error ratio and p95 / p99 per run
+    stored   the latest results-*.json per architecture and scenario:
+             avg / median / p95 / p99 / max latency, throughput, error
+             ratio, goodput, VUs and run duration
+
+Ingestion bumps a version number; the exposition text is rendered at most
+once per version and format, so a scrape of unchanged data only copies
+cached bytes. Rolling gauges are refreshed once per second.
+
+Usage (from performance-tests/):
+    python -m perf.openmetrics --port 9464
+
+    # prometheus.yml
+    scrape_configs:
+      - job_name: quizhub-loadtest
+        static_configs: [{targets: ['localhost:9464']}]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+from datetime import datetime
+
+from perf import summary
+from perf.k6stream import endpoint_of, find_raw_results, iter_points
+from perf.watch import RollingStats, request_failed, tail_lines
+
+PREFIX = 'quizhub_loadtest'
+# Histogram bucket bounds (seconds), k6-friendly latency range
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DISCOVERY_SECONDS = 2.0
+RESULTS_PATTERN = 'results-*.json'
+
+PROMETHEUS_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+
+class EndpointSeries:
+    __slots__ = ('requests', 'failed', 'buckets', 'sum')
+
+    def __init__(self):
+        self.requests = 0
+        self.failed = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+    def add(self, seconds, failed):
+        self.requests += 1
+        self.failed += failed
+        self.sum += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+
+class LiveRun:
+    """Counters of one raw stream being written"""
+
+    def __init__(self, window):
+        self.endpoints = {}
+        self.rolling = RollingStats(window)
+        self.last_sample = 0.0
+
+    def add(self, epoch, duration_ms, tags):
+        failed = request_failed(tags)
+        series = self.endpoints.get(endpoint_of(tags))
+        if series is None:
+            series = self.endpoints[endpoint_of(tags)] = EndpointSeries()
+        series.add(duration_ms / 1000, failed)
+        self.rolling.add(epoch, duration_ms, failed)
+        self.last_sample = max(self.last_sample, epoch)
+
+
+class MetricsStore:
+    """Live runs and stored results, with a version-keyed render cache"""
+
+    def __init__(self, window=30):
+        self.window = window
+        self.live = {}
+        self.results = {}
+        self.version = 0
+        self._cache = {}
+
+    def changed(self):
+        self.version += 1
+
+    def reset_live(self, key):
+        self.live[key] = LiveRun(self.window)
+        self.changed()
+        return self.live[key]
+
+    def load_results(self, pattern=RESULTS_PATTERN):
+        """Reload results files whose modification time changed"""
+        for path in glob.glob(pattern):
+            mtime = os.path.getmtime(path)
+            known = self.results.get(path)
+            if known and known[0] == mtime:
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # being written
+            self.results[path] = (mtime, data)
+            self.changed()
+
+    def latest_results(self):
+        """{(architecture, scenario): data}, newest file per pair"""
+        latest = {}
+        for path, (mtime, data) in self.results.items():
+            config = data.get('testConfig', {})
+            architecture, scenario = summary.split_name(path, config.get('testName'))
+            key = (config.get('testName') or architecture, config.get('scenario') or scenario)
+            if key not in latest or mtime > latest[key][0]:
+                latest[key] = (mtime, data)
+        return {key: data for key, (_, data) in latest.items()}
+
+    def render(self, openmetrics=False):
+        """Exposition text; rendered once per data version and format"""
+        key = (self.version, openmetrics)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = render(self, openmetrics).encode('utf-8')
+            self._cache = {key: cached}
+        return cached
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(store, openmetrics=False):
+    """Prometheus text format 0.0.4, or OpenMetrics 1.0"""
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+        lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+        for suffix, labels, value in samples:
+            lines.append(f'{PREFIX}_{name}{suffix}{_labels(**labels)} {_number(value)}')
+
+    # OpenMetrics names the counter family without _total; Prometheus text names it with
+    total = '' if openmetrics else '_total'
+    sample_total = '_total' if openmetrics else ''
+    requests, failures, histogram = [], [], []
+    rolling = {k: [] for k in ('rps', 'error_ratio', 'p95_seconds', 'p99_seconds', 'last_sample_timestamp_seconds')}
+    for (architecture, scenario), run in sorted(store.live.items()):
+        run_labels = {'architecture': architecture, 'scenario': scenario}
+        for endpoint, s in sorted(run.endpoints.items()):
+            labels = {**run_labels, 'endpoint': endpoint}
+            requests.append((sample_total, labels, s.requests))
+            failures.append((sample_total, labels, s.failed))
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float('inf'),), s.buckets):
+                cumulative += n
+                histogram.append(('_bucket', {**labels, 'le': _number(bound)}, cumulative))
+            histogram.append(('_count', labels, s.requests))
+            histogram.append(('_sum', labels, s.sum))
+        snapshot = run.rolling.snapshot()
+        rolling['rps'].append(('', run_labels, snapshot['rate']))
+        rolling['error_ratio'].append(('', run_labels, snapshot['error_rate']))
+        rolling['p95_seconds'].append(('', run_labels, snapshot['p95'] / 1000))
+        rolling['p99_seconds'].append(('', run_labels, snapshot['p99'] / 1000))
+        rolling['last_sample_timestamp_seconds'].append(('', run_labels, run.last_sample))
+
+    family(f'http_requests{total}', 'counter', 'Requests seen in the live raw stream', requests)
+    family(f'http_request_failures{total}', 'counter', 'Failed requests in the live raw stream', failures)
+    family('http_request_duration_seconds', 'histogram', 'Request latency in the live raw stream', histogram)
+    family('rolling_rps', 'gauge', f'Requests per second over the last {store.window}s', rolling['rps'])
+    family('rolling_error_ratio', 'gauge', f'Failed share over the last {store.window}s', rolling['error_ratio'])
+    family('rolling_p95_seconds', 'gauge', f'p95 latency over the last {store.window}s', rolling['p95_seconds'])
+    family('rolling_p99_seconds', 'gauge', f'p99 latency over the last {store.window}s', rolling['p99_seconds'])
+    family('last_sample_timestamp_seconds', 'gauge', 'Time of the newest request in the live stream',
+           rolling['last_sample_timestamp_seconds'])
+
+    stored = {k: [] for k in ('duration', 'rps', 'error', 'goodput', 'vus', 'run', 'timestamp')}
+    for (architecture, scenario), data in sorted(store.latest_results().items()):
+        labels = {'architecture': architecture, 'scenario': scenario}
+        metrics = data.get('metrics', {})
+        d = metrics.get('http_req_duration', {}).get('values', {})
+        for stat, key in (('avg', 'avg'), ('med', 'med'), ('p95', 'p(95)'), ('p99', 'p(99)'), ('max', 'max')):
+            if key in d:
+                stored['duration'].append(('', {**labels, 'stat': stat}, d[key] / 1000))
+        stored['rps'].append(('', labels, metrics.get('http_reqs', {}).get('values', {}).get('rate', 0)))
+        stored['error'].append(('', labels, metrics.get('http_req_failed', {}).get('values', {}).get('rate', 0)))
+        if 'useful_requests' in metrics:
+            stored['goodput'].append(('', labels, metrics['useful_requests']['values'].get('rate', 0)))
+        config = data.get('testConfig', {})
+        vus = config.get('vus') or metrics.get('vus_max', {}).get('values', {}).get('max')
+        if vus:
+            stored['vus'].append(('', labels, vus))
+        stored['run'].append(('', labels, data.get('state', {}).get('testRunDurationMs', 0) / 1000))
+        try:
+            stamp = datetime.fromisoformat(config['timestamp'].replace('Z', '+00:00')).timestamp()
+            stored['timestamp'].append(('', labels, stamp))
+        except (KeyError, ValueError, AttributeError):
+            pass
+
+    family('result_http_req_duration_seconds', 'gauge', 'Latency statistic of the latest stored run',
+           stored['duration'])
+    family('result_http_reqs_per_second', 'gauge', 'Throughput of the latest stored run', stored['rps'])
+    family('result_error_ratio', 'gauge', 'http_req_failed rate of the latest stored run', stored['error'])
+    family('result_goodput_per_second', 'gauge', 'useful_requests rate of the latest stored run', stored['goodput'])
+    family('result_vus', 'gauge', 'Virtual users of the latest stored run', stored['vus'])
+    family('result_run_duration_seconds', 'gauge', 'Length of the latest stored run', stored['run'])
+    family('result_timestamp_seconds', 'gauge', 'Start time of the latest stored run', stored['timestamp'])
+
+    if openmetrics:
+        lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+
+async def follow(store, key, path):
+    """Tail one raw stream into the store; returns when the file is replaced by a new run"""
+    run = store.reset_live(key)
+    stat = os.stat(path)
+    identity, size = stat.st_ino, [stat.st_size]
+
+    def replaced():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return True
+        shrunk, size[0] = stat.st_size < size[0], stat.st_size
+        return stat.st_ino != identity or shrunk
+
+    async for lines in tail_lines(path, replaced):
+        for _, epoch, value, tags in iter_points(lines, metrics=('http_req_duration',)):
+            run.add(epoch, value, tags)
+        store.changed()
+
+
+async def ingest(store, results_pattern=RESULTS_PATTERN):
+    """Discover raw streams and result files, following each live stream"""
+    followers = {}
+    while True:
+        store.load_results(results_pattern)
+        for key, path in find_raw_results().items():
+            if not path.endswith('.ndjson'):
+                continue  # compressed streams and archives are not live
+            task = followers.get(key)
+            if task is None or task.done():
+                followers[key] = asyncio.get_running_loop().create_task(follow(store, key, path))
+        await asyncio.sleep(DISCOVERY_SECONDS)
+
+
+async def refresh(store):
+    # Rolling gauges move with the clock even without new data
+    while True:
+        await asyncio.sleep(1)
+        if store.live:
+            store.changed()
+
+
+async def handle(store, reader, writer):
+    """Minimal HTTP/1.1: GET /metrics, keep-alive"""
+    try:
+        while True:
+            request = await reader.readuntil(b'\r\n\r\n')
+            head = request.decode('latin-1').split('\r\n')
+            method, path = (head[0].split(' ') + ['', ''])[:2]
+            headers = {k.strip().lower(): v.strip() for k, _, v in (h.partition(':') for h in head[1:] if h)}
+            if method not in ('GET', 'HEAD'):
+                status, content_type, body = '405 Method Not Allowed', 'text/plain', b'GET only\n'
+            elif path.split('?')[0] == '/metrics':
+                openmetrics = 'application/openmetrics-text' in headers.get('accept', '')
+                status = '200 OK'
+                content_type = OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE
+                body = store.render(openmetrics)
+            elif path == '/':
+                status, content_type, body = '200 OK', 'text/html', b'<a href="/metrics">/metrics</a>\n'
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', b'not found\n'
+            writer.write(f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                         f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1'))
+            if method != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+            if headers.get('connection', '').lower() == 'close':
+                break
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port, window=30, results_pattern=RESULTS_PATTERN):
+    store = MetricsStore(window)
+    server = await asyncio.start_server(lambda r, w: handle(store, r, w), host, port)
+    print(f"📡 Serving http://{host}:{port}/metrics (Ctrl+C to stop)")
+    async with server:
+        await asyncio.gather(server.serve_forever(), ingest(store, results_pattern), refresh(store))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OpenMetrics / Prometheus endpoint for load-test metrics')
+    parser.add_argument('--host', default='127.0.0.1', help='bind address (0.0.0.0 for a remote Prometheus)')
+    parser.add_argument('--port', type=int, default=9464)
+    parser.add_argument('--window', type=int, default=30, help='rolling window (seconds)')
+    parser.add_argument('--results', default=RESULTS_PATTERN, help='glob of stored results to expose')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.window, args.results))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Response Payload Analysis
+Bytes per request, JSON size distribution and simulated compression savings
+
+k6 only reports `data_received` as a total. GET /api/quiz returns a
+PaginatedResponse with nested category and creator data and
+GET /api/quiz/{id} carries every question and answer, so payload size is
+a per-endpoint property. perf.loadgen records a `response_size` trend per
+endpoint and samples 2xx bodies into bodies-{arch}-{scenario}.ndjson (it
+requests `Accept-Encoding: identity`, so the bodies are uncompressed).
+
+For every sampled body this module measures:
+    gzip / brotli size and compression time, at the levels ASP.NET Core
+    ResponseCompression maps CompressionLevel.Fastest / Optimal to
+    (brotli only if the `brotli` package is installed)
+    JSON parse / serialize time and node count - Python's json module, so
+    a relative cost per endpoint rather than System.Text.Json's time
+    bytes per JSON field path, to show which DTO members dominate
+
+Savings are projected onto the measured request rate (bandwidth) and onto
+LINK_MBPS (transfer time per response).
+
+Usage (from performance-tests/):
+    python -m perf.payload [bodies-monolith-journey.ndjson ...]
+"""
+
+import glob
+import gzip
+import json
+import os
+import sys
+import time
+
+from perf.summary import split_name
+
+try:
+    # Optional: brotli savings are skipped when the package is not installed
+    import brotli
+except ImportError:
+    brotli = None
+
+BODIES_PATTERN = 'bodies-*.ndjson'
+# Link used to turn saved bytes into saved transfer time
+LINK_MBPS = 100
+# Field paths listed per endpoint, and how deep the breakdown goes
+TOP_FIELDS = 5
+FIELD_DEPTH = 4
+
+# (label, compress) for gzip level 1 / 6 and brotli quality 1 / 4
+CODECS = [
+    ('gzip fastest', lambda b: gzip.compress(b, 1)),
+    ('gzip optimal', lambda b: gzip.compress(b, 6)),
+]
+if brotli is not None:
+    CODECS += [
+        ('brotli fastest', lambda b: brotli.compress(b, quality=1)),
+        ('brotli optimal', lambda b: brotli.compress(b, quality=4)),
+    ]
+
+
+def find_bodies(pattern=BODIES_PATTERN):
+    """Map (architecture, scenario) -> bodies-*.ndjson path"""
+    found = {}
+    for path in sorted(glob.glob(pattern)):
+        architecture, scenario = split_name(path)
+        if architecture:
+            found[(architecture, scenario)] = path
+    return found
+
+
+def read_bodies(path):
+    """{endpoint: [body bytes]} from a bodies-*.ndjson file"""
+    bodies = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                sample = json.loads(line)
+                bodies.setdefault(sample['name'], []).append(sample['body'].encode('utf-8'))
+    return bodies
+
+
+def _timed_ms(fn, arg, size):
+    # Repeat small bodies so the timer resolution does not dominate
+    repeat = max(1, min(50, 200_000 // max(size, 1)))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(arg)
+    return (time.perf_counter() - started) * 1000 / repeat, result
+
+
+def _nodes(value):
+    if isinstance(value, dict):
+        return 1 + sum(_nodes(v) for v in value.values())
+    if isinstance(value, list):
+        return 1 + sum(_nodes(v) for v in value)
+    return 1
+
+
+def field_bytes(value, path='', depth=FIELD_DEPTH, totals=None):
+    """Serialized bytes attributed to each field path; array items collapse into `[]`"""
+    totals = {} if totals is None else totals
+    if depth == 0:
+        return totals
+    if isinstance(value, dict):
+        for key, child in value.items():
+            child_path = f'{path}.{key}' if path else key
+            totals[child_path] = totals.get(child_path, 0) + len(json.dumps(child, separators=(',', ':')))
+            field_bytes(child, child_path, depth - 1, totals)
+    elif isinstance(value, list):
+        for child in value:
+            field_bytes(child, f'{path}[]', depth, totals)
+    return totals
+
+
+def measure(body):
+    """Compression, serialization and structure figures for one body"""
+    size = len(body)
+    result = {'bytes': size, 'codecs': {}}
+    for label, compress in CODECS:
+        ms, compressed = _timed_ms(compress, body, size)
+        result['codecs'][label] = {'bytes': len(compressed), 'ms': ms}
+    try:
+        parse_ms, document = _timed_ms(json.loads, body, size)
+    except ValueError:
+        return result
+    result['parse_ms'] = parse_ms
+    result['serialize_ms'], _ = _timed_ms(lambda d: json.dumps(d, separators=(',', ':')), document, size)
+    result['nodes'] = _nodes(document)
+    result['fields'] = field_bytes(document)
+    return result
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def analyze_endpoint(bodies, size_values=None, rate=0.0, link_mbps=LINK_MBPS):
+    """Aggregate measure() over an endpoint's samples
+
+    `size_values` is the endpoint's response_size trend from the summary
+    (every response, not only the samples); `rate` its requests per second.
+    """
+    measured = [measure(b) for b in bodies]
+    sizes = [m['bytes'] for m in measured]
+    if size_values:
+        size = {'avg': size_values['avg'], 'p50': size_values['med'], 'p95': size_values['p(95)'],
+                'max': size_values['max'], 'count': size_values.get('count', len(sizes))}
+    else:
+        size = {'avg': _mean(sizes), 'p50': _percentile(sizes, 50), 'p95': _percentile(sizes, 95),
+                'max': max(sizes), 'count': len(sizes)}
+
+    raw_total = sum(sizes) or 1
+    codecs = {}
+    for label, _ in CODECS:
+        compressed = sum(m['codecs'][label]['bytes'] for m in measured)
+        ratio = compressed / raw_total
+        saved = size['avg'] * (1 - ratio)
+        codecs[label] = {
+            'ratio': ratio,
+            'saved_bytes': saved,
+            'compress_ms': _mean([m['codecs'][label]['ms'] for m in measured]),
+            'bandwidth_saved_kbps': saved * rate * 8 / 1000,
+            'transfer_saved_ms': saved * 8 / (link_mbps * 1e6) * 1000,
+        }
+
+    documents = [m for m in measured if 'fields' in m]
+    fields = {}
+    for m in documents:
+        for path, n in m['fields'].items():
+            fields[path] = fields.get(path, 0) + n
+    top = sorted(fields.items(), key=lambda item: -item[1])
+    # Keep the most specific paths: drop a parent if a child accounts for most of it
+    leaves = [(p, n) for p, n in top
+              if not any(q.startswith((p + '.', p + '[]')) and m >= 0.8 * n for q, m in top)]
+    return {
+        'samples': len(measured),
+        'sizes': sizes,
+        'size': size,
+        'rate': rate,
+        'codecs': codecs,
+        'parse_ms': _mean([m['parse_ms'] for m in documents]),
+        'serialize_ms': _mean([m['serialize_ms'] for m in documents]),
+        'nodes': _mean([m['nodes'] for m in documents]),
+        'fields': [(p, n / raw_total) for p, n in leaves[:TOP_FIELDS]],
+    }
+
+
+def analyze(bodies, summary=None, link_mbps=LINK_MBPS):
+    """{endpoint: analyze_endpoint(...)} for one run; `summary` is its handleSummary JSON"""
+    metrics = (summary or {}).get('metrics', {})
+    seconds = (summary or {}).get('state', {}).get('testRunDurationMs', 0) / 1000
+    result = {}
+    for endpoint, samples in sorted(bodies.items()):
+        size_values = metrics.get(f'response_size{{name:{endpoint}}}', {}).get('values')
+        rate = size_values.get('count', 0) / seconds if size_values and seconds else 0.0
+        result[endpoint] = analyze_endpoint(samples, size_values, rate, link_mbps)
+    return result
+
+
+def plot_payloads(payloads, path):
+    """Mean size raw vs compressed, and sampled size distribution, per run and endpoint"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    runs = sorted(payloads.items())
+    fig, axes = plt.subplots(len(runs), 2, figsize=(16, 4.5 * len(runs)), squeeze=False)
+    for (left, right), ((architecture, scenario), endpoints) in zip(axes, runs):
+        names = list(endpoints)
+        x = np.arange(len(names))
+        series = [('raw', [e['size']['avg'] for e in endpoints.values()])]
+        series += [(label, [e['size']['avg'] * e['codecs'][label]['ratio'] for e in endpoints.values()])
+                   for label, _ in CODECS]
+        width = 0.8 / len(series)
+        for i, (label, values) in enumerate(series):
+            left.bar(x + (i - (len(series) - 1) / 2) * width, np.array(values) / 1024, width, label=label)
+        left.set_xticks(x, names, rotation=30, ha='right', fontsize=8)
+        left.set_ylabel('Mean Response Size (KB)')
+        left.set_title(f"{architecture.title()} - {scenario.replace('_', ' ').title()}: Compression",
+                       fontweight='bold')
+        left.legend(fontsize=8)
+        left.grid(True, alpha=0.3, axis='y')
+
+        right.boxplot([np.array(e['sizes']) / 1024 for e in endpoints.values()])
+        right.set_xticks(x + 1, names, rotation=30, ha='right', fontsize=8)
+        right.set_yscale('log')
+        right.set_ylabel('Response Size (KB)')
+        right.set_title('Sampled Size Distribution', fontweight='bold')
+        right.grid(True, alpha=0.3, axis='y')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def generate_html_section(payloads):
+    """HTML report section for {(architecture, scenario): analyze(...)}"""
+    best = CODECS[-1][0]
+    html = f"""
+        <h2>📦 Response Payloads</h2>
+        <p>Response sizes per endpoint from perf.loadgen, with compression simulated on sampled bodies
+        (gzip level 1 / 6{', brotli quality 1 / 4' if brotli is not None else '; install <code>brotli</code> for brotli'}).
+        Savings use {best}; transfer time assumes a {LINK_MBPS} Mbit/s link. Parse / serialize times are
+        Python's json module: compare endpoints, not absolute server cost.</p>
+        <img src="graph-payload.png" alt="Response Payloads">
+        <table>
+            <tr><th>Run</th><th>Endpoint</th><th>Avg / P95 size</th>{''.join(f'<th>{label}</th>' for label, _ in CODECS)}<th>Saved per response</th><th>Bandwidth saved</th><th>Parse / serialize</th><th>Largest fields</th></tr>
+"""
+    for (architecture, scenario), endpoints in sorted(payloads.items()):
+        for endpoint, e in endpoints.items():
+            codecs = e['codecs']
+            ratios = ''.join(f"<td>{(1 - c['ratio']) * 100:.0f}% ({c['compress_ms']:.2f} ms)</td>"
+                             for c in codecs.values())
+            fields = '<br>'.join(f'{p} {share * 100:.0f}%' for p, share in e['fields'])
+            html += f"""            <tr><td>{architecture.title()} - {scenario.replace('_', ' ').title()}</td><td>{endpoint}</td><td>{e['size']['avg'] / 1024:.1f} / {e['size']['p95'] / 1024:.1f} KB</td>{ratios}<td>{codecs[best]['saved_bytes'] / 1024:.1f} KB, {codecs[best]['transfer_saved_ms']:.2f} ms</td><td>{codecs[best]['bandwidth_saved_kbps']:.0f} kbit/s</td><td>{e['parse_ms']:.2f} / {e['serialize_ms']:.2f} ms</td><td>{fields}</td></tr>
+"""
+    html += """        </table>
+"""
+    return html
+
+
+def main():
+    paths = sys.argv[1:] or sorted(find_bodies().values())
+    if not paths:
+        print(f"❌ No {BODIES_PATTERN} files - run perf.loadgen first")
+        return
+    for path in paths:
+        summary_path = path.replace('bodies-', 'results-', 1).replace('.ndjson', '.json')
+        summary = None
+        if os.path.exists(summary_path):
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+        print(f"\n📦 {path}")
+        print(f"  {'Endpoint':<24} {'avg KB':>8} {'p95 KB':>8} " + ' '.join(f'{label:>15}' for label, _ in CODECS)
+              + f" {'parse ms':>9} {'ser. ms':>8}")
+        for endpoint, e in analyze(read_bodies(path), summary).items():
+            savings = ' '.join(f"{(1 - c['ratio']) * 100:>14.0f}%" for c in e['codecs'].values())
+            print(f"  {endpoint:<24} {e['size']['avg'] / 1024:>8.1f} {e['size']['p95'] / 1024:>8.1f} {savings}"
+                  f" {e['parse_ms']:>9.3f} {e['serialize_ms']:>8.3f}")
+            for field, share in e['fields']:
+                print(f"      {field:<40} {share * 100:>5.1f}%")
+
+
+if __name__ == '__main__':
+    main()
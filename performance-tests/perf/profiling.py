@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analysis Profiling
+Per-stage wall time, CPU time, allocations and peak memory for the analysis scripts
+
+On raw streams and long runs it is not obvious whether loading, metric
+extraction, matplotlib layout or PNG encoding dominates. `--profile` on
+analyze-results.py, generate-graphs.py and quick-summary.py runs the script
+inside a session that records:
+
+    spans       every public analyzer / generator method (and the named
+                steps of quick-summary) plus matplotlib's tight_layout,
+                Figure.draw, the Agg render and PNG encoding inside savefig;
+                each with wall time, CPU time, net allocated blocks / MB
+                (sys.getallocatedblocks, tracemalloc) and peak traced MB
+    functions   cProfile for the whole run, saved as {prefix}.prof
+                (pstats / snakeviz) with the top functions printed
+
+The spans are written as {prefix}-timeline.json in the Chrome trace event
+format (open in chrome://tracing or https://ui.perfetto.dev). tracemalloc
+and cProfile slow Python code down by roughly 2-3x; compare the shares of
+the stages, not the absolute times against an unprofiled run.
+
+Usage (from performance-tests/):
+    python analyze-results.py --profile                 # profile-analyze.prof, profile-analyze-timeline.json
+    python generate-graphs.py --profile profile-graphs
+    python -m pstats profile-analyze.prof
+"""
+
+import functools
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 5
+# (owner module, attribute path, span name): matplotlib's figure pipeline, split into
+# layout (tight_layout and the bbox_inches='tight' pre-draw), render and PNG encoding
+MATPLOTLIB_SPANS = [
+    ('matplotlib.figure', 'Figure.savefig', 'savefig'),
+    ('matplotlib.figure', 'Figure.tight_layout', 'layout'),
+    ('matplotlib.figure', 'Figure.draw', 'figure draw'),
+    ('matplotlib.backends.backend_agg', 'FigureCanvasAgg.draw', 'agg render'),
+    ('matplotlib.image', 'imsave', 'png encode'),
+]
+
+
+class _Span:
+    __slots__ = ('name', 'category', 'path', 'start', 'cpu', 'blocks', 'traced', 'peak', 'children_s',
+                 'wall_s', 'cpu_s', 'net_blocks', 'net_mb', 'peak_mb')
+
+    def __init__(self, name, category, path):
+        self.name = name
+        self.category = category
+        self.path = path
+        self.peak = 0
+        self.children_s = 0.0
+
+
+class Profiler:
+    """Nested spans plus one cProfile / tracemalloc session for a whole run"""
+
+    def __init__(self, prefix, name):
+        self.prefix = prefix
+        self.name = name
+        self.spans = []
+        self._stack = []
+        self._patches = []
+        self._profile = None
+        self._origin = None
+        self.snapshot = None
+
+    def start(self):
+        import cProfile
+        import tracemalloc
+
+        self._origin = time.perf_counter()
+        tracemalloc.start()
+        self._patch_matplotlib()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self):
+        import tracemalloc
+
+        self._profile.disable()
+        for owner, attribute, original in reversed(self._patches):
+            setattr(owner, attribute, original)
+        self._patches = []
+        self.snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    @contextmanager
+    def span(self, name, category='stage'):
+        import tracemalloc
+
+        span = _Span(name, category, (self._stack[-1].path if self._stack else ()) + (name,))
+        if self._stack:
+            # The parent keeps the peak reached so far; the child starts from a fresh peak
+            parent = self._stack[-1]
+            parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._stack.append(span)
+        span.traced = tracemalloc.get_traced_memory()[0]
+        span.blocks = sys.getallocatedblocks()
+        span.cpu = time.process_time()
+        span.start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.wall_s = time.perf_counter() - span.start
+            span.cpu_s = time.process_time() - span.cpu
+            span.net_blocks = sys.getallocatedblocks() - span.blocks
+            traced, peak = tracemalloc.get_traced_memory()
+            span.net_mb = (traced - span.traced) / (1024 * 1024)
+            span.peak = max(span.peak, peak)
+            span.peak_mb = span.peak / (1024 * 1024)
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, span.peak)
+                self._stack[-1].children_s += span.wall_s
+            tracemalloc.reset_peak()
+            self.spans.append(span)
+
+    def wrap(self, function, name, category='stage'):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.span(name, category):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, target, names=None):
+        """Trace calls to the public methods of an object, or to `names` in a module namespace dict"""
+        if isinstance(target, dict):
+            for name in names:
+                target[name] = self.wrap(target[name], name)
+            return
+        if names is None:
+            names = [n for n, v in vars(type(target)).items() if callable(v) and not n.startswith('_')]
+        for name in names:
+            setattr(target, name, self.wrap(getattr(target, name), name))
+
+    def _patch_matplotlib(self):
+        # Only when the script already uses matplotlib: the text-only scripts stay light
+        if 'matplotlib' not in sys.modules:
+            return
+        import importlib
+
+        for module, path, name in MATPLOTLIB_SPANS:
+            owner = importlib.import_module(module)
+            *parents, attribute = path.split('.')
+            for parent in parents:
+                owner = getattr(owner, parent)
+            original = vars(owner)[attribute]
+            self._patches.append((owner, attribute, original))
+            setattr(owner, attribute, self.wrap(original, name, 'matplotlib'))
+
+    def stages(self):
+        """[{'path', 'name', 'category', 'calls', 'wall_s', 'own_s', ...}] per call path, in first-seen order"""
+        rows = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            row = rows.get(span.path)
+            if row is None:
+                row = rows[span.path] = {'path': span.path, 'name': span.name, 'category': span.category,
+                                         'calls': 0, 'wall_s': 0.0, 'own_s': 0.0, 'cpu_s': 0.0,
+                                         'net_blocks': 0, 'net_mb': 0.0, 'peak_mb': 0.0}
+            row['calls'] += 1
+            row['wall_s'] += span.wall_s
+            row['own_s'] += span.wall_s - span.children_s
+            row['cpu_s'] += span.cpu_s
+            row['net_blocks'] += span.net_blocks
+            row['net_mb'] += span.net_mb
+            row['peak_mb'] = max(row['peak_mb'], span.peak_mb)
+        return list(rows.values())
+
+    def timeline(self):
+        """Chrome trace event format: one complete ('X') event per span"""
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            events.append({
+                'name': span.name, 'cat': span.category, 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+                'ts': round((span.start - self._origin) * 1e6, 1), 'dur': round(span.wall_s * 1e6, 1),
+                'args': {'cpu_ms': round(span.cpu_s * 1000, 3), 'net_blocks': span.net_blocks,
+                         'net_mb': round(span.net_mb, 3), 'peak_mb': round(span.peak_mb, 3)},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'otherData': {'script': self.name, 'python': sys.version.split()[0]}}
+
+    def own_time(self):
+        """[(seconds, name)] wall time spent in each span name outside its child spans; sums to the run"""
+        totals = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.wall_s - span.children_s
+        return sorted(((seconds, name) for name, seconds in totals.items()), reverse=True)
+
+    def top_functions(self, count=TOP_FUNCTIONS):
+        """[(tottime, cumtime, calls, 'file:line(function)')] by own time"""
+        import pstats
+
+        stats = pstats.Stats(self._profile).stats
+        rows = [(tt, ct, nc, f'{os.path.basename(f)}:{line}({function})')
+                for (f, line, function), (_, nc, tt, ct, _) in stats.items() if f != __file__]
+        return sorted(rows, reverse=True)[:count]
+
+    def top_allocations(self, count=TOP_ALLOCATIONS):
+        """[(MB, blocks, 'file:line')] still held when the run finished"""
+        return [(s.size / (1024 * 1024), s.count, f'{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}')
+                for s in self.snapshot.statistics('lineno')[:count]]
+
+    def report(self):
+        """Print the stage table and hot spots, and save {prefix}.prof and {prefix}-timeline.json"""
+        import json
+
+        stages = self.stages()
+        total = stages[0]['wall_s'] if stages else 0
+        print(f"\n⏱  Profile: {self.name}\n")
+        print(f"  {'Stage':<40} {'calls':>6} {'wall s':>8} {'share':>6} {'own s':>8} {'cpu s':>8} "
+              f"{'blocks':>9} {'net MB':>8} {'peak MB':>8}")
+        for row in stages:
+            share = row['wall_s'] / total * 100 if total else 0
+            indent = '  ' * (len(row['path']) - 1)
+            print(f"  {indent + row['name']:<40} {row['calls']:>6} {row['wall_s']:>8.3f} {share:>5.1f}% "
+                  f"{row['own_s']:>8.3f} {row['cpu_s']:>8.3f} {row['net_blocks']:>9,} {row['net_mb']:>8.2f} "
+                  f"{row['peak_mb']:>8.2f}")
+
+        print("\n  Own time by stage (outside nested stages):")
+        for seconds, name in self.own_time()[:TOP_FUNCTIONS]:
+            share = seconds / total * 100 if total else 0
+            print(f"  {seconds:>8.3f} s {share:>5.1f}%  {name}")
+
+        print(f"\n  Top {TOP_FUNCTIONS} functions by own time:")
+        print(f"  {'own s':>8} {'cum s':>8} {'calls':>9}  function")
+        for tottime, cumtime, calls, where in self.top_functions():
+            print(f"  {tottime:>8.3f} {cumtime:>8.3f} {calls:>9,}  {where}")
+
+        print("\n  Largest allocations still held at the end:")
+        for size_mb, blocks, where in self.top_allocations():
+            print(f"  {size_mb:>8.2f} MB {blocks:>9,} blocks  {where}")
+
+        self._profile.dump_stats(f'{self.prefix}.prof')
+        with open(f'{self.prefix}-timeline.json', 'w', encoding='utf-8') as f:
+            json.dump(self.timeline(), f)
+        print(f"\n  ✓ Saved: {self.prefix}.prof (python -m pstats / snakeviz)")
+        print(f"  ✓ Saved: {self.prefix}-timeline.json (chrome://tracing / ui.perfetto.dev)")
+
+
+class _Disabled:
+    """Stand-in when --profile is not given: spans and instrumentation do nothing"""
+
+    @contextmanager
+    def span(self, name, category='stage'):
+        yield None
+
+    def instrument(self, target, names=None):
+        pass
+
+
+@contextmanager
+def session(prefix, name):
+    """Profile the block as one top-level span `name` when `prefix` is set; yields the Profiler"""
+    if not prefix:
+        yield _Disabled()
+        return
+    profiler = Profiler(prefix, name)
+    profiler.start()
+    try:
+        with profiler.span(name, 'script'):
+            yield profiler
+    finally:
+        profiler.stop()
+        profiler.report()
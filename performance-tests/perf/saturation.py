@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Endpoint Saturation Benchmark
+Drives one endpoint at a time with a stepped arrival rate until an SLO breaks
+
+Mixed journeys cannot tell which endpoint runs out of capacity first. This
+mode isolates each endpoint and offers it an open-loop arrival rate (like
+k6's constant-arrival-rate executor): requests are started on schedule
+whether or not earlier ones have finished, on a bounded pool of keep-alive
+connections. Each stage runs at a fixed rate; the rate is multiplied by
+--step-factor until p99 or the error rate breaks the SLO, or the endpoint
+cannot keep up (completed < 95% of offered, or arrivals dropped for lack of
+a free connection). A stage during which the generator itself was
+saturated (perf.clientmonitor) also stops the search, with the load
+generator named as the limit, since its latencies are not the server's.
+
+The maximum sustainable throughput is the achieved rate of the last stage
+that met the SLO. Results merge into capacity-{arch}.json, so endpoints can
+be measured in separate invocations; analyze-results.py renders the
+per-endpoint capacity table.
+
+Usage (from performance-tests/):
+    python -m perf.saturation --base-url http://localhost:5000 --arch monolith
+    python -m perf.saturation --arch microservices --base-url http://... \\
+        --endpoint leaderboard_ThisWeek --endpoint submit --slo-p99 500
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+from perf import clientmonitor, journeys
+from perf.loadgen import HttpClient, parse_duration, trend_values
+
+CAPACITY_PATTERN = 'capacity-*.json'
+
+DEFAULT_SLO_P99_MS = 1000.0
+DEFAULT_SLO_ERROR_RATE = 0.01
+# A stage whose completions fall below this share of the offered rate is saturated
+MIN_COMPLETION_RATIO = 0.95
+
+
+class Endpoint:
+    """One isolated request type; `build(context)` returns (method, path, body) per call"""
+
+    def __init__(self, name, build, auth=False):
+        self.name = name
+        self.build = build
+        self.auth = auth
+
+
+def _quiz(context):
+    return random.choice(context.quizzes)
+
+
+def _submit_body(context):
+    quiz = _quiz(context)
+    now = time.time()
+    answers = [{'questionId': q['id'], 'selectedAnswerIds': [random.choice(q['answers'])], 'timeSpent': 5000}
+               for q in quiz.get('questions', []) if q.get('answers')]
+    return ('POST', f"/api/quiz/{quiz['id']}/submit",
+            {'answers': answers, 'startedAt': journeys._iso(now - 60), 'finishedAt': journeys._iso(now)})
+
+
+ENDPOINTS = {
+    'categories': Endpoint('categories', lambda c: ('GET', '/api/category', None)),
+    'quiz_list': Endpoint('quiz_list', lambda c: (
+        'GET', f'/api/quiz?pageNumber={random.randint(1, c.pages)}&pageSize=10', None)),
+    'quiz_details': Endpoint('quiz_details', lambda c: ('GET', f"/api/quiz/{_quiz(c)['id']}", None)),
+    'quiz_take': Endpoint('quiz_take', lambda c: ('GET', f"/api/quiz/{_quiz(c)['id']}/take", None)),
+    **{f'leaderboard_{t}': Endpoint(f'leaderboard_{t}', lambda c, t=t: ('GET', f'/api/quiz/leaderboard?timeframe={t}', None))
+       for t in journeys.LEADERBOARD_TIMEFRAMES},
+    'attempts': Endpoint('attempts', lambda c: ('GET', '/api/quiz/attempts?pageNumber=1&pageSize=10', None), auth=True),
+    'submit': Endpoint('submit', _submit_body, auth=True),
+}
+
+
+class SaturationContext:
+    def __init__(self, pool, quizzes, pages, dataset=None):
+        self.pool = pool
+        self.quizzes = quizzes
+        self.pages = pages
+        self.dataset = dataset
+
+
+async def prepare(base_url, manifest=None, users=64, timeout=60.0):
+    """Token pool, quizzes with answer IDs (for submit) and the quiz list page count"""
+    context = await journeys.prepare('journey', base_url, users, manifest, timeout=timeout)
+    client = HttpClient(base_url, timeout)
+    try:
+        quizzes = []
+        for quiz in context.quizzes:
+            if 'questions' in quiz:
+                quizzes.append({'id': quiz['id'], 'questions': [
+                    {'id': q['id'], 'answers': q['answers']} for q in quiz['questions']]})
+                continue
+            response = await client.request('GET', f"/api/quiz/{quiz['id']}/take")
+            data = journeys._data(response) if response.ok else None
+            if data:
+                quizzes.append({'id': quiz['id'], 'questions': [
+                    {'id': q['id'], 'answers': [a['id'] for a in q.get('answers', [])]}
+                    for q in data.get('questions', [])]})
+        response = await client.request('GET', '/api/quiz?pageNumber=1&pageSize=10')
+        listing = journeys._data(response) if response.ok else None
+        pages = max(1, (listing or {}).get('totalPages', 1)) if isinstance(listing, dict) else 1
+    finally:
+        await client.close()
+    return SaturationContext(context.pool, quizzes or context.quizzes, pages, context.dataset)
+
+
+async def run_stage(endpoint, context, base_url, rate, seconds, max_connections, timeout, monitor=None):
+    """Offer `rate` requests/second for `seconds`; returns the stage statistics"""
+    loop = asyncio.get_running_loop()
+    wall_started = time.time()
+    idle, tasks = [], set()
+    durations, statuses = [], {}
+    opened = dropped = errors = 0
+    credentials = context.pool.credentials if context.pool else []
+
+    async def fire(client, index):
+        nonlocal errors
+        method, path, body = endpoint.build(context)
+        headers = None
+        if endpoint.auth and credentials:
+            headers = {'Authorization': f'Bearer {credentials[index % len(credentials)].token}'}
+        response = await client.request(method, path, body, headers)
+        durations.append(response.duration)
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        if not response.ok:
+            errors += 1
+        idle.append(client)
+
+    started = loop.time()
+    total = max(1, int(rate * seconds))
+    for i in range(total):
+        delay = started + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if monitor is not None:
+            monitor.skew(max(0.0, (loop.time() - started - i / rate) * 1000))
+        if idle:
+            client = idle.pop()
+        elif opened < max_connections:
+            client = HttpClient(base_url, timeout)
+            opened += 1
+        else:
+            dropped += 1
+            continue
+        task = asyncio.create_task(fire(client, i))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    offered_until = loop.time()
+    if tasks:
+        await asyncio.gather(*tasks)
+    elapsed = max(offered_until - started, 1e-9)
+    for client in idle:
+        await client.close()
+
+    stats = trend_values(durations)
+    completed = len(durations)
+    client = None
+    if monitor is not None:
+        samples = [s for s in monitor.samples if s['time'] > wall_started + 1.0]
+        client = sorted({r for s in samples for r in clientmonitor.reasons(s, monitor.fd_limit)}) or None
+    return {
+        'offered_rate': rate,
+        'achieved_rate': completed / max(loop.time() - started, 1e-9),
+        'offered': total,
+        'completed': completed,
+        'dropped': dropped,
+        'error_rate': errors / completed if completed else 1.0,
+        'connections': opened,
+        'statuses': {str(k): v for k, v in sorted(statuses.items())},
+        'p50': stats['med'],
+        'p95': stats['p(95)'],
+        'p99': stats['p(99)'],
+        'schedule_seconds': elapsed,
+        'client_bound': client,
+    }
+
+
+def verdict(stage, slo_p99, slo_error):
+    """Why a stage breaks the SLO, or None if it is sustainable"""
+    if stage.get('client_bound'):
+        return f"load generator saturated ({', '.join(stage['client_bound'])})"
+    if stage['error_rate'] > slo_error:
+        return f"error rate {stage['error_rate'] * 100:.1f}%"
+    if stage['p99'] > slo_p99:
+        return f"p99 {stage['p99']:.0f} ms"
+    if stage['dropped']:
+        return f"{stage['dropped']} arrivals dropped"
+    if stage['completed'] < stage['offered'] * MIN_COMPLETION_RATIO:
+        return 'cannot keep up'
+    return None
+
+
+async def saturate(endpoint, context, base_url, start_rate, step_factor, stage_seconds, max_rate,
+                   slo_p99, slo_error, max_connections, timeout, cooldown=2.0, monitor=None):
+    """Step the arrival rate for one endpoint until the SLO breaks"""
+    stages, best, broken = [], None, None
+    rate = start_rate
+    while rate <= max_rate:
+        stage = await run_stage(endpoint, context, base_url, rate, stage_seconds, max_connections, timeout,
+                                monitor)
+        stage['breach'] = verdict(stage, slo_p99, slo_error)
+        stages.append(stage)
+        print(f"    {rate:8.1f}/s -> {stage['achieved_rate']:8.1f}/s  p99 {stage['p99']:8.1f} ms  "
+              f"errors {stage['error_rate'] * 100:5.1f}%" + (f"  ✗ {stage['breach']}" if stage['breach'] else ''))
+        if stage['breach']:
+            broken = stage['breach']
+            break
+        best = stage
+        rate *= step_factor
+        await asyncio.sleep(cooldown)
+    return {
+        'max_sustainable_rate': best['achieved_rate'] if best else 0.0,
+        'p99_at_max': best['p99'] if best else None,
+        'p95_at_max': best['p95'] if best else None,
+        'limit': broken or f'reached --max-rate {max_rate:g}/s',
+        'stages': stages,
+    }
+
+
+def load_capacities(pattern=CAPACITY_PATTERN):
+    """{architecture: capacity file contents} for capacity-*.json in the working directory"""
+    capacities = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        capacities[data.get('architecture') or path[len('capacity-'):-len('.json')]] = data
+    return capacities
+
+
+def generate_html_section(capacities):
+    """Per-endpoint capacity table across architectures"""
+    architectures = sorted(capacities)
+    endpoints = sorted({e for c in capacities.values() for e in c['endpoints']})
+    headers = ''.join(f'<th>{a.title()} max req/s</th><th>{a.title()} p99 at max</th><th>{a.title()} limit</th>'
+                      for a in architectures)
+    html = """
+        <h2>🧱 Endpoint Capacity</h2>
+        <p>Maximum sustainable throughput of each endpoint driven in isolation with a stepped open-loop
+        arrival rate (perf/saturation.py). SLO: """
+    slos = {f"p99 &lt; {c['slo']['p99_ms']:g} ms, errors &lt; {c['slo']['error_rate'] * 100:g}%"
+            for c in capacities.values()}
+    html += ' / '.join(sorted(slos)) + f"""</p>
+        <table>
+            <tr><th>Endpoint</th>{headers}</tr>
+"""
+    for endpoint in endpoints:
+        cells = ''
+        for architecture in architectures:
+            result = capacities[architecture]['endpoints'].get(endpoint)
+            if result is None:
+                cells += '<td>-</td><td>-</td><td>-</td>'
+                continue
+            p99 = f"{result['p99_at_max']:.0f} ms" if result['p99_at_max'] is not None else '-'
+            cells += f"<td>{result['max_sustainable_rate']:.1f}</td><td>{p99}</td><td>{result['limit']}</td>"
+        html += f"""            <tr><td>{endpoint}</td>{cells}</tr>
+"""
+    html += """        </table>
+"""
+    return html
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-endpoint saturation benchmark')
+    parser.add_argument('--base-url', default=os.environ.get('BASE_URL', 'http://localhost:5000'))
+    parser.add_argument('--arch', default=os.environ.get('TEST_NAME', 'monolith'))
+    parser.add_argument('--endpoint', action='append', choices=sorted(ENDPOINTS),
+                        help='endpoint to measure (repeatable, default: all)')
+    parser.add_argument('--manifest', default=os.environ.get('DATASET_MANIFEST'))
+    parser.add_argument('--start-rate', type=float, default=5.0, help='first stage arrival rate (req/s)')
+    parser.add_argument('--step-factor', type=float, default=1.5)
+    parser.add_argument('--stage', type=parse_duration, default=30.0, help='stage length')
+    parser.add_argument('--max-rate', type=float, default=5000.0)
+    parser.add_argument('--slo-p99', type=float, default=DEFAULT_SLO_P99_MS, help='p99 SLO (ms)')
+    parser.add_argument('--slo-error', type=float, default=DEFAULT_SLO_ERROR_RATE, help='error rate SLO (0-1)')
+    parser.add_argument('--max-connections', type=int, default=512)
+    parser.add_argument('--timeout', type=parse_duration, default=10.0)
+    args = parser.parse_args()
+
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    path = f'capacity-{args.arch}.json'
+    result = {'architecture': args.arch, 'endpoints': {}}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+    result.update({
+        'baseUrl': args.base_url,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'slo': {'p99_ms': args.slo_p99, 'error_rate': args.slo_error},
+        'stage_seconds': args.stage,
+        'step_factor': args.step_factor,
+    })
+
+    async def run():
+        context = await prepare(args.base_url, args.manifest, timeout=args.timeout)
+        result['dataset'] = context.dataset
+        monitor = clientmonitor.ClientMonitor(lambda: HttpClient.open_connections)
+        monitor.start()
+        for name in args.endpoint or list(ENDPOINTS):
+            print(f"\n  🧱 {name}")
+            result['endpoints'][name] = await saturate(
+                ENDPOINTS[name], context, args.base_url, args.start_rate, args.step_factor, args.stage,
+                args.max_rate, args.slo_p99, args.slo_error, args.max_connections, args.timeout,
+                monitor=monitor)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+        await monitor.stop()
+
+    print(f"🧱 Saturation benchmark: {args.arch} at {args.base_url}")
+    asyncio.run(run())
+
+    print(f"\n  {'Endpoint':<24} {'max req/s':>10} {'p99 at max':>11}  limit")
+    for name, r in sorted(result['endpoints'].items()):
+        p99 = f"{r['p99_at_max']:.0f} ms" if r['p99_at_max'] is not None else '-'
+        print(f"  {name:<24} {r['max_sustainable_rate']:>10.1f} {p99:>11}  {r['limit']}")
+    print(f"\n  ✓ Saved: {path}")
+
+
+if __name__ == '__main__':
+    main()
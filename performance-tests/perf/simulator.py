@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Discrete-Event Queueing Simulator
+Predicts latency and throughput at load levels we did not measure
+
+Models the k6 workload as closed-loop virtual users that walk the
+test-scenarios.js script (request, think time, next request). Requests
+flow through stations (multi-server FIFO queues) and fixed delays on a
+heap-ordered event queue:
+
+    monolith:       client -> [api x servers] -> client
+    microservices:  client -> RTT/2 -> [gateway] -> hop -> [service] -> hop -> RTT/2 -> client
+
+Service times are resampled from the measured monolith light-load run
+(per endpoint when a raw k6 stream is present, otherwise a lognormal fitted
+to the summary median and p95). Server counts are calibrated by matching
+measured average latency across the measured scenarios.
+
+Usage (from performance-tests/):
+    python -m perf.simulator 5 20 50 100 200
+"""
+
+import heapq
+import math
+import random
+import sys
+from collections import deque
+
+import numpy as np
+
+from perf.gateway import route_upstream
+
+# (endpoint name, path, think time after the request in s) - test-scenarios.js
+SCENARIO_SCRIPT = [
+    ('browse_quizzes', '/api/quiz', 1.0),
+    ('get_categories', '/api/category', 1.0),
+    ('view_quiz_details', '/api/quiz/{id}', 2.0),
+    ('health_check', '/health', 1.0),
+]
+
+SCENARIO_VUS = {'light_load': 5, 'medium_load': 20, 'heavy_load': 50}
+
+DEFAULT_DURATION = 120.0
+WARMUP = 10.0
+# Gateway proxy cost per request when no access log is available (ms)
+DEFAULT_GATEWAY_MS = 0.3
+# One-way container-to-container hop inside the microservices host (ms)
+DEFAULT_HOP_MS = 0.2
+
+
+class LogNormalSampler:
+    """Service-time sampler fitted to a median and p95 (ms)"""
+
+    def __init__(self, median, p95):
+        self.mu = math.log(max(median, 1e-3))
+        self.sigma = max(math.log(max(p95, median) / max(median, 1e-3)) / 1.645, 1e-6)
+
+    def __call__(self, rng):
+        return rng.lognormvariate(self.mu, self.sigma)
+
+    @property
+    def mean(self):
+        return math.exp(self.mu + self.sigma ** 2 / 2)
+
+
+class EmpiricalSampler:
+    """Service-time sampler that resamples measured durations (ms)"""
+
+    def __init__(self, samples):
+        self.samples = list(samples)
+
+    def __call__(self, rng):
+        return self.samples[rng.randrange(len(self.samples))]
+
+    @property
+    def mean(self):
+        return sum(self.samples) / len(self.samples)
+
+
+class Station:
+    """Multi-server FIFO queue"""
+
+    def __init__(self, name, servers):
+        self.name = name
+        self.servers = servers
+        self.busy = 0
+        self.queue = deque()
+        self.work = 0.0
+
+
+class Simulation:
+    """Heap-based event loop running closed-loop virtual users"""
+
+    def __init__(self, model, vus, duration=DEFAULT_DURATION, seed=1):
+        self.model = model
+        self.vus = vus
+        self.duration = duration
+        self.rng = random.Random(seed)
+        self.events = []
+        self.seq = 0
+        self.now = 0.0
+        self.stations = {name: Station(name, servers) for name, servers in model.stations().items()}
+        self.latencies = []
+        self.completed = 0
+
+    def schedule(self, delay, fn, *args):
+        self.seq += 1
+        heapq.heappush(self.events, (self.now + delay, self.seq, fn, args))
+
+    # -- request life cycle -------------------------------------------------
+
+    def _start_request(self, vu, step):
+        endpoint = SCENARIO_SCRIPT[step][0]
+        route = self.model.route(endpoint, self.rng)
+        self._advance(vu, step, route, 0, self.now)
+
+    def _advance(self, vu, step, route, index, started):
+        if index == len(route):
+            self._finish_request(vu, step, started)
+            return
+        kind, target, cost = route[index]
+        if kind == 'delay':
+            self.schedule(cost / 1000, self._advance, vu, step, route, index + 1, started)
+            return
+        station = self.stations[target]
+        job = (vu, step, route, index, started, cost)
+        if station.busy < station.servers:
+            station.busy += 1
+            station.work += cost
+            self.schedule(cost / 1000, self._depart, station, job)
+        else:
+            station.queue.append(job)
+
+    def _depart(self, station, job):
+        if station.queue:
+            waiting = station.queue.popleft()
+            station.work += waiting[5]
+            self.schedule(waiting[5] / 1000, self._depart, station, waiting)
+        else:
+            station.busy -= 1
+        vu, step, route, index, started, _ = job
+        self._advance(vu, step, route, index + 1, started)
+
+    def _finish_request(self, vu, step, started):
+        if started >= WARMUP:
+            self.latencies.append((self.now - started) * 1000)
+            self.completed += 1
+        think = SCENARIO_SCRIPT[step][2]
+        self.schedule(think, self._start_request, vu, (step + 1) % len(SCENARIO_SCRIPT))
+
+    # -- driver ---------------------------------------------------------------
+
+    def run(self):
+        """Run the simulation; returns latency / throughput statistics"""
+        for vu in range(self.vus):
+            # Stagger VU start like k6 does within the first second
+            self.schedule(self.rng.random(), self._start_request, vu, 0)
+
+        end = WARMUP + self.duration
+        while self.events:
+            time, _, fn, args = heapq.heappop(self.events)
+            if time > end:
+                break
+            self.now = time
+            fn(*args)
+
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            'vus': self.vus,
+            'avg_response_time': float(latencies.mean()),
+            'median_response_time': float(np.median(latencies)),
+            'p95_response_time': float(np.percentile(latencies, 95)),
+            'p99_response_time': float(np.percentile(latencies, 99)),
+            'throughput': self.completed / self.duration,
+            # Busy server-time over available server-time (includes the warm-up)
+            'utilization': {name: s.work / 1000 / (s.servers * (WARMUP + self.duration))
+                            for name, s in self.stations.items()},
+        }
+
+
+class MonolithModel:
+    """One multi-server queue serving every endpoint"""
+
+    architecture = 'monolith'
+
+    def __init__(self, samplers, servers=8, instances=1, client_rtt_ms=0.0):
+        self.samplers = samplers
+        self.servers = servers
+        self.instances = instances
+        self.client_rtt_ms = client_rtt_ms
+
+    def stations(self):
+        return {'api': self.servers * self.instances}
+
+    def _service_time(self, endpoint, rng):
+        sampler = self.samplers.get(endpoint) or self.samplers['*']
+        return sampler(rng)
+
+    def route(self, endpoint, rng):
+        half_rtt = self.client_rtt_ms / 2
+        return [('delay', None, half_rtt), ('station', 'api', self._service_time(endpoint, rng)),
+                ('delay', None, half_rtt)]
+
+
+class MicroservicesModel(MonolithModel):
+    """Gateway queue, network hops and one queue per upstream service"""
+
+    architecture = 'microservices'
+    services = ('auth_service', 'quiz_service', 'execution_service')
+
+    def __init__(self, samplers, servers=2, instances=1, client_rtt_ms=0.0,
+                 gateway_ms=DEFAULT_GATEWAY_MS, hop_ms=DEFAULT_HOP_MS, gateway_servers=64):
+        super().__init__(samplers, servers, instances, client_rtt_ms)
+        self.gateway_ms = gateway_ms
+        self.hop_ms = hop_ms
+        self.gateway_servers = gateway_servers
+
+    def stations(self):
+        stations = {name: self.servers * self.instances for name in self.services}
+        stations['gateway'] = self.gateway_servers
+        return stations
+
+    def route(self, endpoint, rng):
+        half_rtt = self.client_rtt_ms / 2
+        path = dict((name, path) for name, path, _ in SCENARIO_SCRIPT).get(endpoint, endpoint)
+        upstream = route_upstream(path)
+        route = [('delay', None, half_rtt), ('station', 'gateway', self.gateway_ms)]
+        if upstream in self.services:
+            route += [('delay', None, self.hop_ms),
+                      ('station', upstream, self._service_time(endpoint, rng)),
+                      ('delay', None, self.hop_ms)]
+        route.append(('delay', None, half_rtt))
+        return route
+
+
+def samplers_from_summary(data):
+    """One lognormal sampler for all endpoints from a summary result file"""
+    values = data.get('metrics', {}).get('http_req_duration', {}).get('values', {})
+    return {'*': LogNormalSampler(values.get('med', 1.0), values.get('p(95)', values.get('med', 1.0)))}
+
+
+def samplers_from_requests(requests):
+    """Per-endpoint empirical samplers from a perf.k6stream RequestTable"""
+    samplers = {}
+    for code, label in enumerate(requests.endpoint_labels):
+        durations = requests.duration[requests.endpoint == code]
+        if len(durations):
+            samplers[label] = EmpiricalSampler(durations.tolist())
+    samplers['*'] = EmpiricalSampler(requests.duration.tolist())
+    return samplers
+
+
+def simulate(model, vus, duration=DEFAULT_DURATION, seed=1):
+    return Simulation(model, vus, duration, seed).run()
+
+
+def measured_points(results):
+    """{scenario: (vus, extracted metrics)} from loaded summary results
+
+    Only runs of the SCENARIO_SCRIPT flow count: the k6 load levels and
+    perf.loadgen's `browse` scenario, not other journeys.
+    """
+    points = {}
+    for scenario, data in results.items():
+        if scenario not in SCENARIO_VUS and data.get('testConfig', {}).get('scenario') != 'browse':
+            continue
+        metrics = data.get('metrics', {})
+        vus = (metrics.get('vus_max', {}).get('values', {}).get('max') or data.get('testConfig', {}).get('vus')
+               or SCENARIO_VUS.get(scenario))
+        duration = metrics.get('http_req_duration', {}).get('values', {})
+        points[scenario] = {
+            'vus': vus,
+            'avg_response_time': duration.get('avg', 0),
+            'p95_response_time': duration.get('p(95)', 0),
+            'throughput': metrics.get('http_reqs', {}).get('values', {}).get('rate', 0),
+        }
+    return points
+
+
+def calibrate_servers(build_model, measured, candidates=(1, 2, 4, 8, 16, 32, 64)):
+    """Pick the per-instance server count whose predictions best match measured avg latency"""
+    best, best_error = candidates[0], float('inf')
+    for servers in candidates:
+        model = build_model(servers)
+        error = 0.0
+        for point in measured.values():
+            predicted = simulate(model, point['vus'], duration=60)
+            error += (math.log(predicted['avg_response_time'] + 1) - math.log(point['avg_response_time'] + 1)) ** 2
+        if error < best_error:
+            best, best_error = servers, error
+    return best
+
+
+def build_models(results, raw_requests=None, gateway_ms=None):
+    """Calibrated monolith and microservices models from loaded results
+
+    results: {'monolith': {scenario: data}, 'microservices': {scenario: data}}
+    raw_requests: optional {(architecture, scenario): RequestTable}
+    """
+    raw_requests = raw_requests or {}
+    mono_results = results.get('monolith', {})
+    micro_results = results.get('microservices', {})
+    baseline = 'light_load' if 'light_load' in mono_results else next(iter(mono_results), None)
+    if baseline is None:
+        return {}
+
+    if ('monolith', baseline) in raw_requests:
+        samplers = samplers_from_requests(raw_requests[('monolith', baseline)])
+    else:
+        samplers = samplers_from_summary(mono_results[baseline])
+
+    models = {}
+    mono_measured = measured_points(mono_results)
+    servers = calibrate_servers(lambda s: MonolithModel(samplers, servers=s), mono_measured)
+    models['monolith'] = MonolithModel(samplers, servers=servers)
+
+    if micro_results:
+        # At light load the median gap between the two runs is the client <->
+        # gateway network (the medians share the same service-time distribution)
+        mono_med = mono_results[baseline].get('metrics', {}).get('http_req_duration', {}).get('values', {}).get('med', 0)
+        micro_base = micro_results.get(baseline) or next(iter(micro_results.values()))
+        micro_med = micro_base.get('metrics', {}).get('http_req_duration', {}).get('values', {}).get('med', 0)
+        client_rtt = max(micro_med - mono_med, 0)
+        gateway = gateway_ms if gateway_ms is not None else DEFAULT_GATEWAY_MS
+
+        def build(s):
+            return MicroservicesModel(samplers, servers=s, client_rtt_ms=client_rtt, gateway_ms=gateway)
+
+        servers = calibrate_servers(build, measured_points(micro_results))
+        models['microservices'] = build(servers)
+
+    return models
+
+
+def predict(model, vus_levels, instances=1, duration=DEFAULT_DURATION):
+    """Predicted metrics for each VU level at the given instance count"""
+    model.instances = instances
+    try:
+        return [simulate(model, vus, duration) for vus in vus_levels]
+    finally:
+        model.instances = 1
+
+
+def print_predictions(models, vus_levels, instance_counts=(1, 2)):
+    """Print a what-if table for every model"""
+    print("\n" + "=" * 80)
+    print(" WHAT-IF SIMULATION (calibrated discrete-event model)")
+    print("=" * 80)
+    for architecture, model in models.items():
+        print(f"\n  {architecture.upper()}  ({model.servers} servers/instance)")
+        print(f"    {'Inst':>4} {'VUs':>5} {'Avg ms':>9} {'P95 ms':>9} {'P99 ms':>9} {'Req/s':>8}")
+        for instances in instance_counts:
+            for p in predict(model, vus_levels, instances):
+                print(f"    {instances:>4} {p['vus']:>5} {p['avg_response_time']:>9.1f} "
+                      f"{p['p95_response_time']:>9.1f} {p['p99_response_time']:>9.1f} {p['throughput']:>8.2f}")
+    print("\n" + "=" * 80 + "\n")
+
+
+if __name__ == '__main__':
+    from perf.summary import load_results
+
+    levels = [int(v) for v in sys.argv[1:]] or [5, 20, 50, 100, 200]
+    print_predictions(build_models(load_results(architectures=('monolith', 'microservices'))), levels)
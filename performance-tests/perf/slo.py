@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SLO Compliance and Error Budgets
+Per-window compliance, Apdex and error-budget burn from the k6 thresholds
+
+A k6 threshold is checked once, over the whole run: `p(95)<3000` passes or
+fails, and a run that met it on average may still have spent its whole
+error budget in one minute at peak load. This module reads the thresholds
+(perf.thresholds: the `options.thresholds` of a k6 script such as
+test-scenarios.js or aws-deployment/testing/load-test.js, or a JSON config)
+and turns the ratio-style ones into SLOs:
+
+    p(N)<X on a trend   at least N% of samples under X ms; the error budget
+                        is the (100 - N)% allowed above it
+    rate<R on a rate    at most R of the samples non-zero (http_req_failed:
+                        failed requests); the budget is R
+    rate>R on a rate    at least R non-zero (e.g. checks); the budget is 1 - R
+
+avg / min / max / count thresholds are not ratios and are left to
+perf.thresholds. For every raw stream, every SLO, overall and per endpoint,
+and every WINDOW_SECONDS window:
+
+    compliance      share of good samples, against the target
+    budget used     bad samples / (budget x samples); over 100% = SLO missed
+    burn rate       the same per window: 1 spends the budget exactly over the
+                    run, above 1 the window burns it faster than allowed
+    Apdex           (satisfied + tolerating / 2) / samples with T = limit /
+                    APDEX_FACTOR, so tolerating ends at the SLO limit; failed
+                    requests count as frustrated
+    load level      the VUs (k6 `vus` gauge) of every window, the worst
+                    window and the VUs at which the budget first burned
+
+Usage (from performance-tests/):
+    python -m perf.slo raw-monolith-heavy_load.ndjson
+    python -m perf.slo raw-microservices-heavy_load.k6a --script ../aws-deployment/testing/load-test.js
+    python -m perf.slo raw-*.ndjson --threshold 'http_req_duration:p(99)<1000' --window 30
+"""
+
+import argparse
+import glob
+
+import numpy as np
+
+from perf import k6stream, thresholds
+from perf.summary import parse_key
+
+WINDOW_SECONDS = 10
+# Apdex T = latency limit / APDEX_FACTOR: satisfied <= T, tolerating <= 4T = the limit
+APDEX_FACTOR = 4
+# A window with a burn rate above this spends the error budget faster than the run may
+BURN_ALERT = 1.0
+# Trends read from the RequestTable; other metrics come from their own points
+REQUEST_METRICS = ('http_req_duration', 'http_req_failed')
+
+
+def objectives(threshold_map):
+    """[{'key', 'metric', 'tags', 'expression', 'kind', 'limit', 'budget', ...}] for the ratio thresholds"""
+    found = []
+    for key, expressions in threshold_map.items():
+        metric, tags = parse_key(key)
+        for expression in expressions:
+            aggregation, op, limit = thresholds.parse_expression(expression)
+            objective = {'key': key, 'metric': metric, 'tags': tags, 'expression': expression, 'limit': limit}
+            if (aggregation.startswith('p(') or aggregation == 'med') and op in ('<', '<='):
+                target = 50.0 if aggregation == 'med' else float(aggregation[2:-1])
+                objective.update(kind='latency', budget=1 - target / 100, inclusive=op == '<=')
+            elif aggregation == 'rate' and op in ('<', '<='):
+                objective.update(kind='rate', budget=limit, bad_when_set=True)
+            elif aggregation == 'rate' and op in ('>', '>='):
+                objective.update(kind='rate', budget=1 - limit, bad_when_set=False)
+            else:
+                continue
+            found.append(objective)
+    return found
+
+
+class Series:
+    """One SLO's samples: time, value, endpoint code and (for requests) the failed flag"""
+
+    def __init__(self, time, value, endpoint, endpoint_labels, failed=None):
+        self.time = time
+        self.value = value
+        self.endpoint = endpoint
+        self.endpoint_labels = endpoint_labels
+        self.failed = failed
+
+
+def _request_series(objective, requests):
+    failed = (requests.status < 200) | (requests.status >= 400)
+    value = requests.duration if objective['metric'] == 'http_req_duration' else failed.astype(np.float64)
+    mask = np.ones(len(requests), dtype=bool)
+    name = objective['tags'].get('name')
+    if name is not None:
+        code = requests.endpoint_labels.index(name) if name in requests.endpoint_labels else -1
+        mask = requests.endpoint == code
+    return Series(requests.time[mask], value[mask], requests.endpoint[mask], requests.endpoint_labels, failed[mask])
+
+
+def _point_series(objective, path):
+    labels, times, values, endpoints = {}, [], [], []
+    wanted = objective['tags'].items()
+    for _, epoch, value, tags in k6stream.read_points(path, metrics=(objective['metric'],)):
+        if any(tags.get(tag) != expected for tag, expected in wanted):
+            continue
+        times.append(epoch)
+        values.append(value)
+        endpoints.append(labels.setdefault(tags.get('name') or objective['metric'], len(labels)))
+    return Series(np.array(times, dtype=np.float64), np.array(values, dtype=np.float64),
+                  np.array(endpoints, dtype=np.int32), list(labels))
+
+
+def series(objective, path, requests=None):
+    """Samples of one SLO from a raw stream; `requests` (its RequestTable) saves a pass for request metrics"""
+    if objective['metric'] in REQUEST_METRICS and set(objective['tags']) <= {'name'}:
+        return _request_series(objective, requests if requests is not None else k6stream.read_requests(path))
+    return _point_series(objective, path)
+
+
+def vu_gauge(path):
+    """(epoch, vus) arrays of the k6 `vus` gauge; empty for perf.loadgen streams"""
+    points = [(epoch, value) for _, epoch, value, _ in k6stream.read_points(path, metrics=('vus',))]
+    if not points:
+        return np.array([]), np.array([])
+    epochs, vus = zip(*points)
+    return np.array(epochs), np.array(vus)
+
+
+def bad_mask(objective, s):
+    if objective['kind'] == 'latency':
+        return s.value > objective['limit'] if objective['inclusive'] else s.value >= objective['limit']
+    set_ = s.value != 0
+    return set_ if objective['bad_when_set'] else ~set_
+
+
+def apdex(objective, s, mask=None):
+    """Apdex over the selected samples, or None for non-latency SLOs"""
+    if objective['kind'] != 'latency':
+        return None
+    values = s.value if mask is None else s.value[mask]
+    if not len(values):
+        return None
+    t = objective['limit'] / APDEX_FACTOR
+    frustrated = np.zeros(len(values), dtype=bool)
+    if s.failed is not None:
+        frustrated = s.failed if mask is None else s.failed[mask]
+    satisfied = (values <= t) & ~frustrated
+    tolerating = (values > t) & (values <= APDEX_FACTOR * t) & ~frustrated
+    return float((satisfied.sum() + tolerating.sum() / 2) / len(values))
+
+
+def _compliance(objective, s, bad, mask, start, window, vus):
+    total = int(mask.sum())
+    bad_count = int(bad[mask].sum())
+    budget = objective['budget']
+    row = {
+        'total': total,
+        'bad': bad_count,
+        'compliance': 1 - bad_count / total if total else None,
+        'budget_used': bad_count / (budget * total) if total and budget > 0 else None,
+        'apdex': apdex(objective, s, mask),
+        'windows': [],
+    }
+    if not total:
+        return row
+    index = ((s.time[mask] - start) // window).astype(np.int64)
+    totals = np.bincount(index)
+    bads = np.bincount(index, weights=bad[mask], minlength=len(totals))
+    for w in np.flatnonzero(totals):
+        fraction = bads[w] / totals[w]
+        row['windows'].append({
+            'start': int(w * window), 'total': int(totals[w]), 'bad': int(bads[w]),
+            'burn': fraction / budget if budget > 0 else (float('inf') if bads[w] else 0.0),
+            'vus': vus(w),
+        })
+    burning = [w for w in row['windows'] if w['burn'] > BURN_ALERT]
+    row['burning'] = len(burning)
+    row['worst'] = max(row['windows'], key=lambda w: w['burn'])
+    first = next((w for w in burning if w['vus'] is not None), None)
+    row['first_burn_vus'] = first['vus'] if first else None
+    row['met'] = row['budget_used'] is not None and row['budget_used'] <= 1
+    return row
+
+
+def analyze_run(path, threshold_map, requests=None, window=WINDOW_SECONDS):
+    """[{'objective', 'endpoints': {'all' | endpoint: row}}] for one raw stream"""
+    slos = objectives(threshold_map)
+    if not slos:
+        return []
+    gauge_time, gauge_vus = vu_gauge(path)
+    results = []
+    loaded = {}
+    start = None
+    for objective in slos:
+        if objective['metric'] in REQUEST_METRICS and requests is None:
+            requests = k6stream.read_requests(path)
+        s = series(objective, path, requests)
+        if not len(s.time):
+            continue
+        loaded[objective['key'], objective['expression']] = s
+        start = min(start, float(s.time.min())) if start is not None else float(s.time.min())
+
+    def vus(w):
+        if not len(gauge_time):
+            return None
+        mask = (gauge_time >= start + w * window) & (gauge_time < start + (w + 1) * window)
+        return int(gauge_vus[mask].max()) if mask.any() else None
+
+    for objective in slos:
+        s = loaded.get((objective['key'], objective['expression']))
+        if s is None:
+            continue
+        bad = bad_mask(objective, s)
+        rows = {'all': _compliance(objective, s, bad, np.ones(len(s.time), dtype=bool), start, window, vus)}
+        if 'name' not in objective['tags'] and len(s.endpoint_labels) > 1:
+            for code, label in enumerate(s.endpoint_labels):
+                mask = s.endpoint == code
+                if mask.any():
+                    rows[label] = _compliance(objective, s, bad, mask, start, window, vus)
+        results.append({'objective': objective, 'endpoints': rows})
+    return results
+
+
+def analyze(raw_results, threshold_map, raw_requests=None, window=WINDOW_SECONDS):
+    """{(architecture, scenario): analyze_run(...)} for perf.k6stream.find_raw_results()"""
+    analysis = {}
+    for key, path in sorted(raw_results.items()):
+        run = analyze_run(path, threshold_map, (raw_requests or {}).get(key), window)
+        if run:
+            analysis[key] = run
+    return analysis
+
+
+def _label(objective):
+    return f"{objective['key']} {objective['expression']}"
+
+
+def _target(objective):
+    return f"{(1 - objective['budget']) * 100:g}%"
+
+
+def plot_burn(analysis, path, window=WINDOW_SECONDS):
+    """Burn rate over time of every SLO (all endpoints), one line per run"""
+    import matplotlib.pyplot as plt
+
+    colors = {'monolith': '#3498db', 'microservices': '#e74c3c'}
+    styles = {'light_load': ':', 'medium_load': '--', 'heavy_load': '-'}
+    labels = []
+    for run in analysis.values():
+        for result in run:
+            if _label(result['objective']) not in labels:
+                labels.append(_label(result['objective']))
+    fig, axes = plt.subplots(len(labels), 1, figsize=(14, 3.5 * len(labels)), squeeze=False)
+
+    for ax, label in zip(axes.flat, labels):
+        for (architecture, scenario), run in analysis.items():
+            for result in run:
+                if _label(result['objective']) != label:
+                    continue
+                windows = result['endpoints']['all']['windows']
+                ax.plot([w['start'] for w in windows], [min(w['burn'], 1e3) for w in windows],
+                        styles.get(scenario, '-'), color=colors.get(architecture), linewidth=1.2,
+                        label=f"{architecture.title()} {scenario.replace('_', ' ')}")
+        ax.axhline(BURN_ALERT, color='gray', linestyle='--', linewidth=1)
+        ax.set_yscale('symlog', linthresh=1)
+        ax.set_ylim(bottom=0)
+        ax.set_title(f'Error-budget burn rate: {label}', fontweight='bold')
+        ax.set_xlabel(f'Seconds since start ({window}s windows)')
+        ax.set_ylabel('Burn rate (1 = budget pace)')
+        ax.legend(fontsize=7)
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def _percent(value):
+    return f'{value * 100:.1f}%' if value is not None else '-'
+
+
+def generate_html_section(analysis, window=WINDOW_SECONDS):
+    """HTML section for {(architecture, scenario): analyze_run(...)}"""
+    html = f"""
+        <h2>🚦 SLO Compliance and Error Budget</h2>
+        <p>SLOs are the ratio thresholds of the k6 script (p(N)&lt;X, rate&lt;R). The error budget is the share of
+        samples allowed to miss the SLO; "budget used" over 100% means the SLO was missed over the run. Burn rate is
+        the budget spent per {window}s window relative to an even pace: windows above {BURN_ALERT:g} spend it faster
+        than the run may. Apdex uses T = limit / {APDEX_FACTOR}, with failed requests frustrated. "First burn" is the
+        VU count of the first window over budget pace.</p>
+        <img src="graph-slo-burn.png" alt="Error Budget Burn Rate">
+        <table>
+            <tr><th>Run</th><th>SLO</th><th>Endpoint</th><th>Samples</th><th>Compliance (target)</th><th>Apdex</th><th>Budget used</th><th>Burning windows</th><th>Worst window</th><th>First burn</th></tr>
+"""
+    for (architecture, scenario), run in sorted(analysis.items()):
+        run_label = f"{architecture.title()} - {scenario.replace('_', ' ').title()}"
+        for result in run:
+            objective = result['objective']
+            for endpoint, row in result['endpoints'].items():
+                if not row['total']:
+                    continue
+                css = 'better' if row['met'] else 'worse'
+                worst = row['worst']
+                worst_vus = f", {worst['vus']} VUs" if worst['vus'] is not None else ''
+                apdex_value = f"{row['apdex']:.2f}" if row['apdex'] is not None else '-'
+                first = f"{row['first_burn_vus']} VUs" if row['first_burn_vus'] is not None else '-'
+                name = f'<strong>{endpoint}</strong>' if endpoint == 'all' else endpoint
+                html += f"""            <tr><td>{run_label}</td><td>{objective['key']}: {objective['expression']}</td><td>{name}</td><td>{row['total']:,}</td><td>{_percent(row['compliance'])} ({_target(objective)})</td><td>{apdex_value}</td><td class="{css}">{_percent(row['budget_used'])}</td><td>{row['burning']} / {len(row['windows'])}</td><td>{worst['start']}s: {worst['burn']:.1f}x{worst_vus}</td><td>{first}</td></tr>
+"""
+    html += """        </table>
+"""
+    return html
+
+
+def print_run(path, run, window):
+    print(f"\n🚦 {path}")
+    for result in run:
+        objective = result['objective']
+        print(f"\n  {_label(objective)}   target {_target(objective)}, budget {objective['budget'] * 100:g}%")
+        print(f"  {'endpoint':<24} {'samples':>9} {'compliance':>11} {'apdex':>6} {'budget used':>12} "
+              f"{'burning':>9}  worst {window}s window")
+        for endpoint, row in result['endpoints'].items():
+            if not row['total']:
+                continue
+            worst = row['worst']
+            vus = f" ({worst['vus']} VUs)" if worst['vus'] is not None else ''
+            apdex_value = f"{row['apdex']:.2f}" if row['apdex'] is not None else '-'
+            mark = '✓' if row['met'] else '✗'
+            print(f"  {endpoint:<24} {row['total']:>9,} {_percent(row['compliance']):>11} {apdex_value:>6} "
+                  f"{_percent(row['budget_used']):>11} {mark} {row['burning']:>4}/{len(row['windows']):<4}  "
+                  f"{worst['start']}s {worst['burn']:.1f}x{vus}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SLO compliance, Apdex and error-budget burn of raw k6 streams')
+    parser.add_argument('paths', nargs='*', help='raw-*.ndjson[.gz] / raw-*.k6a (default: every raw stream)')
+    parser.add_argument('--script', default=thresholds.DEFAULT_SCRIPT,
+                        help='k6 script or JSON config whose thresholds are the SLOs')
+    parser.add_argument('--threshold', action='append', default=[], metavar='METRIC:EXPRESSION',
+                        help="extra or replacing SLO, e.g. 'http_req_duration{name:browse_quizzes}:p(95)<400'")
+    parser.add_argument('--window', type=int, default=WINDOW_SECONDS, help=f'window seconds (default {WINDOW_SECONDS})')
+    args = parser.parse_args()
+
+    threshold_map = thresholds.load(args.script) if args.script else {}
+    overrides = {}
+    for text in args.threshold:
+        try:
+            metric, expression = thresholds.parse_override(text)
+        except ValueError as e:
+            parser.error(str(e))
+        overrides.setdefault(metric, []).append(expression)
+    threshold_map.update(overrides)
+    if not objectives(threshold_map):
+        parser.error(f'no p(N)< or rate thresholds in {args.script} and none given with --threshold')
+
+    paths = [p for pattern in args.paths for p in sorted(glob.glob(pattern)) or [pattern]]
+    paths = paths or list(k6stream.find_raw_results().values())
+    if not paths:
+        print("❌ No raw streams (raw-*.ndjson / raw-*.k6a)")
+        return
+    for path in paths:
+        print_run(path, analyze_run(path, threshold_map, window=args.window), args.window)
+
+
+if __name__ == '__main__':
+    main()
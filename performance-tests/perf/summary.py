@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run Summary Model
+Typed, read-only view of a k6 handleSummary result with lazy derived metrics
+
+The scripts used to rebuild `metrics.get(name, {}).get('values', {})` chains
+for every graph, scenario and architecture. RunSummary is loaded once per
+result file:
+
+    run = summary.load('results-monolith-heavy_load.json')
+    run.trend('http_req_duration').p95
+    run.trend('http_req_duration', expected_response='true').avg
+    run.trend('http_req_duration', name='view_quiz_details').p99
+    run.counter('http_reqs').rate, run.rate('http_req_failed').rate
+    run.gauge('vus_max').max
+    run.throughput, run.goodput, run.error_rate      (computed once)
+    run.histogram('http_req_duration', name='browse_quizzes').quantile(0.999)
+
+Every metric family k6 writes is exposed as Trend, Counter, Rate or Gauge,
+including tagged submetrics (`http_req_duration{expected_response:true}`).
+Missing metrics come back empty (every statistic 0), like the old
+`.get(..., 0)` chains. Metrics are parsed on first access and derived values
+memoized; all classes use __slots__.
+
+k6 exports only the summaryTrendStats percentiles. perf.loadgen,
+perf.coordinator and perf.ingest also write `histograms`
+(perf.histogram.LogHistogram, overall and per endpoint) and a per-second
+`timeline`, so any percentile can be recomputed and runs merged by adding
+bucket counts.
+
+RunSummary is also a read-only Mapping over the original JSON, so helpers
+that take the summary dict (perf.goodput, perf.simulator, ...) accept it
+unchanged. Standard library only: importable from notebooks and
+quick-summary.py alike.
+
+Usage (from performance-tests/):
+    python -m perf.summary [results-monolith-heavy_load.json ...]
+"""
+
+import glob
+import json
+import os
+import re
+import sys
+from collections.abc import Mapping
+
+RESULTS_PATTERN = 'results-*.json'
+
+
+class Metric:
+    """One k6 metric or tagged submetric: name, tags and its raw `values` block"""
+
+    __slots__ = ('name', 'tags', 'type', 'contains', 'values')
+
+    def __init__(self, name, tags=None, type=None, contains=None, values=None):
+        self.name = name
+        self.tags = tags or {}
+        self.type = type
+        self.contains = contains
+        self.values = values or {}
+
+    @property
+    def key(self):
+        """Name as k6 writes it, e.g. http_req_duration{expected_response:true}"""
+        if not self.tags:
+            return self.name
+        return f"{self.name}{{{','.join(f'{k}:{v}' for k, v in self.tags.items())}}}"
+
+    def __bool__(self):
+        return bool(self.values)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.key!r}, {self.values!r})'
+
+
+class Trend(Metric):
+    __slots__ = ()
+
+    avg = property(lambda self: self.values.get('avg', 0))
+    min = property(lambda self: self.values.get('min', 0))
+    med = property(lambda self: self.values.get('med', 0))
+    max = property(lambda self: self.values.get('max', 0))
+    p90 = property(lambda self: self.values.get('p(90)', 0))
+    p95 = property(lambda self: self.values.get('p(95)', 0))
+    p99 = property(lambda self: self.values.get('p(99)', 0))
+    # Only perf.loadgen / perf.coordinator write counts for trends
+    count = property(lambda self: self.values.get('count', 0))
+
+    def percentile(self, p):
+        """Any percentile the summary holds (summaryTrendStats), e.g. percentile(99.9)"""
+        return self.values.get(f'p({p:g})', 0)
+
+
+class Counter(Metric):
+    __slots__ = ()
+
+    count = property(lambda self: self.values.get('count', 0))
+    rate = property(lambda self: self.values.get('rate', 0))
+
+
+class Rate(Metric):
+    __slots__ = ()
+
+    rate = property(lambda self: self.values.get('rate', 0))
+    passes = property(lambda self: self.values.get('passes', 0))
+    fails = property(lambda self: self.values.get('fails', 0))
+
+
+class Gauge(Metric):
+    __slots__ = ()
+
+    value = property(lambda self: self.values.get('value', 0))
+    min = property(lambda self: self.values.get('min', 0))
+    max = property(lambda self: self.values.get('max', 0))
+
+
+METRIC_TYPES = {'trend': Trend, 'counter': Counter, 'rate': Rate, 'gauge': Gauge}
+
+
+def parse_key(key):
+    """'http_req_duration{name:a,status:200}' -> ('http_req_duration', {'name': 'a', 'status': '200'})"""
+    name, brace, rest = key.partition('{')
+    if not brace or not rest.endswith('}'):
+        return key, {}
+    tags = {}
+    for part in rest[:-1].split(','):
+        tag, _, value = part.partition(':')
+        tags[tag.strip()] = value.strip()
+    return name, tags
+
+
+def _tag_value(value):
+    """Tag values as k6 writes them (expected_response=True -> 'true')"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def derived(method):
+    """Memoized read-only property for __slots__ classes (cached in self._cache)"""
+    name = method.__name__
+
+    def getter(self):
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = method(self)
+            return value
+
+    getter.__doc__ = method.__doc__
+    return property(getter)
+
+
+class RunSummary(Mapping):
+    """One run: architecture, scenario, typed metrics and derived values"""
+
+    __slots__ = ('data', 'architecture', 'scenario', 'path', '_metrics', '_cache')
+
+    def __init__(self, data, architecture=None, scenario=None, path=None):
+        self.data = data
+        config = data.get('testConfig', {})
+        self.architecture = architecture or config.get('testName')
+        self.scenario = scenario or config.get('scenario')
+        self.path = path
+        self._metrics = None
+        self._cache = {}
+
+    @classmethod
+    def of(cls, data):
+        """`data` as a RunSummary (returned as is when it already is one)"""
+        return data if isinstance(data, cls) else cls(data)
+
+    # Mapping over the original JSON
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f'RunSummary({self.architecture!r}, {self.scenario!r}, {len(self.metrics)} metrics)'
+
+    @property
+    def config(self):
+        return self.data.get('testConfig', {})
+
+    @property
+    def metrics(self):
+        """{(name, frozenset(tags)): Metric}, parsed on first access"""
+        if self._metrics is None:
+            self._metrics = {}
+            for key, raw in self.data.get('metrics', {}).items():
+                name, tags = parse_key(key)
+                cls = METRIC_TYPES.get(raw.get('type'), Metric)
+                self._metrics[(name, frozenset(tags.items()))] = cls(
+                    name, tags, raw.get('type'), raw.get('contains'), raw.get('values', {}))
+        return self._metrics
+
+    def metric(self, name, cls=Metric, /, **tags):
+        """Metric `name` with exactly `tags`; an empty `cls` instance when absent"""
+        tags = {k: _tag_value(v) for k, v in tags.items()}
+        found = self.metrics.get((name, frozenset(tags.items())))
+        return found if found is not None else cls(name, tags)
+
+    def trend(self, name, /, **tags):
+        return self.metric(name, Trend, **tags)
+
+    def counter(self, name, /, **tags):
+        return self.metric(name, Counter, **tags)
+
+    def rate(self, name, /, **tags):
+        return self.metric(name, Rate, **tags)
+
+    def gauge(self, name, /, **tags):
+        return self.metric(name, Gauge, **tags)
+
+    def submetrics(self, name, tag=None):
+        """Tagged submetrics of `name` (only those tagged with `tag` when given)"""
+        return [m for (n, tags), m in self.metrics.items()
+                if n == name and tags and (tag is None or tag in m.tags)]
+
+    def names(self):
+        """Metric names present, submetrics folded into their parent"""
+        return sorted({name for name, _ in self.metrics})
+
+    def histogram(self, name, /, **tags):
+        """perf.histogram.LogHistogram exported for `name` with exactly `tags`; None when absent"""
+        from perf.histogram import LogHistogram
+
+        wanted = (name, frozenset((k, _tag_value(v)) for k, v in tags.items()))
+        for key, raw in self.data.get('histograms', {}).items():
+            metric, metric_tags = parse_key(key)
+            if (metric, frozenset(metric_tags.items())) == wanted:
+                return LogHistogram.from_dict(raw)
+        return None
+
+    @property
+    def timeline(self):
+        """[{'second', 'requests', 'failed', ...}] per window (empty when not exported)"""
+        return self.data.get('timeline', [])
+
+    @derived
+    def duration_s(self):
+        """Test run duration in seconds (0 when the summary lacks state)"""
+        return self.data.get('state', {}).get('testRunDurationMs', 0) / 1000
+
+    @derived
+    def vus(self):
+        """Peak VUs: vus_max gauge, else the vus gauge, else testConfig.vus"""
+        return self.gauge('vus_max').max or self.gauge('vus').max or self.config.get('vus', 0)
+
+    @derived
+    def total_requests(self):
+        return self.counter('http_reqs').count
+
+    @derived
+    def throughput(self):
+        return self.counter('http_reqs').rate
+
+    @derived
+    def error_rate(self):
+        """Share of failed requests (0-1), from http_req_failed
+
+        Not the scenario script's `errors` Rate: test-scenarios.js only adds
+        1s to it (on failed checks), so its rate is 100% whenever anything failed.
+        """
+        return self.rate('http_req_failed').rate
+
+    @derived
+    def goodput(self):
+        from perf.goodput import summary_goodput
+
+        return summary_goodput(self.data)
+
+    @derived
+    def data_received_mb(self):
+        return self.counter('data_received').count / 1024 / 1024
+
+    @derived
+    def endpoints(self):
+        """Per-endpoint http_req_duration trends ({name: Trend}), from `name`-tagged submetrics"""
+        return {m.tags['name']: m for m in self.submetrics('http_req_duration', 'name') if len(m.tags) == 1}
+
+
+def load(path, architecture=None, scenario=None):
+    """RunSummary for one result file; architecture / scenario default to the file name"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if architecture is None and scenario is None:
+        architecture, scenario = split_name(path, data.get('testConfig', {}).get('testName'))
+    return RunSummary(data, architecture, scenario, path)
+
+
+def split_name(path, test_name=None):
+    """{results,raw,bodies}-{architecture}-{scenario}.{json,ndjson[.gz],k6a} -> (architecture, scenario)
+
+    (None, None) when the name has no dash. The scenario is the last
+    dash-separated part (k6 scenario names use underscores), so hyphenated
+    variants such as aws-microservices stay whole; the file's `test_name`
+    (testConfig.testName) wins when it prefixes the name.
+    """
+    name = re.sub(r'\.(json|ndjson(\.gz)?|k6a)$', '', os.path.basename(path))
+    name = re.sub(r'^(results|raw|bodies)-', '', name)
+    if test_name and name.startswith(f'{test_name}-'):
+        return test_name, name[len(test_name) + 1:].replace('-', '_')
+    architecture, _, scenario = name.rpartition('-')
+    if not architecture or not scenario:
+        return None, None
+    return architecture, scenario
+
+
+def load_results(pattern=RESULTS_PATTERN, architectures=None):
+    """{architecture: {scenario: RunSummary}} for every result file matching `pattern`
+
+    Files that fail to parse are skipped with a warning. With `architectures`,
+    the result has exactly those keys (other architectures are ignored).
+    """
+    results = {a: {} for a in architectures} if architectures else {}
+    for path in sorted(glob.glob(pattern)):
+        try:
+            run = load(path)
+        except (OSError, ValueError) as e:
+            print(f"  ⚠️  Error loading {path}: {e}")
+            continue
+        if run.architecture is None or (architectures and run.architecture not in results):
+            continue
+        results.setdefault(run.architecture, {})[run.scenario] = run
+    return results
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob(RESULTS_PATTERN))
+    if not paths:
+        print(f"❌ No {RESULTS_PATTERN} files")
+        return
+    for path in paths:
+        run = load(path)
+        d = run.trend('http_req_duration')
+        print(f"\n📄 {path}: {run.architecture} / {run.scenario}, {run.vus:.0f} VUs, {run.duration_s:.0f}s")
+        print(f"  {run.total_requests:,} requests ({run.throughput:.2f}/s, goodput {run.goodput:.2f}/s), "
+              f"errors {run.error_rate * 100:.2f}%")
+        print(f"  http_req_duration  avg {d.avg:.1f}  med {d.med:.1f}  p95 {d.p95:.1f}  p99 {d.p99:.1f} ms")
+        for name, trend in sorted(run.endpoints.items()):
+            print(f"    {name:<28} avg {trend.avg:>8.1f}  p95 {trend.p95:>8.1f} ms")
+        families = {}
+        for metric in run.metrics.values():
+            families.setdefault(type(metric).__name__, set()).add(metric.name)
+        print('  ' + ', '.join(f'{len(names)} {family.lower()}s' for family, names in sorted(families.items())))
+
+
+if __name__ == '__main__':
+    main()
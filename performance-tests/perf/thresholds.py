@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+k6 Threshold Evaluation
+Reads the `thresholds` of a k6 script and checks stored results against them
+
+k6 evaluates thresholds while a run is live. CI also needs the check after
+the fact, e.g. on summaries merged by perf.coordinator or produced by
+perf.loadgen. This module reads the `options.thresholds` block of a k6
+script (test-scenarios.js by default) or a JSON config and evaluates each expression on a
+perf.summary.RunSummary:
+
+    'http_req_duration': ['p(95)<3000', 'p(99)<5000']
+    'http_req_failed': ['rate<0.1']
+    'http_req_duration{expected_response:true}': [{ threshold: 'avg<500', abortOnFail: true }]
+
+Expressions are `aggregation operator number` with the aggregations k6
+allows per metric type (avg, min, med, max, p(N), count, rate, value). A
+metric the summary does not contain is reported as missing and fails,
+unless `missing_ok`. Standard library only, so the CI gate starts fast.
+
+Usage (from performance-tests/):
+    python -m perf.thresholds                                   # every results-*.json
+    python -m perf.thresholds results-microservices-heavy_load.json \
+        --threshold 'http_req_duration:p(95)<500'
+"""
+
+import argparse
+import glob
+import json
+import operator
+import re
+import sys
+
+DEFAULT_SCRIPT = 'test-scenarios.js'
+RESULTS_PATTERN = 'results-*.json'
+# k6's exit code when thresholds fail
+EXIT_THRESHOLDS_FAILED = 99
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '===': operator.eq,
+    '!=': operator.ne,
+}
+
+_EXPRESSION = re.compile(r'^\s*(avg|min|med|max|count|rate|value|p\(\d+(?:\.\d+)?\))\s*(===|==|!=|<=|>=|<|>)\s*'
+                         r'(-?\d+(?:\.\d+)?(?:e-?\d+)?)\s*$')
+_BLOCK = re.compile(r'thresholds\s*:\s*\{')
+_ENTRY = re.compile(r"""(['"]?)([\w.]+(?:\{[^}]*\})?)\1\s*:\s*\[""")
+_STRING = re.compile(r"""(['"`])(.*?)\1""")
+_OBJECT_THRESHOLD = re.compile(r"""threshold\s*:\s*(['"`])(.*?)\1""")
+
+
+def _matching(text, start, open_char, close_char):
+    """Index just past the bracket that closes the one at text[start]"""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == open_char:
+            depth += 1
+        elif text[i] == close_char:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    raise ValueError(f'unbalanced {open_char}{close_char} in thresholds block')
+
+
+def _strip_comments(text):
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    return re.sub(r'(?<![:\'"])//[^\n]*', '', text)
+
+
+def parse_script(text):
+    """{metric key: [expression, ...]} from the `thresholds: {...}` block of a k6 script"""
+    text = _strip_comments(text)
+    match = _BLOCK.search(text)
+    if match is None:
+        return {}
+    block = text[match.end() - 1:_matching(text, match.end() - 1, '{', '}')]
+    thresholds = {}
+    position = 1
+    while True:
+        entry = _ENTRY.search(block, position)
+        if entry is None:
+            break
+        end = _matching(block, entry.end() - 1, '[', ']')
+        body = block[entry.end():end - 1]
+        objects = _OBJECT_THRESHOLD.findall(body)
+        expressions = [e for _, e in objects] if objects else [e for _, e in _STRING.findall(body)]
+        thresholds[entry.group(2)] = expressions
+        position = end
+    return thresholds
+
+
+def load(path=DEFAULT_SCRIPT):
+    """Thresholds of a k6 script, or of a JSON config (k6 options with `thresholds`, or the mapping itself)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if not path.endswith('.json'):
+            return parse_script(f.read())
+        config = json.load(f)
+    config = config.get('thresholds', config)
+    return {key: [e['threshold'] if isinstance(e, dict) else e for e in expressions]
+            for key, expressions in config.items()}
+
+
+def parse_expression(expression):
+    """'p(95)<3000' -> ('p(95)', '<', 3000.0)"""
+    match = _EXPRESSION.match(expression)
+    if match is None:
+        raise ValueError(f'unsupported threshold expression: {expression!r}')
+    aggregation, op, value = match.groups()
+    return aggregation, op, float(value)
+
+
+def parse_override(text):
+    """'http_req_duration:p(95)<2000' -> ('http_req_duration', 'p(95)<2000')"""
+    match = re.match(r'^([\w.]+(?:\{[^}]*\})?):(.+)$', text.strip())
+    if match is None or not _EXPRESSION.match(match.group(2)):
+        raise ValueError(f'expected METRIC:EXPRESSION, got {text!r}')
+    return match.group(1), match.group(2)
+
+
+def evaluate(run, thresholds, missing_ok=False):
+    """[{'metric', 'expression', 'actual', 'ok', 'missing'}] for every expression on a RunSummary"""
+    from perf.summary import parse_key
+
+    checks = []
+    for key, expressions in thresholds.items():
+        name, tags = parse_key(key)
+        metric = run.metric(name, **tags)
+        for expression in expressions:
+            aggregation, op, limit = parse_expression(expression)
+            actual = metric.values.get(aggregation)
+            if actual is None:
+                checks.append({'metric': key, 'expression': expression, 'actual': None,
+                               'ok': missing_ok, 'missing': True})
+                continue
+            checks.append({'metric': key, 'expression': expression, 'actual': actual,
+                           'ok': OPERATORS[op](actual, limit), 'missing': False})
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check stored results against k6 thresholds (CI gate)')
+    parser.add_argument('paths', nargs='*', help=f'results files (default: {RESULTS_PATTERN})')
+    parser.add_argument('--script', default=DEFAULT_SCRIPT, help='k6 script whose thresholds apply')
+    parser.add_argument('--threshold', action='append', default=[], metavar='METRIC:EXPRESSION',
+                        help="extra or replacing threshold, e.g. 'http_req_duration:p(95)<500' (repeatable)")
+    parser.add_argument('--missing-ok', action='store_true', help='do not fail on metrics a summary lacks')
+    args = parser.parse_args(argv)
+
+    from perf import summary
+
+    thresholds = load(args.script) if args.script else {}
+    overrides = {}
+    for text in args.threshold:
+        try:
+            metric, expression = parse_override(text)
+        except ValueError as e:
+            parser.error(str(e))
+        overrides.setdefault(metric, []).append(expression)
+    thresholds.update(overrides)
+    if not thresholds:
+        parser.error(f'no thresholds in {args.script} and none given with --threshold')
+
+    paths = args.paths or sorted(glob.glob(RESULTS_PATTERN))
+    if not paths:
+        print(f"❌ No {RESULTS_PATTERN} files")
+        sys.exit(1)
+
+    failed = 0
+    for path in paths:
+        checks = evaluate(summary.load(path), thresholds, args.missing_ok)
+        bad = [c for c in checks if not c['ok']]
+        failed += bool(bad)
+        print(f"{'✗' if bad else '✓'} {path}")
+        for c in checks:
+            actual = 'missing' if c['missing'] else f"{c['actual']:.4g}"
+            print(f"    {'✓' if c['ok'] else '✗'} {c['metric']}: {c['expression']} (actual {actual})")
+    if failed:
+        print(f"\n❌ Thresholds failed in {failed} of {len(paths)} result files")
+        sys.exit(EXIT_THRESHOLDS_FAILED)
+    print(f"\n✅ All thresholds passed ({len(paths)} result files)")
+
+
+if __name__ == '__main__':
+    main()
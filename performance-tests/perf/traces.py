@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Distributed Trace Analyzer
+Reconstructs traces from OTLP JSON span dumps and finds where time goes
+
+Accepts a single OTLP/JSON export ({"resourceSpans": [...]}) or the
+newline-delimited form written by the OpenTelemetry Collector file
+exporter, streamed one line (one export batch) at a time. Spans are
+flattened into typed columns as they are read and grouped by an
+interned trace index, so a trace is a contiguous slice after one sort.
+
+For every trace the critical path (the chain of spans that determined the
+end-to-end latency) is walked from the root; time on the path is
+attributed to the span's service, or to "network" when a CLIENT span is
+waiting on a remote child. Results are aggregated per endpoint (root span
+http.route, else root span name).
+
+Usage (from performance-tests/):
+    python -m perf.traces traces.json
+"""
+
+import json
+import os
+import sys
+from array import array
+from multiprocessing import Pool
+
+import numpy as np
+
+SPAN_KIND_CLIENT = 3
+NETWORK = 'network'
+TRACES_PER_BATCH = 50000
+
+
+def _attributes(items):
+    """Flatten OTLP [{key, value: {stringValue: ...}}] into a plain dict"""
+    out = {}
+    for item in items or []:
+        value = item.get('value', {})
+        out[item['key']] = next(iter(value.values()), None) if value else None
+    return out
+
+
+def _iter_documents(path):
+    """Yield OTLP export documents from a JSON or NDJSON file
+
+    NDJSON is parsed a line at a time, so only one export batch is in memory;
+    a pretty-printed single document (its first line is not valid JSON on
+    its own) is parsed whole.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        first = True
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                document = json.loads(line)
+            except ValueError:
+                if not first:
+                    raise
+                f.seek(0)
+                yield json.load(f)
+                return
+            first = False
+            yield document
+
+
+class SpanTable:
+    """Columnar spans sorted by (trace, start time)"""
+
+    def __init__(self, trace, span_id, parent, service, name, kind, start, end,
+                 service_labels, name_labels, trace_labels):
+        order = np.lexsort((start, trace))
+        self.trace = trace[order]
+        self.span_id = span_id[order]
+        self.parent = parent[order]
+        self.service = service[order]
+        self.name = name[order]
+        self.kind = kind[order]
+        self.start = start[order]
+        self.end = end[order]
+        self.service_labels = service_labels
+        self.name_labels = name_labels
+        self.trace_labels = trace_labels
+        self._trace_index = None
+        # Trace i occupies rows bounds[i]:bounds[i + 1]
+        self.bounds = np.concatenate((
+            [0], np.flatnonzero(np.diff(self.trace)) + 1, [len(self.trace)]
+        )) if len(self.trace) else np.array([0])
+
+    def __len__(self):
+        return len(self.trace)
+
+    @property
+    def trace_count(self):
+        return len(self.bounds) - 1
+
+    def rows_for(self, trace_id):
+        """Row slice holding the spans of one trace (by OTLP traceId)"""
+        if self._trace_index is None:
+            self._trace_index = {t: i for i, t in enumerate(self.trace_labels)}
+        code = self._trace_index.get(trace_id)
+        if code is None:
+            return slice(0, 0)
+        lo, hi = np.searchsorted(self.trace, [code, code + 1])
+        return slice(int(lo), int(hi))
+
+
+def load_spans(path):
+    """Load an OTLP JSON span dump into a SpanTable"""
+    ids = {'': -1}
+    traces, services, names = {}, {}, {}
+    # Typed arrays grow in place at 1-8 bytes per value, not a Python int each
+    columns = {k: array(code) for k, code in (('trace', 'q'), ('span_id', 'q'), ('parent', 'q'),
+                                              ('service', 'i'), ('name', 'i'), ('kind', 'b'),
+                                              ('start', 'q'), ('end', 'q'))}
+
+    # Bound appends: this loop runs once per span
+    trace_col, span_col, parent_col = columns['trace'].append, columns['span_id'].append, columns['parent'].append
+    service_col, name_col, kind_col = columns['service'].append, columns['name'].append, columns['kind'].append
+    start_col, end_col = columns['start'].append, columns['end'].append
+
+    for document in _iter_documents(path):
+        for resource_spans in document.get('resourceSpans', []):
+            resource = _attributes(resource_spans.get('resource', {}).get('attributes'))
+            service = services.setdefault(resource.get('service.name', 'unknown'), len(services))
+            for scope_spans in resource_spans.get('scopeSpans', resource_spans.get('instrumentationLibrarySpans', [])):
+                for span in scope_spans.get('spans', []):
+                    label = span.get('name', '')
+                    for item in span.get('attributes') or ():
+                        if item['key'] == 'http.route':
+                            label = item['value'].get('stringValue') or label
+                            break
+                    trace_col(traces.setdefault(span['traceId'], len(traces)))
+                    span_col(ids.setdefault(span['spanId'], len(ids)))
+                    parent_col(ids.setdefault(span.get('parentSpanId') or '', len(ids)))
+                    service_col(service)
+                    name_col(names.setdefault(label, len(names)))
+                    kind_col(span.get('kind', 0))
+                    start_col(int(span['startTimeUnixNano']))
+                    end_col(int(span['endTimeUnixNano']))
+
+    return SpanTable(
+        np.frombuffer(columns['trace'], dtype=np.int64),
+        np.frombuffer(columns['span_id'], dtype=np.int64),
+        np.frombuffer(columns['parent'], dtype=np.int64),
+        np.frombuffer(columns['service'], dtype=np.int32),
+        np.frombuffer(columns['name'], dtype=np.int32),
+        np.frombuffer(columns['kind'], dtype=np.int8),
+        np.frombuffer(columns['start'], dtype=np.int64),
+        np.frombuffer(columns['end'], dtype=np.int64),
+        list(services),
+        list(names),
+        list(traces),
+    )
+
+
+def _analyze_trace(columns, service_labels, lo, hi):
+    """Critical-path and self-time attribution for one trace slice
+
+    Takes the span columns as Python lists (one .tolist() per table instead of
+    per trace). Returns (root row, critical path {label: ns}, self time {label: ns}).
+    """
+    span_id, parent_id, service, kind, start, end = (c[lo:hi] for c in columns)
+    local = {sid: i for i, sid in enumerate(span_id)}
+
+    children = [[] for _ in range(hi - lo)]
+    roots = []
+    for i, parent in enumerate(parent_id):
+        p = local.get(parent)
+        if p is None:
+            roots.append(i)
+        else:
+            children[p].append(i)
+    if not roots:
+        return None, {}, {}
+    root = max(roots, key=lambda i: end[i] - start[i])
+
+    # A CLIENT span's own time while it waits on a remote server span is
+    # time on the wire (plus client-library overhead), not work in its service
+    labels = [
+        NETWORK if kind[i] == SPAN_KIND_CLIENT and any(service[c] != service[i] for c in children[i])
+        else service_labels[service[i]]
+        for i in range(hi - lo)
+    ]
+    critical, self_time = {}, {}
+
+    for i in range(hi - lo):
+        # Self time: span duration minus the union of its (clipped) children
+        covered, cursor = 0, start[i]
+        for c in sorted(children[i], key=lambda c: start[c]):
+            s, e = max(start[c], cursor), min(end[c], end[i])
+            if e > s:
+                covered += e - s
+                cursor = e
+        self_time[labels[i]] = self_time.get(labels[i], 0) + (end[i] - start[i] - covered)
+
+    # Walk backwards from each span's window end, always following the child
+    # that finished last; gaps between children belong to the span itself
+    stack = [(root, end[root])]
+    while stack:
+        i, window_end = stack.pop()
+        cursor = window_end
+        for c in sorted(children[i], key=lambda c: end[c], reverse=True):
+            if start[c] >= cursor or cursor <= start[i]:
+                continue
+            child_end = min(end[c], cursor)
+            if cursor > child_end:
+                critical[labels[i]] = critical.get(labels[i], 0) + (cursor - child_end)
+            stack.append((c, child_end))
+            cursor = max(start[c], start[i])
+        if cursor > start[i]:
+            critical[labels[i]] = critical.get(labels[i], 0) + (cursor - start[i])
+
+    return lo + root, critical, self_time
+
+
+class TraceBreakdown:
+    """Per-endpoint "where does time go" aggregate over many traces (ms)"""
+
+    def __init__(self):
+        self.endpoints = {}
+
+    def add(self, endpoint, duration, critical, self_time):
+        entry = self.endpoints.setdefault(endpoint, {
+            'durations': [], 'critical': {}, 'self_time': {},
+        })
+        entry['durations'].append(duration)
+        for label, ns in critical.items():
+            entry['critical'][label] = entry['critical'].get(label, 0) + ns
+        for label, ns in self_time.items():
+            entry['self_time'][label] = entry['self_time'].get(label, 0) + ns
+
+    def merge(self, other):
+        """Fold another breakdown (e.g. from a worker process) into this one"""
+        for endpoint, theirs in other.endpoints.items():
+            entry = self.endpoints.setdefault(endpoint, {
+                'durations': [], 'critical': {}, 'self_time': {},
+            })
+            entry['durations'].extend(theirs['durations'])
+            for key in ('critical', 'self_time'):
+                for label, ns in theirs[key].items():
+                    entry[key][label] = entry[key].get(label, 0) + ns
+
+    def summary(self):
+        """{endpoint: {traces, avg_ms, p95_ms, critical_ms, critical_share, self_ms}}"""
+        result = {}
+        for endpoint, entry in self.endpoints.items():
+            durations = np.array(entry['durations']) / 1e6
+            n = len(durations)
+            total = sum(entry['critical'].values()) or 1
+            result[endpoint] = {
+                'traces': n,
+                'avg_ms': float(durations.mean()),
+                'p95_ms': float(np.percentile(durations, 95)),
+                'critical_ms': {k: v / 1e6 / n for k, v in entry['critical'].items()},
+                'critical_share': {k: v / total for k, v in entry['critical'].items()},
+                'self_ms': {k: v / 1e6 / n for k, v in entry['self_time'].items()},
+            }
+        return result
+
+
+def _analyze_batch(args):
+    """Analyze a contiguous run of traces; runs in a worker process"""
+    columns, name, bounds, service_labels, name_labels = args
+    columns = [c.tolist() for c in columns]
+    start, end = columns[4], columns[5]
+    name = name.tolist()
+    breakdown = TraceBreakdown()
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        root, critical, self_time = _analyze_trace(columns, service_labels, lo, hi)
+        if root is not None:
+            breakdown.add(name_labels[name[root]], end[root] - start[root], critical, self_time)
+    return breakdown
+
+
+def analyze(spans, workers=None):
+    """Critical-path breakdown of every trace in a SpanTable"""
+    bounds = spans.bounds.tolist()
+    batches = []
+    for b in range(0, len(bounds) - 1, TRACES_PER_BATCH):
+        batch = bounds[b:b + TRACES_PER_BATCH + 1]
+        lo, hi = batch[0], batch[-1]
+        columns = [spans.span_id[lo:hi], spans.parent[lo:hi], spans.service[lo:hi],
+                   spans.kind[lo:hi], spans.start[lo:hi], spans.end[lo:hi]]
+        batches.append((columns, spans.name[lo:hi], [x - lo for x in batch],
+                        spans.service_labels, spans.name_labels))
+
+    workers = workers or os.cpu_count() or 1
+    if len(batches) > 1 and workers > 1:
+        with Pool(min(workers, len(batches))) as pool:
+            parts = pool.map(_analyze_batch, batches)
+    else:
+        parts = [_analyze_batch(b) for b in batches]
+
+    breakdown = TraceBreakdown()
+    for part in parts:
+        breakdown.merge(part)
+    return breakdown.summary()
+
+
+def generate_html_section(summary):
+    """HTML report section for analyze() output"""
+    html = """
+        <h2>🧭 Where Does Time Go (Distributed Traces)</h2>
+        <p>Average critical-path time per request, attributed to the service whose span was
+        on the path. "network" is time a client span spent waiting on a remote service
+        beyond that service's own span.</p>
+        <table>
+            <tr>
+                <th>Endpoint</th>
+                <th>Traces</th>
+                <th>Avg</th>
+                <th>P95</th>
+                <th>Critical path breakdown</th>
+                <th>Self time per service</th>
+            </tr>
+"""
+    for endpoint, s in sorted(summary.items(), key=lambda kv: -kv[1]['traces']):
+        critical = ', '.join(f"{k} {v:.1f} ms ({s['critical_share'][k] * 100:.0f}%)"
+                             for k, v in sorted(s['critical_ms'].items(), key=lambda kv: -kv[1]))
+        self_ms = ', '.join(f"{k} {v:.1f} ms" for k, v in sorted(s['self_ms'].items(), key=lambda kv: -kv[1]))
+        html += f"""
+            <tr>
+                <td>{endpoint}</td>
+                <td>{s['traces']}</td>
+                <td>{s['avg_ms']:.1f} ms</td>
+                <td>{s['p95_ms']:.1f} ms</td>
+                <td>{critical}</td>
+                <td>{self_ms}</td>
+            </tr>
+"""
+    html += """
+        </table>
+"""
+    return html
+
+
+def print_summary(summary):
+    """Print the per-endpoint breakdown to the terminal"""
+    print("\n" + "=" * 80)
+    print(" WHERE DOES TIME GO - CRITICAL PATH PER ENDPOINT")
+    print("=" * 80)
+    for endpoint, s in sorted(summary.items(), key=lambda kv: -kv[1]['traces']):
+        print(f"\n  {endpoint}  ({s['traces']} traces, avg {s['avg_ms']:.1f} ms, p95 {s['p95_ms']:.1f} ms)")
+        for label, ms in sorted(s['critical_ms'].items(), key=lambda kv: -kv[1]):
+            print(f"    {label:<24} {ms:>9.2f} ms  {s['critical_share'][label] * 100:5.1f}%")
+    print("\n" + "=" * 80 + "\n")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python -m perf.traces <otlp-spans.json>")
+        sys.exit(1)
+    spans = load_spans(sys.argv[1])
+    print(f"Loaded {len(spans):,} spans in {spans.trace_count:,} traces")
+    print_summary(analyze(spans))
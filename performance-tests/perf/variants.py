@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deployment Variant Comparison
+Pairwise deltas, ranking and Pareto front for any number of deployment variants
+
+The report compares monolith and microservices, but the same scenarios are
+also run against other variants: the local microservices simulation, the AWS
+deployment, the monolith with and without caching, other instance sizes.
+Each is a TEST_NAME (results-{testName}-{scenario}.json). For every scenario
+measured by two or more variants this module gives:
+
+    matrix      % change of every variant (column) against every other (row)
+                for p95, throughput and error rate
+    ranking     mean rank over the directed headline metrics of
+                perf.compare (throughput, goodput, avg / median / p95 / p99 /
+                max latency, error rate); lower is better
+    pareto      the variants no other variant beats on both p95 latency and
+                throughput - the candidates worth keeping
+
+Standard library only; the Pareto plot imports matplotlib when it is drawn.
+
+Usage (from performance-tests/):
+    python -m perf.variants                                   # every results-*.json
+    python -m perf.variants --scenario heavy_load --metric "99th Percentile"
+    python -m perf.variants --markdown variants.md
+"""
+
+import argparse
+
+from perf import compare, summary
+
+# The perf.compare rows that have a better direction: (label, value(run), unit, higher is better)
+METRICS = [row for row in compare.ROWS if row[3] is not None]
+MATRIX_METRICS = ('95th Percentile', 'Requests/sec', 'Error Rate')
+LATENCY = '95th Percentile'
+THROUGHPUT = 'Requests/sec'
+
+
+def by_scenario(results, scenarios=None):
+    """{scenario: {variant: RunSummary}} for the scenarios measured by at least two variants"""
+    runs = {}
+    for variant, per_scenario in sorted(results.items()):
+        for scenario, run in per_scenario.items():
+            runs.setdefault(scenario, {})[variant] = summary.RunSummary.of(run)
+    order = list(scenarios or []) + sorted(s for s in runs if s not in (scenarios or []))
+    return {s: runs[s] for s in order if len(runs.get(s, {})) >= 2}
+
+
+def values(runs):
+    """{variant: {metric label: value}}"""
+    return {variant: {name: value(run) for name, value, _, _ in METRICS} for variant, run in runs.items()}
+
+
+def delta_matrix(measured, metric):
+    """{row variant: {column variant: % change of the column against the row}}"""
+    return {a: {b: (measured[b][metric] - measured[a][metric]) / measured[a][metric] * 100
+                if measured[a][metric] else None
+                for b in measured if b != a}
+            for a in measured}
+
+
+def ranking(measured):
+    """[(variant, mean rank, {metric: rank})] best first; ties share the better rank"""
+    ranks = {variant: {} for variant in measured}
+    for name, _, _, higher_is_better in METRICS:
+        ordered = sorted({m[name] for m in measured.values()}, reverse=higher_is_better)
+        for variant, m in measured.items():
+            ranks[variant][name] = ordered.index(m[name]) + 1
+    rows = [(variant, sum(r.values()) / len(r), r) for variant, r in ranks.items()]
+    return sorted(rows, key=lambda row: (row[1], row[0]))
+
+
+def pareto_front(measured, latency=LATENCY, throughput=THROUGHPUT):
+    """Variants not dominated on (lower latency, higher throughput), by latency"""
+    front = []
+    for variant, m in measured.items():
+        dominated = any(o[latency] <= m[latency] and o[throughput] >= m[throughput] and
+                        (o[latency] < m[latency] or o[throughput] > m[throughput])
+                        for other, o in measured.items() if other != variant)
+        if not dominated:
+            front.append(variant)
+    return sorted(front, key=lambda v: measured[v][latency])
+
+
+def analyze(results, scenarios=None):
+    """{scenario: {'variants', 'values', 'matrix': {metric: matrix}, 'ranking', 'pareto'}}"""
+    analysis = {}
+    for scenario, runs in by_scenario(results, scenarios).items():
+        measured = values(runs)
+        analysis[scenario] = {
+            'variants': sorted(measured),
+            'values': measured,
+            'matrix': {metric: delta_matrix(measured, metric) for metric in MATRIX_METRICS},
+            'ranking': ranking(measured),
+            'pareto': pareto_front(measured),
+        }
+    return analysis
+
+
+def variant_count(analysis):
+    return len({v for a in analysis.values() for v in a['variants']})
+
+
+def plot_pareto(analysis, path):
+    """p95 latency vs throughput per scenario, with the Pareto front joined"""
+    import matplotlib.pyplot as plt
+
+    scenarios = list(analysis)
+    fig, axes = plt.subplots(1, len(scenarios), figsize=(6 * len(scenarios), 5), squeeze=False)
+    variants = sorted({v for a in analysis.values() for v in a['variants']})
+    colors = {v: plt.cm.tab10(i % 10) for i, v in enumerate(variants)}
+
+    for ax, scenario in zip(axes.flat, scenarios):
+        a = analysis[scenario]
+        for variant in a['variants']:
+            m = a['values'][variant]
+            on_front = variant in a['pareto']
+            ax.scatter(m[LATENCY], m[THROUGHPUT], s=90 if on_front else 45, color=colors[variant],
+                       edgecolors='black' if on_front else 'none', zorder=3, label=variant)
+            ax.annotate(variant, (m[LATENCY], m[THROUGHPUT]), textcoords='offset points', xytext=(6, 4),
+                        fontsize=8)
+        front = [a['values'][v] for v in a['pareto']]
+        ax.plot([m[LATENCY] for m in front], [m[THROUGHPUT] for m in front], '--', color='gray',
+                linewidth=1, zorder=2, label='Pareto front')
+        ax.set_xscale('log')
+        ax.set_xlabel('P95 Response Time (ms, log)')
+        ax.set_ylabel('Requests/sec')
+        ax.set_title(scenario.replace('_', ' ').title(), fontweight='bold')
+        ax.legend(fontsize=7)
+        ax.grid(True, which='both', alpha=0.3)
+
+    fig.suptitle('Deployment Variants: Latency vs Throughput (up and left is better)', fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close()
+
+
+def _better(metric, percent):
+    higher_is_better = next(row[3] for row in METRICS if row[0] == metric)
+    return (percent > 0) == higher_is_better
+
+
+def generate_html_section(analysis):
+    """HTML report section for analyze(...)"""
+    html = f"""
+        <h2>🧪 Deployment Variants</h2>
+        <p>{variant_count(analysis)} variants (TEST_NAME) compared per scenario. Ranking is the mean rank over the
+        headline metrics (lower is better); Pareto-optimal variants (★) are not beaten on both p95 latency and
+        throughput by any other variant. Matrix cells are the % change of the column variant against the row
+        variant.</p>
+        <img src="graph-variants-pareto.png" alt="Deployment Variants Pareto Front">
+"""
+    for scenario, a in analysis.items():
+        title = scenario.replace('_', ' ').title()
+        html += f"""        <h3>{title}</h3>
+        <table>
+            <tr><th>Rank</th><th>Variant</th><th>Mean rank</th><th>Requests/sec</th><th>P95</th><th>P99</th><th>Error Rate</th></tr>
+"""
+        for position, (variant, mean_rank, _) in enumerate(a['ranking'], 1):
+            m = a['values'][variant]
+            star = ' ★' if variant in a['pareto'] else ''
+            html += f"""            <tr><td>{position}</td><td><strong>{variant}</strong>{star}</td><td>{mean_rank:.2f}</td><td>{m['Requests/sec']:.2f}</td><td>{m['95th Percentile']:.1f} ms</td><td>{m['99th Percentile']:.1f} ms</td><td>{m['Error Rate']:.2f}%</td></tr>
+"""
+        html += """        </table>
+"""
+        for metric, matrix in a['matrix'].items():
+            header = ''.join(f'<th>{v}</th>' for v in a['variants'])
+            html += f"""        <table>
+            <tr><th>{metric}: column vs row</th>{header}</tr>
+"""
+            for row in a['variants']:
+                cells = ''
+                for column in a['variants']:
+                    percent = matrix[row].get(column)
+                    if column == row or percent is None:
+                        cells += '<td>-</td>'
+                    else:
+                        css = 'better' if _better(metric, percent) else 'worse'
+                        cells += f'<td class="{css}">{percent:+.1f}%</td>' if percent else '<td>0.0%</td>'
+                html += f"""            <tr><td><strong>{row}</strong></td>{cells}</tr>
+"""
+            html += """        </table>
+"""
+    return html
+
+
+def _percent(matrix, row, column):
+    percent = matrix[row].get(column)
+    return '-' if percent is None else f'{percent:+.1f}%'
+
+
+def to_text(scenario, a, metric):
+    width = max(12, *(len(v) for v in a['variants'])) + 2
+    lines = [f"\n[{scenario.replace('_', ' ').upper()}]", '  Ranking (mean rank over the headline metrics):']
+    for position, (variant, mean_rank, _) in enumerate(a['ranking'], 1):
+        m = a['values'][variant]
+        star = '  * Pareto' if variant in a['pareto'] else ''
+        lines.append(f"  {position:>3}. {variant:<{width}} {mean_rank:>5.2f}   {m['Requests/sec']:>9.2f} req/s "
+                     f"p95 {m['95th Percentile']:>9.1f} ms  errors {m['Error Rate']:>6.2f}%{star}")
+    lines.append(f'\n  {metric}: % change of the column against the row')
+    lines.append('  ' + ' ' * width + ''.join(f'{v:>{width}}' for v in a['variants']))
+    matrix = delta_matrix(a['values'], metric)
+    for row in a['variants']:
+        cells = ''.join(f'{_percent(matrix, row, column):>{width}}' for column in a['variants'])
+        lines.append(f'  {row:<{width}}{cells}')
+    return '\n'.join(lines)
+
+
+def to_markdown(analysis, metric):
+    lines = []
+    for scenario, a in analysis.items():
+        lines += [f"### {scenario.replace('_', ' ').title()}", '',
+                  '| Rank | Variant | Mean rank | Requests/sec | P95 | Error Rate | Pareto |',
+                  '|------|---------|-----------|--------------|-----|------------|--------|']
+        for position, (variant, mean_rank, _) in enumerate(a['ranking'], 1):
+            m = a['values'][variant]
+            lines.append(f"| {position} | **{variant}** | {mean_rank:.2f} | {m['Requests/sec']:.2f} | "
+                         f"{m['95th Percentile']:.1f} ms | {m['Error Rate']:.2f}% | "
+                         f"{'yes' if variant in a['pareto'] else ''} |")
+        matrix = delta_matrix(a['values'], metric)
+        lines += ['', f'| {metric}: column vs row | ' + ' | '.join(a['variants']) + ' |',
+                  '|---' * (len(a['variants']) + 1) + '|']
+        for row in a['variants']:
+            cells = [_percent(matrix, row, column) for column in a['variants']]
+            lines.append(f'| **{row}** | ' + ' | '.join(cells) + ' |')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    labels = [row[0] for row in METRICS]
+    parser = argparse.ArgumentParser(description='Compare any number of deployment variants (TEST_NAME)')
+    parser.add_argument('--pattern', default=summary.RESULTS_PATTERN, help='results files to load')
+    parser.add_argument('--scenario', action='append', help='only these scenarios (repeatable)')
+    parser.add_argument('--metric', default=LATENCY, choices=labels, help=f'delta matrix metric (default {LATENCY})')
+    parser.add_argument('--markdown', help='also write the rankings and matrices as Markdown')
+    parser.add_argument('--plot', metavar='PNG', help='also draw the Pareto plot (needs matplotlib)')
+    args = parser.parse_args(argv)
+
+    analysis = analyze(summary.load_results(args.pattern), args.scenario)
+    if args.scenario:
+        analysis = {s: a for s, a in analysis.items() if s in args.scenario}
+    if not analysis:
+        print("❌ No scenario was measured by two or more variants")
+        return
+    print(f"\n🧪 {variant_count(analysis)} deployment variants")
+    for scenario, a in analysis.items():
+        print(to_text(scenario, a, args.metric))
+    if args.markdown:
+        with open(args.markdown, 'w', encoding='utf-8') as f:
+            f.write(to_markdown(analysis, args.metric))
+        print(f"\n  ✓ Saved: {args.markdown}")
+    if args.plot:
+        plot_pareto(analysis, args.plot)
+        print(f"  ✓ Saved: {args.plot}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cold-Start and Warm-Up Detection
+Separates the warm-up phase of a run from its steady state
+
+The first requests after a deploy pay for EF Core model building, JIT and
+connection-pool setup; in the summary they are averaged into
+http_req_duration. Here the per-second median latency (log scale) of a raw
+k6 stream is segmented with PELT changepoint detection, and leading
+segments that sit clearly above the segment after them are the warm-up. A
+ramping scenario's later load increases only raise latency, so they never
+count as warm-up.
+
+Reported per run and per endpoint: cold-start latency (first request and
+first COLD_REQUESTS mean), time-to-steady-state, and all-in vs
+steady-state-only avg / p95 / p99.
+"""
+
+import numpy as np
+
+from perf import k6stream
+
+# Mean of the first requests, reported as cold-start latency
+COLD_REQUESTS = 10
+# A leading segment is warm-up if its median latency exceeds the next one by this factor
+WARMUP_TOLERANCE = 1.25
+# Minimum segment length (seconds) for the changepoint search
+MIN_SEGMENT = 3
+
+
+def per_second(times, durations, start):
+    """(seconds, log median latency, count) for every second that has requests"""
+    second = ((times - start) // 1).astype(np.int64)
+    order = np.argsort(second, kind='stable')
+    second, values = second[order], np.log(np.maximum(durations[order], 1e-3))
+    keys, first = np.unique(second, return_index=True)
+    medians = np.array([np.median(chunk) for chunk in np.split(values, first[1:])])
+    counts = np.diff(np.append(first, len(second)))
+    return keys, medians, counts
+
+
+def pelt(series, penalty=None, min_size=MIN_SEGMENT):
+    """Changepoints of a piecewise-constant mean (PELT, squared-error cost)
+
+    Returns segment end indices (exclusive), the last one being len(series).
+    The default penalty is BIC-like: 2 * variance * log(n), with the variance
+    estimated from first differences so level shifts do not inflate it.
+    """
+    n = len(series)
+    if n < 2 * min_size:
+        return [n]
+    if penalty is None:
+        sigma2 = np.median(np.abs(np.diff(series))) ** 2 / (2 * 0.6745 ** 2) or np.var(series) or 1e-6
+        penalty = 2 * sigma2 * np.log(n)
+
+    s1 = np.concatenate([[0.0], np.cumsum(series)])
+    s2 = np.concatenate([[0.0], np.cumsum(series ** 2)])
+
+    def cost(starts, end):
+        length = end - starts
+        total = s1[end] - s1[starts]
+        return (s2[end] - s2[starts]) - total * total / length
+
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    previous = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0], dtype=np.int64)
+    for end in range(min_size, n + 1):
+        costs = best[candidates] + cost(candidates, end) + penalty
+        i = int(np.argmin(costs))
+        best[end], previous[end] = costs[i], candidates[i]
+        # Prune candidates that can never be optimal again
+        candidates = candidates[costs - penalty <= best[end]]
+        if end - min_size + 1 >= min_size:
+            candidates = np.append(candidates, end - min_size + 1)
+
+    ends, end = [], n
+    while end > 0:
+        ends.append(end)
+        end = int(previous[end])
+    return sorted(ends)
+
+
+def warmup_end(medians, counts, tolerance=WARMUP_TOLERANCE):
+    """Index (into the per-second series) where steady state begins; 0 if no warm-up"""
+    ends = pelt(medians)
+    bounds = list(zip([0] + ends[:-1], ends))
+    level = [np.average(medians[a:b], weights=counts[a:b]) for a, b in bounds]
+    start = 0
+    # Compare with the following segment, not the rest of the run: a ramping
+    # scenario's later, slower segments would otherwise hide the warm-up tail
+    for i in range(len(bounds) - 1):
+        if level[i] - level[i + 1] < np.log(tolerance):
+            break
+        start = bounds[i][1]
+    return start
+
+
+def _stats(durations):
+    if not len(durations):
+        return {'count': 0, 'avg': 0.0, 'p95': 0.0, 'p99': 0.0}
+    p95, p99 = np.percentile(durations, [95, 99])
+    return {'count': int(len(durations)), 'avg': float(durations.mean()), 'p95': float(p95), 'p99': float(p99)}
+
+
+def _analyze_series(times, durations, start):
+    order = np.argsort(times, kind='stable')
+    times, durations = times[order], durations[order]
+    seconds, medians, counts = per_second(times, durations, start)
+    index = warmup_end(medians, counts)
+    boundary = start + float(seconds[index]) if index else start
+    warm = times >= boundary
+    return {
+        'first_request_ms': float(durations[0]),
+        'cold_start_ms': float(durations[:COLD_REQUESTS].mean()),
+        'warmup_seconds': boundary - start,
+        'warmup_requests': int((~warm).sum()),
+        'all': _stats(durations),
+        'steady': _stats(durations[warm]),
+        'series': {'second': seconds.tolist(), 'median_ms': np.exp(medians).tolist()},
+    }
+
+
+def analyze(requests):
+    """Warm-up analysis of a RequestTable, overall and per endpoint"""
+    start = requests.start
+    result = _analyze_series(requests.time, requests.duration, start)
+    result['start'] = start
+    result['endpoints'] = {}
+    for code, label in enumerate(requests.endpoint_labels):
+        mask = requests.endpoint == code
+        if mask.sum() >= 2 * MIN_SEGMENT:
+            endpoint = _analyze_series(requests.time[mask], requests.duration[mask], start)
+            del endpoint['series']
+            result['endpoints'][label] = endpoint
+    return result
+
+
+def steady_mask(requests, warmup):
+    """Boolean mask of the requests after the warm-up phase"""
+    return requests.time >= requests.start + warmup['warmup_seconds']
+
+
+def steady_summary(data, requests, warmup):
+    """Copy of a handleSummary result with http_req_duration / http_reqs restricted to steady state"""
+    return k6stream.subset_summary(data, requests, steady_mask(requests, warmup),
+                                   {'warmupExcludedSeconds': warmup['warmup_seconds']})
+
+
+def generate_html_section(warmups, excluded=False):
+    """HTML section for {(architecture, scenario): analyze(...)}"""
+    note = ('Headline metrics above exclude the warm-up phase.' if excluded else
+            'Headline metrics above include the warm-up phase (use --exclude-warmup to drop it).')
+    html = f"""
+        <h2>🔥 Cold Start and Warm-Up</h2>
+        <p>Warm-up is detected with PELT changepoints on the per-second median latency. {note}</p>
+        <img src="graph-warmup.png" alt="Warm-Up Detection">
+        <table>
+            <tr><th>Run</th><th>Endpoint</th><th>First request</th><th>Cold start (first {COLD_REQUESTS})</th><th>Time to steady state</th><th>Avg (all / steady)</th><th>P95 (all / steady)</th><th>P99 (all / steady)</th></tr>
+"""
+    for (architecture, scenario), w in sorted(warmups.items()):
+        rows = [('all', w)] + sorted(w['endpoints'].items())
+        for endpoint, r in rows:
+            html += f"""            <tr><td>{architecture.title()} - {scenario.replace('_', ' ').title()}</td><td>{endpoint}</td><td>{r['first_request_ms']:.0f} ms</td><td>{r['cold_start_ms']:.0f} ms</td><td>{r['warmup_seconds']:.0f} s ({r['warmup_requests']} req)</td><td>{r['all']['avg']:.1f} / {r['steady']['avg']:.1f} ms</td><td>{r['all']['p95']:.1f} / {r['steady']['p95']:.1f} ms</td><td>{r['all']['p99']:.1f} / {r['steady']['p99']:.1f} ms</td></tr>
+"""
+    html += """        </table>
+"""
+    return html
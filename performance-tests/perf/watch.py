@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Live Run Monitor
+Tails a growing k6 / perf.loadgen NDJSON stream and prints rolling stats
+
+handleSummary only prints when a run ends. This mode follows the raw
+stream while it is written (`k6 run --out json=raw-....ndjson`, or a
+perf.loadgen raw file) and prints once per second, over a rolling window:
+throughput, error rate, p95 and p99, plus the run's cumulative p95.
+
+Memory is bounded: each second of the window is one perf.histogram
+LogHistogram, and older seconds are dropped; the file is read
+incrementally.
+
+SLOs default to the thresholds in test-scenarios.js (p95 < 3000 ms,
+p99 < 5000 ms, errors < 10%). A breach has to hold for --grace seconds on
+a window with at least --min-requests requests before it counts, so a
+single slow second does not end a run. With a command after `--` (or
+--pid) the monitored k6 process is then interrupted like Ctrl+C, so k6
+still writes its summary, and watch exits with 99 (k6's exit code for
+failed thresholds).
+
+Usage (from performance-tests/):
+    python -m perf.watch raw-monolith-heavy_load.ndjson
+    python -m perf.watch raw-monolith-heavy_load.ndjson -- \\
+        k6 run --out json=raw-monolith-heavy_load.ndjson test-scenarios.js
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from perf.histogram import LogHistogram
+from perf.k6stream import iter_points
+
+# test-scenarios.js thresholds
+DEFAULT_SLO_P95_MS = 3000.0
+DEFAULT_SLO_P99_MS = 5000.0
+DEFAULT_SLO_ERROR_RATE = 0.1
+EXIT_SLO_ABORT = 99
+
+POLL_SECONDS = 0.25
+READ_CHUNK = 1 << 20
+
+
+class _Second:
+    __slots__ = ('histogram', 'requests', 'failed')
+
+    def __init__(self):
+        self.histogram = LogHistogram()
+        self.requests = 0
+        self.failed = 0
+
+
+class RollingStats:
+    """Per-second buckets over the last `window` seconds of stream time, plus run totals"""
+
+    def __init__(self, window=30):
+        self.window = window
+        self.seconds = {}
+        self.latest = None
+        self.first = None
+        self.total = LogHistogram()
+        self.requests = 0
+        self.failed = 0
+
+    def add(self, epoch, duration, failed):
+        second = int(epoch)
+        if self.latest is not None and second <= self.latest - self.window:
+            return  # older than the window (late flush)
+        bucket = self.seconds.get(second)
+        if bucket is None:
+            bucket = self.seconds[second] = _Second()
+            if self.latest is None or second > self.latest:
+                self.latest = second
+                for old in [s for s in self.seconds if s <= second - self.window]:
+                    del self.seconds[old]
+        if self.first is None or second < self.first:
+            self.first = second
+        bucket.histogram.add(duration)
+        bucket.requests += 1
+        bucket.failed += failed
+        self.total.add(duration)
+        self.requests += 1
+        self.failed += failed
+
+    def snapshot(self):
+        """Rolling throughput, error rate and percentiles over the buckets in the window"""
+        merged = LogHistogram()
+        requests = failed = 0
+        for bucket in self.seconds.values():
+            merged.merge(bucket.histogram)
+            requests += bucket.requests
+            failed += bucket.failed
+        # The newest second is still filling; throughput uses complete seconds only
+        complete = [b.requests for s, b in self.seconds.items() if s != self.latest]
+        rate = sum(complete) / len(complete) if complete else float(requests)
+        return {
+            'elapsed': (self.latest - self.first + 1) if self.first is not None else 0,
+            'requests': requests,
+            'rate': rate,
+            'error_rate': failed / requests if requests else 0.0,
+            'p95': merged.quantile(0.95),
+            'p99': merged.quantile(0.99),
+            'total_requests': self.requests,
+            'total_p95': self.total.quantile(0.95),
+        }
+
+
+def request_failed(tags):
+    """Whether a request Point failed: expected_response tag, else its status"""
+    expected = tags.get('expected_response')
+    if expected is not None:
+        return expected == 'false'
+    status = int(tags.get('status') or 0)
+    return status == 0 or status >= 400
+
+
+def breaches(snapshot, slo):
+    """SLOs the rolling window violates"""
+    found = []
+    if slo['p95'] and snapshot['p95'] > slo['p95']:
+        found.append(f"p95 {snapshot['p95']:.0f} ms > {slo['p95']:g}")
+    if slo['p99'] and snapshot['p99'] > slo['p99']:
+        found.append(f"p99 {snapshot['p99']:.0f} ms > {slo['p99']:g}")
+    if slo['error_rate'] is not None and snapshot['error_rate'] > slo['error_rate']:
+        found.append(f"errors {snapshot['error_rate'] * 100:.1f}% > {slo['error_rate'] * 100:g}%")
+    return found
+
+
+async def tail_lines(path, done, from_end=False):
+    """Yield complete lines appended to `path` until `done()` is true and the file is drained"""
+    while not os.path.exists(path):
+        if done():
+            return
+        await asyncio.sleep(POLL_SECONDS)
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        if from_end:
+            f.seek(0, os.SEEK_END)
+        partial = ''
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if chunk:
+                lines = (partial + chunk).split('\n')
+                partial = lines.pop()
+                yield lines
+                continue
+            if done():
+                if partial:
+                    yield [partial]
+                return
+            await asyncio.sleep(POLL_SECONDS)
+
+
+def render(snapshot, problems, interactive):
+    line = (f"⏱ {snapshot['elapsed']:>5}s  {snapshot['rate']:>8.1f} req/s  "
+            f"errors {snapshot['error_rate'] * 100:5.1f}%  p95 {snapshot['p95']:>7.0f} ms  "
+            f"p99 {snapshot['p99']:>7.0f} ms  | total {snapshot['total_requests']:>9,} req, p95 {snapshot['total_p95']:.0f} ms")
+    if problems:
+        line += '  ⚠️  ' + '; '.join(problems)
+    if interactive:
+        sys.stdout.write('\r\033[K' + line)
+        sys.stdout.flush()
+    else:
+        print(line, flush=True)
+
+
+async def watch(path, slo, window=30, grace=10, min_requests=100, from_end=False, process=None, pid=None,
+                idle_exit=None):
+    """Follow a stream until the watched process exits (or the file goes idle); returns (stats, abort reason)"""
+    stats = RollingStats(window)
+    interactive = sys.stdout.isatty()
+    state = {'last_data': time.monotonic()}
+
+    def done():
+        if process is not None:
+            return process.poll() is not None
+        if pid is not None:
+            return not _alive(pid)
+        return idle_exit is not None and time.monotonic() - state['last_data'] > idle_exit
+
+    async def reader():
+        async for lines in tail_lines(path, done, from_end):
+            state['last_data'] = time.monotonic()
+            for _, epoch, value, tags in iter_points(lines, metrics=('http_req_duration',)):
+                stats.add(epoch, value, request_failed(tags))
+
+    task = asyncio.get_running_loop().create_task(reader())
+    breached_for, reason = 0, None
+    while not task.done():
+        await asyncio.sleep(1)
+        snapshot = stats.snapshot()
+        problems = breaches(snapshot, slo) if snapshot['requests'] >= min_requests else []
+        breached_for = breached_for + 1 if problems else 0
+        render(snapshot, problems, interactive)
+        if problems and breached_for >= grace and reason is None and (process is not None or pid is not None):
+            reason = '; '.join(problems)
+            print(f"\n🛑 SLO violated for {breached_for}s ({reason}) - stopping the run")
+            _interrupt(process, pid)
+    await task
+    if interactive:
+        print()
+    return stats, reason
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _interrupt(process, pid):
+    """Ask k6 to stop like Ctrl+C (it still runs handleSummary)"""
+    sig = signal.CTRL_BREAK_EVENT if os.name == 'nt' else signal.SIGINT
+    if process is not None:
+        process.send_signal(sig)
+    elif pid is not None:
+        os.kill(pid, sig)
+
+
+def main():
+    argv = sys.argv[1:]
+    command = []
+    if '--' in argv:
+        command = argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+
+    parser = argparse.ArgumentParser(description='Live monitor for a k6 / perf.loadgen raw stream')
+    parser.add_argument('path', help='raw NDJSON stream being written')
+    parser.add_argument('--window', type=int, default=30, help='rolling window (seconds)')
+    parser.add_argument('--slo-p95', type=float, default=DEFAULT_SLO_P95_MS, help='ms, 0 = off')
+    parser.add_argument('--slo-p99', type=float, default=DEFAULT_SLO_P99_MS, help='ms, 0 = off')
+    parser.add_argument('--slo-error', type=float, default=DEFAULT_SLO_ERROR_RATE, help='0-1')
+    parser.add_argument('--grace', type=int, default=10, help='seconds a breach must last before aborting')
+    parser.add_argument('--min-requests', type=int, default=100,
+                        help='requests the window needs before SLOs are evaluated')
+    parser.add_argument('--pid', type=int, help='k6 process to interrupt on a sustained breach')
+    parser.add_argument('--from-end', action='store_true', help='skip what the file already contains')
+    parser.add_argument('--idle-exit', type=float, default=30.0,
+                        help='without a process to watch, stop after this many seconds without new data')
+    args = parser.parse_args(argv)
+
+    process = None
+    if command:
+        # Start fresh: an old stream with the same name would be replayed
+        if os.path.exists(args.path) and not args.from_end:
+            os.remove(args.path)
+        flags = subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0
+        process = subprocess.Popen(command, creationflags=flags)
+        print(f"👀 Watching {args.path} while running: {' '.join(command)}")
+    else:
+        print(f"👀 Watching {args.path} (Ctrl+C to stop)")
+
+    slo = {'p95': args.slo_p95, 'p99': args.slo_p99, 'error_rate': args.slo_error}
+    try:
+        stats, reason = asyncio.run(watch(args.path, slo, args.window, args.grace, args.min_requests,
+                                          args.from_end, process, args.pid, args.idle_exit))
+    except KeyboardInterrupt:
+        if process is not None:
+            process.wait()
+        return
+
+    if process is not None:
+        process.wait()
+    final = stats.snapshot()
+    print(f"\n  {final['total_requests']:,} requests, "
+          f"errors {stats.failed / max(stats.requests, 1) * 100:.2f}%, p95 {final['total_p95']:.0f} ms")
+    if reason:
+        print(f"  ✗ Aborted early: {reason}")
+        sys.exit(EXIT_SLO_ABORT)
+    if process is not None and process.returncode:
+        sys.exit(process.returncode)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,10 @@
 Quick Performance Summary - No external dependencies
 """
 
-import json
 import glob
 
+from perf import summary
+
 def load_results():
     """Load all test result JSON files"""
     results = {
@@ -17,28 +18,27 @@ def load_results():
     result_files = glob.glob('results-*.json')
 
     for file in result_files:
-        with open(file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        arch = data['testConfig']['testName']
-        scenario = data['testConfig']['scenario']
-        results[arch][scenario] = data
+        run = summary.load(file)
+        arch = run.config['testName']
+        scenario = run.config['scenario']
+        results.setdefault(arch, {})[scenario] = run
 
     return results
 
 def extract_metrics(data):
     """Extract key metrics from test data"""
-    metrics = data.get('metrics', {})
+    duration = data.trend('http_req_duration')
 
     return {
-        'requests_total': metrics.get('http_reqs', {}).get('values', {}).get('count', 0),
-        'requests_per_sec': metrics.get('http_reqs', {}).get('values', {}).get('rate', 0),
-        'response_avg': metrics.get('http_req_duration', {}).get('values', {}).get('avg', 0),
-        'response_p95': metrics.get('http_req_duration', {}).get('values', {}).get('p(95)', 0),
-        'response_p99': metrics.get('http_req_duration', {}).get('values', {}).get('p(99)', 0),
-        'success_count': metrics.get('successful_requests', {}).get('values', {}).get('count', 0),
-        'failed_count': metrics.get('failed_requests', {}).get('values', {}).get('count', 0),
-        'data_received_mb': metrics.get('data_received', {}).get('values', {}).get('count', 0) / 1024 / 1024
+        'requests_total': data.total_requests,
+        'requests_per_sec': data.throughput,
+        'response_avg': duration.avg,
+        'response_p95': duration.p95,
+        'response_p99': duration.p99,
+        'success_count': data.counter('successful_requests').count,
+        'failed_count': data.counter('failed_requests').count,
+        'data_received_mb': data.data_received_mb,
+        'goodput': data.goodput
     }
 
 def print_summary(results):
@@ -62,6 +62,7 @@ def print_summary(results):
             print(f"\n  MONOLITH:")
             print(f"    Total Requests:     {mono_metrics['requests_total']}")
             print(f"    Requests/sec:       {mono_metrics['requests_per_sec']:.2f}")
+            print(f"    Goodput (useful/s): {mono_metrics['goodput']:.2f}")
             print(f"    Avg Response Time:  {mono_metrics['response_avg']:.2f} ms")
             print(f"    P95 Response Time:  {mono_metrics['response_p95']:.2f} ms")
             print(f"    P99 Response Time:  {mono_metrics['response_p99']:.2f} ms")
@@ -74,6 +75,7 @@ def print_summary(results):
             print(f"\n  MICROSERVICES:")
             print(f"    Total Requests:     {micro_metrics['requests_total']}")
             print(f"    Requests/sec:       {micro_metrics['requests_per_sec']:.2f}")
+            print(f"    Goodput (useful/s): {micro_metrics['goodput']:.2f}")
             print(f"    Avg Response Time:  {micro_metrics['response_avg']:.2f} ms")
             print(f"    P95 Response Time:  {micro_metrics['response_p95']:.2f} ms")
             print(f"    P99 Response Time:  {micro_metrics['response_p99']:.2f} ms")
@@ -86,9 +88,11 @@ def print_summary(results):
                 print(f"\n  COMPARISON (Microservices vs Monolith):")
                 response_diff = ((micro_metrics['response_avg'] - mono_metrics['response_avg']) / mono_metrics['response_avg'] * 100)
                 throughput_diff = ((micro_metrics['requests_per_sec'] - mono_metrics['requests_per_sec']) / mono_metrics['requests_per_sec'] * 100)
+                goodput_diff = ((micro_metrics['goodput'] - mono_metrics['goodput']) / mono_metrics['goodput'] * 100) if mono_metrics['goodput'] > 0 else 0
 
                 print(f"    Response Time:  {response_diff:+.1f}% ({'SLOWER' if response_diff > 0 else 'FASTER'})")
                 print(f"    Throughput:     {throughput_diff:+.1f}% ({'BETTER' if throughput_diff > 0 else 'WORSE'})")
+                print(f"    Goodput:        {goodput_diff:+.1f}% ({'BETTER' if goodput_diff > 0 else 'WORSE'})")
 
                 if mono_metrics['failed_count'] == 0 and micro_metrics['failed_count'] > 0:
                     error_rate = (micro_metrics['failed_count'] / micro_metrics['requests_total'] * 100)
@@ -123,9 +127,36 @@ def print_summary(results):
         print(f"  [!] Microservices: ~{abs(avg_response_diff):.0f}x slower responses, some request failures")
         print(f"  [*] Note: Microservices are deployed on AWS (external), Monolith is local")
         print(f"      Network latency is a significant factor in the performance difference")
+        print(f"      (run both locally behind perf/netem_proxy.py for identical network conditions)")
+
+    print_variants(results)
 
     print("\n" + "="*80 + "\n")
 
+def print_variants(results):
+    """Ranking and p95 delta matrix when more than the two architectures were run"""
+    from perf import variants
+
+    analysis = variants.analyze(results, ['light_load', 'medium_load', 'heavy_load'])
+    if variants.variant_count(analysis) <= 2:
+        return
+    print("\n" + "="*80)
+    print(f" DEPLOYMENT VARIANTS ({variants.variant_count(analysis)})")
+    print("="*80)
+    for scenario, a in analysis.items():
+        print(variants.to_text(scenario, a, variants.LATENCY))
+
 if __name__ == "__main__":
-    results = load_results()
-    print_summary(results)
+    import argparse
+
+    from perf import profiling
+
+    parser = argparse.ArgumentParser(description='Text summary of the results files')
+    parser.add_argument('--profile', nargs='?', const='profile-summary', metavar='PREFIX',
+                        help='per-stage time / memory profile: PREFIX.prof and PREFIX-timeline.json')
+    args = parser.parse_args()
+
+    with profiling.session(args.profile, 'quick-summary') as profiler:
+        profiler.instrument(globals(), ['load_results', 'extract_metrics', 'print_summary', 'print_variants'])
+        results = load_results()
+        print_summary(results)
@@ -36,7 +36,8 @@ function Run-Test {
     $env:TEST_NAME = $Architecture
     $env:SCENARIO = $Scenario.Name
 
-    & $K6_PATH run test-scenarios.js
+    # Raw per-request stream for goodput / error taxonomy analysis
+    & $K6_PATH run --out "json=raw-$Architecture-$($Scenario.Name).ndjson" test-scenarios.js
 
     Write-Host "`n✓ Test completed!" -ForegroundColor Green
 }
@@ -0,0 +1,109 @@
+# Load x Data-Size Matrix
+# Runs test-scenarios.js at several user loads against several synthetic dataset sizes
+#
+# Each dataset directory comes from: python -m perf.datagen --users N --out dataset-N
+# The script loads one dataset at a time with psql into the database of each
+# target, runs every VU level against it, then unloads it again. Results land
+# in matrix/ and are picked up by analyze-results.py (heatmaps and contour plots).
+#
+# The monolith and the microservices deployment have their own databases:
+# -MonolithDSN (default -DSN / $env:DSN) and -MicroservicesDSN (default
+# $env:MICROSERVICES_DSN). A target without a connection string is skipped.
+
+param(
+    [string[]]$Datasets = @("dataset-1000", "dataset-10000", "dataset-100000"),
+    [int[]]$Users = @(5, 20, 50, 100),
+    [string]$Duration = "2m",
+    [string]$DSN = $env:DSN,
+    [string]$MonolithDSN = $DSN,
+    [string]$MicroservicesDSN = $env:MICROSERVICES_DSN,
+    [switch]$SkipMonolith,
+    [switch]$SkipMicroservices
+)
+
+$K6_PATH = "C:\Program Files\k6\k6.exe"
+$MONOLITH_URL = "http://localhost:5000"
+$MICROSERVICES_URL = "http://44.208.207.182"
+$MATRIX_DIR = "matrix"
+
+Write-Host "`n╔════════════════════════════════════════════╗" -ForegroundColor Cyan
+Write-Host "║  QuizHub Load x Data-Size Matrix           ║" -ForegroundColor Cyan
+Write-Host "╚════════════════════════════════════════════╝`n" -ForegroundColor Cyan
+
+$architectures = @()
+if (-not $SkipMonolith) {
+    if ($MonolithDSN) { $architectures += @{ Name = "monolith"; URL = $MONOLITH_URL; DSN = $MonolithDSN } }
+    else { Write-Host "⚠️  Skipping monolith: no database connection string (-MonolithDSN, -DSN or `$env:DSN)" -ForegroundColor Yellow }
+}
+if (-not $SkipMicroservices) {
+    if ($MicroservicesDSN) { $architectures += @{ Name = "microservices"; URL = $MICROSERVICES_URL; DSN = $MicroservicesDSN } }
+    else { Write-Host "⚠️  Skipping microservices: no database connection string (-MicroservicesDSN or `$env:MICROSERVICES_DSN)" -ForegroundColor Yellow }
+}
+
+if ($architectures.Count -eq 0) {
+    Write-Host "❌ No target has a database to load the datasets into" -ForegroundColor Red
+    exit 1
+}
+
+New-Item -ItemType Directory -Force -Path $MATRIX_DIR | Out-Null
+
+$totalTests = $Datasets.Count * $Users.Count * $architectures.Count
+$completedTests = 0
+Write-Host "Total tests to run: $totalTests" -ForegroundColor White
+
+foreach ($dataset in $Datasets) {
+    if (-not (Test-Path "$dataset\manifest.json")) {
+        Write-Host "❌ $dataset\manifest.json not found - run: python -m perf.datagen --out $dataset" -ForegroundColor Red
+        continue
+    }
+
+    Write-Host "`n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━" -ForegroundColor Cyan
+    Write-Host " DATASET: $dataset" -ForegroundColor Cyan
+    Write-Host "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━`n" -ForegroundColor Cyan
+
+    foreach ($architecture in $architectures) {
+        # load.sql runs in one transaction with ON_ERROR_STOP, so a failure leaves nothing behind
+        Push-Location $dataset
+        & psql $architecture.DSN -q -f load.sql
+        $loaded = $LASTEXITCODE -eq 0
+        Pop-Location
+        if (-not $loaded) {
+            Write-Host "❌ Loading $dataset into the $($architecture.Name) database failed (psql exit $LASTEXITCODE) - skipping its cells" -ForegroundColor Red
+            $completedTests += $Users.Count
+            continue
+        }
+
+        foreach ($vus in $Users) {
+            $name = "$($architecture.Name)-$(Split-Path $dataset -Leaf)-${vus}vu"
+            Write-Host "`n📊 Testing: $name" -ForegroundColor Yellow
+
+            $env:BASE_URL = $architecture.URL
+            $env:TEST_NAME = $architecture.Name
+            $env:SCENARIO = "medium_load"
+            $env:VUS = $vus
+            $env:DURATION = $Duration
+            $env:DATASET_MANIFEST = "$dataset\manifest.json"
+            $env:RESULTS_FILE = "$MATRIX_DIR\results-$name.json"
+
+            & $K6_PATH run --out "json=$MATRIX_DIR\raw-$name.ndjson" test-scenarios.js
+
+            $completedTests++
+            Write-Host "`nProgress: $completedTests/$totalTests tests completed" -ForegroundColor Gray
+            Start-Sleep -Seconds 10  # Cool-down period
+        }
+
+        # Rows left behind would be measured as part of the next dataset
+        Push-Location $dataset
+        & psql $architecture.DSN -q -f unload.sql
+        $unloaded = $LASTEXITCODE -eq 0
+        Pop-Location
+        if (-not $unloaded) {
+            Write-Host "❌ Unloading $dataset from the $($architecture.Name) database failed (psql exit $LASTEXITCODE) - aborting the matrix" -ForegroundColor Red
+            exit 1
+        }
+    }
+}
+
+Remove-Item Env:\VUS, Env:\DURATION, Env:\DATASET_MANIFEST, Env:\RESULTS_FILE -ErrorAction SilentlyContinue
+
+Write-Host "`n✓ Matrix complete. Run: python analyze-results.py" -ForegroundColor Green
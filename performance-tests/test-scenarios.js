@@ -4,17 +4,28 @@
 import http from 'k6/http';
 import { check, sleep } from 'k6';
 import { Rate, Trend, Counter } from 'k6/metrics';
+import { SharedArray } from 'k6/data';
+import exec from 'k6/execution';
 
 // Custom metrics
 const errorRate = new Rate('errors');
 const responseTime = new Trend('response_time');
 const successfulRequests = new Counter('successful_requests');
 const failedRequests = new Counter('failed_requests');
+// Successful non-health requests - the numerator of goodput (perf/goodput.py)
+const usefulRequests = new Counter('useful_requests');
 
 // Get base URL from environment (set when running tests)
 const BASE_URL = __ENV.BASE_URL || 'http://localhost:5000';
 const TEST_NAME = __ENV.TEST_NAME || 'unknown';
 
+// Optional synthetic dataset (python -m perf.datagen); without it the
+// scenario keeps using the seeded quiz below
+const DATASET_MANIFEST = __ENV.DATASET_MANIFEST;
+const dataset = DATASET_MANIFEST ? JSON.parse(open(DATASET_MANIFEST)) : null;
+const datasetQuizIds = new SharedArray('dataset quiz ids', () =>
+  dataset ? dataset.quizzes.filter((q) => q.public).map((q) => q.id) : []);
+
 // Test scenario configurations
 export const scenarios = {
   // Scenario 1: Light Load (5 users)
@@ -54,15 +65,83 @@ export const scenarios = {
 };
 
 // Thresholds for pass/fail criteria
+// VUS / DURATION override constant-vus scenarios (load x data-size matrix runs)
+const selectedScenario = { ...scenarios[__ENV.SCENARIO || 'medium_load'] };
+if (selectedScenario.executor === 'constant-vus') {
+  if (__ENV.VUS) selectedScenario.vus = parseInt(__ENV.VUS, 10);
+  if (__ENV.DURATION) selectedScenario.duration = __ENV.DURATION;
+}
+
+// Latency histograms and a request timeline for handleSummary, which only
+// sees aggregates. Each request adds 1 to the Counter of its latency bucket
+// and to the Rate of its time window; handleSummary folds them into the
+// `histograms` / `timeline` blocks (perf/histogram.py, perf/distribution.py).
+// A bucket here spans HISTOGRAM_STEP LogHistogram buckets (~10% relative
+// error instead of 1%), so an endpoint needs ~60 Counters, not ~700.
+const HISTOGRAM_ENDPOINTS = ['browse_quizzes', 'get_categories', 'view_quiz_details', 'health_check'];
+const HISTOGRAM_GAMMA = 1.01 / 0.99;
+const HISTOGRAM_STEP = 10;
+const HISTOGRAM_LOG_STEP = HISTOGRAM_STEP * Math.log(HISTOGRAM_GAMMA);
+const HISTOGRAM_MIN_INDEX = Math.ceil(Math.log(0.5) / HISTOGRAM_LOG_STEP);    // 0.5 ms
+const HISTOGRAM_MAX_INDEX = Math.ceil(Math.log(60000) / HISTOGRAM_LOG_STEP);  // k6's 60s request timeout
+// Windows cover the scenario plus the 30s graceful stop: one second each, wider for long runs
+const TIMELINE_MAX_WINDOWS = 120;
+
+function durationSeconds(value) {
+  const units = { ms: 0.001, s: 1, m: 60, h: 3600 };
+  const pattern = /(\d+(?:\.\d+)?)(ms|s|m|h)/g;
+  let seconds = 0;
+  let match;
+  while ((match = pattern.exec(String(value))) !== null) {
+    seconds += parseFloat(match[1]) * units[match[2]];
+  }
+  return seconds;
+}
+
+const scenarioSeconds = (selectedScenario.stages || [{ duration: selectedScenario.duration }])
+  .reduce((total, stage) => total + durationSeconds(stage.duration), 0) + 30;
+const TIMELINE_WINDOW_S = Math.max(1, Math.ceil(scenarioSeconds / TIMELINE_MAX_WINDOWS));
+const TIMELINE_WINDOWS = Math.ceil(scenarioSeconds / TIMELINE_WINDOW_S);
+
+function bucketName(index) {
+  return index < 0 ? `m${-index}` : `${index}`;
+}
+
+const histogramCounters = {};
+for (const endpoint of HISTOGRAM_ENDPOINTS) {
+  histogramCounters[endpoint] = [];
+  for (let index = HISTOGRAM_MIN_INDEX; index <= HISTOGRAM_MAX_INDEX; index++) {
+    histogramCounters[endpoint].push(new Counter(`hist_${endpoint}_${bucketName(index)}`));
+  }
+}
+// One Rate per window: passes are the failed requests, passes + fails all of them
+const timelineFailed = [];
+for (let window = 0; window < TIMELINE_WINDOWS; window++) {
+  timelineFailed.push(new Rate(`timeline_${window}`));
+}
+
+function recordRequest(response, endpoint) {
+  const index = Math.ceil(Math.log(Math.max(response.timings.duration, 1e-3)) / HISTOGRAM_LOG_STEP);
+  const clamped = Math.min(Math.max(index, HISTOGRAM_MIN_INDEX), HISTOGRAM_MAX_INDEX);
+  histogramCounters[endpoint][clamped - HISTOGRAM_MIN_INDEX].add(1);
+  const elapsed = (Date.now() - exec.scenario.startTime) / 1000;
+  const window = Math.min(Math.floor(elapsed / TIMELINE_WINDOW_S), TIMELINE_WINDOWS - 1);
+  timelineFailed[window].add(response.status < 200 || response.status >= 400);
+}
+
 export const options = {
   scenarios: {
-    default: scenarios[__ENV.SCENARIO || 'medium_load'],
+    default: selectedScenario,
   },
   thresholds: {
     'http_req_duration': ['p(95)<3000', 'p(99)<5000'], // Calculate p99 explicitly
     'http_req_failed': ['rate<0.1'],     // Less than 10% errors
   },
   summaryTrendStats: ['avg', 'min', 'med', 'max', 'p(95)', 'p(99)'],
+  // k6's default system tags plus vu / iter, so slow requests in the raw stream
+  // can be traced to a VU iteration (perf/exemplars.py)
+  systemTags: ['proto', 'subproto', 'status', 'method', 'url', 'name', 'group', 'check', 'error',
+    'error_code', 'tls_version', 'scenario', 'service', 'expected_response', 'vu', 'iter'],
 };
 
 // Realistic user behavior - browse, view quiz, take quiz
@@ -71,6 +150,7 @@ export default function () {
   let response = http.get(`${BASE_URL}/api/quiz`, {
     tags: { name: 'browse_quizzes' },
   });
+  recordRequest(response, 'browse_quizzes');
 
   const browseSuccess = check(response, {
     'browse quizzes status is 200': (r) => r.status === 200,
@@ -86,6 +166,7 @@ export default function () {
 
   if (browseSuccess) {
     successfulRequests.add(1);
+    usefulRequests.add(1);
   } else {
     failedRequests.add(1);
     errorRate.add(1);
@@ -98,6 +179,7 @@ export default function () {
   response = http.get(`${BASE_URL}/api/category`, {
     tags: { name: 'get_categories' },
   });
+  recordRequest(response, 'get_categories');
 
   const categoriesSuccess = check(response, {
     'categories status is 200': (r) => r.status === 200,
@@ -105,6 +187,7 @@ export default function () {
 
   if (categoriesSuccess) {
     successfulRequests.add(1);
+    usefulRequests.add(1);
   } else {
     failedRequests.add(1);
     errorRate.add(1);
@@ -114,8 +197,8 @@ export default function () {
   sleep(1);
 
   // 3. View specific quiz details (simulate clicking on a quiz)
-  // Using real quiz ID from the database
-  const quizIds = [
+  // Using real quiz ID from the database, or one sampled from the dataset manifest
+  const quizIds = datasetQuizIds.length > 0 ? datasetQuizIds : [
     '1f645276-d6bc-4901-8774-5d8af1e13396', // proba quiz (Sports)
   ];
 
@@ -124,6 +207,7 @@ export default function () {
   response = http.get(`${BASE_URL}/api/quiz/${randomQuizId}`, {
     tags: { name: 'view_quiz_details' },
   });
+  recordRequest(response, 'view_quiz_details');
 
   const detailsSuccess = check(response, {
     'quiz details status is 200': (r) => r.status === 200,
@@ -131,6 +215,7 @@ export default function () {
 
   if (detailsSuccess) {
     successfulRequests.add(1);
+    usefulRequests.add(1);
   } else {
     failedRequests.add(1);
     errorRate.add(1);
@@ -143,6 +228,7 @@ export default function () {
   response = http.get(`${BASE_URL}/health`, {
     tags: { name: 'health_check' },
   });
+  recordRequest(response, 'health_check');
 
   const healthSuccess = check(response, {
     'health check responds': (r) => r.status === 200 || r.status === 404,
@@ -158,18 +244,81 @@ export default function () {
   sleep(1);
 }
 
+// LogHistogram compact form ({n, s, min, max, b: [[index, count], ...]}) of
+// coarse buckets: each is written as the LogHistogram bucket at its middle,
+// so the histograms merge with the 1% ones of perf.loadgen / perf.ingest.
+// sum / min / max come from the k6 trend when there is one, else the buckets
+function histogramOf(buckets, trend) {
+  const b = buckets.map(([index, count]) => [index * HISTOGRAM_STEP - HISTOGRAM_STEP / 2, count]);
+  const midpoint = (index) => 2 * Math.pow(HISTOGRAM_GAMMA, index) / (HISTOGRAM_GAMMA + 1);
+  const n = b.reduce((total, bucket) => total + bucket[1], 0);
+  if (trend) {
+    return { n, s: trend.values.avg * n, min: trend.values.min, max: trend.values.max, b };
+  }
+  const s = b.reduce((total, bucket) => total + midpoint(bucket[0]) * bucket[1], 0);
+  return { n, s, min: midpoint(b[0][0]), max: midpoint(b[b.length - 1][0]), b };
+}
+
+// Moves the hist_* / timeline_* metrics out of `metrics` into `histograms`
+// (per endpoint and overall) and `timeline` (requests / failed per window).
+// k6 only reports metrics that got samples, so empty buckets cost nothing.
+function exportHistograms(data) {
+  const metrics = {};
+  const buckets = {};
+  const overall = {};
+  const timeline = [];
+  for (const [key, metric] of Object.entries(data.metrics)) {
+    let match = /^hist_(\w+)_(m?)(\d+)$/.exec(key);
+    if (match) {
+      const index = (match[2] ? -1 : 1) * parseInt(match[3], 10);
+      const count = metric.values.count;
+      (buckets[match[1]] = buckets[match[1]] || []).push([index, count]);
+      overall[index] = (overall[index] || 0) + count;
+      continue;
+    }
+    match = /^timeline_(\d+)$/.exec(key);
+    if (match) {
+      timeline.push({
+        second: parseInt(match[1], 10) * TIMELINE_WINDOW_S,
+        requests: metric.values.passes + metric.values.fails,
+        failed: metric.values.passes,
+      });
+      continue;
+    }
+    metrics[key] = metric;
+  }
+
+  const byIndex = (a, b) => a[0] - b[0];
+  const histograms = {};
+  const overallBuckets = Object.keys(overall).map((index) => [parseInt(index, 10), overall[index]]).sort(byIndex);
+  if (overallBuckets.length > 0) {
+    histograms.http_req_duration = histogramOf(overallBuckets, metrics.http_req_duration);
+  }
+  for (const endpoint of Object.keys(buckets)) {
+    const key = `http_req_duration{name:${endpoint}}`;
+    histograms[key] = histogramOf(buckets[endpoint].sort(byIndex), metrics[key]);
+  }
+  timeline.sort((a, b) => a.second - b.second);
+  return { ...data, metrics, histograms, timeline };
+}
+
 // Summary function - formats output nicely
 export function handleSummary(data) {
   const timestamp = new Date().toISOString();
+  data = exportHistograms(data);
 
   return {
-    [`results-${TEST_NAME}-${__ENV.SCENARIO || 'default'}.json`]: JSON.stringify({
+    [__ENV.RESULTS_FILE || `results-${TEST_NAME}-${__ENV.SCENARIO || 'default'}.json`]: JSON.stringify({
       ...data,
       testConfig: {
         baseUrl: BASE_URL,
         testName: TEST_NAME,
         scenario: __ENV.SCENARIO || 'medium_load',
         timestamp: timestamp,
+        vus: selectedScenario.vus || null,
+        // Catalogue size the run was measured against (null = seed data only)
+        dataset: dataset ? { ...dataset.size, counts: dataset.counts, seed: dataset.seed } : null,
+        timelineWindowSeconds: TIMELINE_WINDOW_S,
       },
     }, null, 2),
     'stdout': generateTextSummary(data),
@@ -186,6 +335,7 @@ function generateTextSummary(data) {
   summary += indent + `Test Duration: ${(data.state.testRunDurationMs / 1000).toFixed(2)}s\n`;
   summary += indent + `Total Requests: ${data.metrics.http_reqs.values.count}\n`;
   summary += indent + `Requests/sec: ${data.metrics.http_reqs.values.rate.toFixed(2)}\n`;
+  summary += indent + `Goodput (useful req/s): ${(data.metrics.useful_requests?.values.rate || 0).toFixed(2)}\n`;
   summary += indent + `Successful: ${data.metrics.successful_requests?.values.count || 0}\n`;
   summary += indent + `Failed: ${data.metrics.failed_requests?.values.count || 0}\n\n`;
 
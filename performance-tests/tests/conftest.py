@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The perf package is imported from performance-tests/, as the scripts run it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,43 @@
+import asyncio
+import socket
+
+import pytest
+
+from perf import coordinator
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def _worker_that_drops_after_start(port):
+    for _ in range(50):
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            break
+        except OSError:
+            await asyncio.sleep(0.05)
+    await coordinator._send(writer, {'type': 'hello', 'host': 'test', 'pid': 1, 'time': 0})
+    await coordinator._receive(reader)
+    await coordinator._send(writer, {'type': 'ready'})
+    await coordinator._receive(reader)
+    writer.close()
+
+
+async def _run(port, workers):
+    run = asyncio.ensure_future(coordinator.coordinate({}, 2, 1, '127.0.0.1', port, 0))
+    await asyncio.gather(*(worker(port) for worker in workers))
+    return await asyncio.wait_for(run, 10)
+
+
+def test_a_dropped_worker_fails_the_run():
+    with pytest.raises(SystemExit, match='worker at 127.0.0.1'):
+        asyncio.run(_run(_free_port(), [_worker_that_drops_after_start]))
+
+
+def test_join_timeout_fails_the_run(monkeypatch):
+    monkeypatch.setattr(coordinator, 'JOIN_TIMEOUT', 0.3)
+    with pytest.raises(SystemExit, match='0 of 1 workers ready'):
+        asyncio.run(_run(_free_port(), []))
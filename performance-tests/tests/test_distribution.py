@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from perf import distribution, k6stream
+from perf.summary import RunSummary
+
+
+def _requests():
+    durations = np.concatenate((np.full(90, 10.0), np.full(10, 200.0)))
+    return k6stream.RequestTable(
+        ['browse_quizzes', 'health_check'],
+        np.array([0, 1] * 50),
+        np.linspace(100.0, 102.5, 100),
+        durations,
+        np.array([200] * 99 + [500]),
+        np.zeros(100, dtype=np.int32),
+    )
+
+
+def test_from_requests_builds_histograms_and_timeline():
+    blocks = distribution.from_requests(_requests())
+    assert set(blocks['histograms']) == {'http_req_duration', 'http_req_duration{name:browse_quizzes}',
+                                         'http_req_duration{name:health_check}'}
+    assert [t['second'] for t in blocks['timeline']] == [0, 1, 2]
+    assert sum(t['requests'] for t in blocks['timeline']) == 100
+    assert sum(t['failed'] for t in blocks['timeline']) == 1
+
+
+def test_analyze_falls_back_to_the_raw_stream():
+    run = RunSummary({'metrics': {'http_req_duration': {'type': 'trend', 'values': {'p(95)': 200}}}},
+                     'monolith', 'heavy_load')
+    analysis = distribution.analyze({'monolith': {'heavy_load': run}}, raw_requests={
+        ('monolith', 'heavy_load'): _requests()})
+    overall = analysis['monolith']['runs']['heavy_load']['overall']
+    assert overall.count == 100
+    assert overall.quantile(0.5) == pytest.approx(10, rel=0.01)
+    assert overall.quantile(0.95) == pytest.approx(200, rel=0.01)
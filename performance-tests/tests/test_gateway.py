@@ -0,0 +1,25 @@
+import pytest
+
+from perf.gateway import route_upstream
+
+
+# One case per location block of aws-deployment/microservices/nginx-simulation.conf
+@pytest.mark.parametrize('path, upstream', [
+    ('/health', 'gateway'),                                   # location /health
+    ('/api/auth/login', 'auth_service'),                      # location /api/auth
+    ('/api/quiz/17', 'quiz_service'),                         # location ~ ^/api/quiz/(?!.*/(submit|take|attempts))
+    ('/api/quiz/17/take', 'execution_service'),               # location ~ ^/api/quiz/.*/take
+    ('/api/quiz/17/submit', 'execution_service'),             # location ~ ^/api/quiz/.*/submit
+    ('/api/quiz/attempts/17/attempts', 'execution_service'),  # location ~ ^/api/quiz/attempts
+    ('/api/quiz/leaderboard', 'quiz_service'),                # location /api/quiz/leaderboard loses to the regex
+    ('/api/quiz', 'quiz_service'),                            # location /api/
+    ('/api/categories', 'quiz_service'),                      # location /api/
+    ('/favicon.ico', 'gateway'),                              # no location
+])
+def test_route_upstream_follows_nginx_location_selection(path, upstream):
+    assert route_upstream(path) == upstream
+
+
+def test_leaderboard_prefix_applies_when_no_regex_matches():
+    # Excluded from the quiz_service regex by /attempts, matched by no other regex
+    assert route_upstream('/api/quiz/leaderboard/attempts') == 'execution_service'
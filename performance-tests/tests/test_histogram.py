@@ -0,0 +1,37 @@
+import pytest
+
+from perf.histogram import LogHistogram
+
+
+def _histogram(*groups):
+    h = LogHistogram()
+    for value, n in groups:
+        h.add(value, n)
+    return h
+
+
+def test_values_just_below_one_ms_are_not_counted_as_zero():
+    h = _histogram((0.3, 10), (0.99, 80), (1.5, 10))
+    assert h.quantile(0.5) == pytest.approx(0.99, rel=0.01)
+    assert h.quantile(0.9) == pytest.approx(0.99, rel=0.01)
+
+
+def test_median_of_a_bucket_zero_majority():
+    h = _histogram((0.995, 99), (0.5, 1))
+    assert h.quantile(0.5) == pytest.approx(0.995, rel=0.01)
+
+
+def test_zero_values_are_kept_apart_and_round_trip():
+    h = _histogram((0.0, 60), (0.99, 40))
+    assert h.quantile(0.5) == 0.0
+    assert h.quantile(0.9) == pytest.approx(0.99, rel=0.01)
+    restored = LogHistogram.from_dict(h.to_dict())
+    assert restored.zero == 60
+    assert restored.quantile(0.9) == h.quantile(0.9)
+    assert LogHistogram().merge(restored).merge(restored).zero == 120
+
+
+def test_bucket_zero_is_an_ordinary_bucket():
+    # Bucket 0 is (1/GAMMA, 1] ms; zeros are only counted in "z"
+    h = LogHistogram.from_dict({'n': 3, 's': 2.97, 'min': 0.985, 'max': 0.995, 'b': [[0, 3]]})
+    assert h.quantile(0.5) == pytest.approx(0.99, rel=0.01)
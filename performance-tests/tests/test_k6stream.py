@@ -0,0 +1,61 @@
+import numpy as np
+
+from perf import k6stream
+
+
+def _requests():
+    return k6stream.RequestTable(
+        ['health_check', 'get_quizzes'],
+        np.array([0, 1, 1, 1]),
+        np.array([0.0, 1.0, 2.0, 3.0]),
+        np.array([500.0, 10.0, 20.0, 30.0]),
+        np.array([200, 200, 500, 200]),
+        np.array([0, 0, 0, 0]),
+    )
+
+
+def _summary():
+    trend = {'avg': 140, 'min': 10, 'med': 25, 'max': 500, 'p(90)': 500, 'p(95)': 500, 'p(99)': 500}
+    return {
+        'metrics': {
+            'http_req_duration': {'type': 'trend', 'values': dict(trend)},
+            'http_req_duration{name:get_quizzes}': {'type': 'trend', 'values': dict(trend)},
+            'http_req_duration{expected_response:true}': {'type': 'trend', 'values': dict(trend)},
+            'http_reqs': {'type': 'counter', 'values': {'count': 4, 'rate': 1.33}},
+            'http_req_failed': {'type': 'rate', 'values': {'rate': 0.25, 'passes': 1, 'fails': 3}},
+            'errors': {'type': 'rate', 'values': {'rate': 1, 'passes': 1, 'fails': 0}},
+            'http_req_waiting': {'type': 'trend', 'values': dict(trend)},
+            'vus_max': {'type': 'gauge', 'values': {'value': 5, 'min': 5, 'max': 5}},
+            'data_received': {'type': 'counter', 'contains': 'data', 'values': {'count': 4000, 'rate': 1333}},
+            'successful_requests': {'type': 'counter', 'values': {'count': 3, 'rate': 1}},
+        },
+        'histograms': {'http_req_duration': {}},
+        'state': {'testRunDurationMs': 3000},
+    }
+
+
+def test_subset_summary_recomputes_every_percentile():
+    subset = k6stream.subset_summary(_summary(), _requests(), np.array([False, True, True, True]))
+    values = subset['metrics']['http_req_duration']['values']
+    assert values['max'] == 30
+    assert values['p(90)'] == np.percentile([10, 20, 30], 90)
+    assert subset['metrics']['http_req_duration{expected_response:true}']['values']['max'] == 30
+    assert subset['metrics']['http_req_duration{name:get_quizzes}']['values']['avg'] == 20
+    assert subset['metrics']['http_reqs']['values'] == {'count': 3, 'rate': 1.5}
+    assert subset['metrics']['http_req_failed']['values'] == {'rate': 1 / 3, 'passes': 1, 'fails': 2}
+    assert subset['state']['testRunDurationMs'] == 2000
+
+
+def test_subset_summary_drops_what_it_cannot_recompute():
+    subset = k6stream.subset_summary(_summary(), _requests(), np.array([False, True, True, True]))
+    assert 'errors' not in subset['metrics']
+    assert 'http_req_waiting' not in subset['metrics']
+    assert 'histograms' not in subset
+    assert subset['metrics']['vus_max']['values']['max'] == 5
+
+
+def test_subset_summary_scales_per_request_counters():
+    subset = k6stream.subset_summary(_summary(), _requests(), np.array([False, True, True, True]))
+    assert subset['metrics']['data_received']['values'] == {'count': 3000, 'rate': 1500}
+    assert subset['metrics']['data_received']['contains'] == 'data'
+    assert subset['metrics']['successful_requests']['values']['count'] == 2.25
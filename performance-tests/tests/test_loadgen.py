@@ -0,0 +1,58 @@
+import asyncio
+
+from perf import loadgen
+
+RESPONSE = b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok'
+
+
+async def _serve(handler):
+    server = await asyncio.start_server(handler, '127.0.0.1', 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+def _drop_second_request(requests):
+    """Answer each connection's first request; read the second one and hang up without answering"""
+    async def handler(reader, writer):
+        requests.append(await reader.readuntil(b'\r\n\r\n'))
+        writer.write(RESPONSE)
+        await writer.drain()
+        requests.append(await reader.readuntil(b'\r\n\r\n'))
+        writer.close()
+    return handler
+
+
+async def _twice(method):
+    requests = []
+    server, url = await _serve(_drop_second_request(requests))
+    client = loadgen.HttpClient(url, timeout=5)
+    try:
+        await client.request(method, '/api/quiz/1/submit')
+        second = await client.request(method, '/api/quiz/1/submit')
+    finally:
+        await client.close()
+        server.close()
+    return second, len(requests)
+
+
+def test_failed_post_on_a_reused_connection_is_not_resent():
+    response, received = asyncio.run(_twice('POST'))
+    assert response.status == 0 and response.error_code == loadgen.K6_CONNECTION_ERROR
+    assert received == 2
+
+
+def test_failed_get_on_a_reused_connection_is_retried_once():
+    response, received = asyncio.run(_twice('GET'))
+    assert response.status == 200
+    assert received == 3
+
+
+def test_recorder_keeps_histograms_not_samples():
+    recorder = loadgen.Recorder()
+    for duration in range(1, 1001):
+        recorder.request('get_quizzes', 'GET', '/api/quiz', loadgen.Response(200, body=b'[]', duration=duration))
+    summary = recorder.summary(10, {})
+    values = summary['metrics']['http_req_duration{name:get_quizzes}']['values']
+    assert values['count'] == 1000
+    assert abs(values['p(95)'] - 950) / 950 < 0.02
+    assert summary['histograms']['http_req_duration']['n'] == 1000
+    assert isinstance(recorder.durations['get_quizzes'], loadgen.LogHistogram)
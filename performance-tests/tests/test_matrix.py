@@ -0,0 +1,26 @@
+import json
+
+from perf import archive, matrix
+
+
+def _point(time, duration, name):
+    return json.dumps({'type': 'Point', 'metric': 'http_req_duration',
+                       'data': {'time': time, 'value': duration,
+                                'tags': {'name': name, 'status': '200', 'method': 'GET'}}},
+                      separators=(',', ':'))
+
+
+def test_load_cells_reads_archived_raw_streams(tmp_path):
+    stem = 'aws-microservices-dataset-1000-5vu'
+    (tmp_path / f'results-{stem}.json').write_text(json.dumps({
+        'testConfig': {'testName': 'aws-microservices', 'vus': 5, 'dataset': {'users': 1000}},
+        'metrics': {'http_req_duration': {'values': {'p(95)': 10}}, 'http_reqs': {'values': {'rate': 2}}},
+    }))
+    raw = tmp_path / f'raw-{stem}.ndjson'
+    raw.write_text('\n'.join(_point(f'2026-01-01T00:00:0{i}Z', 10 + i, 'get_quizzes') for i in range(5)) + '\n')
+    archive.pack(str(raw), str(tmp_path / f'raw-{stem}.k6a'))
+    raw.unlink()
+
+    cells = matrix.load_cells(str(tmp_path))
+    assert [(c.architecture, c.vus) for c in cells] == [('aws-microservices', 5)]
+    assert cells[0].endpoints['get_quizzes']['p95'] > 13
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from perf.netem_proxy import LinkProfile, NetemProxy
+
+
+async def _answer_after_eof(reader, writer):
+    request = await reader.read()
+    writer.write(b'response to ' + request)
+    await writer.drain()
+    writer.close()
+
+
+async def _half_close_through(profile):
+    upstream = await asyncio.start_server(_answer_after_eof, '127.0.0.1', 0)
+    proxy = NetemProxy('127.0.0.1', 0, '127.0.0.1', upstream.sockets[0].getsockname()[1], profile)
+    server = await proxy.start()
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.sockets[0].getsockname()[1])
+        writer.write(b'request')
+        writer.write_eof()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+    finally:
+        server.close()
+        upstream.close()
+
+
+@pytest.mark.parametrize('profile', [LinkProfile(), LinkProfile(latency_ms=5, jitter_ms=1)])
+def test_response_after_a_client_half_close_is_delivered(profile):
+    assert asyncio.run(_half_close_through(profile)) == b'response to request'
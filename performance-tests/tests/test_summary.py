@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from perf import k6stream
+from perf.summary import RunSummary, load, split_name
+
+
+def test_error_rate_comes_from_http_req_failed():
+    run = RunSummary({'metrics': {
+        'errors': {'type': 'rate', 'values': {'rate': 1, 'passes': 12, 'fails': 0}},
+        'http_req_failed': {'type': 'rate', 'values': {'rate': 0.03, 'passes': 12, 'fails': 388}},
+    }})
+    assert run.error_rate == 0.03
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('results-monolith-heavy_load.json', ('monolith', 'heavy_load')),
+    ('results-aws-microservices-heavy_load.json', ('aws-microservices', 'heavy_load')),
+    ('raw-aws-microservices-heavy_load.ndjson', ('aws-microservices', 'heavy_load')),
+    ('raw-aws-microservices-heavy_load.ndjson.gz', ('aws-microservices', 'heavy_load')),
+    ('raw-aws-microservices-heavy_load.k6a', ('aws-microservices', 'heavy_load')),
+    ('bodies-aws-microservices-journey.ndjson', ('aws-microservices', 'journey')),
+    ('results-default.json', (None, None)),
+])
+def test_split_name_keeps_hyphenated_variants(path, expected):
+    assert split_name(path) == expected
+
+
+def test_split_name_prefers_the_test_name():
+    assert split_name('results-monolith-dataset-1000-5vu.json', 'monolith') == ('monolith', 'dataset_1000_5vu')
+
+
+def test_raw_streams_of_hyphenated_variants(tmp_path, monkeypatch):
+    for name in ('raw-aws-microservices-heavy_load.ndjson', 'raw-monolith-light_load.k6a'):
+        (tmp_path / name).write_text('')
+    monkeypatch.chdir(tmp_path)
+    assert sorted(k6stream.find_raw_results()) == [('aws-microservices', 'heavy_load'), ('monolith', 'light_load')]
+
+
+def test_ingest_keeps_hyphenated_variants(tmp_path, monkeypatch):
+    from perf import ingest
+
+    point = {'type': 'Point', 'metric': 'http_req_duration',
+             'data': {'time': '2026-01-01T00:00:00Z', 'value': 12, 'tags': {'name': 'browse_quizzes', 'status': '200'}}}
+    (tmp_path / 'raw-aws-micro-heavy_load.ndjson').write_text(json.dumps(point) + '\n')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('sys.argv', ['ingest', 'raw-aws-micro-heavy_load.ndjson'])
+    with pytest.raises(SystemExit):
+        ingest.main()
+    run = load('results-aws-micro-heavy_load.json')
+    assert (run.config['testName'], run.config['scenario']) == ('aws-micro', 'heavy_load')
+    assert (run.architecture, run.scenario) == ('aws-micro', 'heavy_load')
@@ -0,0 +1,29 @@
+import json
+
+from perf import traces
+
+
+def _document(trace_id):
+    span = {'traceId': trace_id, 'spanId': trace_id + 'r', 'name': 'GET', 'kind': 2,
+            'startTimeUnixNano': '1000', 'endTimeUnixNano': '5000',
+            'attributes': [{'key': 'http.route', 'value': {'stringValue': '/api/quiz'}}]}
+    return {'resourceSpans': [{'resource': {'attributes': [{'key': 'service.name',
+                                                             'value': {'stringValue': 'quiz'}}]},
+                               'scopeSpans': [{'spans': [span]}]}]}
+
+
+def test_load_spans_streams_ndjson(tmp_path):
+    path = tmp_path / 'traces.ndjson'
+    path.write_text('\n'.join(json.dumps(_document(t)) for t in ('a', 'b', 'c')) + '\n\n')
+    spans = traces.load_spans(str(path))
+    assert spans.trace_count == 3
+    assert spans.name_labels == ['/api/quiz']
+    assert spans.end.tolist() == [5000] * 3
+
+
+def test_load_spans_reads_a_pretty_printed_document(tmp_path):
+    path = tmp_path / 'traces.json'
+    path.write_text(json.dumps(_document('a'), indent=2))
+    spans = traces.load_spans(str(path))
+    assert len(spans) == 1
+    assert spans.service_labels == ['quiz']